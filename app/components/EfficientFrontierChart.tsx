@@ -78,7 +78,10 @@ export default function EfficientFrontierChart({ data }: { data: any }) {
             transition={{ duration: 0.5 }}
           >
             <img
-              src={`data:image/png;base64,${data.efficient_frontier_image}`}
+              src={
+                data.efficient_frontier_image_url ??
+                `data:image/png;base64,${data.efficient_frontier_image}`
+              }
               alt="Efficient Frontier"
               style={{ maxWidth: "100%", height: "auto" }}
             />
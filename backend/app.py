@@ -1,26 +1,37 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, url_for, g
 from flask_cors import CORS
-import yfinance as yf
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from statsmodels.tsa.arima.model import ARIMA
-from statsmodels.tsa.statespace.sarimax import SARIMAX
-from statsmodels.tsa.seasonal import seasonal_decompose
-from statsmodels.tsa.stattools import adfuller
-from sklearn.metrics import mean_absolute_error, mean_squared_error
 from math import sqrt
+from urllib.parse import urljoin
 import scipy.optimize as sco
-from scipy.stats import norm
-import tensorflow as tf
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense
-from sklearn.preprocessing import MinMaxScaler
 import warnings
 import logging
-import io
-import base64
+import os
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
+from scripts.price_store import PriceStore
+from scripts.data_sources import ConcurrentFetcher, parse_sources
+from scripts.return_cache import ReturnCache
+from scripts.response_cache import ResponseCache, request_key, request_tickers
+from scripts.metrics import (REGISTRY, REQUEST_SECONDS, REQUESTS_IN_FLIGHT, PROFILERS, stage, timed_stage,
+                             start_request, finish_request, server_timing, start_profile, stop_profile)
+from scripts.frontier import simulate_random_portfolios, frontier_envelope, exact_efficient_frontier
+from scripts.model_registry import ModelRegistry
+from scripts.risk import rolling_risk_metrics, RiskEngines
+from scripts.eda import analyze_frame
+from scripts.covariance import estimate_covariance, as_covariance_model, COVARIANCE_METHODS
+from scripts.optimizer import optimize_portfolio
+from scripts.arima_search import get_pool
+from scripts.backtest import (PORTFOLIO_STRATEGIES, walk_forward_portfolio, walk_forward_forecast,
+                             performance_summary, forecast_errors)
+from scripts.portfolio_risk import parametric_var_cvar, historical_var_cvar, monte_carlo_var_cvar
+from scripts.jobs import JobQueue, report_progress
+from scripts.backends import get_backend, preload_backends, FORECAST_BACKENDS
+from scripts.render_service import RenderService
+from scripts.encoding import (JSON, NDJSON, EVENT_STREAM, MIN_COMPRESS_BYTES, to_columnar, to_records,
+                              available_media_types, encode, encode_stream_item, available_encodings, compress)
 
 # Suppress warnings for cleaner logs
 warnings.filterwarnings('ignore')
@@ -29,7 +40,68 @@ warnings.filterwarnings('ignore')
 logging.basicConfig(level=logging.INFO)
 
 app = Flask(__name__)
-CORS(app)  # Allow cross-origin requests
+CORS(app, expose_headers=["ETag", "X-Cache", "Server-Timing"])  # Allow cross-origin requests; let the frontend read cache and timing headers
+
+# Price providers tried in order for each ticker, e.g. "yahoo,file:data/csv" to fall back to local CSV files
+PRICE_SOURCES = os.environ.get("PRICE_SOURCES", "yahoo")
+
+# Tickers are downloaded concurrently, each with retries, giving up on a whole fetch after FETCH_TIMEOUT seconds
+PRICE_FETCHER = ConcurrentFetcher(parse_sources(PRICE_SOURCES),
+                                  max_workers=int(os.environ.get("FETCH_WORKERS", 8)),
+                                  attempts=int(os.environ.get("FETCH_ATTEMPTS", 3)),
+                                  timeout=float(os.environ.get("FETCH_TIMEOUT", 60)))
+
+# Local price store so repeated requests only download new bars
+PRICE_STORE = PriceStore(os.environ.get("PRICE_STORE_DIR", os.path.join(os.path.dirname(__file__), "data", "price_store")),
+                         fetcher=PRICE_FETCHER)
+
+# Derived return statistics shared across requests, dropped when the price store changes
+RETURN_CACHE = ReturnCache()
+PRICE_STORE.add_listener(RETURN_CACHE.invalidate)
+
+# Results of identical requests, shared until their tickers' data changes or they expire
+RESPONSE_CACHE = ResponseCache(max_entries=int(os.environ.get("RESPONSE_CACHE_ENTRIES", 256)),
+                               ttl=float(os.environ.get("RESPONSE_CACHE_TTL", 300)))
+PRICE_STORE.add_listener(RESPONSE_CACHE.invalidate)
+
+# Rolling VaR/CVaR engines, extended bar by bar as new prices arrive
+RISK_ENGINES = RiskEngines()
+
+# Fitted forecasting models, reused until new bars arrive and then updated in place
+MODEL_REGISTRY = ModelRegistry(os.environ.get("MODEL_REGISTRY_DIR", os.path.join(os.path.dirname(__file__), "data", "models")))
+
+# Background worker processes for forecast, optimize and analyze jobs; their state is stored on disk so any server process can poll them
+JOB_QUEUE = JobQueue(os.environ.get("JOB_STORE_DIR", os.path.join(os.path.dirname(__file__), "data", "jobs")),
+                     max_workers=int(os.environ.get("JOB_WORKERS", 2)))
+
+# Plots rendered in worker processes and served by content hash; stored on disk so any server process can serve them
+RENDER_SERVICE = RenderService(os.environ.get("IMAGE_CACHE_DIR", os.path.join(os.path.dirname(__file__), "data", "images")),
+                               max_workers=int(os.environ.get("RENDER_WORKERS", 1)))
+
+# Threads analysing tickers concurrently within one /api/analyze request
+EDA_WORKERS = int(os.environ.get("EDA_WORKERS", min(8, os.cpu_count() or 1)))
+
+# Tickers analysed together in one vectorized pass when their prices are already loaded
+EDA_CHUNK_SIZE = int(os.environ.get("EDA_CHUNK_SIZE", 32))
+
+# Worker processes fitting models concurrently within one /api/forecast/batch request
+FORECAST_WORKERS = int(os.environ.get("FORECAST_WORKERS", os.cpu_count() or 1))
+
+# Requests sent with ?profile=cprofile (or pyinstrument) write a profile dump here; unset disables profiling
+PROFILE_DIR = os.environ.get("PROFILE_DIR")
+
+# Universes at least this large are optimized as a convex QP instead of with SLSQP
+QP_MIN_ASSETS = int(os.environ.get("QP_MIN_ASSETS", 50))
+
+# Most target returns an exact efficient frontier may solve for; each one is a QP
+MAX_FRONTIER_POINTS = int(os.environ.get("MAX_FRONTIER_POINTS", 200))
+
+# Tickers and backends `warmup` loads before the first request, e.g. "SPY,BND,TSLA" and "arima,plotting"
+WARMUP_TICKERS = [ticker.strip() for ticker in os.environ.get("WARMUP_TICKERS", "").split(",") if ticker.strip()]
+WARMUP_BACKENDS = [name.strip() for name in os.environ.get("WARMUP_BACKENDS", "").split(",") if name.strip()]
+
+# Outcome of the last `warmup`; /readyz reports 503 until it has run
+WARMUP_STATE = {"ready": False}
 
 # ---------------------------
 # HELPER FUNCTIONS
@@ -62,6 +134,38 @@ def negative_sharpe_ratio(weights, expected_returns, cov_matrix):
     """
     ret, vol, sharpe = portfolio_annualized_performance(weights, expected_returns, cov_matrix)
     return -sharpe
+def portfolio_volatility_gradient(weights, expected_returns, cov_matrix):
+    """
+    Analytic gradient of portfolio volatility with respect to the weights.
+    
+    Parameters:
+    weights (np.array): Portfolio weights
+    expected_returns (pd.Series): Expected annual returns
+    cov_matrix (pd.DataFrame): Annual covariance matrix
+    
+    Returns:
+    np.array: d(volatility)/d(weights) = Σw / σ
+    """
+    cov_w = as_covariance_model(cov_matrix).matvec(weights)
+    return cov_w / np.sqrt(np.dot(weights, cov_w))
+def negative_sharpe_ratio_gradient(weights, expected_returns, cov_matrix):
+    """
+    Analytic gradient of the negative Sharpe ratio with respect to the weights.
+    
+    Parameters:
+    weights (np.array): Portfolio weights
+    expected_returns (pd.Series): Expected annual returns
+    cov_matrix (pd.DataFrame): Annual covariance matrix
+    
+    Returns:
+    np.array: -(μ/σ - r·Σw/σ³)
+    """
+    mu = np.asarray(expected_returns)
+    cov_w = as_covariance_model(cov_matrix).matvec(weights)
+    vol = np.sqrt(np.dot(weights, cov_w))
+    ret = np.dot(weights, mu)
+    return -(mu / vol - ret * cov_w / vol ** 3)
+@timed_stage("fetch_prices")
 def fetch_and_preprocess_data(tickers, start_date="2015-01-01", end_date="2025-01-01"):
     """
     Fetches and preprocesses financial data for the given tickers.
@@ -74,15 +178,17 @@ def fetch_and_preprocess_data(tickers, start_date="2015-01-01", end_date="2025-0
     Returns:
     pd.DataFrame: Cleaned and processed dataframe with historical data
     """
-    # Fetch data using yfinance
-    data = yf.download(tickers, start=start_date, end=end_date)
+    # Read from the local price store, which only downloads dates it does not have yet
+    data = PRICE_STORE.get(tickers, start_date, end_date)
     
     # Check if data was successfully fetched
     if data.empty:
-        raise ValueError(f"No data fetched for tickers {tickers}. Please check the stock tickers.")
+        reasons = "; ".join(f"{ticker}: {error}" for ticker, error in PRICE_STORE.errors(tickers).items())
+        raise ValueError(f"No data fetched for tickers {tickers}" + (f" ({reasons})" if reasons else "")
+                         + ". Please check the stock tickers.")
     
-    # Select only the 'Close' prices and handle missing values
-    close_prices = data["Close"].copy()
+    # Handle missing values in the close prices
+    close_prices = data.copy()
     
     # Fill missing values using forward fill
     close_prices.fillna(method="ffill", inplace=True)
@@ -99,152 +205,121 @@ def fetch_and_preprocess_data(tickers, start_date="2015-01-01", end_date="2025-0
     
     return close_prices
 
-def perform_eda(data, tickers):
+def get_return_statistics(tickers, start_date="2015-01-01", end_date="2025-01-01", covariance="sample",
+                          **covariance_options):
     """
-    Perform exploratory data analysis on the given financial data.
+    Return daily returns and annualized return/covariance estimates for the
+    given tickers, served from the process-wide cache when the underlying
+    price data has not changed. The covariance comes back as a
+    CovarianceModel, so its factorizations are computed once and shared by
+    every request that hits the same cache entry.
     
     Parameters:
-    data (pd.DataFrame): Cleaned financial data
     tickers (list): List of stock tickers
+    start_date (str): Start date for historical data
+    end_date (str): End date for historical data
+    covariance (str): Covariance estimator, one of COVARIANCE_METHODS
+    **covariance_options: Estimator options ("halflife", "num_factors")
     
     Returns:
-    dict: Dictionary containing EDA results
+    tuple: (daily_returns, expected_returns, cov_matrix)
     """
-    eda_results = {}
-    
-    for ticker in tickers:
-        if ticker not in data.columns:
-            continue
-        
-        # Basic statistics
-        stats = data[ticker].describe().to_dict()
-        
-        # Rolling metrics
-        rolling_mean = data[ticker].rolling(window=30).mean()
-        rolling_std = data[ticker].rolling(window=30).std()
-        
-        # Calculate returns
-        returns = data[ticker].pct_change().dropna()
-        
-        # Stationarity test
-        stationarity = check_stationarity(data[ticker])
-        
-        # Seasonal decomposition
-        decomposition = seasonal_decompose(data[ticker], model="multiplicative", period=252)
-        trend = decomposition.trend
-        seasonal = decomposition.seasonal
-        residual = decomposition.resid
-        
-        # Volatility clustering
-        volatility_clustering = (returns.rolling(window=30).std() * np.sqrt(252)).dropna()
-        
-        # Store results
-        eda_results[ticker] = {
-            "basic_stats": stats,
-            "rolling_mean": rolling_mean.to_dict(),
-            "rolling_std": rolling_std.to_dict(),
-            "returns": returns.to_dict(),
-            "stationarity": stationarity,
-            "trend": trend.dropna().to_dict(),
-            "seasonal": seasonal.dropna().to_dict(),
-            "residual": residual.dropna().to_dict(),
-            "volatility_clustering": volatility_clustering.to_dict()
-        }
+    def compute():
+        data = fetch_and_preprocess_data(tickers, start_date, end_date)
+        with stage("return_statistics"):
+            daily_returns = data.pct_change().dropna()
+            cov_matrix = estimate_covariance(daily_returns, covariance, **covariance_options)
+        return daily_returns, daily_returns.mean() * 252, cov_matrix
     
-    return eda_results
+    # Refresh first so the version in the key reflects any newly fetched bars
+    PRICE_STORE.refresh(tickers, start_date, end_date)
+    key = (tuple(tickers), start_date, end_date, PRICE_STORE.version(tickers),
+           covariance, tuple(sorted(covariance_options.items())))
+    return RETURN_CACHE.get_or_compute(key, compute)
 
-def optimize_arima_params(series, max_p=5, max_d=2, max_q=5):
+def analyze_ticker(prices):
     """
-    Find optimal ARIMA parameters using AIC criterion.
+    Perform exploratory data analysis on one ticker's prices.
     
     Parameters:
-    series (pd.Series): Time series data
-    max_p (int): Maximum p value to test
-    max_d (int): Maximum d value to test
-    max_q (int): Maximum q value to test
+    prices (pd.Series): Cleaned close prices
     
     Returns:
-    tuple: Optimal (p, d, q) parameters
+    dict: "basic_stats" and "stationarity" plus a "series" dict of pd.Series
+    (rolling metrics, returns, decomposition, volatility clustering)
     """
-    best_aic = float("inf")
-    best_params = (0, 0, 0)
-    
-    for p in range(max_p + 1):
-        for d in range(max_d + 1):
-            for q in range(max_q + 1):
-                try:
-                    model = ARIMA(series, order=(p, d, q))
-                    model_fit = model.fit()
-                    
-                    if model_fit.aic < best_aic:
-                        best_aic = model_fit.aic
-                        best_params = (p, d, q)
-                except:
-                    continue
-    
-    return best_params
+    # The frame-wide engine on a single column, so both paths give identical results
+    result = next(iter(analyze_frame(prices.to_frame()).values()))
+    if "error" in result:
+        raise ValueError(result["error"])
+    return result
 
-def optimize_sarima_params(series, max_p=2, max_d=1, max_q=2, 
-                          max_P=1, max_D=1, max_Q=1, max_m=12):
+def perform_eda(data, tickers, max_workers=None):
     """
-    Find optimal SARIMA parameters using AIC criterion.
+    Perform exploratory data analysis on the given financial data, yielding
+    each ticker's results as soon as it is done.
     
-    Parameters:
-    series (pd.Series): Time series data
-    max_p (int): Maximum non-seasonal p value
-    max_d (int): Maximum non-seasonal d value
-    max_q (int): Maximum non-seasonal q value
-    max_P (int): Maximum seasonal P value
-    max_D (int): Maximum seasonal D value
-    max_Q (int): Maximum seasonal Q value
-    max_m (int): Maximum seasonal period
-    
-    Returns:
-    tuple: Optimal (p, d, q, P, D, Q, m) parameters
-    """
-    best_aic = float("inf")
-    best_params = (0, 0, 0, 0, 0, 0, 0)
-    
-    for p in range(max_p + 1):
-        for d in range(max_d + 1):
-            for q in range(max_q + 1):
-                for P in range(max_P + 1):
-                    for D in range(max_D + 1):
-                        for Q in range(max_Q + 1):
-                            for m in [12, 24, 252]:  # Common financial periods
-                                try:
-                                    model = SARIMAX(series, 
-                                                  order=(p, d, q),
-                                                  seasonal_order=(P, D, Q, m))
-                                    model_fit = model.fit(disp=False)
-                                    
-                                    if model_fit.aic < best_aic:
-                                        best_aic = model_fit.aic
-                                        best_params = (p, d, q, P, D, Q, m)
-                                except:
-                                    continue
-    
-    return best_params
-
-def create_lstm_model(window_size, features):
-    """
-    Create an LSTM model for time series forecasting.
+    Prices that are already loaded are analysed in chunks of
+    EDA_CHUNK_SIZE columns, each in one vectorized pass of `analyze_frame`;
+    a loader function is called per ticker instead, so each result is
+    ready as soon as its own prices are. Chunks or tickers run concurrently
+    in a thread pool with at most twice `max_workers` in flight, so memory
+    stays bounded however many tickers are requested. A ticker that fails
+    yields {"error": message} instead of stopping the others.
     
     Parameters:
-    window_size (int): Number of time steps to use for prediction
-    features (int): Number of features in the input data
+    data (pd.DataFrame or callable): Cleaned financial data, or a function
+    `ticker -> pd.Series` that loads one ticker's prices inside the worker
+    tickers (list): List of stock tickers
+    max_workers (int): Number of threads, defaults to EDA_WORKERS
     
     Returns:
-    Sequential: Compiled LSTM model
+    generator: (ticker, results) pairs in completion order
     """
-    model = Sequential()
-    model.add(LSTM(50, return_sequences=True, input_shape=(window_size, features)))
-    model.add(LSTM(50, return_sequences=False))
-    model.add(Dense(25))
-    model.add(Dense(1))
+    if isinstance(data, pd.DataFrame):
+        frame = data
+        tickers = [ticker for ticker in dict.fromkeys(tickers) if ticker in frame.columns]
+        chunks = [tickers[i:i + EDA_CHUNK_SIZE] for i in range(0, len(tickers), EDA_CHUNK_SIZE)]
+        
+        def run(chunk):
+            try:
+                with stage("eda"):
+                    return list(analyze_frame(frame[chunk]).items())
+            except Exception as e:
+                logging.exception(f"EDA failed for {chunk}")
+                return [(ticker, {"error": str(e)}) for ticker in chunk]
+    else:
+        chunks = [[ticker] for ticker in tickers]
+        
+        def run(chunk):
+            try:
+                prices = data(chunk[0])
+                with stage("eda"):
+                    return [(chunk[0], analyze_ticker(prices))]
+            except Exception as e:
+                logging.exception(f"EDA failed for {chunk[0]}")
+                return [(chunk[0], {"error": str(e)})]
     
-    model.compile(optimizer='adam', loss='mean_squared_error')
-    return model
+    max_workers = max_workers or EDA_WORKERS
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    remaining = iter(chunks)
+    pending = set()
+    try:
+        while True:
+            while len(pending) < 2 * max_workers:
+                chunk = next(remaining, None)
+                if chunk is None:
+                    break
+                # Run in a copy of this context so the stages count towards the request
+                pending.add(pool.submit(contextvars.copy_context().run, run, chunk))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+    finally:
+        # Also reached when a streaming client disconnects and the generator is closed
+        pool.shutdown(wait=False, cancel_futures=True)
 
 def calculate_var(returns, confidence_level=0.95):
     """
@@ -287,60 +362,67 @@ def portfolio_annualized_performance(weights, expected_returns, cov_matrix):
     tuple: (return, volatility, sharpe_ratio)
     """
     ret = np.dot(weights, expected_returns)
-    vol = np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights)))
+    vol = as_covariance_model(cov_matrix).volatility(weights)
     sharpe = ret / vol
     return ret, vol, sharpe
 
-def maximize_sharpe_ratio(expected_returns, cov_matrix):
+def maximize_sharpe_ratio(expected_returns, cov_matrix, initial_guess=None):
     """
     Find the portfolio weights that maximize the Sharpe ratio.
     
     Parameters:
     expected_returns (pd.Series): Expected annual returns
     cov_matrix (pd.DataFrame): Annual covariance matrix
+    initial_guess (np.array): Optional starting weights, e.g. a previous solution
     
     Returns:
     np.array: Optimal portfolio weights
     """
     num_assets = len(expected_returns)
     args = (expected_returns, cov_matrix)
-    constraints = ({'type': 'eq', 'fun': lambda x: np.sum(x) - 1})
+    constraints = ({'type': 'eq', 'fun': lambda x: np.sum(x) - 1, 'jac': lambda x: np.ones_like(x)})
     bounds = tuple((0, 1) for _ in range(num_assets))
-    initial_guess = num_assets * [1. / num_assets,]
+    if initial_guess is None:
+        initial_guess = num_assets * [1. / num_assets,]
     
     result = sco.minimize(negative_sharpe_ratio, 
                           initial_guess,
                           args=args,
+                          jac=negative_sharpe_ratio_gradient,
                           method='SLSQP',
                           bounds=bounds,
                           constraints=constraints)
     return result.x
-def minimum_volatility_portfolio(expected_returns, cov_matrix):
+def minimum_volatility_portfolio(expected_returns, cov_matrix, initial_guess=None):
     """
     Find the portfolio weights that minimize volatility.
     
     Parameters:
     expected_returns (pd.Series): Expected annual returns
     cov_matrix (pd.DataFrame): Annual covariance matrix
+    initial_guess (np.array): Optional starting weights, e.g. a previous solution
     
     Returns:
     np.array: Optimal portfolio weights
     """
     num_assets = len(expected_returns)
     args = (expected_returns, cov_matrix)
-    constraints = ({'type': 'eq', 'fun': lambda x: np.sum(x) - 1})
+    constraints = ({'type': 'eq', 'fun': lambda x: np.sum(x) - 1, 'jac': lambda x: np.ones_like(x)})
     bounds = tuple((0, 1) for _ in range(num_assets))
-    initial_guess = num_assets * [1. / num_assets,]
+    if initial_guess is None:
+        initial_guess = num_assets * [1. / num_assets,]
     
     result = sco.minimize(portfolio_volatility, 
                           initial_guess,
                           args=args,
+                          jac=portfolio_volatility_gradient,
                           method='SLSQP',
                           bounds=bounds,
                           constraints=constraints)
     return result.x
 
-def efficient_frontier(expected_returns, cov_matrix, num_portfolios=10000):
+@timed_stage("efficient_frontier")
+def efficient_frontier(expected_returns, cov_matrix, num_portfolios=10000, rng=None):
     """
     Generate the efficient frontier for a set of assets.
     
@@ -348,211 +430,1378 @@ def efficient_frontier(expected_returns, cov_matrix, num_portfolios=10000):
     expected_returns (pd.Series): Expected annual returns
     cov_matrix (pd.DataFrame): Annual covariance matrix
     num_portfolios (int): Number of portfolios to generate
+    rng (np.random.Generator): Random generator or seed for reproducible results
     
     Returns:
     pd.DataFrame: Efficient frontier data
     """
-    results = []
-    weights_list = []
+    portfolios = simulate_random_portfolios(expected_returns, cov_matrix, num_portfolios, rng=rng)
+    
+    # Keep only portfolios not dominated by a lower-volatility portfolio
+    frontier_idx = frontier_envelope(portfolios["volatility"], portfolios["return"])
+    
+    return pd.DataFrame({
+        'Volatility': portfolios["volatility"][frontier_idx],
+        'Return': portfolios["return"][frontier_idx],
+        'Sharpe Ratio': portfolios["sharpe_ratio"][frontier_idx]
+    })
+
+def optimal_portfolios(expected_returns, cov_matrix, optimizer="auto", previous_weights=None, **constraints):
+    """
+    Find the maximum Sharpe ratio and minimum volatility portfolios.
+    
+    Small unconstrained universes use SLSQP; large universes, or requests
+    with weight, sector or turnover constraints, are solved as a convex QP
+    (see scripts/optimizer.py), which scales to thousands of assets with a
+    factor covariance model.
     
-    for _ in range(num_portfolios):
-        weights = np.random.random(len(expected_returns))
-        weights /= np.sum(weights)
-        ret, vol, sharpe = portfolio_annualized_performance(weights, expected_returns, cov_matrix)
-        results.append((vol, ret, sharpe))
-        weights_list.append(weights)
+    Parameters:
+    expected_returns (pd.Series): Expected annual returns
+    cov_matrix (CovarianceModel): Annual covariance matrix
+    optimizer (str): "auto", "slsqp" or "qp"
+    previous_weights (np.array): Current holdings, used to warm-start both
+    optimizers and as the turnover anchor
+    **constraints: "max_weight", "sectors", "sector_bounds", "max_turnover"
     
-    results = np.array(results)
-    weights_list = np.array(weights_list)
+    Returns:
+    tuple: (max_sharpe_weights, min_vol_weights, optimizer used)
+    """
+    constraints = {name: value for name, value in constraints.items() if value is not None}
+    if optimizer == "auto":
+        optimizer = "qp" if constraints or len(expected_returns) >= QP_MIN_ASSETS else "slsqp"
     
-    # Find portfolios on the efficient frontier
-    unique_vol = np.unique(results[:,0])
-    ef_points = []
+    if optimizer == "slsqp":
+        if constraints:
+            raise ValueError("Weight, sector and turnover constraints need the 'qp' optimizer.")
+        return (maximize_sharpe_ratio(expected_returns, cov_matrix, previous_weights),
+                minimum_volatility_portfolio(expected_returns, cov_matrix, previous_weights),
+                optimizer)
     
-    for vol in unique_vol:
-        max_sharpe_idx = np.argmax(results[results[:,0]==vol][:,2])
-        ef_points.append(results[results[:,0]==vol][max_sharpe_idx])
+    return (optimize_portfolio(expected_returns, cov_matrix, "max_sharpe", previous_weights=previous_weights,
+                               **constraints),
+            optimize_portfolio(expected_returns, cov_matrix, "min_volatility", previous_weights=previous_weights,
+                               **constraints),
+            optimizer)
+def fit_forecast_model(series, model_type):
+    """
+    Search the order of and fit a forecasting model on a price series.
     
-    ef_points = np.array(ef_points)
+    Parameters:
+    series (pd.Series): Time series data
+    model_type (str): Name of a forecasting backend, e.g. "arima"
     
-    return pd.DataFrame(ef_points, columns=['Volatility', 'Return', 'Sharpe Ratio'])
-# ---------------------------
-# ENDPOINTS
-# ---------------------------
-# Endpoint 1: Data Analysis & EDA
-@app.route("/api/analyze", methods=["POST"])
-def analyze():
+    Returns:
+    dict: Registry entry with the fitted model and its parameters
+    """
+    with stage(f"{model_type}_fit"):
+        entry = get_backend(model_type).fit(series)
+    entry.update({
+        "nobs": len(series),
+        "last_date": series.index[-1],
+        "version": None
+    })
+    return entry
+
+def update_forecast_model(entry, series, model_type):
+    """
+    Bring a fitted model up to date with bars that arrived after it was fitted,
+    without re-estimating its parameters.
+    
+    Parameters:
+    entry (dict): Registry entry
+    series (pd.Series): Time series data including the new bars
+    model_type (str): Name of a forecasting backend
+    
+    Returns:
+    dict: Updated registry entry, or None if the series does not extend the
+    data the model was fitted on
+    """
+    nobs = entry["nobs"]
+    if len(series) < nobs or series.index[nobs - 1] != entry["last_date"]:
+        return None
+    
+    model = entry["model"]
+    if len(series) > nobs:
+        new_values = pd.Series(series.values[nobs:], index=pd.RangeIndex(nobs, len(series)), name=series.name)
+        with stage(f"{model_type}_update"):
+            model = get_backend(model_type).update(entry, new_values)
+    
+    return dict(entry, model=model, nobs=len(series), last_date=series.index[-1])
+
+def get_forecast_model(ticker, model_type, series, version=None):
+    """
+    Return a fitted model for the ticker from the registry, updating a
+    previous fit with new bars or fitting from scratch when needed.
+    
+    Parameters:
+    ticker (str): Stock ticker
+    model_type (str): "arima", "sarima" or "lstm"
+    series (pd.Series): Time series data
+    version (int): Price data version of the series, read from the price
+    store when not given
+    
+    Returns:
+    dict: Registry entry
+    """
+    if version is None:
+        version = PRICE_STORE.version([ticker])[0][1]
+    entry = MODEL_REGISTRY.get(ticker, model_type, version)
+    if entry is not None and entry["nobs"] == len(series):
+        return entry
+    
+    previous = MODEL_REGISTRY.latest(ticker, model_type)
+    entry = update_forecast_model(previous, series, model_type) if previous is not None else None
+    if entry is None:
+        report_progress(f"fitting {model_type}")
+        entry = fit_forecast_model(series, model_type)
+    entry["version"] = version
+    MODEL_REGISTRY.put(ticker, model_type, entry)
+    return entry
+
+def predict_forecast(entry, series, model_type, forecast_period):
+    """
+    Forecast `forecast_period` steps ahead with a fitted model.
+    
+    Parameters:
+    entry (dict): Registry entry
+    series (pd.Series): Time series data the model is up to date with
+    model_type (str): Name of a forecasting backend
+    forecast_period (int): Number of steps to forecast
+    
+    Returns:
+    tuple: (predictions, conf_int) where conf_int is None for LSTM
+    """
+    with stage(f"{model_type}_forecast"):
+        return get_backend(model_type).forecast(entry, series, forecast_period)
+
+def forecast_result(ticker, model_type, forecast_period, predictions, conf_int):
+    """
+    Build the response body for one ticker's forecast.
+    
+    Parameters:
+    ticker (str): Stock ticker
+    model_type (str): Name of a forecasting backend
+    forecast_period (int): Number of steps forecast
+    predictions (pd.Series or np.array): Forecast prices
+    conf_int (pd.DataFrame): Lower and upper confidence bounds, or None
+    
+    Returns:
+    dict: Forecast with confidence intervals when the model has them
+    """
+    results = {
+        "ticker": ticker,
+        "model": model_type,
+        "forecast_period": forecast_period,
+        "predictions": predictions.to_dict() if hasattr(predictions, 'to_dict') else {i: val for i, val in enumerate(predictions)}
+    }
+    
+    if conf_int is not None:
+        results["confidence_interval_lower"] = conf_int.iloc[:, 0].to_dict()
+        results["confidence_interval_upper"] = conf_int.iloc[:, 1].to_dict()
+    
+    return results
+
+def forecast_ticker(ticker, model_type, series, forecast_period, version):
+    """
+    Fit or update one ticker's model and forecast with it. Runs in a pool
+    worker for batch forecasts; the fit is stored in the on-disk registry
+    and only the forecast is sent back.
+    
+    Parameters:
+    ticker (str): Stock ticker
+    model_type (str): Name of a forecasting backend
+    series (pd.Series): Cleaned close prices
+    forecast_period (int): Number of steps to forecast
+    version (int): Price data version of the series
+    
+    Returns:
+    dict: Output of `forecast_result`
+    """
+    entry = get_forecast_model(ticker, model_type, series, version)
+    predictions, conf_int = predict_forecast(entry, series, model_type, forecast_period)
+    return forecast_result(ticker, model_type, forecast_period, predictions, conf_int)
+
+def parse_analyze_params(params):
+    """
+    Validate the body of an /api/analyze request.
+    
+    Parameters:
+    params (dict): Request body
+    
+    Returns:
+    tuple: (options dict with "tickers", "format", "precision" and
+    "max_points", error message or None)
+    """
+    # Get tickers from request
+    tickers = [ticker.strip() for ticker in params.get("stocks", []) if ticker.strip()]
+    if not tickers:
+        return None, "No valid stocks provided."
+    
+    response_format = params.get("format", "columnar")
+    if response_format not in ("columnar", "records"):
+        return None, "Invalid format. Choose 'columnar' or 'records'."
+    precision = params.get("precision", "float64")
+    if precision not in ("float64", "float32"):
+        return None, "Invalid precision. Choose 'float64' or 'float32'."
+    max_points = params.get("max_points")
+    
+    return {
+        "tickers": tickers,
+        "format": response_format,
+        "precision": precision,
+        "max_points": int(max_points) if max_points else None
+    }, None
+
+def encode_eda_result(result, options, index=None):
+    """
+    Replace the pd.Series in one ticker's EDA results with columnar arrays,
+    or with {date: value} dicts for the "records" format.
+    
+    Parameters:
+    result (dict): Output of `analyze_ticker`
+    options (dict): Parsed request options
+    index (pd.DatetimeIndex): Date index to align on, defaults to the
+    union of the ticker's own series
+    
+    Returns:
+    tuple: (encoded result, dates array)
+    """
+    dates, columns = to_columnar({"": result["series"]}, index, options["precision"], options["max_points"])
+    result = {key: value for key, value in result.items() if key != "series"}
+    if options["format"] == "records":
+        result.update({metric: to_records(dates, values) for metric, values in columns[""].items()})
+    else:
+        result["series"] = columns[""]
+    return result, dates
+
+def run_analyze(params):
+    """
+    Run exploratory data analysis for the requested stocks.
+    
+    By default the series are returned in a columnar layout: one shared
+    "dates" array and, per ticker, one array per metric aligned with it
+    (null where a metric has no value). `"format": "records"` returns the
+    previous {date: value} dict per metric instead.
+    
+    Parameters:
+    params (dict): Request body with a "stocks" list and optional "format"
+    ("columnar" or "records"), "precision" ("float64" or "float32") and
+    "max_points" (downsample to at most this many dates)
+    
+    Returns:
+    tuple: (response dict, HTTP status code)
+    """
+    options, error = parse_analyze_params(params)
+    if error:
+        return {"error": error}, 400
+    tickers = options["tickers"]
+    
+    # Fetch and preprocess data
+    data = fetch_and_preprocess_data(tickers)
+    
+    # Perform EDA, aligning every series onto the shared date index
+    eda_results = {}
+    dates = None
+    for ticker, result in perform_eda(data, tickers):
+        if "error" not in result:
+            result, dates = encode_eda_result(result, options, data.index)
+        eda_results[ticker] = result
+        report_progress("eda", len(eda_results), len(tickers))
+    
+    # Return results
+    results = {
+        "message": "EDA completed successfully",
+        "results": {ticker: eda_results[ticker] for ticker in tickers if ticker in eda_results},
+        "tickers": tickers
+    }
+    if options["format"] == "columnar":
+        if dates is None:
+            dates, _ = to_columnar({}, data.index, options["precision"], options["max_points"])
+        results.update({"format": "columnar", "dtype": options["precision"], "dates": dates})
+    return results, 200
+
+def stream_analyze(options, media_type):
+    """
+    Stream EDA results one ticker at a time as NDJSON lines or server-sent
+    events. Each ticker's prices are loaded inside its worker and every
+    ticker carries its own "dates" array, so the first result is sent as
+    soon as one ticker is done and nothing is kept once it is written.
+    
+    Parameters:
+    options (dict): Parsed request options
+    media_type (str): NDJSON or EVENT_STREAM
+    
+    Returns:
+    generator: Encoded chunks; one per ticker, then a final summary
+    """
+    tickers = options["tickers"]
+    failed = []
+    
+    for ticker, result in perform_eda(lambda ticker: fetch_and_preprocess_data([ticker])[ticker], tickers):
+        if "error" in result:
+            failed.append(ticker)
+            item = dict(result, ticker=ticker)
+        else:
+            result, dates = encode_eda_result(result, options)
+            item = dict(result, ticker=ticker)
+            if options["format"] == "columnar":
+                item.update({"format": "columnar", "dtype": options["precision"], "dates": dates})
+        yield encode_stream_item(item, media_type, event="error" if ticker in failed else "ticker")
+    
+    yield encode_stream_item({
+        "message": "EDA completed successfully",
+        "tickers": tickers,
+        "failed": failed
+    }, media_type, event="done")
+
+def run_forecast(params):
+    """
+    Forecast a single ticker with ARIMA, SARIMA or LSTM.
+    
+    Parameters:
+    params (dict): Request body with "ticker", "model_type" and "forecast_period"
+    
+    Returns:
+    tuple: (response dict, HTTP status code)
+    """
+    # Get parameters from request
+    ticker = params.get("ticker")
+    model_type = params.get("model_type", "arima")
+    forecast_period = params.get("forecast_period", 30)
+    
+    if not ticker:
+        return {"error": "No valid ticker provided."}, 400
+    
+    # Fetch data
+    data = fetch_and_preprocess_data([ticker])
+    
+    # Select forecasting model
+    model_type = model_type.lower()
+    if model_type not in FORECAST_BACKENDS:
+        return {"error": "Invalid model type. Choose from 'arima', 'sarima', or 'lstm'."}, 400
+    
+    # Reuse a registered fit when possible, then forecast
+    entry = get_forecast_model(ticker, model_type, data[ticker])
+    report_progress("forecasting")
+    predictions, conf_int = predict_forecast(entry, data[ticker], model_type, forecast_period)
+    
+    # Prepare results
+    return forecast_result(ticker, model_type, forecast_period, predictions, conf_int), 200
+
+def parse_batch_forecast_params(params):
+    """
+    Validate the body of an /api/forecast/batch request.
+    
+    Parameters:
+    params (dict): Request body
+    
+    Returns:
+    tuple: (options dict with "tickers", "model_types" and
+    "forecast_period", error message or None)
+    """
+    tickers = params.get("tickers", params.get("stocks", []))
+    tickers = list(dict.fromkeys(ticker.strip() for ticker in tickers if ticker.strip()))
+    if not tickers:
+        return None, "No valid tickers provided."
+    
+    model_types = params.get("model_types", params.get("model_type", "arima"))
+    if isinstance(model_types, str):
+        model_types = [model_types]
+    model_types = list(dict.fromkeys(model_type.lower() for model_type in model_types))
+    if not model_types or any(model_type not in FORECAST_BACKENDS for model_type in model_types):
+        return None, "Invalid model type. Choose from 'arima', 'sarima', or 'lstm'."
+    
+    forecast_period = int(params.get("forecast_period", 30))
+    if forecast_period < 1:
+        return None, "forecast_period must be at least 1."
+    
+    return {
+        "tickers": tickers,
+        "model_types": model_types,
+        "forecast_period": forecast_period
+    }, None
+
+def batch_forecast(options, n_jobs=None):
+    """
+    Forecast every requested (ticker, model type) pair, yielding each
+    result as soon as it is ready.
+    
+    Prices for all tickers are read in one bulk price store call, so
+    missing bars are downloaded in a single request. Pairs whose registry
+    entry is already up to date are forecast right away in this process;
+    the rest are fitted in parallel on the shared process pool. A ticker
+    without data, or a fit that fails, yields {"error": message} for that
+    pair and the others carry on.
+    
+    Parameters:
+    options (dict): Parsed request options
+    n_jobs (int): Worker processes for the fits, defaults to
+    FORECAST_WORKERS; 1 fits in this process
+    
+    Returns:
+    generator: (ticker, model_type, result) triples in completion order
+    """
+    tickers, model_types = options["tickers"], options["model_types"]
+    forecast_period = options["forecast_period"]
+    n_jobs = n_jobs or FORECAST_WORKERS
+    total = len(tickers) * len(model_types)
+    
+    data = PRICE_STORE.get(tickers, "2015-01-01", "2025-01-01")
+    versions = dict(PRICE_STORE.version(tickers))
+    
+    # Split the pairs into missing data, fresh registry entries and fits
+    missing, fresh, pending = [], [], []
+    for ticker in tickers:
+        if ticker not in data.columns:
+            missing += [(ticker, model_type) for model_type in model_types]
+            continue
+        series = data[ticker].dropna()
+        for model_type in model_types:
+            entry = MODEL_REGISTRY.get(ticker, model_type, versions[ticker])
+            if entry is not None and entry["nobs"] == len(series):
+                fresh.append((ticker, model_type, series, entry))
+            else:
+                pending.append((ticker, model_type, series))
+    
+    def run(func, ticker, model_type, *args):
+        try:
+            return func(*args)
+        except Exception as e:
+            logging.exception(f"Forecast failed for {ticker} ({model_type})")
+            return {"error": str(e)}
+    
+    def predict(ticker, model_type, series, entry):
+        predictions, conf_int = predict_forecast(entry, series, model_type, forecast_period)
+        return forecast_result(ticker, model_type, forecast_period, predictions, conf_int)
+    
+    # Start the fits first so they run while the fresh entries are forecast here
+    futures = {}
+    if n_jobs > 1 and len(pending) > 1:
+        pool = get_pool(n_jobs)
+        futures = {pool.submit(forecast_ticker, ticker, model_type, series, forecast_period, versions[ticker]):
+                   (ticker, model_type) for ticker, model_type, series in pending}
+        pending = []
+    
+    done = 0
     try:
-        # Get tickers from request
-        tickers = [ticker.strip() for ticker in request.json.get("stocks", []) if ticker.strip()]
-        if not tickers:
-            return jsonify({"error": "No valid stocks provided."}), 400
-        
-        # Fetch and preprocess data
-        data = fetch_and_preprocess_data(tickers)
-        
-        # Perform EDA
-        eda_results = perform_eda(data, tickers)
-        
-        # Return results
-        return jsonify({
-            "message": "EDA completed successfully",
-            "results": eda_results,
-            "tickers": tickers
-        })
+        errors = PRICE_STORE.errors([ticker for ticker, _ in missing])
+        for ticker, model_type in missing:
+            done += 1
+            reason = f" ({errors[ticker]})" if ticker in errors else ""
+            yield ticker, model_type, {"error": f"No data fetched for ticker {ticker}{reason}. Please check the stock ticker."}
+        for ticker, model_type, series, entry in fresh:
+            done += 1
+            report_progress("forecasts", done, total)
+            yield ticker, model_type, run(predict, ticker, model_type, ticker, model_type, series, entry)
+        for ticker, model_type, series in pending:
+            done += 1
+            report_progress(f"fitting {model_type}", done, total)
+            yield ticker, model_type, run(forecast_ticker, ticker, model_type, ticker, model_type, series,
+                                          forecast_period, versions[ticker])
+        for future in as_completed(futures):
+            ticker, model_type = futures[future]
+            result = run(future.result, ticker, model_type)
+            # The worker stored its fit on disk; drop the stale copy held here
+            MODEL_REGISTRY.evict(ticker, model_type)
+            done += 1
+            report_progress("forecasts", done, total)
+            yield ticker, model_type, result
+    finally:
+        # Also reached when a streaming client disconnects and the generator is closed
+        for future in futures:
+            future.cancel()
+
+def run_batch_forecast(params):
+    """
+    Forecast many tickers with one or more models in a single request.
     
-    except Exception as e:
-        logging.exception("Error in /api/analyze")
-        return jsonify({"error": str(e)}), 500
+    Parameters:
+    params (dict): Request body with a "tickers" list, "model_types" (a
+    list of "arima", "sarima" and "lstm", default ["arima"]) and
+    "forecast_period"
+    
+    Returns:
+    tuple: (response dict, HTTP status code)
+    """
+    options, error = parse_batch_forecast_params(params)
+    if error:
+        return {"error": error}, 400
+    
+    forecasts = {}
+    failed = []
+    for ticker, model_type, result in batch_forecast(options):
+        if "error" in result:
+            failed.append({"ticker": ticker, "model": model_type, "error": result["error"]})
+        else:
+            forecasts.setdefault(ticker, {})[model_type] = result
+    
+    return {
+        "message": "Batch forecast completed",
+        "results": {ticker: forecasts[ticker] for ticker in options["tickers"] if ticker in forecasts},
+        "tickers": options["tickers"],
+        "model_types": options["model_types"],
+        "failed": failed
+    }, 200
 
-@app.route("/api/forecast", methods=["POST"])
-def forecast():
+def stream_batch_forecast(options, media_type):
+    """
+    Stream batch forecasts as NDJSON lines or server-sent events, one per
+    (ticker, model type) pair in the order they finish.
+    
+    Parameters:
+    options (dict): Parsed request options
+    media_type (str): NDJSON or EVENT_STREAM
+    
+    Returns:
+    generator: Encoded chunks; one per forecast, then a final summary
+    """
+    failed = []
+    
+    for ticker, model_type, result in batch_forecast(options):
+        if "error" in result:
+            failed.append({"ticker": ticker, "model": model_type, "error": result["error"]})
+            yield encode_stream_item(dict(result, ticker=ticker, model=model_type), media_type, event="error")
+        else:
+            yield encode_stream_item(result, media_type, event="ticker")
+    
+    yield encode_stream_item({
+        "message": "Batch forecast completed",
+        "tickers": options["tickers"],
+        "model_types": options["model_types"],
+        "failed": failed
+    }, media_type, event="done")
+
+def parse_covariance_params(params):
+    """
+    Read the covariance estimator settings from a request body.
+    
+    Parameters:
+    params (dict): Request body with optional "covariance" (one of
+    COVARIANCE_METHODS), "halflife" (EWMA, trading days) and "num_factors"
+    (factor model)
+    
+    Returns:
+    tuple: (keyword arguments for get_return_statistics, error message or None)
+    """
+    method = params.get("covariance", "sample")
+    if method not in COVARIANCE_METHODS:
+        return None, f"Unknown covariance method '{method}'. Choose from {', '.join(COVARIANCE_METHODS)}."
+    options = {"covariance": method}
     try:
-        # Get parameters from request
-        ticker = request.json.get("ticker")
-        model_type = request.json.get("model_type", "arima")
-        forecast_period = request.json.get("forecast_period", 30)
-        
-        if not ticker:
-            return jsonify({"error": "No valid ticker provided."}), 400
-        
-        # Fetch data
-        data = fetch_and_preprocess_data([ticker])
-        
-        # Select forecasting model
-        if model_type.lower() == "arima":
-            # Optimize ARIMA parameters
-            best_params = optimize_arima_params(data[ticker])
-            model = ARIMA(data[ticker], order=best_params)
-            model_fit = model.fit()
-            
-            # Forecast
-            forecast = model_fit.get_forecast(steps=forecast_period)
-            predictions = forecast.predicted_mean
-            conf_int = forecast.conf_int()
-            
-        elif model_type.lower() == "sarima":
-            # Optimize SARIMA parameters
-            best_params = optimize_sarima_params(data[ticker])
-            model = SARIMAX(data[ticker], 
-                           order=(best_params[0], best_params[1], best_params[2]),
-                           seasonal_order=(best_params[3], best_params[4], best_params[5], best_params[6]))
-            model_fit = model.fit(disp=False)
-            
-            # Forecast
-            forecast = model_fit.get_forecast(steps=forecast_period)
-            predictions = forecast.predicted_mean
-            conf_int = forecast.conf_int()
-            
-        elif model_type.lower() == "lstm":
-            # Prepare data for LSTM
-            scaler = MinMaxScaler(feature_range=(0, 1))
-            scaled_data = scaler.fit_transform(np.array(data[ticker]).reshape(-1, 1))
-            
-            # Create sequences
-            window_size = 60
-            X, y = create_sequences(scaled_data, window_size)
-            
-            # Split into train/test
-            split = int(0.8 * len(X))
-            X_train, X_test = X[:split], X[split:]
-            y_train, y_test = y[:split], y[split:]
-            
-            # Reshape data for LSTM [samples, time steps, features]
-            X_train = np.reshape(X_train, (X_train.shape[0], X_train.shape[1], 1))
-            X_test = np.reshape(X_test, (X_test.shape[0], X_test.shape[1], 1))
-            
-            # Create and train model with early stopping
-            model = create_lstm_model(window_size, 1)
-            
-            # Add early stopping to prevent overfitting and reduce training time
-            early_stopping = tf.keras.callbacks.EarlyStopping(
-                monitor='val_loss',
-                patience=5,
-                restore_best_weights=True
-            )
-            
-            model.fit(
-                X_train, 
-                y_train, 
-                batch_size=32, 
-                epochs=50,
-                validation_data=(X_test, y_test),
-                callbacks=[early_stopping]
+        if method == "ewma" and "halflife" in params:
+            options["halflife"] = float(params["halflife"])
+            if options["halflife"] <= 0:
+                return None, "halflife must be positive."
+        if method == "factor" and "num_factors" in params:
+            options["num_factors"] = int(params["num_factors"])
+            if not 1 <= options["num_factors"] <= len(params.get("stocks", [])):
+                return None, "num_factors must be between 1 and the number of stocks."
+    except (TypeError, ValueError):
+        return None, "halflife and num_factors must be numbers."
+    return options, None
+
+def parse_optimizer_params(params, tickers):
+    """
+    Read the optimizer choice and portfolio constraints from a request body.
+    
+    Parameters:
+    params (dict): Request body with optional "optimizer" ("auto", "slsqp"
+    or "qp"), "max_weight", "sectors" ({ticker: sector}), "sector_bounds"
+    ({sector: [min, max]}), "previous_weights" ({ticker: weight}) and
+    "max_turnover"
+    tickers (list): Tickers in portfolio order
+    
+    Returns:
+    tuple: (keyword arguments for optimal_portfolios, error message or None)
+    """
+    optimizer = params.get("optimizer", "auto")
+    if optimizer not in ("auto", "slsqp", "qp"):
+        return None, f"Unknown optimizer '{optimizer}'. Choose from auto, slsqp, qp."
+    options = {"optimizer": optimizer}
+    try:
+        if params.get("max_weight") is not None:
+            options["max_weight"] = float(params["max_weight"])
+            if not 0 < options["max_weight"] <= 1:
+                return None, "max_weight must be in (0, 1]."
+        if params.get("sector_bounds"):
+            sectors = params.get("sectors") or {}
+            missing = [ticker for ticker in tickers if ticker not in sectors]
+            if missing:
+                return None, f"No sector given for {missing}."
+            options["sectors"] = [sectors[ticker] for ticker in tickers]
+            options["sector_bounds"] = {sector: (float(low), float(high))
+                                        for sector, (low, high) in params["sector_bounds"].items()}
+        if params.get("previous_weights"):
+            previous = params["previous_weights"]
+            options["previous_weights"] = np.array([float(previous.get(ticker, 0.0)) for ticker in tickers])
+        if params.get("max_turnover") is not None:
+            if "previous_weights" not in options:
+                return None, "max_turnover needs previous_weights."
+            options["max_turnover"] = float(params["max_turnover"])
+    except (TypeError, ValueError, AttributeError):
+        return None, "Invalid portfolio constraints."
+    return options, None
+
+def covariance_summary(cov_matrix):
+    """
+    Describe the covariance estimate used for a response.
+    
+    Parameters:
+    cov_matrix (CovarianceModel): Covariance model
+    
+    Returns:
+    dict: Estimator name and its details (shrinkage, factors, ...)
+    """
+    return {"method": cov_matrix.method, **cov_matrix.details}
+
+def run_optimize(params):
+    """
+    Compute the maximum Sharpe ratio and minimum volatility portfolios and
+    the efficient frontier for the requested stocks.
+    
+    Parameters:
+    params (dict): Request body with "stocks", optional frontier settings,
+    covariance estimator settings (see parse_covariance_params) and
+    optimizer settings and constraints (see parse_optimizer_params)
+    
+    Returns:
+    tuple: (response dict, HTTP status code)
+    """
+    # Get tickers from request
+    tickers = [ticker.strip() for ticker in params.get("stocks", []) if ticker.strip()]
+    if not tickers:
+        return {"error": "No valid stocks provided."}, 400
+    covariance_options, error = parse_covariance_params(params)
+    if error:
+        return {"error": error}, 400
+    optimizer_options, error = parse_optimizer_params(params, tickers)
+    if error:
+        return {"error": error}, 400
+    frontier_points = params.get("frontier_points", 50)
+    if (isinstance(frontier_points, bool) or not isinstance(frontier_points, int)
+            or not 1 <= frontier_points <= MAX_FRONTIER_POINTS):
+        return {"error": f"frontier_points must be an integer between 1 and {MAX_FRONTIER_POINTS}."}, 400
+    
+    # Fetch data and annualized returns and covariance
+    daily_returns, expected_returns, cov_matrix = get_return_statistics(tickers, **covariance_options)
+    
+    # Calculate optimal portfolios
+    report_progress("optimizing portfolios")
+    try:
+        with stage("portfolio_optimization"):
+            max_sharpe_weights, min_vol_weights, optimizer = optimal_portfolios(expected_returns, cov_matrix,
+                                                                                **optimizer_options)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    
+    # Calculate efficient frontier, either sampled or solved exactly
+    report_progress("efficient frontier")
+    if params.get("frontier_method", "sampled") == "exact":
+        with stage("efficient_frontier"):
+            ef = exact_efficient_frontier(expected_returns, cov_matrix, num_points=frontier_points)
+        ef = ef.drop(columns=["weights"])
+    else:
+        ef = efficient_frontier(expected_returns, cov_matrix, rng=params.get("seed"))
+    
+    # Prepare results
+    results = {
+        "max_sharpe_portfolio": {
+            "weights": {ticker: round(weight, 4) for ticker, weight in zip(tickers, max_sharpe_weights)},
+            "performance": portfolio_annualized_performance(max_sharpe_weights, expected_returns, cov_matrix)
+        },
+        "min_volatility_portfolio": {
+            "weights": {ticker: round(weight, 4) for ticker, weight in zip(tickers, min_vol_weights)},
+            "performance": portfolio_annualized_performance(min_vol_weights, expected_returns, cov_matrix)
+        },
+        "efficient_frontier": ef.to_dict(orient='records'),
+        "covariance": covariance_summary(cov_matrix),
+        "optimizer": optimizer
+    }
+    
+    return results, 200
+
+def run_risk(params):
+    """
+    Compute rolling historical VaR, CVaR and annualized volatility for the
+    requested stocks over one or more windows and confidence levels.
+    
+    Engines are kept per (tickers, window, confidence levels) and only
+    process the bars that arrived since the previous request.
+    
+    Parameters:
+    params (dict): Request body with "stocks" and optional "windows"
+    (trading days, default [252]), "confidence_levels" (default [0.95, 0.99]),
+    "precision" and "max_points"
+    
+    Returns:
+    tuple: (response dict, HTTP status code)
+    """
+    # Get tickers from request
+    tickers = [ticker.strip() for ticker in params.get("stocks", []) if ticker.strip()]
+    if not tickers:
+        return {"error": "No valid stocks provided."}, 400
+    
+    windows = [int(window) for window in params.get("windows", [252])]
+    confidence_levels = tuple(float(level) for level in params.get("confidence_levels", [0.95, 0.99]))
+    if not all(0 < level < 1 for level in confidence_levels):
+        return {"error": "Confidence levels must be between 0 and 1."}, 400
+    precision = params.get("precision", "float64")
+    if precision not in ("float64", "float32"):
+        return {"error": "Invalid precision. Choose 'float64' or 'float32'."}, 400
+    max_points = params.get("max_points")
+    
+    # Fetch data and daily returns
+    daily_returns, _, _ = get_return_statistics(tickers)
+    if not all(2 <= window <= len(daily_returns) for window in windows):
+        return {"error": f"Windows must be between 2 and {len(daily_returns)} trading days."}, 400
+    
+    # Rolling metrics for every ticker at once, one engine per window
+    report_progress("rolling risk")
+    series = {ticker: {} for ticker in daily_returns.columns}
+    for window in windows:
+        metrics = RISK_ENGINES.series(daily_returns, window, confidence_levels)
+        for ticker in daily_returns.columns:
+            for level in confidence_levels:
+                series[ticker][f"var_{level * 100:g}_{window}"] = metrics["var"][level][ticker]
+                series[ticker][f"cvar_{level * 100:g}_{window}"] = metrics["cvar"][level][ticker]
+            series[ticker][f"volatility_{window}"] = metrics["volatility"][ticker]
+    
+    # Align every series onto the shared date index
+    dates, columns = to_columnar(series, daily_returns.index, precision, int(max_points) if max_points else None)
+    results = {
+        ticker: {
+            "latest": {metric: float(values.iloc[-1]) for metric, values in series[ticker].items()},
+            "series": columns[ticker]
+        }
+        for ticker in daily_returns.columns
+    }
+    
+    return {
+        "message": "Risk metrics computed successfully",
+        "tickers": list(daily_returns.columns),
+        "windows": windows,
+        "confidence_levels": list(confidence_levels),
+        "results": results,
+        "format": "columnar",
+        "dtype": precision,
+        "dates": dates
+    }, 200
+
+def run_portfolio_risk(params):
+    """
+    Compute portfolio VaR and CVaR for the maximum Sharpe ratio and minimum
+    volatility portfolios with parametric (delta-normal), historical and
+    Monte Carlo methods.
+    
+    Parameters:
+    params (dict): Request body with "stocks" and optional "methods",
+    "confidence_levels", "horizon" (trading days), "num_scenarios", "seed",
+    "distribution" ("normal" or "t"), "df", "executor" ("threads" or
+    "processes"), covariance estimator settings (see
+    parse_covariance_params) and optimizer settings and constraints (see
+    parse_optimizer_params)
+    
+    Returns:
+    tuple: (response dict, HTTP status code)
+    """
+    # Get tickers from request
+    tickers = [ticker.strip() for ticker in params.get("stocks", []) if ticker.strip()]
+    if not tickers:
+        return {"error": "No valid stocks provided."}, 400
+    
+    methods = params.get("methods", ["parametric", "historical", "monte_carlo"])
+    unknown = set(methods) - {"parametric", "historical", "monte_carlo"}
+    if unknown:
+        return {"error": f"Unknown methods {sorted(unknown)}. Choose from parametric, historical, monte_carlo."}, 400
+    confidence_levels = tuple(float(level) for level in params.get("confidence_levels", [0.95, 0.99]))
+    if not all(0 < level < 1 for level in confidence_levels):
+        return {"error": "Confidence levels must be between 0 and 1."}, 400
+    horizon = int(params.get("horizon", 1))
+    num_scenarios = int(params.get("num_scenarios", 100000))
+    if horizon < 1 or num_scenarios < 100:
+        return {"error": "Horizon must be at least 1 day and num_scenarios at least 100."}, 400
+    covariance_options, error = parse_covariance_params(params)
+    if error:
+        return {"error": error}, 400
+    optimizer_options, error = parse_optimizer_params(params, tickers)
+    if error:
+        return {"error": error}, 400
+    
+    # Fetch data and annualized returns and covariance
+    daily_returns, expected_returns, cov_matrix = get_return_statistics(tickers, **covariance_options)
+    
+    # Weights of the optimized portfolios, one column each
+    report_progress("optimizing portfolios")
+    try:
+        max_sharpe_weights, min_vol_weights, _ = optimal_portfolios(expected_returns, cov_matrix, **optimizer_options)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    portfolios = {
+        "max_sharpe_portfolio": max_sharpe_weights,
+        "min_volatility_portfolio": min_vol_weights
+    }
+    weights = np.column_stack(list(portfolios.values()))
+    mean, cov = expected_returns.to_numpy() / 252, cov_matrix.scaled(1 / 252)
+    
+    estimates = {}
+    if "parametric" in methods:
+        estimates["parametric"] = parametric_var_cvar(weights, mean, cov, confidence_levels, horizon)
+    if "historical" in methods:
+        estimates["historical"] = historical_var_cvar(daily_returns.to_numpy(), weights, confidence_levels, horizon)
+    if "monte_carlo" in methods:
+        report_progress("monte carlo")
+        try:
+            estimates["monte_carlo"] = monte_carlo_var_cvar(
+                weights, mean, cov, confidence_levels,
+                num_scenarios=num_scenarios,
+                horizon=horizon,
+                distribution=params.get("distribution", "normal"),
+                df=float(params.get("df", 5)),
+                seed=params.get("seed"),
+                executor=params.get("executor", "threads")
             )
-            
-            # Create forecast data
-            last_sequence = scaled_data[-window_size:]
-            forecast_input = last_sequence.reshape(1, window_size, 1)
-            
-            forecast_scaled = []
-            current_input = forecast_input.copy()
-            
-            for _ in range(forecast_period):
-                next_pred = model.predict(current_input)
-                forecast_scaled.append(next_pred[0, 0])
-                current_input = np.append(current_input[:, 1:, :], [[next_pred]], axis=1)
-            
-            # Inverse transform scaling
-            predictions = scaler.inverse_transform(np.array(forecast_scaled).reshape(-1, 1)).flatten()
-            
-            # For LSTM, we don't have confidence intervals directly
-            conf_int = None
-            
-        else:
-            return jsonify({"error": "Invalid model type. Choose from 'arima', 'sarima', or 'lstm'."}), 400
-        
-        # Prepare results
-        results = {
-            "ticker": ticker,
-            "model": model_type,
-            "forecast_period": forecast_period,
-            "predictions": predictions.to_dict() if hasattr(predictions, 'to_dict') else {i: val for i, val in enumerate(predictions)}
+        except ValueError as e:
+            return {"error": str(e)}, 400
+    
+    # Prepare results, keyed by confidence level
+    results = {}
+    for i, (name, portfolio_weights) in enumerate(portfolios.items()):
+        results[name] = {
+            "weights": {ticker: round(weight, 4) for ticker, weight in zip(tickers, portfolio_weights)},
+            "performance": portfolio_annualized_performance(portfolio_weights, expected_returns, cov_matrix)
         }
+        for method, estimate in estimates.items():
+            results[name][method] = {
+                metric: {str(level): float(values[k, i]) for k, level in enumerate(confidence_levels)}
+                for metric, values in estimate.items()
+            }
+    
+    return {
+        "tickers": tickers,
+        "confidence_levels": list(confidence_levels),
+        "horizon_days": horizon,
+        "num_scenarios": num_scenarios if "monte_carlo" in methods else None,
+        "covariance": covariance_summary(cov_matrix),
+        "results": results
+    }, 200
+
+def run_portfolio_backtest(params):
+    """
+    Walk-forward backtest of the optimized portfolios: re-optimize on the
+    trailing window at every rebalance date and hold until the next one.
+    
+    Parameters:
+    params (dict): Request body with "stocks" and optional "lookback"
+    (trading days, default 252), "rebalance_every" (default 21),
+    "strategies", covariance estimator settings (see
+    parse_covariance_params), "optimizer", "max_weight", "sectors",
+    "sector_bounds", "precision" and "max_points"
+    
+    Returns:
+    tuple: (response dict, HTTP status code)
+    """
+    # Get tickers from request
+    tickers = [ticker.strip() for ticker in params.get("stocks", []) if ticker.strip()]
+    if not tickers:
+        return {"error": "No valid stocks provided."}, 400
+    covariance_options, error = parse_covariance_params(params)
+    if error:
+        return {"error": error}, 400
+    optimizer_options, error = parse_optimizer_params(params, tickers)
+    if error:
+        return {"error": error}, 400
+    if "previous_weights" in optimizer_options or "max_turnover" in optimizer_options:
+        return {"error": "Backtests track their own holdings; previous_weights and max_turnover are not supported."}, 400
+    optimizer = optimizer_options.pop("optimizer")
+    strategies = tuple(params.get("strategies", PORTFOLIO_STRATEGIES))
+    lookback = int(params.get("lookback", 252))
+    step = int(params.get("rebalance_every", 21))
+    precision = params.get("precision", "float64")
+    max_points = params.get("max_points")
+    
+    # Daily returns come from the shared cache; windows are slices of it
+    daily_returns, _, _ = get_return_statistics(tickers)
+    covariance = {"method": covariance_options.pop("covariance"), **covariance_options}
+    report_progress("backtesting")
+    try:
+        backtest = walk_forward_portfolio(daily_returns, lookback, step, strategies, covariance, optimizer_options,
+                                          optimizer, qp_min_assets=QP_MIN_ASSETS)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    
+    # Wealth curves and rebalance turnover, aligned on the out-of-sample dates
+    series = {
+        name: {"wealth": (1 + result["returns"]).cumprod(), "turnover": result["turnover"]}
+        for name, result in backtest.items()
+    }
+    index = next(iter(backtest.values()))["returns"].index
+    dates, columns = to_columnar(series, index, precision, int(max_points) if max_points else None)
+    
+    results = {}
+    for name, result in backtest.items():
+        # Realized out-of-sample performance next to what the optimizer expected;
+        # the initial purchase is not counted as turnover
+        performance = performance_summary(result["returns"].to_numpy())
+        rebalances = result["turnover"].iloc[1:]
+        performance["average_turnover"] = float(rebalances.mean()) if len(rebalances) else 0.0
+        performance["predicted_volatility"] = float(result["predicted_volatility"].mean())
+        results[name] = {
+            "performance": performance,
+            "latest_weights": {ticker: round(weight, 4) for ticker, weight in result["weights"].iloc[-1].items()},
+            "series": columns[name]
+        }
+    
+    return {
+        "message": "Backtest completed successfully",
+        "type": "portfolio",
+        "tickers": tickers,
+        "lookback": lookback,
+        "rebalance_every": step,
+        "num_rebalances": len(next(iter(backtest.values()))["weights"]),
+        "covariance": covariance["method"],
+        "results": results,
+        "format": "columnar",
+        "dtype": precision,
+        "dates": dates
+    }, 200
+
+def run_forecast_backtest(params):
+    """
+    Walk-forward evaluation of a forecasting model on one ticker.
+    
+    Parameters:
+    params (dict): Request body with "ticker" and optional "model_type",
+    "lookback" (observations before the first forecast, default 756),
+    "rebalance_every" (default 21), "horizon" (default 5), "refit"
+    ("update" or "full") and "precision"
+    
+    Returns:
+    tuple: (response dict, HTTP status code)
+    """
+    ticker = params.get("ticker")
+    if not ticker:
+        return {"error": "No valid ticker provided."}, 400
+    model_type = params.get("model_type", "arima").lower()
+    if model_type not in FORECAST_BACKENDS:
+        return {"error": "Invalid model type. Choose from 'arima', 'sarima', or 'lstm'."}, 400
+    lookback = int(params.get("lookback", 756))
+    step = int(params.get("rebalance_every", 21))
+    horizon = int(params.get("horizon", 5))
+    refit = params.get("refit", "update")
+    precision = params.get("precision", "float64")
+    
+    data = fetch_and_preprocess_data([ticker])
+    try:
+        forecasts = walk_forward_forecast(data[ticker], model_type, lookback, step, horizon, refit)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    
+    # One forecast and one actual column per horizon step, indexed by forecast origin
+    series = {ticker: {}}
+    for h, frame in forecasts.groupby("step"):
+        series[ticker][f"forecast_{h}"] = frame["forecast"]
+        series[ticker][f"actual_{h}"] = frame["actual"]
+    dates, columns = to_columnar(series, forecasts.index.unique(), precision)
+    
+    return {
+        "message": "Backtest completed successfully",
+        "type": "forecast",
+        "ticker": ticker,
+        "model": model_type,
+        "lookback": lookback,
+        "rebalance_every": step,
+        "horizon": horizon,
+        "refit": refit,
+        "num_forecasts": int(forecasts.index.nunique()),
+        "results": {
+            ticker: {
+                "errors": forecast_errors(forecasts),
+                "series": columns[ticker]
+            }
+        },
+        "format": "columnar",
+        "dtype": precision,
+        "dates": dates
+    }, 200
+
+def run_backtest(params):
+    """
+    Walk-forward backtest of the portfolio optimizer or of a forecasting
+    model over the stored price history.
+    
+    Parameters:
+    params (dict): Request body with "type" ("portfolio", the default, or
+    "forecast") and the settings of run_portfolio_backtest or
+    run_forecast_backtest
+    
+    Returns:
+    tuple: (response dict, HTTP status code)
+    """
+    kind = params.get("type", "portfolio")
+    if kind == "portfolio":
+        return run_portfolio_backtest(params)
+    if kind == "forecast":
+        return run_forecast_backtest(params)
+    return {"error": f"Unknown backtest type '{kind}'. Choose 'portfolio' or 'forecast'."}, 400
+
+def run_market_trend(params):
+    """
+    Value at risk, recent volatility and correlations for the requested stocks.
+    
+    Parameters:
+    params (dict): Request body with a "stocks" list
+    
+    Returns:
+    tuple: (response dict, HTTP status code)
+    """
+    # Get tickers from request
+    tickers = [ticker.strip() for ticker in params.get("stocks", []) if ticker.strip()]
+    if not tickers:
+        return {"error": "No valid stocks provided."}, 400
+    
+    # Fetch data and daily returns
+    daily_returns, _, _ = get_return_statistics(tickers)
+    
+    # Calculate risk metrics for all tickers in one pass over the full history
+    risk = rolling_risk_metrics(daily_returns.to_numpy(), len(daily_returns), (0.95,))
+    var_95 = pd.Series(risk["var"][0, -1], index=daily_returns.columns)
+    cvar_95 = pd.Series(risk["cvar"][0, -1], index=daily_returns.columns)
+    rolling_volatility = daily_returns.iloc[-30:].std() * np.sqrt(252)  # Annualized, last 30 days
+    
+    # Calculate correlation matrix
+    correlation_matrix = daily_returns.corr()
+    
+    # Prepare results
+    results = {
+        "var_95": var_95.to_dict(),
+        "cvar_95": cvar_95.to_dict(),
+        "rolling_volatility": rolling_volatility.to_dict(),
+        "correlation_matrix": correlation_matrix.to_dict()
+    }
+    
+    return results, 200
+
+def run_efficient_frontier(params):
+    """
+    Simulate random portfolios for the efficient frontier chart and render
+    the plot in the background. Needs a request context for the image URL.
+    
+    Parameters:
+    params (dict): Request body with a "stocks" list and optional
+    "covariance", "seed" and "inline_image"
+    
+    Returns:
+    tuple: (response dict, HTTP status code)
+    """
+    tickers = [ticker.strip() for ticker in params.get("stocks", []) if ticker.strip()]
+    if not tickers:
+        return {"error": "No valid stocks provided."}, 400
+    covariance_options, error = parse_covariance_params(params)
+    if error:
+        return {"error": error}, 400
+    
+    daily_returns, expected_returns, cov_matrix = get_return_statistics(tickers, **covariance_options)
+    
+    num_portfolios = 5000
+    with stage("efficient_frontier"):
+        portfolios = simulate_random_portfolios(expected_returns, cov_matrix, num_portfolios,
+                                                rng=params.get("seed"))
+    random_portfolios = [
+        {"volatility": vol, "return": ret, "sharpe_ratio": sharpe}
+        for vol, ret, sharpe in zip(portfolios["volatility"].tolist(),
+                                    portfolios["return"].tolist(),
+                                    portfolios["sharpe_ratio"].tolist())
+    ]
+    
+    # Find the portfolio with the maximum Sharpe ratio
+    max_sharpe_portfolio = random_portfolios[int(np.argmax(portfolios["sharpe_ratio"]))]
+    
+    results = {
+        "random_portfolios": random_portfolios,
+        "optimized_portfolio": max_sharpe_portfolio,
+        "covariance": covariance_summary(cov_matrix)
+    }
+    
+    # Render the plot in the background and return its URL; the image is
+    # only inlined as base64 when explicitly requested
+    if params.get("inline_image"):
+        with stage("plot"):
+            results["efficient_frontier_image"] = get_backend("plotting").render_efficient_frontier(
+                portfolios, max_sharpe_portfolio)
+    else:
+        key = RENDER_SERVICE.submit(get_backend("plotting").render_efficient_frontier_png,
+                                    portfolios["volatility"], portfolios["return"], portfolios["sharpe_ratio"],
+                                    max_sharpe_portfolio["volatility"], max_sharpe_portfolio["return"])
+        results["efficient_frontier_image_url"] = url_for("image", key=key)
+    
+    return results, 200
+
+# Long-running request handlers that can be submitted as background jobs
+JOB_HANDLERS = {
+    "analyze": run_analyze,
+    "forecast": run_forecast,
+    "forecast-batch": run_batch_forecast,
+    "optimize": run_optimize,
+    "risk": run_risk,
+    "portfolio-risk": run_portfolio_risk,
+    "backtest": run_backtest
+}
+
+def respond(results, status=200, etag=None):
+    """
+    Encode a response in the best media type the client accepts (JSON,
+    MessagePack or Arrow) and compress it with brotli or gzip when the
+    client accepts that.
+    
+    Parameters:
+    results (dict): Response payload, which may contain numpy arrays
+    status (int): HTTP status code
+    etag (str): Cache entry token; the response gets a weak ETag for the
+    chosen media type, and 304 Not Modified when If-None-Match has it
+    
+    Returns:
+    Response: Flask response
+    """
+    media_type = request.accept_mimetypes.best_match(available_media_types(results), default=JSON)
+    if etag:
+        etag = f"{etag}.{media_type.rsplit('/', 1)[-1]}"
+        if request.if_none_match.contains_weak(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag, weak=True)
+            response.vary.update(("Accept", "Accept-Encoding"))
+            return response
+    with stage("serialize"):
+        body = encode(results, media_type)
+    response = app.response_class(body, status=status, mimetype=media_type)
+    response.vary.update(("Accept", "Accept-Encoding"))
+    if etag:
+        response.set_etag(etag, weak=True)
+    
+    encoding = request.accept_encodings.best_match(available_encodings())
+    if encoding and len(body) >= MIN_COMPRESS_BYTES:
+        with stage("compress"):
+            response.set_data(compress(body, encoding))
+        response.headers["Content-Encoding"] = encoding
+    return response
+
+def cached_response(kind, params, handler):
+    """
+    Answer a request from the response cache. Identical requests (same
+    sorted tickers, parameters and price data version) share one cached
+    result, and concurrent ones wait for a single computation. Send
+    Cache-Control: no-cache to recompute, or If-None-Match with a previous
+    ETag to get 304 Not Modified while the result is unchanged. Results
+    that list tickers whose prices could not be fetched ("data_errors")
+    are not cached, so the next request tries those tickers again.
+    
+    Parameters:
+    kind (str): Endpoint name, part of the cache key
+    params (dict): Request body
+    handler (callable): `params -> (result, status_code)`
+    
+    Returns:
+    Response: Encoded Flask response with an X-Cache header of HIT,
+    COALESCED or MISS
+    """
+    def compute():
+        results, status = handler(params)
+        # Name the tickers whose prices could not be fetched rather than silently leaving them out
+        errors = PRICE_STORE.errors(request_tickers(params))
+        if errors and status == 200 and isinstance(results, dict):
+            results = dict(results, data_errors=errors)
+        return results, status
+    
+    # The handler may fetch new bars, so its result is stored under the price version it ended up reading
+    def key():
+        return request_key(kind, params, PRICE_STORE.version)
+    
+    # The handler may fetch new bars, so its result is stored under the price version it ended up reading
+    results, status, etag, source = RESPONSE_CACHE.get_or_compute(key(), compute, rekey=key,
+                                                                  refresh=bool(request.cache_control.no_cache),
+                                                                  cacheable=lambda results: "data_errors" not in results)
+    if isinstance(results, dict) and "efficient_frontier_image_url" in results:
+        # Cached with the image's path only; the host is the one the current client used
+        image_url = urljoin(request.host_url, results["efficient_frontier_image_url"])
+        results = dict(results, efficient_frontier_image_url=image_url)
+    response = respond(results, status, etag if status == 200 else None)
+    response.headers["X-Cache"] = source.upper()
+    return response
+
+def handle_request(kind):
+    """
+    Run a request handler synchronously through the response cache, or
+    submit it as a background job when the body contains `"async": true`.
+    
+    Parameters:
+    kind (str): Handler name in JOB_HANDLERS
+    
+    Returns:
+    Response: Encoded Flask response
+    """
+    try:
+        params = {k: v for k, v in request.json.items() if k != "async"}
+        if request.json.get("async"):
+            job_id = JOB_QUEUE.submit(kind, JOB_HANDLERS[kind], params)
+            return jsonify(JOB_QUEUE.status(job_id)), 202
         
-        if conf_int is not None:
-            results["confidence_interval_lower"] = conf_int.iloc[:, 0].to_dict()
-            results["confidence_interval_upper"] = conf_int.iloc[:, 1].to_dict()
-        
-        return jsonify(results)
+        return cached_response(kind, params, JOB_HANDLERS[kind])
     
     except Exception as e:
-        logging.exception("Error in /api/forecast")
+        logging.exception(f"Error in /api/{kind}")
         return jsonify({"error": str(e)}), 500
+
+# ---------------------------
+# WARMUP
+# ---------------------------
+def warmup(tickers=None, backends=None):
+    """
+    Load state that requests only read before the first request arrives:
+    import the given backends, bring the tickers' prices up to date,
+    compute their return statistics and load their stored forecasting
+    models. Run in a server's master process before it forks, the workers
+    share these pages copy-on-write instead of each building its own copy.
+    Failures are reported, not raised, so a missing ticker does not keep
+    the server from starting.
+    
+    Parameters:
+    tickers (list): Tickers to load, defaults to WARMUP_TICKERS
+    backends (list): Backends to import, defaults to WARMUP_BACKENDS
+    
+    Returns:
+    dict: Warmup report, also served by /readyz
+    """
+    tickers = WARMUP_TICKERS if tickers is None else tickers
+    backends = WARMUP_BACKENDS if backends is None else backends
+    start = time.perf_counter()
+    errors = {}
+    
+    with stage("warmup"):
+        for name in backends:
+            try:
+                preload_backends([name])
+            except Exception as e:
+                logging.exception(f"Warmup could not load backend {name}")
+                errors[name] = str(e)
+        
+        if tickers:
+            try:
+                get_return_statistics(tickers)
+            except Exception as e:
+                logging.exception(f"Warmup could not load prices for {tickers}")
+                errors["prices"] = str(e)
+            for ticker in tickers:
+                for model_type in backends:
+                    if model_type in FORECAST_BACKENDS:
+                        MODEL_REGISTRY.latest(ticker, model_type)
+    
+    WARMUP_STATE.update({
+        "ready": True,
+        "seconds": time.perf_counter() - start,
+        "tickers": list(tickers),
+        "backends": list(backends),
+        "errors": errors
+    })
+    logging.info(f"Warmup finished in {WARMUP_STATE['seconds']:.1f}s with {len(errors)} errors")
+    return dict(WARMUP_STATE)
+
+# ---------------------------
+# INSTRUMENTATION
+# ---------------------------
+def cache_metrics():
+    """
+    Cache counters reported at every /metrics scrape.
+    
+    Returns:
+    list: (name, kind, documentation, value) tuples
+    """
+    stats = RESPONSE_CACHE.stats()
+    return [
+        ("response_cache_hits_total", "counter", "Requests answered from the response cache.", stats["hits"]),
+        ("response_cache_misses_total", "counter", "Requests computed by a handler.", stats["misses"]),
+        ("response_cache_coalesced_total", "counter", "Requests that waited for an identical request.", stats["coalesced"]),
+        ("response_cache_evictions_total", "counter", "Entries dropped to stay within bounds.", stats["evictions"]),
+        ("response_cache_expired_total", "counter", "Entries dropped after their TTL.", stats["expired"]),
+        ("response_cache_hit_ratio", "gauge", "Cached and coalesced answers over all lookups.", stats["hit_rate"]),
+        ("response_cache_entries", "gauge", "Entries in the response cache.", stats["entries"]),
+        ("response_cache_bytes", "gauge", "Approximate size of the response cache.", stats["bytes"]),
+        ("return_cache_hits_total", "counter", "Return statistics served from cache.", RETURN_CACHE.hits),
+        ("return_cache_misses_total", "counter", "Return statistics computed.", RETURN_CACHE.misses)
+    ]
+
+REGISTRY.add_collector(cache_metrics)
+
+@app.before_request
+def start_instrumentation():
+    g.timing = start_request()
+    REQUESTS_IN_FLIGHT.inc()
+    
+    # Opt-in profiling, only when the server has somewhere to write dumps
+    profiler = request.args.get("profile") or request.headers.get("X-Profile")
+    if profiler and PROFILE_DIR:
+        g.profile = start_profile(profiler if profiler in PROFILERS else "cprofile")
+
+@app.after_request
+def finish_instrumentation(response):
+    if g.get("profile") is not None:
+        response.headers["X-Profile-File"] = stop_profile(g.pop("profile"), PROFILE_DIR, request.endpoint or "request")
+    
+    # Record the whole request and expose its stage breakdown to the client
+    elapsed, stages = finish_request(g.pop("timing"))
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    REQUEST_SECONDS.observe(elapsed, endpoint=endpoint, method=request.method, status=response.status_code)
+    response.headers["Server-Timing"] = server_timing(stages, elapsed)
+    return response
+
+@app.teardown_request
+def close_instrumentation(error=None):
+    # after_request is skipped when a response could not be built
+    if g.get("timing") is not None:
+        finish_request(g.pop("timing"))
+    if g.get("profile") is not None:
+        stop_profile(g.pop("profile"), PROFILE_DIR, request.endpoint or "request")
+    REQUESTS_IN_FLIGHT.dec()
+
+# ---------------------------
+# ENDPOINTS
+# ---------------------------
+# Endpoint 1: Data Analysis & EDA
+@app.route("/api/analyze", methods=["POST"])
+def analyze():
+    # Clients that accept NDJSON or server-sent events get one result per ticker as it finishes
+    media_type = request.accept_mimetypes.best_match([JSON, NDJSON, EVENT_STREAM], default=JSON)
+    if media_type == JSON:
+        return handle_request("analyze")
+    
+    options, error = parse_analyze_params(request.json or {})
+    if error:
+        return jsonify({"error": error}), 400
+    return app.response_class(stream_analyze(options, media_type), mimetype=media_type,
+                              headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# Endpoint 2: Forecasting
+@app.route("/api/forecast", methods=["POST"])
+def forecast():
+    return handle_request("forecast")
+
+# Endpoint 2: Batch forecasting
+@app.route("/api/forecast/batch", methods=["POST"])
+def forecast_batch():
+    # Clients that accept NDJSON or server-sent events get each forecast as soon as it is done
+    media_type = request.accept_mimetypes.best_match([JSON, NDJSON, EVENT_STREAM], default=JSON)
+    if media_type == JSON:
+        return handle_request("forecast-batch")
     
+    options, error = parse_batch_forecast_params(request.json or {})
+    if error:
+        return jsonify({"error": error}), 400
+    return app.response_class(stream_batch_forecast(options, media_type), mimetype=media_type,
+                              headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 # Endpoint 3: Market Trend Analysis & Risk Metrics
 @app.route("/api/market-trend", methods=["POST"])
 def market_trend():
     try:
-        # Get tickers from request
-        tickers = [ticker.strip() for ticker in request.json.get("stocks", []) if ticker.strip()]
-        if not tickers:
-            return jsonify({"error": "No valid stocks provided."}), 400
-        
-        # Fetch data
-        data = fetch_and_preprocess_data(tickers)
-        
-        # Calculate daily returns
-        daily_returns = data.pct_change().dropna()
-        
-        # Calculate risk metrics
-        var_95 = daily_returns.apply(lambda x: calculate_var(x))
-        cvar_95 = daily_returns.apply(lambda x: calculate_cvar(x))
-        rolling_volatility = daily_returns.rolling(window=30).std().iloc[-1] * np.sqrt(252)  # Annualized
-        
-        # Calculate correlation matrix
-        correlation_matrix = daily_returns.corr()
-        
-        # Prepare results
-        results = {
-            "var_95": var_95.to_dict(),
-            "cvar_95": cvar_95.to_dict(),
-            "rolling_volatility": rolling_volatility.to_dict(),
-            "correlation_matrix": correlation_matrix.to_dict()
-        }
-        
-        return jsonify(results)
+        return cached_response("market-trend", request.json, run_market_trend)
     
     except Exception as e:
         logging.exception("Error in /api/market-trend")
@@ -565,78 +1814,7 @@ def efficient_frontier_two():
         return jsonify({}), 200
     
     try:
-        tickers = [ticker.strip() for ticker in request.json.get("stocks", []) if ticker.strip()]
-        if not tickers:
-            return jsonify({"error": "No valid stocks provided."}), 400
-
-        stock_data = fetch_and_preprocess_data(tickers)
-        daily_returns = stock_data.pct_change().dropna()
-        expected_returns = daily_returns.mean() * 252
-        cov_matrix = daily_returns.cov() * 252
-
-        num_portfolios = 5000
-        random_portfolios = []
-
-        for _ in range(num_portfolios):
-            weights = np.random.random(len(tickers))
-            weights /= np.sum(weights)
-            port_return = np.dot(weights, expected_returns)
-            port_volatility = np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights)))
-            sharpe_ratio = port_return / port_volatility if port_volatility != 0 else 0
-
-            random_portfolios.append({
-                "volatility": float(port_volatility),
-                "return": float(port_return),
-                "sharpe_ratio": float(sharpe_ratio)
-            })
-
-        # Find the portfolio with the maximum Sharpe ratio
-        max_sharpe_portfolio = max(random_portfolios, key=lambda p: p["sharpe_ratio"])
-
-        # Generate the efficient frontier plot
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        # Plot all generated portfolios
-        sc = ax.scatter(
-            [p["volatility"] for p in random_portfolios],
-            [p["return"] for p in random_portfolios],
-            c=[p["sharpe_ratio"] for p in random_portfolios],
-            cmap='viridis',
-            marker='o',
-            s=10,
-            alpha=0.3
-        )
-        plt.colorbar(sc, label='Sharpe Ratio')
-        
-        # Highlight the maximum Sharpe ratio portfolio
-        ax.scatter(
-            max_sharpe_portfolio["volatility"],
-            max_sharpe_portfolio["return"],
-            marker='*',
-            color='red',
-            s=200,
-            label='Max Sharpe Ratio'
-        )
-        
-        ax.set_xlabel('Volatility')
-        ax.set_ylabel('Expected Return')
-        ax.set_title('Efficient Frontier')
-        ax.legend()
-        plt.tight_layout()
-
-        # Convert plot to Base64
-        buf = io.BytesIO()
-        plt.savefig(buf, format="png")
-        buf.seek(0)
-        img_base64 = base64.b64encode(buf.getvalue()).decode("utf-8")
-        buf.close()
-        plt.close(fig)
-
-        return jsonify({
-            "efficient_frontier_image": img_base64,
-            "random_portfolios": random_portfolios,
-            "optimized_portfolio": max_sharpe_portfolio
-        })
+        return cached_response("efficient-frontier", request.json, run_efficient_frontier)
 
     except Exception as e:
         logging.exception("Error in /api/efficient-frontier")
@@ -644,48 +1822,107 @@ def efficient_frontier_two():
 # Endpoint 4: Portfolio Optimization
 @app.route("/api/optimize", methods=["POST"])
 def optimize():
-    try:
-        # Get tickers from request
-        tickers = [ticker.strip() for ticker in request.json.get("stocks", []) if ticker.strip()]
-        if not tickers:
-            return jsonify({"error": "No valid stocks provided."}), 400
-        
-        # Fetch data
-        data = fetch_and_preprocess_data(tickers)
-        
-        # Calculate daily returns
-        daily_returns = data.pct_change().dropna()
-        
-        # Annualize returns and covariance
-        expected_returns = daily_returns.mean() * 252
-        cov_matrix = daily_returns.cov() * 252
-        
-        # Calculate optimal portfolios
-        max_sharpe_weights = maximize_sharpe_ratio(expected_returns, cov_matrix)
-        min_vol_weights = minimum_volatility_portfolio(expected_returns, cov_matrix)
-        
-        # Calculate efficient frontier
-        ef = efficient_frontier(expected_returns, cov_matrix)
-        
-        # Prepare results
-        results = {
-            "max_sharpe_portfolio": {
-                "weights": {ticker: round(weight, 4) for ticker, weight in zip(tickers, max_sharpe_weights)},
-                "performance": portfolio_annualized_performance(max_sharpe_weights, expected_returns, cov_matrix)
-            },
-            "min_volatility_portfolio": {
-                "weights": {ticker: round(weight, 4) for ticker, weight in zip(tickers, min_vol_weights)},
-                "performance": portfolio_annualized_performance(min_vol_weights, expected_returns, cov_matrix)
-            },
-            "efficient_frontier": ef.to_dict(orient='records')
-        }
-        
-        return jsonify(results)
+    return handle_request("optimize")
+
+# Endpoint 5: Rolling risk metrics
+@app.route("/api/risk", methods=["POST"])
+def risk():
+    return handle_request("risk")
+
+# Endpoint 6: Portfolio VaR/CVaR
+@app.route("/api/portfolio-risk", methods=["POST"])
+def portfolio_risk():
+    return handle_request("portfolio-risk")
+
+# Endpoint 7: Rendered images
+@app.route("/api/images/<key>.png", methods=["GET"])
+def image(key):
+    if len(key) != 64 or any(c not in "0123456789abcdef" for c in key):
+        return jsonify({"error": "Unknown image."}), 404
+    png = RENDER_SERVICE.get(key)
+    if png is None:
+        return jsonify({"error": "Unknown image or rendering failed."}), 404
     
+    # Keys are content hashes, so an image never changes once rendered
+    response = app.response_class(png, mimetype="image/png")
+    response.set_etag(key)
+    response.cache_control.public = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    return response.make_conditional(request)
+
+# Endpoint 8: Walk-forward backtests
+@app.route("/api/backtest", methods=["POST"])
+def backtest():
+    return handle_request("backtest")
+
+# Endpoint 9: Background jobs
+@app.route("/api/jobs/<kind>", methods=["POST"])
+def submit_job(kind):
+    if kind not in JOB_HANDLERS:
+        return jsonify({"error": f"Unknown job type '{kind}'. Choose from {sorted(JOB_HANDLERS)}."}), 404
+    try:
+        job_id = JOB_QUEUE.submit(kind, JOB_HANDLERS[kind], request.json or {})
+        return jsonify(JOB_QUEUE.status(job_id)), 202
     except Exception as e:
-        logging.exception("Error in /api/optimize")
+        logging.exception("Error in /api/jobs")
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    status = JOB_QUEUE.status(job_id)
+    if status is None:
+        return jsonify({"error": "Unknown job id."}), 404
+    return jsonify(status)
+
+@app.route("/api/jobs/<job_id>/result", methods=["GET"])
+def job_result(job_id):
+    status = JOB_QUEUE.status(job_id)
+    if status is None:
+        return jsonify({"error": "Unknown job id."}), 404
+    if status["status"] in ("queued", "running", "cancelling"):
+        return jsonify(status), 202
+    if status["status"] == "failed":
+        return jsonify({"error": status["error"]}), 500
+    if status["status"] == "cancelled":
+        return jsonify({"error": "Job was cancelled."}), 410
+    try:
+        results, code = JOB_QUEUE.result(job_id)
+    except KeyError:
+        # Pruned between the two lookups
+        return jsonify({"error": "Unknown job id."}), 404
+    return respond(results, code)
+
+@app.route("/api/jobs/<job_id>", methods=["DELETE"])
+def cancel_job(job_id):
+    if not JOB_QUEUE.cancel(job_id):
+        return jsonify({"error": "Unknown or already finished job id."}), 404
+    return jsonify(JOB_QUEUE.status(job_id))
+
+# Endpoint 10: Response cache metrics
+@app.route("/api/cache", methods=["GET"])
+def cache_stats():
+    return jsonify(RESPONSE_CACHE.stats())
+
+# Endpoint 11: Prometheus metrics
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return app.response_class(REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Endpoint 12: Liveness and readiness probes
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    # The process is up and serving; says nothing about its data
+    return jsonify({"status": "ok", "pid": os.getpid()})
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    # Ready once warmup has run, so a load balancer only routes to warm workers
+    state = dict(WARMUP_STATE, pid=os.getpid())
+    return jsonify(state), 200 if state["ready"] else 503
+
 if __name__ == "__main__":
+    # Development server; see scripts/serving.py for production
+    warmup()
     app.run(debug=True, port=5000)
 
@@ -0,0 +1,7 @@
+# Gunicorn settings for production: gunicorn -c gunicorn.conf.py app:app
+# SERVING_ROLE picks "data", "models" or "all" (default); see scripts/serving.py
+import os
+
+from scripts.serving import gunicorn_config
+
+globals().update(gunicorn_config(os.environ.get("SERVING_ROLE", "all")))
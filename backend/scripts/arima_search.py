@@ -0,0 +1,313 @@
+import os
+import signal
+import logging
+import warnings
+import multiprocessing.util
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from scripts.jobs import report_progress
+
+# ---------------------------
+# WORKER POOL
+# ---------------------------
+
+_POOLS = {}
+_POOLS_PID = None
+
+# Set in pool workers so work they run (e.g. a backtest window that fits a
+# model) searches serially instead of starting a nested pool per worker
+_IN_WORKER = False
+
+
+def _init_worker(memory_limit=None):
+    global _IN_WORKER
+    _IN_WORKER = True
+    if memory_limit is not None:
+        _limit_worker_memory(memory_limit)
+
+
+def _limit_worker_memory(memory_limit):
+    """
+    Cap the data segment of a worker process so one runaway fit fails with
+    MemoryError instead of exhausting the host.
+
+    Parameters:
+    memory_limit (int): Limit in bytes
+    """
+    import resource
+
+    limit = getattr(resource, "RLIMIT_DATA", resource.RLIMIT_AS)
+    _, hard = resource.getrlimit(limit)
+    if hard != resource.RLIM_INFINITY:
+        memory_limit = min(memory_limit, hard)
+    resource.setrlimit(limit, (memory_limit, hard))
+
+
+def get_pool(n_jobs=None, memory_limit=None):
+    """
+    Return a process pool shared by all order searches and backtests in
+    this process.
+
+    Parameters:
+    n_jobs (int): Number of worker processes (defaults to the CPU count)
+    memory_limit (int): Optional per-worker memory limit in bytes
+
+    Returns:
+    ProcessPoolExecutor: Shared worker pool
+    """
+    global _POOLS_PID
+    if _POOLS_PID != os.getpid():
+        # Pools inherited through fork belong to the parent and cannot be used here
+        _POOLS.clear()
+        _POOLS_PID = os.getpid()
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    key = (n_jobs, memory_limit)
+    if key not in _POOLS:
+        if not _POOLS:
+            # Shut the pools down when this process exits, including when it is itself
+            # a job worker, whose exit would otherwise wait on the idle fit workers.
+            # The priority is above the queues' own finalizers (10) so they still run.
+            multiprocessing.util.Finalize(None, shutdown_pools, exitpriority=100)
+        _POOLS[key] = ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                          initargs=(memory_limit,))
+    return _POOLS[key]
+
+
+def shutdown_pools():
+    """
+    Shut down every pool created by `get_pool`.
+    """
+    while _POOLS:
+        _, pool = _POOLS.popitem()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+class FitTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise FitTimeout()
+
+
+def run_with_timeout(func, timeout, *args):
+    """
+    Run `func(*args)`, aborting it after `timeout` seconds where SIGALRM is
+    available (pool workers run tasks on their main thread, so it is).
+
+    Parameters:
+    func (callable): Function to run
+    timeout (float): Time limit in seconds, or None for no limit
+    *args: Arguments passed to `func`
+
+    Returns:
+    object: Return value of `func`
+    """
+    use_alarm = (timeout is not None and hasattr(signal, "SIGALRM")
+                 and signal.getsignal(signal.SIGALRM) in (signal.SIG_DFL, signal.SIG_IGN, None, _raise_timeout))
+    if use_alarm:
+        try:
+            signal.signal(signal.SIGALRM, _raise_timeout)
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        except ValueError:
+            # Not on the main thread; run without a limit
+            use_alarm = False
+    try:
+        return func(*args)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _fit_arima(values, order):
+    # Imported here so the app can share the worker pool without loading statsmodels at startup
+    from statsmodels.tsa.arima.model import ARIMA
+
+    warnings.filterwarnings("ignore")
+    return ARIMA(values, order=order).fit().aic
+
+
+def fit_arima_aic(values, order, timeout=None):
+    """
+    Fit one ARIMA model and return its AIC, or inf if the fit fails or times out.
+
+    Parameters:
+    values (np.array): Time series values
+    order (tuple): (p, d, q) order
+    timeout (float): Time limit in seconds for this fit
+
+    Returns:
+    tuple: (order, aic)
+    """
+    try:
+        return order, run_with_timeout(_fit_arima, timeout, values, order)
+    except FitTimeout:
+        logging.warning(f"ARIMA{order} fit timed out after {timeout}s")
+        return order, float("inf")
+    except Exception:
+        return order, float("inf")
+
+
+def evaluate_orders(fit_func, values, orders, n_jobs=None, timeout=None, memory_limit=None,
+                    done=0, total=None):
+    """
+    Fit several candidate orders, in parallel unless `n_jobs` is 1.
+
+    Parameters:
+    fit_func (callable): Picklable function `(values, order, timeout) -> (order, aic)`
+    values (np.array): Time series values
+    orders (list): Candidate orders
+    n_jobs (int): Number of worker processes
+    timeout (float): Per-fit time limit in seconds
+    memory_limit (int): Optional per-worker memory limit in bytes
+    done (int): Fits already completed by the caller, for progress reports
+    total (int): Total fits expected by the caller, if known
+
+    Returns:
+    dict: AIC keyed by order
+    """
+    aics = {}
+    if n_jobs == 1 or _IN_WORKER or len(orders) <= 1:
+        for order in orders:
+            order, aic = fit_func(values, order, timeout)
+            aics[order] = aic
+            report_progress("fit", done + len(aics), total)
+        return aics
+
+    pool = get_pool(n_jobs, memory_limit)
+    futures = [pool.submit(fit_func, values, order, timeout) for order in orders]
+    try:
+        for future in as_completed(futures):
+            order, aic = future.result()
+            aics[order] = aic
+            report_progress("fit", done + len(aics), total)
+    finally:
+        for future in futures:
+            future.cancel()
+    return aics
+
+# ---------------------------
+# ORDER SEARCH
+# ---------------------------
+
+def estimate_d(values, max_d=2, alpha=0.05):
+    """
+    Choose the number of differences with repeated ADF tests: the smallest
+    d for which the differenced series rejects a unit root.
+
+    Parameters:
+    values (np.array): Time series values
+    max_d (int): Maximum d value to test
+    alpha (float): Significance level of the ADF test
+
+    Returns:
+    int: Estimated d
+    """
+    from statsmodels.tsa.stattools import adfuller
+
+    x = np.asarray(values, dtype=np.float64)
+    for d in range(max_d + 1):
+        if len(x) < 10:
+            return d
+        if adfuller(x, autolag="AIC")[1] < alpha:
+            return d
+        x = np.diff(x)
+    return max_d
+
+
+def grid_search(fit_func, values, candidates, n_jobs=None, timeout=None, memory_limit=None):
+    """
+    Fit every candidate order and return the one with the lowest AIC.
+
+    Parameters:
+    fit_func (callable): Picklable fit function, see `evaluate_orders`
+    values (np.array): Time series values
+    candidates (list): Candidate orders
+    n_jobs (int): Number of worker processes
+    timeout (float): Per-fit time limit in seconds
+    memory_limit (int): Optional per-worker memory limit in bytes
+
+    Returns:
+    tuple: (best_order, best_aic, number_of_fits)
+    """
+    aics = evaluate_orders(fit_func, values, candidates, n_jobs, timeout, memory_limit,
+                           total=len(candidates))
+    best = min(aics, key=aics.get)
+    return best, aics[best], len(aics)
+
+
+def stepwise_search(fit_func, values, initial, neighbours, n_jobs=None, timeout=None, max_fits=100):
+    """
+    Hyndman-Khandakar style stepwise search: fit a few starting orders,
+    then repeatedly move to the best neighbouring order until no
+    neighbour lowers the AIC.
+
+    Parameters:
+    fit_func (callable): Picklable fit function, see `evaluate_orders`
+    values (np.array): Time series values
+    initial (list): Starting orders
+    neighbours (callable): Function returning the valid neighbours of an order
+    n_jobs (int): Number of worker processes
+    timeout (float): Per-fit time limit in seconds
+    max_fits (int): Upper bound on the number of fits
+
+    Returns:
+    tuple: (best_order, best_aic, number_of_fits)
+    """
+    aics = evaluate_orders(fit_func, values, list(dict.fromkeys(initial)), n_jobs, timeout)
+    best = min(aics, key=aics.get)
+
+    while len(aics) < max_fits:
+        candidates = [order for order in neighbours(best) if order not in aics]
+        if not candidates:
+            break
+        aics.update(evaluate_orders(fit_func, values, candidates, n_jobs, timeout, done=len(aics)))
+        step_best = min(candidates, key=aics.get)
+        if aics[step_best] >= aics[best]:
+            break
+        best = step_best
+
+    return best, aics[best], len(aics)
+
+
+def search_arima_order(series, max_p=5, max_d=2, max_q=5, method="stepwise",
+                       n_jobs=None, fit_timeout=60):
+    """
+    Find the ARIMA order with the lowest AIC.
+
+    d is fixed up front with ADF tests, which rejects the other d values
+    without fitting them. The remaining (p, q) space is either fitted
+    exhaustively (`method="grid"`) or explored stepwise from
+    (2,d,2), (0,d,0), (1,d,0) and (0,d,1) (`method="stepwise"`). Fits run
+    in a shared process pool with a per-fit time limit.
+
+    Parameters:
+    series (pd.Series): Time series data
+    max_p (int): Maximum p value to test
+    max_d (int): Maximum d value to test
+    max_q (int): Maximum q value to test
+    method (str): "stepwise" or "grid"
+    n_jobs (int): Number of worker processes (1 runs in the calling process)
+    fit_timeout (float): Per-fit time limit in seconds
+
+    Returns:
+    tuple: (best_order, best_aic, number_of_fits)
+    """
+    values = np.asarray(series, dtype=np.float64)
+    d = estimate_d(values, max_d)
+
+    if method == "grid":
+        candidates = [(p, d, q) for p in range(max_p + 1) for q in range(max_q + 1)]
+        return grid_search(fit_arima_aic, values, candidates, n_jobs, fit_timeout)
+
+    def neighbours(order):
+        p, _, q = order
+        steps = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, 1), (-1, 1), (1, -1)]
+        return [(p + dp, d, q + dq) for dp, dq in steps
+                if 0 <= p + dp <= max_p and 0 <= q + dq <= max_q]
+
+    initial = [(min(2, max_p), d, min(2, max_q)), (0, d, 0), (min(1, max_p), d, 0), (0, d, min(1, max_q))]
+    return stepwise_search(fit_arima_aic, values, initial, neighbours, n_jobs, fit_timeout)
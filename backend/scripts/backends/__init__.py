@@ -0,0 +1,84 @@
+import importlib
+import threading
+
+import pandas as pd
+
+# ---------------------------
+# BACKEND REGISTRY
+# ---------------------------
+
+# Heavy engines (statsmodels, TensorFlow, matplotlib) are only imported the
+# first time a request needs them, so workers that never forecast or plot
+# do not pay for them at startup or in memory.
+_BACKENDS = {
+    "arima": "scripts.backends.arima",
+    "sarima": "scripts.backends.sarima",
+    "lstm": "scripts.backends.lstm",
+    "plotting": "scripts.backends.plotting",
+}
+
+# Backends that implement the forecasting interface: fit, update and forecast
+FORECAST_BACKENDS = ("arima", "sarima", "lstm")
+
+_LOADED = {}
+_LOCK = threading.Lock()
+
+
+def register_backend(name, module_path):
+    """
+    Register a backend module under a name, replacing any previous one.
+
+    Parameters:
+    name (str): Backend name, e.g. "arima"
+    module_path (str): Dotted path of the module implementing it
+    """
+    with _LOCK:
+        _BACKENDS[name] = module_path
+        _LOADED.pop(name, None)
+
+
+def get_backend(name):
+    """
+    Return a backend module, importing it on first use.
+
+    Parameters:
+    name (str): Backend name
+
+    Returns:
+    module: Backend module
+    """
+    module = _LOADED.get(name)
+    if module is not None:
+        return module
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'. Choose from {sorted(_BACKENDS)}.")
+    with _LOCK:
+        if name not in _LOADED:
+            _LOADED[name] = importlib.import_module(_BACKENDS[name])
+        return _LOADED[name]
+
+
+def preload_backends(names=None):
+    """
+    Import backends ahead of time, e.g. before forking worker processes.
+
+    Parameters:
+    names (list): Backend names, or None for all registered backends
+    """
+    for name in names or list(_BACKENDS):
+        get_backend(name)
+
+
+def to_positional(series):
+    """
+    Re-index a price series by integer position. Trading-day data has no
+    regular frequency, so statsmodels ignores the dates anyway; a RangeIndex
+    lets fitted results be extended with new observations.
+
+    Parameters:
+    series (pd.Series): Time series data
+
+    Returns:
+    pd.Series: Same values indexed 0..n-1
+    """
+    return pd.Series(series.values, index=pd.RangeIndex(len(series)), name=series.name)
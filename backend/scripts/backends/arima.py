@@ -0,0 +1,79 @@
+import logging
+
+from statsmodels.tsa.arima.model import ARIMA
+
+from scripts.arima_search import search_arima_order
+from scripts.backends import to_positional
+from scripts.metrics import timed_stage
+
+# ---------------------------
+# ARIMA BACKEND
+# ---------------------------
+
+@timed_stage("arima_order_search")
+def optimize_arima_params(series, max_p=5, max_d=2, max_q=5, method="stepwise", n_jobs=None, fit_timeout=60):
+    """
+    Find optimal ARIMA parameters using AIC criterion.
+
+    Parameters:
+    series (pd.Series): Time series data
+    max_p (int): Maximum p value to test
+    max_d (int): Maximum d value to test
+    max_q (int): Maximum q value to test
+    method (str): "stepwise" (pruned search) or "grid" (every p, q)
+    n_jobs (int): Number of worker processes for the fits
+    fit_timeout (float): Time limit in seconds for a single fit
+
+    Returns:
+    tuple: Optimal (p, d, q) parameters
+    """
+    best_params, best_aic, num_fits = search_arima_order(series, max_p, max_d, max_q,
+                                                         method=method, n_jobs=n_jobs,
+                                                         fit_timeout=fit_timeout)
+    logging.info(f"ARIMA search selected {best_params} (AIC {best_aic:.2f}) after {num_fits} fits")
+    return best_params
+
+
+def fit(series):
+    """
+    Search the order of and fit an ARIMA model.
+
+    Parameters:
+    series (pd.Series): Time series data
+
+    Returns:
+    dict: Fitted results under "model", the order under "params"
+    """
+    best_params = optimize_arima_params(series)
+    model = ARIMA(to_positional(series), order=best_params).fit()
+    return {"model": model, "scaler": None, "params": best_params}
+
+
+def update(entry, new_values):
+    """
+    Extend fitted results with new observations without re-estimating.
+
+    Parameters:
+    entry (dict): Registry entry
+    new_values (pd.Series): New observations indexed by position
+
+    Returns:
+    ARIMAResults: Updated results
+    """
+    return entry["model"].append(new_values, refit=False)
+
+
+def forecast(entry, series, forecast_period):
+    """
+    Forecast with confidence intervals.
+
+    Parameters:
+    entry (dict): Registry entry
+    series (pd.Series): Time series data the model is up to date with
+    forecast_period (int): Number of steps to forecast
+
+    Returns:
+    tuple: (predictions, conf_int)
+    """
+    result = entry["model"].get_forecast(steps=forecast_period)
+    return result.predicted_mean, result.conf_int()
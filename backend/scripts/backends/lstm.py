@@ -0,0 +1,122 @@
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.models import Sequential
+from tensorflow.keras.layers import LSTM, Dense
+from sklearn.preprocessing import MinMaxScaler
+
+from scripts.lstm_forecast import create_sequences, lstm_forecast
+
+# ---------------------------
+# LSTM BACKEND
+# ---------------------------
+
+def create_lstm_model(window_size, features):
+    """
+    Create an LSTM model for time series forecasting.
+
+    Parameters:
+    window_size (int): Number of time steps to use for prediction
+    features (int): Number of features in the input data
+
+    Returns:
+    Sequential: Compiled LSTM model
+    """
+    model = Sequential()
+    model.add(LSTM(50, return_sequences=True, input_shape=(window_size, features)))
+    model.add(LSTM(50, return_sequences=False))
+    model.add(Dense(25))
+    model.add(Dense(1))
+
+    model.compile(optimizer='adam', loss='mean_squared_error')
+    return model
+
+
+def fit_lstm_model(series):
+    """
+    Scale a price series and train an LSTM on sliding windows of it.
+
+    Parameters:
+    series (pd.Series): Time series data
+
+    Returns:
+    tuple: (model, scaler, window_size)
+    """
+    # Prepare data for LSTM
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaled_data = scaler.fit_transform(np.array(series).reshape(-1, 1))
+
+    # Create sequences of shape [samples, time steps, features]
+    window_size = 60
+    X, y = create_sequences(scaled_data, window_size)
+
+    # Split into train/test
+    split = int(0.8 * len(X))
+    X_train, X_test = X[:split], X[split:]
+    y_train, y_test = y[:split], y[split:]
+
+    # Create and train model with early stopping
+    model = create_lstm_model(window_size, 1)
+
+    # Add early stopping to prevent overfitting and reduce training time
+    early_stopping = tf.keras.callbacks.EarlyStopping(
+        monitor='val_loss',
+        patience=5,
+        restore_best_weights=True
+    )
+
+    model.fit(
+        X_train,
+        y_train,
+        batch_size=32,
+        epochs=50,
+        validation_data=(X_test, y_test),
+        callbacks=[early_stopping]
+    )
+
+    return model, scaler, window_size
+
+
+def fit(series):
+    """
+    Train an LSTM on a price series.
+
+    Parameters:
+    series (pd.Series): Time series data
+
+    Returns:
+    dict: Keras model under "model", the scaler under "scaler" and the
+    window size under "params"
+    """
+    model, scaler, window_size = fit_lstm_model(series)
+    return {"model": model, "scaler": scaler, "params": window_size}
+
+
+def update(entry, new_values):
+    """
+    Keep the trained weights and scaler when new bars arrive; forecasts
+    start from the latest window of the updated series.
+
+    Parameters:
+    entry (dict): Registry entry
+    new_values (pd.Series): New observations indexed by position
+
+    Returns:
+    keras.Model: The unchanged model
+    """
+    return entry["model"]
+
+
+def forecast(entry, series, forecast_period):
+    """
+    Roll all forecast steps out in a single compiled model call.
+
+    Parameters:
+    entry (dict): Registry entry
+    series (pd.Series): Time series data
+    forecast_period (int): Number of steps to forecast
+
+    Returns:
+    tuple: (predictions, None); the LSTM has no confidence intervals
+    """
+    predictions = lstm_forecast(entry["model"], entry["scaler"], series, entry["params"], forecast_period)
+    return predictions, None
@@ -0,0 +1,79 @@
+import io
+import base64
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# ---------------------------
+# PLOTTING BACKEND
+# ---------------------------
+
+# Figures are built with the object-oriented API on their own Agg canvas, so
+# no pyplot global state is shared between threads or requests.
+
+def render_efficient_frontier_png(volatility, returns, sharpe_ratio, best_volatility, best_return):
+    """
+    Render the random portfolios and the maximum Sharpe ratio portfolio
+    as a PNG.
+
+    Parameters:
+    volatility (np.array): Portfolio volatilities
+    returns (np.array): Portfolio returns
+    sharpe_ratio (np.array): Portfolio Sharpe ratios, used for the colour scale
+    best_volatility (float): Volatility of the maximum Sharpe ratio portfolio
+    best_return (float): Return of the maximum Sharpe ratio portfolio
+
+    Returns:
+    bytes: PNG image
+    """
+    fig = Figure(figsize=(12, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+
+    # Plot all generated portfolios
+    sc = ax.scatter(
+        volatility,
+        returns,
+        c=sharpe_ratio,
+        cmap='viridis',
+        marker='o',
+        s=10,
+        alpha=0.3
+    )
+    fig.colorbar(sc, ax=ax, label='Sharpe Ratio')
+
+    # Highlight the maximum Sharpe ratio portfolio
+    ax.scatter(
+        best_volatility,
+        best_return,
+        marker='*',
+        color='red',
+        s=200,
+        label='Max Sharpe Ratio'
+    )
+
+    ax.set_xlabel('Volatility')
+    ax.set_ylabel('Expected Return')
+    ax.set_title('Efficient Frontier')
+    ax.legend()
+    fig.tight_layout()
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    return buf.getvalue()
+
+
+def render_efficient_frontier(portfolios, max_sharpe_portfolio):
+    """
+    Render the efficient frontier plot as an inline base64 string.
+
+    Parameters:
+    portfolios (dict): Arrays "volatility", "return" and "sharpe_ratio"
+    max_sharpe_portfolio (dict): Volatility and return of the best portfolio
+
+    Returns:
+    str: Base64-encoded PNG image
+    """
+    png = render_efficient_frontier_png(portfolios["volatility"], portfolios["return"], portfolios["sharpe_ratio"],
+                                        max_sharpe_portfolio["volatility"], max_sharpe_portfolio["return"])
+    return base64.b64encode(png).decode("utf-8")
@@ -0,0 +1,88 @@
+import logging
+
+from scripts.sarima_search import search_sarima_order, build_sarima, forecast_exog
+from scripts.backends import to_positional
+from scripts.metrics import timed_stage
+
+# ---------------------------
+# SARIMA BACKEND
+# ---------------------------
+
+@timed_stage("sarima_order_search")
+def optimize_sarima_params(series, max_p=2, max_d=1, max_q=2,
+                           max_P=1, max_D=1, max_Q=1, n_jobs=None, fit_timeout=120):
+    """
+    Find optimal SARIMA parameters using AIC criterion.
+
+    Only seasonal periods detected in the series are tried; long periods
+    such as 252 are modelled with Fourier regressors instead of a seasonal
+    state.
+
+    Parameters:
+    series (pd.Series): Time series data
+    max_p (int): Maximum non-seasonal p value
+    max_d (int): Maximum non-seasonal d value
+    max_q (int): Maximum non-seasonal q value
+    max_P (int): Maximum seasonal P value
+    max_D (int): Maximum seasonal D value
+    max_Q (int): Maximum seasonal Q value
+    n_jobs (int): Number of worker processes for the fits
+    fit_timeout (float): Time limit in seconds for a single fit
+
+    Returns:
+    tuple: Optimal (order, seasonal_order, fourier) specification, where
+    fourier is (period, num_terms) or None
+    """
+    best_spec, best_aic, num_fits = search_sarima_order(series, max_p, max_d, max_q,
+                                                        max_P, max_D, max_Q,
+                                                        n_jobs=n_jobs, fit_timeout=fit_timeout)
+    logging.info(f"SARIMA search selected {best_spec} (AIC {best_aic:.2f}) after {num_fits} fits")
+    return best_spec
+
+
+def fit(series):
+    """
+    Search the specification of and fit a SARIMA model.
+
+    Parameters:
+    series (pd.Series): Time series data
+
+    Returns:
+    dict: Fitted results under "model", the specification under "params"
+    """
+    best_params = optimize_sarima_params(series)
+    model = build_sarima(to_positional(series), best_params).fit(disp=False)
+    return {"model": model, "scaler": None, "params": best_params}
+
+
+def update(entry, new_values):
+    """
+    Extend fitted results with new observations (and their Fourier terms)
+    without re-estimating.
+
+    Parameters:
+    entry (dict): Registry entry
+    new_values (pd.Series): New observations indexed by position
+
+    Returns:
+    SARIMAXResults: Updated results
+    """
+    exog = forecast_exog(entry["params"], entry["nobs"], len(new_values))
+    return entry["model"].append(new_values, exog=exog, refit=False)
+
+
+def forecast(entry, series, forecast_period):
+    """
+    Forecast with confidence intervals.
+
+    Parameters:
+    entry (dict): Registry entry
+    series (pd.Series): Time series data the model is up to date with
+    forecast_period (int): Number of steps to forecast
+
+    Returns:
+    tuple: (predictions, conf_int)
+    """
+    exog = forecast_exog(entry["params"], entry["nobs"], forecast_period)
+    result = entry["model"].get_forecast(steps=forecast_period, exog=exog)
+    return result.predicted_mean, result.conf_int()
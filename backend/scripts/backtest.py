@@ -0,0 +1,373 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import as_completed
+
+from scripts.arima_search import get_pool
+from scripts.backends import get_backend
+from scripts.covariance import CovarianceModel, estimate_covariance
+from scripts.jobs import report_progress
+from scripts.optimizer import optimize_portfolio, slsqp_portfolio
+
+PORTFOLIO_STRATEGIES = ("max_sharpe", "min_volatility", "equal_weight")
+
+# ---------------------------
+# REBALANCE SCHEDULE
+# ---------------------------
+
+def rebalance_points(num_obs, lookback, step):
+    """
+    Positions at which the strategy is re-optimized or the model refitted.
+    At position t the estimate uses observations [t - lookback, t) and is
+    evaluated on [t, t + step).
+
+    Parameters:
+    num_obs (int): Number of observations
+    lookback (int): Observations in each estimation window
+    step (int): Observations between rebalances
+
+    Returns:
+    list: Rebalance positions
+    """
+    if lookback < 2 or step < 1:
+        raise ValueError("lookback must be at least 2 and the rebalance step at least 1.")
+    if lookback >= num_obs:
+        raise ValueError(f"lookback {lookback} leaves no out-of-sample data in {num_obs} observations.")
+    return list(range(lookback, num_obs, step))
+
+
+def rolling_moments(values, points, lookback):
+    """
+    Daily mean and sample covariance of the window [t - lookback, t) for
+    every rebalance position, updating running sums of x and x x' with the
+    rows that enter and leave the window instead of recomputing each window
+    from scratch.
+
+    Parameters:
+    values (np.array): Daily returns of shape (T, N)
+    points (list): Rebalance positions, increasing
+    lookback (int): Window length
+
+    Returns:
+    tuple: (means of shape (P, N), covariances of shape (P, N, N))
+    """
+    num_assets = values.shape[1]
+    means = np.empty((len(points), num_assets))
+    covs = np.empty((len(points), num_assets, num_assets))
+    previous = None
+    for i, t in enumerate(points):
+        if previous is None or t - previous >= lookback:
+            window = values[t - lookback:t]
+            total, outer = window.sum(axis=0), window.T @ window
+        else:
+            entering, leaving = values[previous:t], values[previous - lookback:t - lookback]
+            total += entering.sum(axis=0) - leaving.sum(axis=0)
+            outer += entering.T @ entering - leaving.T @ leaving
+        previous = t
+        means[i] = total / lookback
+        covs[i] = (outer - lookback * np.outer(means[i], means[i])) / (lookback - 1)
+    return means, covs
+
+# ---------------------------
+# PORTFOLIO WALK-FORWARD
+# ---------------------------
+
+def _optimize_windows(means, covs, windows, covariance, strategies, constraints, optimizer):
+    """
+    Optimize the portfolios of a chunk of rebalance windows. Runs in a pool
+    worker. Consecutive windows overlap, so SLSQP starts from the previous
+    window's weights; compiled QPs are cached per worker and reused.
+
+    Parameters:
+    means (np.array): Daily means of shape (C, N)
+    covs (np.array): Daily sample covariances of shape (C, N, N), or None
+    windows (list): Daily return windows (np.array), used when `covs` is None
+    covariance (dict): Estimator settings for estimate_covariance
+    strategies (tuple): Strategy names
+    constraints (dict): Keyword arguments for optimize_portfolio
+    optimizer (str): "slsqp" or "qp"
+
+    Returns:
+    dict: Weights (C, N) and ex-ante annual volatility (C,) per strategy
+    """
+    num_windows, num_assets = means.shape
+    results = {name: (np.empty((num_windows, num_assets)), np.empty(num_windows)) for name in strategies}
+    for i in range(num_windows):
+        if covs is not None:
+            model = CovarianceModel(matrix=covs[i] * 252)
+        else:
+            model = estimate_covariance(pd.DataFrame(windows[i]), **covariance)
+        expected_returns = means[i] * 252
+        for name in strategies:
+            if name == "equal_weight":
+                weights = np.full(num_assets, 1.0 / num_assets)
+            elif optimizer == "slsqp":
+                previous = results[name][0][i - 1] if i > 0 else None
+                weights = slsqp_portfolio(expected_returns, model, name, previous)
+            elif name == "min_volatility":
+                weights = optimize_portfolio(expected_returns, model, name, **constraints)
+            else:
+                try:
+                    weights = optimize_portfolio(expected_returns, model, name, **constraints)
+                except ValueError:
+                    # No allowed portfolio has a positive expected return in this
+                    # window, so the Sharpe ratio has no maximum; hold minimum volatility
+                    weights = optimize_portfolio(expected_returns, model, "min_volatility", **constraints)
+            results[name][0][i] = weights
+            results[name][1][i] = model.volatility(weights)
+    return results
+
+
+def holding_period_returns(values, points, weights):
+    """
+    Out-of-sample daily returns of buy-and-hold portfolios between
+    rebalances, and the turnover paid at each rebalance.
+
+    Parameters:
+    values (np.array): Daily returns of shape (T, N)
+    points (list): Rebalance positions
+    weights (np.array): Target weights at each rebalance, shape (P, N)
+
+    Returns:
+    tuple: (daily portfolio returns over [points[0], T), turnover per rebalance)
+    """
+    bounds = list(points) + [len(values)]
+    daily = []
+    turnover = np.empty(len(points))
+    drifted = None
+    for i, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:])):
+        target = weights[i]
+        turnover[i] = np.abs(target - drifted).sum() if drifted is not None else np.abs(target).sum()
+        growth = np.cumprod(1 + values[start:stop], axis=0)
+        value = growth @ target
+        daily.append(np.diff(np.concatenate([[1.0], value])) / np.concatenate([[1.0], value[:-1]]))
+        drifted = target * growth[-1] / value[-1]
+    return np.concatenate(daily), turnover
+
+
+def performance_summary(returns, periods_per_year=252):
+    """
+    Annualized performance of a daily return series.
+
+    Parameters:
+    returns (np.array): Daily returns
+    periods_per_year (int): Annualization factor
+
+    Returns:
+    dict: Total and annualized return, volatility, Sharpe ratio and maximum drawdown
+    """
+    wealth = np.cumprod(1 + returns)
+    volatility = returns.std(ddof=1) * np.sqrt(periods_per_year)
+    return {
+        "total_return": float(wealth[-1] - 1),
+        "annualized_return": float(wealth[-1] ** (periods_per_year / len(returns)) - 1),
+        "annualized_volatility": float(volatility),
+        "sharpe_ratio": float(returns.mean() * periods_per_year / volatility) if volatility > 0 else None,
+        "max_drawdown": float((1 - wealth / np.maximum.accumulate(wealth)).max())
+    }
+
+
+def walk_forward_portfolio(returns, lookback=252, step=21, strategies=PORTFOLIO_STRATEGIES, covariance=None,
+                           constraints=None, optimizer="auto", n_jobs=None, chunk_size=32, qp_min_assets=50):
+    """
+    Walk-forward backtest of optimized portfolios: at every rebalance date
+    the portfolios are re-optimized on the trailing `lookback` days and held
+    (drifting with prices) until the next rebalance.
+
+    Window moments for the sample covariance are updated incrementally in
+    one pass; the per-window optimizations are independent and run in
+    chunks on the shared process pool.
+
+    Parameters:
+    returns (pd.DataFrame): Daily returns, one column per ticker
+    lookback (int): Trading days in each estimation window
+    step (int): Trading days between rebalances
+    strategies (tuple): Names from PORTFOLIO_STRATEGIES
+    covariance (dict): Estimator settings for estimate_covariance; sample
+        covariance when None
+    constraints (dict): Keyword arguments for optimize_portfolio
+        (max_weight, sectors, sector_bounds)
+    optimizer (str): "auto", "slsqp" or "qp"; "auto" uses the QP for
+        constrained problems or at least `qp_min_assets` assets
+    n_jobs (int): Worker processes, 1 to run in this process
+    chunk_size (int): Windows per pool task
+    qp_min_assets (int): Universe size from which "auto" uses the QP
+
+    Returns:
+    dict: Per strategy the out-of-sample daily returns (pd.Series), weights
+    (pd.DataFrame indexed by rebalance date), turnover and ex-ante volatility
+    """
+    unknown = set(strategies) - set(PORTFOLIO_STRATEGIES)
+    if unknown:
+        raise ValueError(f"Unknown strategies {sorted(unknown)}. Choose from {', '.join(PORTFOLIO_STRATEGIES)}.")
+    covariance = covariance or {"method": "sample"}
+    constraints = {name: value for name, value in (constraints or {}).items() if value is not None}
+    if optimizer == "auto":
+        optimizer = "qp" if constraints or returns.shape[1] >= qp_min_assets else "slsqp"
+    if optimizer == "slsqp" and constraints:
+        raise ValueError("Weight and sector constraints need the 'qp' optimizer.")
+
+    values = returns.to_numpy(dtype=np.float64)
+    points = rebalance_points(len(values), lookback, step)
+    if covariance["method"] == "sample":
+        means, covs = rolling_moments(values, points, lookback)
+    else:
+        means = np.array([values[t - lookback:t].mean(axis=0) for t in points])
+
+    chunks = [slice(i, min(i + chunk_size, len(points))) for i in range(0, len(points), chunk_size)]
+
+    def task(chunk):
+        if covariance["method"] == "sample":
+            return means[chunk], covs[chunk], None
+        return means[chunk], None, [values[t - lookback:t] for t in points[chunk]]
+
+    parts = [None] * len(chunks)
+    if n_jobs == 1 or len(chunks) == 1:
+        for i, chunk in enumerate(chunks):
+            parts[i] = _optimize_windows(*task(chunk), covariance, strategies, constraints, optimizer)
+            report_progress("windows", chunk.stop, len(points))
+    else:
+        pool = get_pool(n_jobs)
+        futures = {pool.submit(_optimize_windows, *task(chunk), covariance, strategies, constraints, optimizer): i
+                   for i, chunk in enumerate(chunks)}
+        try:
+            done = 0
+            for future in as_completed(futures):
+                chunk = chunks[futures[future]]
+                parts[futures[future]] = future.result()
+                done += chunk.stop - chunk.start
+                report_progress("windows", done, len(points))
+        finally:
+            for future in futures:
+                future.cancel()
+
+    dates = returns.index[points]
+    results = {}
+    for name in strategies:
+        weights = np.vstack([part[name][0] for part in parts])
+        predicted = np.concatenate([part[name][1] for part in parts])
+        daily, turnover = holding_period_returns(values, points, weights)
+        results[name] = {
+            "returns": pd.Series(daily, index=returns.index[points[0]:]),
+            "weights": pd.DataFrame(weights, index=dates, columns=returns.columns),
+            "turnover": pd.Series(turnover, index=dates),
+            "predicted_volatility": pd.Series(predicted, index=dates)
+        }
+    return results
+
+# ---------------------------
+# FORECAST WALK-FORWARD
+# ---------------------------
+
+def _fit_and_forecast(model_type, train, horizon):
+    """
+    Fit a forecasting backend on one training window and forecast from its
+    end. Runs in a pool worker.
+    """
+    backend = get_backend(model_type)
+    entry = backend.fit(train)
+    entry["nobs"] = len(train)
+    predictions, _ = backend.forecast(entry, train, horizon)
+    return np.asarray(predictions, dtype=np.float64)[:horizon]
+
+
+def walk_forward_forecast(series, model_type, lookback=756, step=21, horizon=5, refit="update", n_jobs=None):
+    """
+    Walk-forward evaluation of a forecasting backend: at every rebalance
+    position the model forecasts the next `horizon` prices from the data
+    before it, and the forecasts are compared with what happened.
+
+    With refit="update" the model is fitted once on the first window and
+    then extended with each new block of bars without re-estimating, which
+    is how fitted models are served; with refit="full" every position gets
+    a fresh fit on all data before it, and these independent fits run in
+    parallel on the shared process pool.
+
+    Parameters:
+    series (pd.Series): Cleaned close prices
+    model_type (str): Forecasting backend name
+    lookback (int): Observations before the first forecast
+    step (int): Observations between forecasts
+    horizon (int): Forecast horizon in trading days
+    refit (str): "update" or "full"
+    n_jobs (int): Worker processes for refit="full", 1 to run in this process
+
+    Returns:
+    pd.DataFrame: One row per forecast origin and step, with the forecast
+    and actual price, indexed by the forecast origin date
+    """
+    if refit not in ("update", "full"):
+        raise ValueError(f"Unknown refit mode '{refit}'. Choose 'update' or 'full'.")
+    points = [t for t in rebalance_points(len(series), lookback, step) if t + horizon <= len(series)]
+    if not points:
+        raise ValueError(f"Not enough data for a {horizon}-day forecast after {lookback} observations.")
+
+    forecasts = [None] * len(points)
+    if refit == "update":
+        backend = get_backend(model_type)
+        train = series.iloc[:points[0]]
+        report_progress(f"fitting {model_type}")
+        entry = backend.fit(train)
+        entry["nobs"] = len(train)
+        for i, t in enumerate(points):
+            if t > entry["nobs"]:
+                new_values = pd.Series(series.values[entry["nobs"]:t], index=pd.RangeIndex(entry["nobs"], t),
+                                       name=series.name)
+                entry = dict(entry, model=backend.update(entry, new_values), nobs=t)
+            predictions, _ = backend.forecast(entry, series.iloc[:t], horizon)
+            forecasts[i] = np.asarray(predictions, dtype=np.float64)[:horizon]
+            report_progress("forecasts", i + 1, len(points))
+    elif n_jobs == 1:
+        for i, t in enumerate(points):
+            forecasts[i] = _fit_and_forecast(model_type, series.iloc[:t], horizon)
+            report_progress("fits", i + 1, len(points))
+    else:
+        pool = get_pool(n_jobs)
+        futures = {pool.submit(_fit_and_forecast, model_type, series.iloc[:t], horizon): i
+                   for i, t in enumerate(points)}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                forecasts[futures[future]] = future.result()
+                report_progress("fits", done, len(points))
+        finally:
+            for future in futures:
+                future.cancel()
+
+    rows = []
+    for t, predicted in zip(points, forecasts):
+        for h in range(horizon):
+            rows.append((series.index[t - 1], h + 1, series.iloc[t - 1], predicted[h], series.iloc[t + h]))
+    return pd.DataFrame(rows, columns=["origin", "step", "last", "forecast", "actual"]).set_index("origin")
+
+
+def forecast_errors(forecasts):
+    """
+    Out-of-sample error metrics of walk-forward forecasts.
+
+    Parameters:
+    forecasts (pd.DataFrame): Output of walk_forward_forecast
+
+    Returns:
+    dict: MAE, RMSE, MAPE and directional accuracy overall and per horizon step,
+    plus the naive no-change forecast's MAE and RMSE for reference
+    """
+    from sklearn.metrics import mean_absolute_error, mean_squared_error
+
+    def metrics(frame):
+        actual, predicted = frame["actual"].to_numpy(), frame["forecast"].to_numpy()
+        predicted_move = np.sign(predicted - frame["last"].to_numpy())
+        actual_move = np.sign(actual - frame["last"].to_numpy())
+        # Direction is only scored where the model predicts a move (a random walk never does)
+        moved = predicted_move != 0
+        return {
+            "mae": float(mean_absolute_error(actual, predicted)),
+            "rmse": float(np.sqrt(mean_squared_error(actual, predicted))),
+            "mape": float(np.mean(np.abs((actual - predicted) / actual))),
+            "directional_accuracy": float((predicted_move == actual_move)[moved].mean()) if moved.any() else None,
+            "naive_mae": float(mean_absolute_error(actual, frame["last"])),
+            "naive_rmse": float(np.sqrt(mean_squared_error(actual, frame["last"])))
+        }
+
+    return {
+        "overall": metrics(forecasts),
+        "by_step": {int(step): metrics(frame) for step, frame in forecasts.groupby("step")}
+    }
@@ -0,0 +1,105 @@
+"""
+Compare /api/analyze payload size and serialization time for the previous
+per-date dict format and the columnar encodings.
+
+Prices are simulated, so no network access is needed. MessagePack, Arrow
+and brotli rows are skipped when the packages are not installed.
+
+Usage: python -m scripts.benchmark_analyze_payload [--tickers 1 5 20] [--days 2500]
+"""
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from app import perform_eda
+from scripts.encoding import (JSON, MSGPACK, ARROW, to_columnar, available_media_types, available_encodings,
+                              encode, compress)
+
+
+def synthetic_prices(num_tickers, num_days, seed=0):
+    """
+    Simulate geometric Brownian motion price paths on business days.
+
+    Parameters:
+    num_tickers (int): Number of tickers
+    num_days (int): Number of trading days
+    seed (int): Random seed
+
+    Returns:
+    pd.DataFrame: Prices with one column per ticker
+    """
+    rng = np.random.default_rng(seed)
+    log_returns = rng.normal(0.0003, 0.02, size=(num_days, num_tickers))
+    index = pd.bdate_range("2015-01-01", periods=num_days)
+    return pd.DataFrame(100 * np.exp(np.cumsum(log_returns, axis=0)), index=index,
+                        columns=[f"T{i}" for i in range(num_tickers)])
+
+
+def legacy_payload(eda_results, tickers):
+    # The previous format: one {date: value} dict per metric
+    results = {}
+    for ticker, result in eda_results.items():
+        results[ticker] = {"basic_stats": result["basic_stats"], "stationarity": result["stationarity"]}
+        for metric, series in result["series"].items():
+            results[ticker][metric] = {str(date): value for date, value in series.to_dict().items()}
+    return {"message": "EDA completed successfully", "results": results, "tickers": tickers}
+
+
+def columnar_payload(eda_results, tickers, index, precision, max_points=None):
+    dates, columns = to_columnar({ticker: result["series"] for ticker, result in eda_results.items()},
+                                 index, precision, max_points)
+    results = {ticker: dict(result, series=columns[ticker]) for ticker, result in eda_results.items()}
+    return {"message": "EDA completed successfully", "results": results, "tickers": tickers,
+            "format": "columnar", "dtype": precision, "dates": dates}
+
+
+def timed(func, repeat=3):
+    best, value = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func()
+        best = min(best, time.perf_counter() - start)
+    return value, best
+
+
+def report(label, build, media_type, encodings):
+    body, seconds = timed(lambda: encode(build(), media_type))
+    sizes = [f"{len(body) / 1024:9.0f} KB raw"]
+    for encoding in encodings:
+        compressed, compress_seconds = timed(lambda: compress(body, encoding), repeat=1)
+        sizes.append(f"{len(compressed) / 1024:7.0f} KB {encoding} (+{compress_seconds * 1000:5.0f} ms)")
+    print(f"  {label:<28} {seconds * 1000:8.1f} ms | " + " | ".join(sizes))
+
+
+def run(num_tickers, num_days, max_points):
+    prices = synthetic_prices(num_tickers, num_days)
+    tickers = list(prices.columns)
+    eda_results = dict(perform_eda(prices, tickers))
+    encodings = available_encodings()
+    print(f"{num_tickers} tickers x {num_days} days")
+
+    report("records json (previous)", lambda: legacy_payload(eda_results, tickers),
+           JSON, encodings)
+    for precision in ("float64", "float32"):
+        build = lambda: columnar_payload(eda_results, tickers, prices.index, precision)
+        media_types = available_media_types(build())
+        report(f"columnar json {precision}", build, JSON, encodings)
+        if MSGPACK in media_types:
+            report(f"columnar msgpack {precision}", build, MSGPACK, encodings)
+        if ARROW in media_types:
+            report(f"columnar arrow {precision}", build, ARROW, encodings)
+    report(f"columnar json f32 <={max_points} pts",
+           lambda: columnar_payload(eda_results, tickers, prices.index, "float32", max_points), JSON, encodings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--days", type=int, default=2500)
+    parser.add_argument("--max-points", type=int, default=500)
+    args = parser.parse_args()
+
+    for num_tickers in args.tickers:
+        run(num_tickers, args.days, args.max_points)
@@ -0,0 +1,76 @@
+"""
+Compare time-to-first-byte, total time and peak memory of /api/analyze
+with a buffered JSON response and with NDJSON streaming, for growing
+ticker baskets.
+
+Prices are simulated and stored in a temporary price store, so no
+network access is needed.
+
+Usage: python -m scripts.benchmark_analyze_stream [--tickers 5 20 50] [--workers 4]
+"""
+import os
+import time
+import zlib
+import argparse
+import tempfile
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault("PRICE_STORE_DIR", tempfile.mkdtemp(prefix="price_store_"))
+os.environ.setdefault("MODEL_REGISTRY_DIR", tempfile.mkdtemp(prefix="models_"))
+
+import app as app_module  # noqa: E402
+
+
+def synthetic_fetcher(tickers, start_date, end_date):
+    # Geometric Brownian motion, seeded per ticker so repeated runs match
+    index = pd.bdate_range(start_date, end_date, inclusive="left")
+    columns = {}
+    for ticker in tickers:
+        rng = np.random.default_rng(zlib.crc32(ticker.encode("utf-8")))
+        columns[ticker] = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, len(index))))
+    return pd.DataFrame(columns, index=index)
+
+
+def measure(client, tickers, accept):
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.post("/api/analyze", json={"stocks": tickers}, headers={"Accept": accept}, buffered=False)
+    first_byte = None
+    size = 0
+    for chunk in response.response:
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+        size += len(chunk)
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first_byte, total, peak, size
+
+
+def run(num_tickers, client):
+    tickers = [f"SYN{i}" for i in range(num_tickers)]
+    # Fill the price store first so both modes read from disk
+    app_module.PRICE_STORE.refresh(tickers, "2015-01-01", "2025-01-01")
+
+    for label, accept in (("buffered json", "application/json"), ("ndjson stream", "application/x-ndjson")):
+        first_byte, total, peak, size = measure(client, tickers, accept)
+        print(f"{num_tickers:>5} tickers | {label:<14} | first byte {first_byte * 1000:8.0f} ms | "
+              f"total {total * 1000:8.0f} ms | peak traced memory {peak / 1024 ** 2:7.1f} MB | "
+              f"{size / 1024 ** 2:6.1f} MB sent")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", type=int, nargs="+", default=[5, 20, 50])
+    parser.add_argument("--workers", type=int, default=None, help="EDA threads per request")
+    args = parser.parse_args()
+
+    if args.workers:
+        app_module.EDA_WORKERS = args.workers
+    app_module.PRICE_STORE.fetcher = synthetic_fetcher
+    client = app_module.app.test_client()
+    for num_tickers in args.tickers:
+        run(num_tickers, client)
@@ -0,0 +1,43 @@
+"""
+Compare the stepwise ARIMA order search with the exhaustive grid on
+synthetic ARIMA series.
+
+The original search fitted all (p, d, q) combinations, but AIC values are
+not comparable across different d, so the order check is made against the
+full (p, q) grid at the ADF-selected d.
+
+Usage: python -m scripts.benchmark_arima_search [--length 2500] [--jobs 4]
+"""
+import time
+import argparse
+import itertools
+
+from scripts.arima_search import search_arima_order, grid_search, fit_arima_aic
+from scripts.fixtures import ARIMA_FIXTURES, arima_series
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--length", type=int, default=2500)
+    parser.add_argument("--jobs", type=int, default=None)
+    args = parser.parse_args()
+
+    for name, (ar, ma, d) in ARIMA_FIXTURES.items():
+        series = arima_series(ar, ma, d, args.length)
+
+        start = time.perf_counter()
+        full = grid_search(fit_arima_aic, series, list(itertools.product(range(6), range(3), range(6))), n_jobs=1)
+        full_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        grid = search_arima_order(series, method="grid", n_jobs=args.jobs)
+        grid_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        stepwise = search_arima_order(series, method="stepwise", n_jobs=args.jobs)
+        stepwise_time = time.perf_counter() - start
+
+        print(f"{name:>12} | serial 108-fit grid {full[0]} in {full_time:6.1f}s | "
+              f"parallel grid at d={grid[0][1]} {grid[0]} in {grid_time:6.1f}s ({grid[2]} fits) | "
+              f"stepwise {stepwise[0]} in {stepwise_time:6.1f}s ({stepwise[2]} fits) | "
+              f"same order: {grid[0] == stepwise[0]}, AIC gap {stepwise[1] - grid[1]:.2f}")
@@ -0,0 +1,61 @@
+"""
+Time a walk-forward portfolio backtest the straightforward way (recompute
+the window covariance and run a cold-started SLSQP at every rebalance, one
+window after another) against the engine in scripts/backtest.py
+(incremental window moments, warm-started SLSQP or compiled QPs, windows
+in parallel).
+
+Usage: python -m scripts.benchmark_backtest [--assets 5 20 50] [--days 2520] [--step 5] [--n-jobs 1 4]
+"""
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from scripts.backtest import rebalance_points, walk_forward_portfolio
+from scripts.benchmark_covariance import synthetic_returns
+from scripts.optimizer import slsqp_portfolio
+
+
+def naive(returns, lookback, step):
+    values = returns.to_numpy()
+    weights = []
+    for t in rebalance_points(len(values), lookback, step):
+        window = values[t - lookback:t]
+        expected_returns, cov = window.mean(axis=0) * 252, np.cov(window, rowvar=False) * 252
+        weights.append(slsqp_portfolio(expected_returns, cov, "min_volatility"))
+    return np.array(weights)
+
+
+def run(num_assets, num_days, lookback, step, n_jobs_list):
+    returns, _ = synthetic_returns(num_days, num_assets)
+    returns.index = pd.bdate_range("2015-01-01", periods=num_days)
+    num_points = len(rebalance_points(num_days, lookback, step))
+
+    start = time.perf_counter()
+    reference = naive(returns, lookback, step)
+    naive_time = time.perf_counter() - start
+
+    line = []
+    for n_jobs in n_jobs_list:
+        start = time.perf_counter()
+        result = walk_forward_portfolio(returns, lookback, step, ("min_volatility",), optimizer="slsqp", n_jobs=n_jobs)
+        elapsed = time.perf_counter() - start
+        diff = np.abs(result["min_volatility"]["weights"].to_numpy() - reference).max()
+        line.append(f"engine n_jobs={n_jobs} {elapsed:6.2f} s ({naive_time / elapsed:4.1f}x, max weight diff {diff:.1e})")
+
+    print(f"{num_assets:>4} assets, {num_points} rebalances | naive {naive_time:6.2f} s | " + " | ".join(line))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--assets", type=int, nargs="+", default=[5, 20, 50])
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--lookback", type=int, default=252)
+    parser.add_argument("--step", type=int, default=5)
+    parser.add_argument("--n-jobs", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    for num_assets in args.assets:
+        run(num_assets, args.days, args.lookback, args.step, args.n_jobs)
@@ -0,0 +1,78 @@
+"""
+Compare forecasting a watchlist with one /api/forecast call per ticker
+against a single streamed /api/forecast/batch call: price fetches, time
+to the first forecast and total time. Every run starts from an empty model
+registry, so all models are fitted.
+
+Prices are simulated and stored in a temporary price store, so no
+network access is needed.
+
+Usage: python -m scripts.benchmark_batch_forecast [--tickers 4 16] [--workers 4] [--model-types arima]
+"""
+import time
+import argparse
+import tempfile
+
+from scripts.benchmark_analyze_stream import app_module, synthetic_fetcher
+from scripts.model_registry import ModelRegistry
+
+
+class CountingFetcher:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, tickers, start_date, end_date):
+        self.calls += 1
+        return synthetic_fetcher(tickers, start_date, end_date)
+
+
+def fresh_state(prefix):
+    # New price store and registry directories, so every mode downloads and fits from scratch
+    fetcher = CountingFetcher()
+    app_module.PRICE_STORE.root = tempfile.mkdtemp(prefix=f"{prefix}_prices_")
+    app_module.PRICE_STORE.fetcher = fetcher
+    app_module.MODEL_REGISTRY = ModelRegistry(tempfile.mkdtemp(prefix=f"{prefix}_models_"))
+    return fetcher
+
+
+def one_by_one(client, tickers, model_types):
+    start = time.perf_counter()
+    first = None
+    for ticker in tickers:
+        for model_type in model_types:
+            client.post("/api/forecast", json={"ticker": ticker, "model_type": model_type, "forecast_period": 30})
+            first = first or time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+def batch(client, tickers, model_types):
+    start = time.perf_counter()
+    first = None
+    response = client.post("/api/forecast/batch", json={"tickers": tickers, "model_types": model_types},
+                           headers={"Accept": "application/x-ndjson"}, buffered=False)
+    for _ in response.response:
+        first = first or time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+def run(num_tickers, model_types, client):
+    tickers = [f"SYN{i}" for i in range(num_tickers)]
+    for label, func in (("one by one", one_by_one), ("batch stream", batch)):
+        fetcher = fresh_state(label.replace(" ", "_"))
+        first, total = func(client, tickers, model_types)
+        print(f"{num_tickers:>4} tickers | {label:<12} | {fetcher.calls:>3} fetches | "
+              f"first forecast {first:7.2f} s | total {total:7.2f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", type=int, nargs="+", default=[4, 16])
+    parser.add_argument("--workers", type=int, default=None, help="Fit processes per batch request")
+    parser.add_argument("--model-types", nargs="+", default=["arima"])
+    args = parser.parse_args()
+
+    if args.workers:
+        app_module.FORECAST_WORKERS = args.workers
+    client = app_module.app.test_client()
+    for num_tickers in args.tickers:
+        run(num_tickers, args.model_types, client)
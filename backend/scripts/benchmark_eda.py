@@ -0,0 +1,81 @@
+"""
+Time EDA the previous way (one ticker at a time with pandas, statsmodels'
+`adfuller` and `seasonal_decompose`) against the frame-wide engine in
+scripts/eda.py (batched ADF regressions and a running-sum decomposition
+over the whole price matrix), and check that both give the same numbers.
+
+Usage: python -m scripts.benchmark_eda [--tickers 1 10 50 200] [--days 2500]
+"""
+import time
+import argparse
+import warnings
+
+import numpy as np
+
+from scripts.eda import analyze_frame
+from scripts.benchmark_analyze_payload import synthetic_prices
+
+
+def per_ticker(prices):
+    from statsmodels.tsa.seasonal import seasonal_decompose
+    from statsmodels.tsa.stattools import adfuller
+
+    stats = prices.describe().to_dict()
+    rolling_mean = prices.rolling(window=30).mean()
+    rolling_std = prices.rolling(window=30).std()
+    returns = prices.pct_change().dropna()
+    adf_stat, p_value, _, _, _, _ = adfuller(prices.dropna(), autolag="AIC")
+    decomposition = seasonal_decompose(prices, model="multiplicative", period=252)
+    volatility_clustering = (returns.rolling(window=30).std() * np.sqrt(252)).dropna()
+    return {
+        "basic_stats": stats,
+        "adf_statistic": adf_stat,
+        "p_value": p_value,
+        "series": {
+            "rolling_mean": rolling_mean,
+            "rolling_std": rolling_std,
+            "returns": returns,
+            "trend": decomposition.trend.dropna(),
+            "seasonal": decomposition.seasonal.dropna(),
+            "residual": decomposition.resid.dropna(),
+            "volatility_clustering": volatility_clustering
+        }
+    }
+
+
+def max_difference(reference, result):
+    diff = abs(reference["adf_statistic"] - result["stationarity"]["adf_statistic"])
+    for name, series in reference["series"].items():
+        other = result["series"][name]
+        scale = np.maximum(np.abs(series.to_numpy()), 1e-12)
+        diff = max(diff, np.nanmax(np.abs(series.to_numpy() - other.to_numpy()) / scale, initial=0.0))
+    return diff
+
+
+def run(num_tickers, num_days):
+    prices = synthetic_prices(num_tickers, num_days)
+
+    start = time.perf_counter()
+    reference = {ticker: per_ticker(prices[ticker]) for ticker in prices.columns}
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = analyze_frame(prices)
+    frame_time = time.perf_counter() - start
+
+    diff = max(max_difference(reference[ticker], results[ticker]) for ticker in prices.columns)
+    print(f"{num_tickers:>4} tickers | per-ticker loop {loop_time * 1000:8.0f} ms | "
+          f"frame-wide {frame_time * 1000:7.0f} ms ({loop_time / frame_time:5.1f}x) | max rel diff {diff:.1e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--days", type=int, default=2500)
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    # Keep the statsmodels imports out of the timings
+    run(1, args.days)
+    for num_tickers in args.tickers:
+        run(num_tickers, args.days)
@@ -0,0 +1,66 @@
+"""
+Compare the sampled efficient frontier with the exact QP frontier.
+
+Usage: python -m scripts.benchmark_frontier [--assets 5 10 25] [--portfolios 10000]
+"""
+import time
+import argparse
+
+import numpy as np
+
+from scripts.frontier import simulate_random_portfolios, frontier_envelope, exact_efficient_frontier
+
+
+def synthetic_moments(num_assets, seed=0):
+    """
+    Build annualized expected returns and a covariance matrix from
+    simulated daily returns.
+
+    Parameters:
+    num_assets (int): Number of assets
+    seed (int): Random seed
+
+    Returns:
+    tuple: (expected_returns, cov_matrix)
+    """
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0, 0.01, size=(2520, 3))
+    loadings = rng.normal(1, 0.3, size=(3, num_assets))
+    daily_returns = factors @ loadings + rng.normal(0.0004, 0.015, size=(2520, num_assets))
+    return daily_returns.mean(axis=0) * 252, np.cov(daily_returns, rowvar=False) * 252
+
+
+def run(num_assets, num_portfolios, num_points):
+    expected_returns, cov_matrix = synthetic_moments(num_assets)
+
+    start = time.perf_counter()
+    portfolios = simulate_random_portfolios(expected_returns, cov_matrix, num_portfolios, rng=0)
+    idx = frontier_envelope(portfolios["volatility"], portfolios["return"])
+    sampled_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    exact = exact_efficient_frontier(expected_returns, cov_matrix, num_points)
+    exact_time = time.perf_counter() - start
+
+    # Volatility excess of the sampled envelope over the exact frontier at the same return
+    sampled_vol = portfolios["volatility"][idx]
+    sampled_ret = portfolios["return"][idx]
+    in_range = sampled_ret >= exact["Return"].iloc[0]
+    exact_vol = np.interp(sampled_ret[in_range], exact["Return"], exact["Volatility"])
+    gap = (sampled_vol[in_range] - exact_vol) / exact_vol
+
+    print(f"{num_assets:>6} | sampled {sampled_time * 1000:8.1f} ms, {num_portfolios:>7} evals, "
+          f"{len(idx):>4} pts | exact {exact_time * 1000:8.1f} ms, {exact.attrs['nfev']:>5} evals, "
+          f"{len(exact):>4} pts | mean vol gap {gap.mean():.2%}, max {gap.max():.2%}, "
+          f"best sampled Sharpe {portfolios['sharpe_ratio'].max():.4f} vs exact {exact['Sharpe Ratio'].max():.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--assets", type=int, nargs="+", default=[5, 10, 25, 50])
+    parser.add_argument("--portfolios", type=int, default=10000)
+    parser.add_argument("--points", type=int, default=50)
+    args = parser.parse_args()
+
+    for num_assets in args.assets:
+        run(num_assets, args.portfolios, args.points)
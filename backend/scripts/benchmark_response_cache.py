@@ -0,0 +1,71 @@
+"""
+Simulate dashboards that each fire the optimize, market-trend,
+efficient-frontier and portfolio-risk endpoints for the same basket at
+once, and compare wall time and handler runs with every request forced
+to recompute (Cache-Control: no-cache) against the response cache, and
+against revalidation with If-None-Match.
+
+Prices are simulated and stored in a temporary price store, so no
+network access is needed.
+
+Usage: python -m scripts.benchmark_response_cache [--dashboards 1 4 16] [--tickers 10]
+"""
+import time
+import argparse
+import threading
+
+from scripts.benchmark_analyze_stream import app_module, synthetic_fetcher
+
+ENDPOINTS = ("/api/optimize", "/api/market-trend", "/api/efficient-frontier", "/api/portfolio-risk")
+
+
+def load(client, body, num_dashboards, headers=None, etags=None):
+    # One thread per request, all started together as a dashboard refresh would
+    responses = {}
+
+    def call(i, path):
+        request_headers = dict(headers or {})
+        if etags:
+            request_headers["If-None-Match"] = etags[path]
+        responses[i, path] = client.post(path, json=body, headers=request_headers)
+
+    threads = [threading.Thread(target=call, args=(i, path)) for i in range(num_dashboards) for path in ENDPOINTS]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, responses
+
+
+def run(num_dashboards, num_tickers, client):
+    body = {"stocks": [f"SYN{i}" for i in range(num_tickers)], "seed": 0}
+    app_module.PRICE_STORE.refresh(body["stocks"], "2015-01-01", "2025-01-01")
+
+    line = []
+    for label, headers in (("no-cache", {"Cache-Control": "no-cache"}), ("cold cache", None), ("warm cache", None)):
+        if label != "warm cache":
+            app_module.RESPONSE_CACHE.invalidate()
+        misses = app_module.RESPONSE_CACHE.misses
+        elapsed, responses = load(client, body, num_dashboards, headers)
+        computed = app_module.RESPONSE_CACHE.misses - misses
+        line.append(f"{label} {elapsed * 1000:7.0f} ms ({computed:>3} computed)")
+
+    etags = {path: response.headers["ETag"] for (_, path), response in responses.items()}
+    elapsed, responses = load(client, body, num_dashboards, etags=etags)
+    not_modified = sum(response.status_code == 304 for response in responses.values())
+    line.append(f"revalidate {elapsed * 1000:7.0f} ms ({not_modified} x 304)")
+
+    print(f"{num_dashboards:>3} dashboards | " + " | ".join(line))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dashboards", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--tickers", type=int, default=10)
+    args = parser.parse_args()
+
+    app_module.PRICE_STORE.fetcher = synthetic_fetcher
+    client = app_module.app.test_client()
+    for num_dashboards in args.dashboards:
+        run(num_dashboards, args.tickers, client)
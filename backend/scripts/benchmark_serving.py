@@ -0,0 +1,240 @@
+"""
+Load test: start the app the current way (`app.run(debug=True)`, the
+Werkzeug development server) and under gunicorn with the production
+config, drive each with concurrent clients sending a mix of requests,
+and compare throughput and latency.
+
+Servers run in subprocesses on fixture prices (see benchmark_suite), so
+no network access is needed. Requests are sent with Cache-Control:
+no-cache so each one is computed; pass --cached to let the response
+cache answer repeats.
+
+Usage: python -m scripts.benchmark_serving [--setups dev gunicorn] [--clients 16] [--duration 20]
+"""
+import os
+import sys
+import time
+import signal
+import socket
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+
+import numpy as np
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TICKERS = [f"SYN{i}" for i in range(5)]
+
+# (weight, path, body): mostly dashboard reads, with the odd forecast
+REQUEST_MIX = (
+    (3, "/api/market-trend", {"stocks": TICKERS}),
+    (3, "/api/optimize", {"stocks": TICKERS, "seed": 0}),
+    (2, "/api/portfolio-risk", {"stocks": TICKERS, "num_scenarios": 20000, "seed": 0}),
+    (1, "/api/risk", {"stocks": TICKERS[:2]}),
+    (1, "/api/analyze", {"stocks": TICKERS[:1]}),
+    (1, "/api/forecast", {"ticker": "SYN0", "model_type": "arima", "forecast_period": 30})
+)
+
+# Server command line per setup, after `python -m scripts.benchmark_serving --serve`
+SETUPS = {
+    "dev": ["dev"],
+    "gunicorn": ["gunicorn", "--role", "all"],
+    "gunicorn-sync": ["gunicorn", "--role", "models"]
+}
+
+# ---------------------------
+# SERVER SIDE
+# ---------------------------
+
+def run_server(kind, port, role):
+    """
+    Serve the app on fixture prices; runs in the subprocess.
+
+    Parameters:
+    kind (str): "dev" or "gunicorn"
+    port (int): Port to listen on
+    role (str): gunicorn serving role
+    """
+    from scripts.benchmark_suite import app_module
+    from scripts.fixtures import fixture_fetcher
+
+    app_module.PRICE_STORE.fetcher = fixture_fetcher()
+    if kind == "dev":
+        # As `python app.py` does, on another port
+        app_module.warmup()
+        app_module.app.run(debug=True, port=port)
+    else:
+        from scripts.serving import serve
+
+        serve(role, bind=f"127.0.0.1:{port}", accesslog=None)
+
+# ---------------------------
+# CLIENT SIDE
+# ---------------------------
+
+def start_server(setup, port, workers):
+    # A server left on the port would answer the readiness probe and be measured instead
+    with socket.socket() as probe:
+        if probe.connect_ex(("127.0.0.1", port)) == 0:
+            raise RuntimeError(f"Port {port} is already in use; pick another with --port")
+    env = dict(os.environ, WARMUP_TICKERS=",".join(TICKERS), WARMUP_BACKENDS="arima",
+               PRICE_STORE_DIR=tempfile.mkdtemp(prefix="price_store_"))
+    if workers:
+        env["WEB_CONCURRENCY"] = str(workers)
+    command = [sys.executable, "-m", "scripts.benchmark_serving", "--serve", *SETUPS[setup], "--port", str(port)]
+    # Own process group, so the reloader's child and gunicorn's workers stop with it
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, start_new_session=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 180
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"{setup} server exited with code {process.returncode}")
+            try:
+                if requests.get(f"http://127.0.0.1:{port}/readyz", timeout=5).status_code == 200:
+                    return process
+            except requests.RequestException:
+                # Not listening yet, or busy warming up
+                pass
+            time.sleep(0.5)
+        raise RuntimeError(f"{setup} server was not ready within 180 s")
+    except BaseException:
+        stop_server(process)
+        raise
+
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+    except ProcessLookupError:
+        pass
+
+
+def group_memory_mb(pgid):
+    """
+    Proportional set size of every process in a process group: pages
+    shared copy-on-write between a master and its workers count once in
+    total rather than once per process. Linux only.
+
+    Parameters:
+    pgid (int): Process group id
+
+    Returns:
+    float: Memory in MB, or None where /proc is not available
+    """
+    total = 0
+    try:
+        pids = [name for name in os.listdir("/proc") if name.isdigit()]
+    except FileNotFoundError:
+        return None
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                # The group id is the 5th field, after the parenthesised command name
+                if int(f.read().rsplit(")", 1)[1].split()[2]) != pgid:
+                    continue
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                total += sum(int(line.split()[1]) for line in f if line.startswith("Pss:"))
+        except (OSError, IndexError, ValueError):
+            continue
+    return total / 1024
+
+
+def load(base_url, num_clients, duration, headers):
+    """
+    Send the request mix from concurrent clients for a fixed time.
+
+    Parameters:
+    base_url (str): Server URL
+    num_clients (int): Concurrent clients, each waiting for its response
+        before sending the next request
+    duration (float): Seconds to run
+    headers (dict): Headers sent with every request
+
+    Returns:
+    tuple: (latencies in seconds, number of failed requests)
+    """
+    weights = [weight for weight, _, _ in REQUEST_MIX]
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(seed):
+        rng = random.Random(seed)
+        session = requests.Session()
+        while time.monotonic() < deadline:
+            _, path, body = rng.choices(REQUEST_MIX, weights)[0]
+            start = time.perf_counter()
+            try:
+                ok = session.post(base_url + path, json=body, headers=headers, timeout=300).status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(num_clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def run(setup, args, port):
+    process = start_server(setup, port, args.workers)
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        headers = {} if args.cached else {"Cache-Control": "no-cache"}
+        # One pass over the mix so first-use imports and fits are not timed
+        for _, path, body in REQUEST_MIX:
+            requests.post(base_url + path, json=body, timeout=300)
+        start = time.perf_counter()
+        latencies, errors = load(base_url, args.clients, args.duration, headers)
+        elapsed = time.perf_counter() - start
+        memory = group_memory_mb(process.pid)
+    finally:
+        stop_server(process)
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if latencies else (np.nan,) * 3
+    throughput = len(latencies) / elapsed
+    print(f"{setup:<14} | {throughput:7.1f} req/s | p50 {p50 * 1000:7.0f} ms | p95 {p95 * 1000:7.0f} ms | "
+          f"p99 {p99 * 1000:7.0f} ms | {len(latencies)} ok, {errors} failed"
+          + (f" | server memory {memory:6.0f} MB" if memory else ""), flush=True)
+    return throughput
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--setups", nargs="+", choices=sorted(SETUPS), default=["dev", "gunicorn"])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--workers", type=int, default=None, help="gunicorn workers, defaults to the CPU count")
+    parser.add_argument("--cached", action="store_true", help="Let the response cache answer repeated requests")
+    parser.add_argument("--port", type=int, default=5100)
+    parser.add_argument("--serve", choices=("dev", "gunicorn"), default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--role", default="all", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        run_server(args.serve, args.port, args.role)
+        sys.exit(0)
+
+    throughputs = {}
+    for i, setup in enumerate(args.setups):
+        throughputs[setup] = run(setup, args, args.port + i)
+    if "dev" in throughputs:
+        for setup, throughput in throughputs.items():
+            if setup != "dev":
+                print(f"{setup}: {throughput / throughputs['dev']:.2f}x the development server's throughput")
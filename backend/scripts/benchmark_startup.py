@@ -0,0 +1,105 @@
+"""
+Measure how long importing the app takes and how much memory a fresh
+worker holds, and fail if either regresses against a stored baseline or
+a heavy engine is imported at startup.
+
+Each measurement runs in a fresh interpreter, so nothing is shared with
+this process.
+
+Usage: python -m scripts.benchmark_startup [--runs 5] [--update-baseline]
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_baseline.json")
+
+# Modules that must only be imported by the backends that need them
+HEAVY_MODULES = ("tensorflow", "keras", "statsmodels", "matplotlib", "seaborn", "sklearn", "yfinance")
+
+_PROBE = """
+import sys, json, time, resource
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    maxrss //= 1024
+backends = sys.argv[1:]
+if backends:
+    from scripts.backends import preload_backends
+    preload_backends(backends)
+print(json.dumps({
+    "import_seconds": elapsed,
+    "rss_mb": maxrss / 1024,
+    "rss_with_backends_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if backends else None,
+    "modules": sorted({name.split(".")[0] for name in sys.modules}),
+}))
+"""
+
+
+def measure(backends=()):
+    """
+    Import the app in a fresh interpreter.
+
+    Parameters:
+    backends (tuple): Backends to load after the import, for comparison
+
+    Returns:
+    dict: Import time in seconds, peak RSS in MB and the top-level modules loaded
+    """
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    output = subprocess.run([sys.executable, "-c", _PROBE, *backends], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(runs, tolerance, update_baseline, backends):
+    samples = [measure() for _ in range(runs)]
+    import_seconds = sorted(s["import_seconds"] for s in samples)[runs // 2]
+    rss_mb = sorted(s["rss_mb"] for s in samples)[runs // 2]
+    print(f"import app: median {import_seconds * 1000:.0f} ms, peak RSS {rss_mb:.0f} MB over {runs} runs")
+
+    failures = []
+    loaded = [name for name in HEAVY_MODULES if name in samples[0]["modules"]]
+    if loaded:
+        failures.append(f"heavy modules imported at startup: {', '.join(loaded)}")
+
+    if backends:
+        loaded = measure(backends)
+        print(f"with backends {', '.join(backends)}: peak RSS {loaded['rss_with_backends_mb']:.0f} MB")
+
+    current = {"import_seconds": import_seconds, "rss_mb": rss_mb}
+    if update_baseline or not os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"baseline written to {BASELINE_PATH}")
+    else:
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+        for key, value in current.items():
+            limit = baseline[key] * (1 + tolerance)
+            status = "ok" if value <= limit else "REGRESSION"
+            print(f"{key}: {value:.3f} vs baseline {baseline[key]:.3f} (limit {limit:.3f}) {status}")
+            if value > limit:
+                failures.append(f"{key} {value:.3f} exceeds {limit:.3f}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return not failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative increase over the baseline")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--backends", nargs="*", default=[],
+                        help="Also report RSS after loading these backends, e.g. arima lstm")
+    args = parser.parse_args()
+
+    sys.exit(0 if run(args.runs, args.tolerance, args.update_baseline, args.backends) else 1)
@@ -0,0 +1,250 @@
+"""
+Reproducible benchmarks of the API endpoints and of the helpers behind
+them (efficient_frontier, maximize_sharpe_ratio, optimize_arima_params,
+perform_eda, ...) across problem sizes, compared against a stored
+baseline so a change that makes any of them slower fails the run.
+
+Prices come from seeded synthetic fixtures: geometric Brownian motion, or
+GARCH(1, 1) returns with volatility clustering and a common market
+factor. yfinance is replaced by a stub that refuses to download and the
+price store, model registry and image cache live in temporary
+directories, so the suite needs no network and leaves the data folder
+alone. Caches are cleared before every timed call, so each timing is a
+cold computation.
+
+Timings are machine-dependent: refresh the baseline with
+--update-baseline on the machine that runs the comparison.
+
+Usage: python -m scripts.benchmark_suite [--only optimize arima] [--repeat 3]
+                                         [--prices garch] [--update-baseline]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import platform
+import statistics
+
+import numpy as np
+import pandas as pd
+
+from scripts.fixtures import PRICE_MODELS, disable_yfinance, fixture_frame, fixture_fetcher
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+
+# Keep the app's on-disk state out of the data folder
+for _name, _prefix in (("PRICE_STORE_DIR", "price_store_"), ("MODEL_REGISTRY_DIR", "models_"),
+                       ("IMAGE_CACHE_DIR", "images_"), ("JOB_STORE_DIR", "jobs_")):
+    os.environ.setdefault(_name, tempfile.mkdtemp(prefix=_prefix))
+disable_yfinance()
+
+import app as app_module  # noqa: E402
+from scripts.risk import RiskEngines  # noqa: E402
+from scripts.model_registry import ModelRegistry  # noqa: E402
+from scripts.backends.arima import optimize_arima_params  # noqa: E402
+
+# ---------------------------
+# BENCHMARKS
+# ---------------------------
+
+def reset_caches():
+    # Every timed call computes from prices, as the first request after new bars would
+    app_module.RESPONSE_CACHE.invalidate()
+    app_module.RETURN_CACHE.invalidate()
+    app_module.RISK_ENGINES = RiskEngines()
+    app_module.MODEL_REGISTRY = ModelRegistry(tempfile.mkdtemp(prefix="models_"))
+
+
+def annual_statistics(prices):
+    returns = prices.pct_change().dropna()
+    return returns.mean() * 252, returns.cov() * 252
+
+
+def helper_benchmarks(model):
+    """
+    Benchmarks of the computational helpers, on fixture frames.
+
+    Parameters:
+    model (str): Price fixture, "gbm" or "garch"
+
+    Returns:
+    list: (name, setup) pairs, where setup returns the zero-argument call to time
+    """
+    def frontier(num_assets):
+        expected_returns, cov_matrix = annual_statistics(fixture_frame(num_assets, 1000, model))
+        return lambda: app_module.efficient_frontier(expected_returns, cov_matrix, rng=0)
+
+    def sharpe(num_assets):
+        expected_returns, cov_matrix = annual_statistics(fixture_frame(num_assets, 1000, model))
+        return lambda: app_module.maximize_sharpe_ratio(expected_returns, cov_matrix)
+
+    def arima(num_days):
+        series = fixture_frame(1, num_days, model)["T0"]
+        return lambda: optimize_arima_params(series, n_jobs=1)
+
+    def eda(num_tickers):
+        prices = fixture_frame(num_tickers, 2500, model)
+        # perform_eda is a generator; the work happens as results are consumed
+        return lambda: dict(app_module.perform_eda(prices, list(prices.columns)))
+
+    def covariance(num_assets):
+        returns = fixture_frame(num_assets, 2500, model).pct_change().dropna()
+        return lambda: app_module.estimate_covariance(returns, "ledoit_wolf")
+
+    benchmarks = []
+    for num_assets in (5, 20, 100):
+        benchmarks.append((f"efficient_frontier[{num_assets} assets]", lambda n=num_assets: frontier(n)))
+    for num_assets in (5, 20, 100):
+        benchmarks.append((f"maximize_sharpe_ratio[{num_assets} assets]", lambda n=num_assets: sharpe(n)))
+    for num_days in (500, 1500):
+        benchmarks.append((f"optimize_arima_params[{num_days} days]", lambda n=num_days: arima(n)))
+    for num_tickers in (1, 10, 50):
+        benchmarks.append((f"perform_eda[{num_tickers} tickers]", lambda n=num_tickers: eda(n)))
+    for num_assets in (20, 200):
+        benchmarks.append((f"estimate_covariance[{num_assets} assets]", lambda n=num_assets: covariance(n)))
+    return [(f"helper/{name}", setup) for name, setup in benchmarks]
+
+
+def endpoint_benchmarks(client):
+    """
+    Benchmarks of the API endpoints through the Flask test client, on
+    baskets served by the fixture fetcher.
+
+    Parameters:
+    client (FlaskClient): Test client of the app
+
+    Returns:
+    list: (name, setup) pairs, where setup returns the zero-argument call to time
+    """
+    def endpoint(path, body):
+        def setup():
+            # Fill the price store up front, so the timing reads from disk
+            tickers = body.get("stocks") or [body["ticker"]]
+            app_module.PRICE_STORE.get(tickers, "2015-01-01", "2025-01-01")
+
+            def call():
+                response = client.post(path, json=body, headers={"Cache-Control": "no-cache"})
+                if response.status_code != 200:
+                    raise RuntimeError(f"{path} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+            return call
+        return setup
+
+    def basket(num_tickers):
+        return [f"SYN{i}" for i in range(num_tickers)]
+
+    cases = []
+    for n in (1, 10):
+        cases.append((f"analyze[{n} tickers]", "/api/analyze", {"stocks": basket(n)}))
+    cases.append(("forecast[arima]", "/api/forecast", {"ticker": "SYN0", "model_type": "arima", "forecast_period": 30}))
+    for n in (5, 20, 100):
+        cases.append((f"optimize[{n} tickers]", "/api/optimize", {"stocks": basket(n), "seed": 0}))
+    for n in (5, 20):
+        cases.append((f"efficient-frontier[{n} tickers]", "/api/efficient-frontier", {"stocks": basket(n), "seed": 0}))
+    for n in (5, 50):
+        cases.append((f"market-trend[{n} tickers]", "/api/market-trend", {"stocks": basket(n)}))
+    for n in (5, 20):
+        cases.append((f"risk[{n} tickers]", "/api/risk", {"stocks": basket(n)}))
+    for n in (5, 20):
+        cases.append((f"portfolio-risk[{n} tickers]", "/api/portfolio-risk",
+                      {"stocks": basket(n), "num_scenarios": 20000, "seed": 0}))
+    cases.append(("backtest[5 tickers]", "/api/backtest", {"stocks": basket(5), "type": "portfolio"}))
+    return [(f"endpoint/{name}", endpoint(path, body)) for name, path, body in cases]
+
+
+def measure(setup, repeat):
+    """
+    Time a benchmark: one untimed warm-up call (imports, pools), then
+    `repeat` timed calls, each after clearing the caches.
+
+    Parameters:
+    setup (callable): Returns the zero-argument call to time
+    repeat (int): Number of timed calls
+
+    Returns:
+    dict: Median and minimum in seconds
+    """
+    call = setup()
+    reset_caches()
+    call()
+    samples = []
+    for _ in range(repeat):
+        reset_caches()
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return {"median_seconds": statistics.median(samples), "min_seconds": min(samples)}
+
+
+def environment(prices):
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "prices": prices
+    }
+
+
+def run(args):
+    app_module.PRICE_STORE.fetcher = fixture_fetcher(args.prices)
+    client = app_module.app.test_client()
+    benchmarks = helper_benchmarks(args.prices) + endpoint_benchmarks(client)
+    if args.only:
+        benchmarks = [(name, setup) for name, setup in benchmarks if any(word in name for word in args.only)]
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+        if stored.get("environment", {}).get("prices", args.prices) != args.prices:
+            print(f"baseline was recorded with {stored['environment']['prices']} prices; comparing anyway")
+        baseline = stored.get("benchmarks", {})
+
+    results, failures = {}, []
+    for name, setup in benchmarks:
+        result = results[name] = measure(setup, args.repeat)
+        line = f"{name:<48} median {result['median_seconds'] * 1000:9.1f} ms | min {result['min_seconds'] * 1000:9.1f} ms"
+        reference = baseline.get(name)
+        if reference and not args.update_baseline:
+            limit = reference["median_seconds"] * (1 + args.tolerance)
+            ratio = result["median_seconds"] / reference["median_seconds"]
+            regressed = result["median_seconds"] > limit
+            line += f" | {ratio:5.2f}x baseline {'REGRESSION' if regressed else 'ok'}"
+            if regressed:
+                failures.append(f"{name} median {result['median_seconds']:.4f} s exceeds {limit:.4f} s")
+        print(line, flush=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"environment": environment(args.prices), "benchmarks": results}, f, indent=2)
+
+    if args.update_baseline or not baseline:
+        # Keep the entries of benchmarks filtered out of this run
+        merged = dict(baseline, **results) if args.only else results
+        with open(args.baseline, "w") as f:
+            json.dump({"environment": environment(args.prices), "benchmarks": merged}, f, indent=2, sort_keys=True)
+        print(f"baseline written to {args.baseline}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return not failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", default=None,
+                        help="Run benchmarks whose name contains any of these words, e.g. helper/ optimize")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed calls per benchmark")
+    parser.add_argument("--prices", choices=sorted(PRICE_MODELS), default="garch")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative increase of the median over the baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", default=None, help="Also write this run's timings to a JSON file")
+    args = parser.parse_args()
+
+    sys.exit(0 if run(args) else 1)
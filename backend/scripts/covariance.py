@@ -0,0 +1,309 @@
+import numpy as np
+import pandas as pd
+
+COVARIANCE_METHODS = ("sample", "ledoit_wolf", "ewma", "factor")
+
+# ---------------------------
+# COVARIANCE MODEL
+# ---------------------------
+
+class CovarianceModel:
+    """
+    Annualized covariance estimate with its factorizations cached.
+
+    A dense model holds the full N x N matrix; its Cholesky factor is
+    computed once on first use. A factor model holds loadings B (N x k) and
+    specific variances d, with Σ = B B' + diag(d), so `variance` and
+    `matvec` cost O(N·k) per portfolio and the N x N matrix is only built
+    if something asks for it.
+
+    The model can be passed wherever a covariance matrix is expected:
+    `np.asarray(model)` returns the dense matrix.
+    """
+
+    def __init__(self, matrix=None, loadings=None, specific=None, labels=None, method="sample", details=None):
+        if matrix is None and loadings is None:
+            raise ValueError("A covariance model needs either a matrix or factor loadings.")
+        self._matrix = None if matrix is None else np.asarray(matrix, dtype=np.float64)
+        self.loadings = None if loadings is None else np.asarray(loadings, dtype=np.float64)
+        self.specific = None if specific is None else np.asarray(specific, dtype=np.float64)
+        self.labels = list(labels) if labels is not None else None
+        self.method = method
+        self.details = details or {}
+        self._cholesky = None
+
+    @property
+    def is_factor(self):
+        return self.loadings is not None
+
+    @property
+    def num_assets(self):
+        return len(self.specific) if self.is_factor else len(self._matrix)
+
+    @property
+    def shape(self):
+        return (self.num_assets, self.num_assets)
+
+    @property
+    def nbytes(self):
+        total = sum(a.nbytes for a in (self._matrix, self.loadings, self.specific, self._cholesky) if a is not None)
+        return int(total)
+
+    @property
+    def matrix(self):
+        """
+        np.array: Dense covariance matrix, built once for factor models
+        """
+        if self._matrix is None:
+            self._matrix = self.loadings @ self.loadings.T + np.diag(self.specific)
+        return self._matrix
+
+    def __array__(self, dtype=None, copy=None):
+        return self.matrix if dtype is None else self.matrix.astype(dtype)
+
+    def to_frame(self):
+        """
+        Returns:
+        pd.DataFrame: Dense covariance matrix labelled by ticker
+        """
+        return pd.DataFrame(self.matrix, index=self.labels, columns=self.labels)
+
+    @property
+    def cholesky(self):
+        """
+        np.array: Lower factor L with L @ L.T == Σ, cached. Falls back to a
+        clipped eigendecomposition when Σ is only positive semi-definite.
+        """
+        if self._cholesky is None:
+            try:
+                self._cholesky = np.linalg.cholesky(self.matrix)
+            except np.linalg.LinAlgError:
+                eigenvalues, eigenvectors = np.linalg.eigh(self.matrix)
+                self._cholesky = eigenvectors * np.sqrt(np.clip(eigenvalues, 0.0, None))
+        return self._cholesky
+
+    def matvec(self, weights):
+        """
+        Multiply portfolio weights by the covariance matrix.
+
+        Parameters:
+        weights (np.array): Weights of shape (N,) or (P, N)
+
+        Returns:
+        np.array: Σw with the same shape as `weights`
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        if self.is_factor:
+            return (weights @ self.loadings) @ self.loadings.T + weights * self.specific
+        return weights @ self.matrix
+
+    def variance(self, weights):
+        """
+        Portfolio variance w'Σw.
+
+        Parameters:
+        weights (np.array): Weights of shape (N,) or (P, N)
+
+        Returns:
+        float or np.array: Variance, or one variance per row of `weights`
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        if self.is_factor:
+            exposures = weights @ self.loadings
+            return (exposures * exposures).sum(axis=-1) + (weights * weights * self.specific).sum(axis=-1)
+        return (weights @ self.matrix * weights).sum(axis=-1)
+
+    def volatility(self, weights):
+        """
+        Portfolio volatility sqrt(w'Σw).
+
+        Parameters:
+        weights (np.array): Weights of shape (N,) or (P, N)
+
+        Returns:
+        float or np.array: Volatility, or one volatility per row of `weights`
+        """
+        return np.sqrt(np.maximum(self.variance(weights), 0.0))
+
+    @property
+    def rank(self):
+        """
+        int: Number of independent standard normals `transform` needs per draw
+        """
+        return self.loadings.shape[1] + self.num_assets if self.is_factor else self.num_assets
+
+    def transform(self, draws):
+        """
+        Map independent standard normal draws to draws with covariance Σ,
+        through the loadings for factor models (O(N·k) per draw) or the
+        cached Cholesky factor otherwise.
+
+        Parameters:
+        draws (np.array): Standard normals of shape (S, rank)
+
+        Returns:
+        np.array: Correlated draws of shape (S, N)
+        """
+        if self.is_factor:
+            k = self.loadings.shape[1]
+            return draws[:, :k] @ self.loadings.T + draws[:, k:] * np.sqrt(self.specific)
+        return draws @ self.cholesky.T
+
+    def scaled(self, factor):
+        """
+        Return the model with Σ multiplied by `factor`, e.g. 1/252 for daily
+        covariance, reusing the cached factorization.
+
+        Parameters:
+        factor (float): Scale factor
+
+        Returns:
+        CovarianceModel: Scaled model
+        """
+        if self.is_factor:
+            model = CovarianceModel(loadings=self.loadings * np.sqrt(factor), specific=self.specific * factor,
+                                    labels=self.labels, method=self.method, details=self.details)
+        else:
+            model = CovarianceModel(matrix=self.matrix * factor, labels=self.labels, method=self.method,
+                                    details=self.details)
+        if self._cholesky is not None:
+            model._cholesky = self._cholesky * np.sqrt(factor)
+        return model
+
+
+def as_covariance_model(cov_matrix):
+    """
+    Wrap a covariance matrix in a dense `CovarianceModel`, or return it
+    unchanged if it already is one.
+
+    Parameters:
+    cov_matrix (CovarianceModel, pd.DataFrame or np.array): Covariance
+
+    Returns:
+    CovarianceModel: Model
+    """
+    if isinstance(cov_matrix, CovarianceModel):
+        return cov_matrix
+    labels = list(cov_matrix.columns) if isinstance(cov_matrix, pd.DataFrame) else None
+    return CovarianceModel(matrix=np.asarray(cov_matrix, dtype=np.float64), labels=labels)
+
+# ---------------------------
+# ESTIMATORS
+# ---------------------------
+
+def _ledoit_wolf(centered):
+    """
+    Ledoit-Wolf shrinkage towards a scaled identity, with the optimal
+    intensity from Ledoit & Wolf (2004).
+
+    Parameters:
+    centered (np.array): De-meaned returns of shape (T, N)
+
+    Returns:
+    tuple: (shrunk covariance, shrinkage intensity)
+    """
+    num_obs, num_assets = centered.shape
+    sample = centered.T @ centered / num_obs
+    mu = np.trace(sample) / num_assets
+
+    # Squared distance of the sample covariance from the target, and the
+    # estimation error of the sample covariance, both per asset
+    delta = ((sample - mu * np.eye(num_assets)) ** 2).sum() / num_assets
+    row_norms = (centered * centered).sum(axis=1)
+    beta = ((row_norms ** 2).sum() / num_obs - (sample ** 2).sum()) / (num_obs * num_assets)
+    shrinkage = 0.0 if delta == 0 else min(beta, delta) / delta
+
+    shrunk = (1 - shrinkage) * sample
+    shrunk.flat[::num_assets + 1] += shrinkage * mu
+    return shrunk, shrinkage
+
+
+def _ewma(values, halflife):
+    """
+    Exponentially weighted covariance with weights halving every `halflife`
+    observations, most recent observation weighted highest.
+
+    Parameters:
+    values (np.array): Returns of shape (T, N)
+    halflife (float): Half-life in observations
+
+    Returns:
+    np.array: Covariance matrix
+    """
+    decay = 0.5 ** (1.0 / halflife)
+    weights = decay ** np.arange(len(values) - 1, -1, -1)
+    weights /= weights.sum()
+    centered = values - weights @ values
+    # Bias correction for weighted samples
+    return (centered * weights[:, np.newaxis]).T @ centered / (1 - (weights ** 2).sum())
+
+
+def _factor(centered, num_factors):
+    """
+    Statistical factor model from the leading principal components: the top
+    `num_factors` components become the loadings, the remaining variance of
+    each asset its specific variance. Uses an SVD of the returns, so the
+    N x N sample covariance is never formed.
+
+    Parameters:
+    centered (np.array): De-meaned returns of shape (T, N)
+    num_factors (int): Number of factors k
+
+    Returns:
+    tuple: (loadings of shape (N, k), specific variances of shape (N,), explained variance ratio)
+    """
+    num_obs = len(centered)
+    _, singular_values, components = np.linalg.svd(centered, full_matrices=False)
+    eigenvalues = singular_values ** 2 / (num_obs - 1)
+    loadings = components[:num_factors].T * np.sqrt(eigenvalues[:num_factors])
+
+    total = (centered * centered).sum(axis=0) / (num_obs - 1)
+    floor = 1e-6 * total.mean()
+    specific = np.maximum(total - (loadings ** 2).sum(axis=1), floor)
+    return loadings, specific, eigenvalues[:num_factors].sum() / eigenvalues.sum()
+
+
+def estimate_covariance(returns, method="sample", periods_per_year=252, halflife=63, num_factors=None):
+    """
+    Estimate the annualized covariance of daily returns.
+
+    Parameters:
+    returns (pd.DataFrame): Daily returns, one column per ticker
+    method (str): "sample", "ledoit_wolf", "ewma" or "factor"
+    periods_per_year (int): Annualization factor
+    halflife (float): EWMA half-life in trading days
+    num_factors (int): Number of factors for the factor model, defaults to
+        min(5, N - 1)
+
+    Returns:
+    CovarianceModel: Annualized covariance with cached factorizations
+    """
+    if method not in COVARIANCE_METHODS:
+        raise ValueError(f"Unknown covariance method '{method}'. Choose from {', '.join(COVARIANCE_METHODS)}.")
+
+    labels = list(returns.columns)
+    values = returns.to_numpy(dtype=np.float64)
+    centered = values - values.mean(axis=0)
+
+    if method == "sample":
+        matrix = centered.T @ centered / (len(values) - 1)
+        return CovarianceModel(matrix=matrix * periods_per_year, labels=labels, method=method)
+
+    if method == "ledoit_wolf":
+        matrix, shrinkage = _ledoit_wolf(centered)
+        return CovarianceModel(matrix=matrix * periods_per_year, labels=labels, method=method,
+                               details={"shrinkage": float(shrinkage)})
+
+    if method == "ewma":
+        if halflife <= 0:
+            raise ValueError("EWMA half-life must be positive.")
+        return CovarianceModel(matrix=_ewma(values, halflife) * periods_per_year, labels=labels, method=method,
+                               details={"halflife": halflife})
+
+    num_factors = num_factors or min(5, max(1, len(labels) - 1))
+    if not 1 <= num_factors <= min(values.shape):
+        raise ValueError(f"Number of factors must be between 1 and {min(values.shape)}.")
+    loadings, specific, explained = _factor(centered, num_factors)
+    return CovarianceModel(loadings=loadings * np.sqrt(periods_per_year), specific=specific * periods_per_year,
+                           labels=labels, method=method,
+                           details={"num_factors": num_factors, "explained_variance": float(explained)})
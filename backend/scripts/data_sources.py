@@ -0,0 +1,341 @@
+import os
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from scripts.metrics import REGISTRY
+
+FETCH_FAILURES = REGISTRY.counter("price_fetch_failures_total",
+                                  "Ticker fetches that failed after all retries, by source.", ("source",))
+
+# ---------------------------
+# ERRORS AND RETRIES
+# ---------------------------
+
+class NoDataError(ValueError):
+    """
+    The provider has no prices for a ticker and date range, e.g. an unknown
+    or delisted ticker, or no trading days in the range. Retrying will not
+    help; the next source may.
+    """
+
+
+class FetchError(RuntimeError):
+    """
+    A ticker could not be fetched from any source because of errors worth
+    trying again later: timeouts, rate limits or connection failures.
+    """
+
+
+def call_with_retries(func, attempts=3, base_delay=0.5, max_delay=8.0, sleep=time.sleep, rng=random):
+    """
+    Call `func`, retrying on errors with exponential backoff and full jitter,
+    so clients that failed together do not retry together. NoDataError is
+    not retried.
+
+    Parameters:
+    func (callable): Zero-argument function
+    attempts (int): Maximum number of calls
+    base_delay (float): Upper bound of the first wait in seconds, doubled
+        after each failure
+    max_delay (float): Cap on the wait in seconds
+    sleep (callable): Sleep function, replaceable in tests
+    rng (random.Random): Source of the jitter
+
+    Returns:
+    Whatever `func` returns
+    """
+    for attempt in range(attempts):
+        try:
+            return func()
+        except NoDataError:
+            raise
+        except Exception as e:
+            if attempt == attempts - 1:
+                raise
+            delay = rng.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            logging.warning(f"Fetch failed ({e!r}); retry {attempt + 1}/{attempts - 1} in {delay:.2f}s")
+            sleep(delay)
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket: at most `burst` calls at once, refilled at
+    `rate` calls per second, shared by every thread fetching from one
+    provider so bursts of requests do not hammer it.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Wait until a call is allowed.
+
+        Returns:
+        float: Seconds waited
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+# ---------------------------
+# SOURCES
+# ---------------------------
+
+def pooled_session(pool_size=16):
+    """
+    HTTP session that keeps up to `pool_size` connections per host open,
+    so concurrent fetches reuse connections instead of opening new ones.
+
+    Parameters:
+    pool_size (int): Connections kept per host, at least the fetch threads
+
+    Returns:
+    requests.Session: Session
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class YahooSource:
+    """
+    Yahoo Finance through yfinance, one ticker per call over a shared
+    pooled session.
+    """
+    name = "yahoo"
+
+    def __init__(self, timeout=10, rate=2.0, burst=4, pool_size=16):
+        self.timeout = timeout
+        self.limiter = RateLimiter(rate, burst)
+        self.pool_size = pool_size
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _get_session(self):
+        with self._lock:
+            if self._session is None:
+                self._session = pooled_session(self.pool_size)
+            return self._session
+
+    def fetch(self, ticker, start_date, end_date):
+        """
+        Download one ticker's close prices.
+
+        Parameters:
+        ticker (str): Stock ticker
+        start_date (str): Start date (inclusive)
+        end_date (str): End date (exclusive)
+
+        Returns:
+        pd.Series: Close prices
+        """
+        import yfinance as yf
+        from yfinance.exceptions import YFTickerMissingError
+
+        try:
+            history = yf.Ticker(ticker, session=self._get_session()).history(
+                start=start_date, end=end_date, timeout=self.timeout, raise_errors=True)
+        except YFTickerMissingError as e:
+            raise NoDataError(str(e)) from e
+        if history.empty:
+            raise NoDataError(f"{ticker}: no prices between {start_date} and {end_date}")
+        return history["Close"]
+
+
+class FileSource:
+    """
+    Local file-backed provider reading `<TICKER>.csv` files with `Date`
+    and `Close` columns, for offline use and tests. `latency` and
+    `failure_rate` make it behave like a slow, flaky upstream, to exercise
+    timeouts and retries.
+    """
+    name = "file"
+
+    def __init__(self, directory, latency=0.0, failure_rate=0.0, seed=None):
+        self.directory = directory
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.limiter = None
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def fetch(self, ticker, start_date, end_date):
+        """
+        Read one ticker's close prices.
+
+        Parameters:
+        ticker (str): Stock ticker
+        start_date (str): Start date (inclusive)
+        end_date (str): End date (exclusive)
+
+        Returns:
+        pd.Series: Close prices
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            failed = self._rng.random() < self.failure_rate
+        if failed:
+            raise ConnectionError(f"{ticker}: simulated provider failure")
+        path = os.path.join(self.directory, f"{ticker}.csv")
+        if not os.path.exists(path):
+            raise NoDataError(f"{ticker}: no file {path}")
+        csv = pd.read_csv(path, parse_dates=["Date"], index_col="Date")
+        window = csv.loc[(csv.index >= pd.Timestamp(start_date)) & (csv.index < pd.Timestamp(end_date)), "Close"]
+        if window.empty:
+            raise NoDataError(f"{ticker}: no prices between {start_date} and {end_date}")
+        return window
+
+
+def parse_sources(spec):
+    """
+    Build sources from a comma-separated list in priority order, e.g.
+    "yahoo,file:data/csv" to fall back to local files.
+
+    Parameters:
+    spec (str): Source names; "file:<directory>" for a FileSource
+
+    Returns:
+    list: Sources
+    """
+    sources = []
+    for item in (part.strip() for part in spec.split(",")):
+        if item == "yahoo":
+            sources.append(YahooSource())
+        elif item.startswith("file:"):
+            sources.append(FileSource(item[len("file:"):]))
+        elif item:
+            raise ValueError(f"Unknown price source '{item}'. Use 'yahoo' or 'file:<directory>'.")
+    if not sources:
+        raise ValueError("At least one price source is required.")
+    return sources
+
+# ---------------------------
+# CONCURRENT FETCHER
+# ---------------------------
+
+class ConcurrentFetcher:
+    """
+    Price store fetcher that downloads tickers separately and concurrently
+    on a shared thread pool, trying each source in priority order. Each
+    source call waits for that source's rate limiter and is retried with
+    exponential backoff; a whole call gives up after `timeout` seconds so
+    one slow upstream response cannot stall the request.
+
+    Tickers that could not be fetched are left out of the returned frame,
+    so one bad ticker does not fail the others. Their reasons are listed in
+    `frame.attrs["errors"]` for failures worth retrying and in
+    `frame.attrs["no_data"]` for tickers no source has prices for.
+    """
+
+    def __init__(self, sources, max_workers=8, attempts=3, base_delay=0.5, max_delay=8.0, timeout=60):
+        self.sources = list(sources)
+        self.max_workers = max_workers
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Started lazily so importing the app does not start threads
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fetch")
+            return self._executor
+
+    def _fetch_source(self, source, ticker, start_date, end_date):
+        if source.limiter is not None:
+            source.limiter.acquire()
+        return source.fetch(ticker, start_date, end_date)
+
+    def fetch_ticker(self, ticker, start_date, end_date):
+        """
+        Fetch one ticker from the first source that has it.
+
+        Parameters:
+        ticker (str): Stock ticker
+        start_date (str): Start date (inclusive)
+        end_date (str): End date (exclusive)
+
+        Returns:
+        pd.Series: Close prices
+        """
+        errors, transient = [], False
+        for source in self.sources:
+            try:
+                return call_with_retries(lambda: self._fetch_source(source, ticker, start_date, end_date),
+                                         self.attempts, self.base_delay, self.max_delay)
+            except NoDataError as e:
+                errors.append(f"{source.name}: {e}")
+            except Exception as e:
+                FETCH_FAILURES.inc(source=source.name)
+                errors.append(f"{source.name}: {e}")
+                transient = True
+        raise (FetchError if transient else NoDataError)("; ".join(errors))
+
+    def __call__(self, tickers, start_date, end_date):
+        """
+        Fetch close prices for the given tickers.
+
+        Parameters:
+        tickers (list): List of stock tickers to fetch
+        start_date (str): Start date (inclusive)
+        end_date (str): End date (exclusive)
+
+        Returns:
+        pd.DataFrame: Close prices, one column per fetched ticker, with
+        {ticker: message} for the others in `attrs["errors"]` and
+        `attrs["no_data"]`
+        """
+        executor = self._get_executor()
+        futures = {executor.submit(self.fetch_ticker, ticker, start_date, end_date): ticker for ticker in tickers}
+        done, not_done = wait(futures, timeout=self.timeout)
+
+        columns, errors, no_data = {}, {}, {}
+        for future in done:
+            ticker = futures[future]
+            try:
+                series = future.result()
+                series.index = pd.to_datetime(series.index).tz_localize(None)
+                columns[ticker] = series
+            except NoDataError as e:
+                no_data[ticker] = str(e)
+            except Exception as e:
+                errors[ticker] = str(e)
+        for future in not_done:
+            # The thread finishes in the background; its result is dropped
+            future.cancel()
+            errors[futures[future]] = f"timed out after {self.timeout}s"
+
+        for ticker, error in errors.items():
+            logging.warning(f"Could not fetch {ticker}: {error}")
+        frame = pd.DataFrame(columns)
+        frame.attrs["errors"] = errors
+        frame.attrs["no_data"] = no_data
+        return frame
@@ -0,0 +1,272 @@
+import numpy as np
+import pandas as pd
+
+# ---------------------------
+# AUGMENTED DICKEY-FULLER
+# ---------------------------
+
+def _augmented_r(x, xdiff, lags, num_rows, order=None):
+    """
+    R factor of the QR decomposition of the ADF regression of the last
+    `num_rows` differences of every column, with the target appended as a
+    last column. For regressors [level, `lags` lagged differences,
+    constant] (or that set permuted by `order`), R[:k, k] holds Q'y and
+    the residual sum of squares of the model with the first j regressors
+    is sum(R[j:K + 1, K]²), so nested models need no refits.
+
+    Parameters:
+    x (np.array): Levels of shape (T, N)
+    xdiff (np.array): First differences of shape (T - 1, N)
+    lags (int): Number of lagged differences
+    num_rows (int): Number of observations in the regression
+    order (np.array): Column order of the regressors
+
+    Returns:
+    np.array: R of shape (N, lags + 3, lags + 3)
+    """
+    start = len(xdiff) - num_rows
+    columns = [x[start:len(x) - 1]]
+    columns += [xdiff[start - j:len(xdiff) - j] for j in range(1, lags + 1)]
+    columns.append(np.ones_like(columns[0]))
+    if order is not None:
+        columns = [columns[j] for j in order]
+    columns.append(xdiff[start:])
+
+    augmented = np.empty((x.shape[1], num_rows, len(columns)))
+    for j, column in enumerate(columns):
+        augmented[:, :, j] = column.T
+    return np.linalg.qr(augmented, mode="r")
+
+
+def adf_test(values, alpha=0.05):
+    """
+    Augmented Dickey-Fuller test with a constant and AIC lag selection, as
+    statsmodels' `adfuller(x, autolag="AIC")`, for every column at once.
+
+    statsmodels fits one OLS per candidate lag and per series. Here the
+    candidate models are nested, so one batched QR decomposition of the
+    largest design gives the residual sum of squares of every lag length;
+    the chosen lag is then refitted on its full sample for all columns
+    that share it.
+
+    Parameters:
+    values (np.array): Prices of shape (T, N) without missing values
+    alpha (float): Significance level
+
+    Returns:
+    list: One dict per column with ADF statistic, p-value, critical values
+    and stationarity flag
+    """
+    from statsmodels.tsa.adfvalues import mackinnonp, mackinnoncrit
+
+    x = np.asarray(values, dtype=np.float64)
+    nobs = len(x)
+    maxlag = min(int(np.ceil(12.0 * np.power(nobs / 100.0, 1 / 4.0))), nobs // 2 - 2)
+    if maxlag < 0:
+        raise ValueError("sample size is too short to use selected regression component")
+    xdiff = np.diff(x, axis=0)
+
+    # Lag selection: every lag length on the same sample, so the AICs compare.
+    # Candidates add lags last, so the constant and level come first here.
+    num_rows = nobs - 1 - maxlag
+    r = _augmented_r(x, xdiff, maxlag, num_rows, order=np.r_[maxlag + 1, 0, 1:maxlag + 1])
+    tail = r[:, :, -1] ** 2
+    ssr = np.cumsum(tail[:, ::-1], axis=1)[:, ::-1][:, 2:]
+    num_params = np.arange(2, maxlag + 3)
+    aic = num_rows * np.log(ssr / num_rows) + 2 * num_params
+    best_lags = np.argmin(aic, axis=1)
+
+    # Refit each chosen lag length on all the observations it allows
+    statistics = np.empty(x.shape[1])
+    used_rows = np.empty(x.shape[1], dtype=int)
+    for lags in np.unique(best_lags):
+        columns = np.flatnonzero(best_lags == lags)
+        num_rows = nobs - 1 - lags
+        r = _augmented_r(x[:, columns], xdiff[:, columns], lags, num_rows)
+        k = lags + 2
+        r_inv = np.linalg.inv(r[:, :k, :k])
+        coefficients = np.einsum("nij,nj->ni", r_inv, r[:, :k, k])
+        sigma2 = r[:, k, k] ** 2 / (num_rows - k)
+        # The level is the first regressor; its variance is row 0 of R⁻¹ R⁻ᵀ
+        statistics[columns] = coefficients[:, 0] / np.sqrt(sigma2 * np.sum(r_inv[:, 0, :] ** 2, axis=1))
+        used_rows[columns] = num_rows
+
+    results = []
+    for statistic, rows in zip(statistics, used_rows):
+        p_value = mackinnonp(statistic, regression="c", N=1)
+        critical_values = mackinnoncrit(N=1, regression="c", nobs=rows)
+        results.append({
+            "adf_statistic": float(statistic),
+            "p_value": float(p_value),
+            "critical_values": {k: float(v) for k, v in zip(("1%", "5%", "10%"), critical_values)},
+            "is_stationary": bool(p_value < alpha)
+        })
+    return results
+
+# ---------------------------
+# SEASONAL DECOMPOSITION
+# ---------------------------
+
+def moving_average(values, period):
+    """
+    Centered moving average of every column, as the two-sided filter of
+    statsmodels' `seasonal_decompose`: a 2 x `period` average for even
+    periods. The convolution is evaluated with running sums, so it costs
+    O(T) per column whatever the period.
+
+    Parameters:
+    values (np.array): Array of shape (T, N)
+    period (int): Number of observations per cycle
+
+    Returns:
+    np.array: Trend of shape (T, N), NaN where the window is incomplete
+    """
+    x = np.asarray(values, dtype=np.float64)
+    num_obs = len(x)
+    sums = np.vstack([np.zeros((1, x.shape[1])), np.cumsum(x, axis=0)])
+    if period % 2 == 0:
+        # Weights 0.5, 1, ..., 1, 0.5 over period + 1 observations
+        width = period + 1
+        valid = (sums[period:num_obs] - sums[1:num_obs - period + 1] + 0.5 * (x[:num_obs - period] + x[period:])) / period
+    else:
+        width = period
+        valid = (sums[period:] - sums[:num_obs - period + 1]) / period
+    head = int(np.ceil(width / 2.0)) - 1
+    trend = np.full_like(x, np.nan)
+    trend[head:head + len(valid)] = valid
+    return trend
+
+
+def seasonal_decompose_frame(values, period, model="multiplicative"):
+    """
+    Classical seasonal decomposition of every column at once, matching
+    statsmodels' `seasonal_decompose` with a two-sided filter.
+
+    Parameters:
+    values (np.array): Array of shape (T, N) without missing values
+    period (int): Number of observations per cycle
+    model (str): "multiplicative" or "additive"
+
+    Returns:
+    tuple: (trend, seasonal, residual), each of shape (T, N)
+    """
+    x = np.asarray(values, dtype=np.float64)
+    num_obs = len(x)
+    multiplicative = model.startswith("m")
+
+    trend = moving_average(x, period)
+    detrended = x / trend if multiplicative else x - trend
+
+    # Average each phase of the cycle over all cycles, ignoring the NaN ends
+    num_cycles = -(-num_obs // period)
+    padded = np.full((num_cycles * period, x.shape[1]), np.nan)
+    padded[:num_obs] = detrended
+    period_averages = np.nanmean(padded.reshape(num_cycles, period, -1), axis=0)
+    if multiplicative:
+        period_averages /= period_averages.mean(axis=0)
+    else:
+        period_averages -= period_averages.mean(axis=0)
+
+    seasonal = np.tile(period_averages, (num_cycles, 1))[:num_obs]
+    residual = x / seasonal / trend if multiplicative else detrended - seasonal
+    return trend, seasonal, residual
+
+# ---------------------------
+# FRAME-WIDE EDA
+# ---------------------------
+
+def summary_statistics(values):
+    """
+    The statistics of pandas' `describe` for every column, computed with
+    one NumPy reduction each instead of per column.
+
+    Parameters:
+    values (np.array): Array of shape (T, N) without missing values
+
+    Returns:
+    list: One {"count", "mean", "std", "min", "25%", "50%", "75%", "max"}
+    dict per column
+    """
+    quartiles = np.percentile(values, [25, 50, 75], axis=0)
+    columns = {
+        "count": np.full(values.shape[1], float(len(values))),
+        "mean": values.mean(axis=0),
+        "std": values.std(axis=0, ddof=1),
+        "min": values.min(axis=0),
+        "25%": quartiles[0],
+        "50%": quartiles[1],
+        "75%": quartiles[2],
+        "max": values.max(axis=0)
+    }
+    return [{name: float(column[i]) for name, column in columns.items()} for i in range(values.shape[1])]
+
+def _column_error(column, period):
+    """
+    Return why a price column cannot be analysed, or None. The messages
+    match those statsmodels raises for the same input.
+    """
+    observed = column[np.isfinite(column)]
+    if len(observed) == 0 or observed.max() == observed.min():
+        return "Invalid input, x is constant"
+    if len(observed) < len(column):
+        return "This function does not handle missing values"
+    if np.any(column <= 0):
+        return "Multiplicative seasonality is not appropriate for zero and negative values"
+    if len(column) < 2 * period:
+        return f"x must have 2 complete cycles requires {2 * period} observations. x only has {len(column)} observation(s)"
+    return None
+
+
+def analyze_frame(prices, window=30, period=252, alpha=0.05):
+    """
+    Exploratory data analysis of every column of a price frame in one
+    vectorized pass: summary statistics, rolling mean and standard
+    deviation, returns, an ADF stationarity test, a multiplicative
+    seasonal decomposition and rolling annualized volatility.
+
+    Parameters:
+    prices (pd.DataFrame): Cleaned close prices, one column per ticker
+    window (int): Rolling window in observations
+    period (int): Seasonal period in observations
+    alpha (float): Significance level of the stationarity test
+
+    Returns:
+    dict: Ticker -> {"basic_stats", "stationarity", "series"} as returned by
+    `analyze_ticker`, or {"error": message} for a column that cannot be
+    analysed
+    """
+    results = {}
+    errors = {ticker: _column_error(prices[ticker].to_numpy(dtype=np.float64), period) for ticker in prices.columns}
+    for ticker, error in errors.items():
+        if error:
+            results[ticker] = {"error": error}
+    valid = [ticker for ticker in prices.columns if not errors[ticker]]
+    if not valid:
+        return results
+
+    frame = prices[valid]
+    values = frame.to_numpy(dtype=np.float64)
+    stats = summary_statistics(values)
+    rolling = frame.rolling(window=window)
+    rolling_mean = rolling.mean()
+    rolling_std = rolling.std()
+    returns = frame.pct_change()
+    volatility_clustering = returns.rolling(window=window).std() * np.sqrt(252)
+    stationarity = adf_test(values, alpha)
+    trend, seasonal, residual = seasonal_decompose_frame(values, period)
+
+    for i, ticker in enumerate(valid):
+        results[ticker] = {
+            "basic_stats": stats[i],
+            "stationarity": stationarity[i],
+            "series": {
+                "rolling_mean": rolling_mean[ticker],
+                "rolling_std": rolling_std[ticker],
+                "returns": returns[ticker].dropna(),
+                "trend": pd.Series(trend[:, i], index=frame.index).dropna(),
+                "seasonal": pd.Series(seasonal[:, i], index=frame.index).dropna(),
+                "residual": pd.Series(residual[:, i], index=frame.index).dropna(),
+                "volatility_clustering": volatility_clustering[ticker].dropna()
+            }
+        }
+    return {ticker: results[ticker] for ticker in prices.columns}
@@ -0,0 +1,260 @@
+import gzip
+import json
+
+import numpy as np
+import pandas as pd
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+NDJSON = "application/x-ndjson"
+EVENT_STREAM = "text/event-stream"
+
+# Responses smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+
+# ---------------------------
+# COLUMNAR LAYOUT
+# ---------------------------
+
+def to_columnar(series_by_ticker, index, dtype="float64", max_points=None):
+    """
+    Align per-ticker series onto one shared date index so a response carries
+    the dates once and one flat array per metric, instead of a
+    {date: value} dict per metric.
+
+    Parameters:
+    series_by_ticker (dict): {ticker: {metric: pd.Series}}, each series indexed by a subset of `index`
+    index (pd.DatetimeIndex): Shared date index, defaults to the union of all series' indexes
+    dtype (str): "float64" or "float32"
+    max_points (int): Optional cap on the number of dates; every n-th date is kept,
+        always including the most recent one
+
+    Returns:
+    tuple: (dates as np.datetime64[D] array, {ticker: {metric: np.array}}) with NaN where a
+    metric has no value on a date
+    """
+    if dtype not in ("float64", "float32"):
+        raise ValueError(f"Unsupported precision '{dtype}'. Choose 'float64' or 'float32'.")
+
+    if index is None:
+        index = pd.DatetimeIndex([])
+        for metrics in series_by_ticker.values():
+            for series in metrics.values():
+                index = index.union(series.index)
+
+    positions = slice(None)
+    if max_points and len(index) > max_points:
+        step = -(-len(index) // max_points)
+        positions = np.arange(len(index) - 1, -1, -step)[::-1]
+
+    dates = index.values[positions].astype("datetime64[D]")
+    columns = {
+        ticker: {
+            metric: series.reindex(index).to_numpy(dtype=np.float64)[positions].astype(dtype)
+            for metric, series in metrics.items()
+        }
+        for ticker, metrics in series_by_ticker.items()
+    }
+    return dates, columns
+
+
+def to_records(dates, values):
+    """
+    Convert one columnar array back into a {ISO date: value} dict, skipping
+    dates without a value.
+
+    Parameters:
+    dates (np.array): np.datetime64[D] dates
+    values (np.array): Values aligned with `dates`
+
+    Returns:
+    dict: Values keyed by ISO date string
+    """
+    mask = np.isfinite(values)
+    return dict(zip(np.datetime_as_string(dates[mask]).tolist(), values[mask].astype(np.float64).tolist()))
+
+# ---------------------------
+# MEDIA TYPES
+# ---------------------------
+
+def available_media_types(payload):
+    """
+    List the media types a payload can be encoded as, JSON first.
+    MessagePack and Arrow are offered only when msgpack / pyarrow are
+    installed, and Arrow only for columnar payloads.
+
+    Parameters:
+    payload (dict): Response payload
+
+    Returns:
+    list: Media types in order of preference
+    """
+    media_types = [JSON]
+    try:
+        import msgpack  # noqa: F401
+        media_types.append(MSGPACK)
+    except ImportError:
+        pass
+    if isinstance(payload, dict) and payload.get("format") == "columnar":
+        try:
+            import pyarrow  # noqa: F401
+            media_types.append(ARROW)
+        except ImportError:
+            pass
+    return media_types
+
+
+def encode(payload, media_type=JSON):
+    """
+    Serialize a payload that may contain numpy arrays.
+
+    Parameters:
+    payload (dict): Response payload
+    media_type (str): One of JSON, MSGPACK or ARROW
+
+    Returns:
+    bytes: Encoded body
+    """
+    if media_type == MSGPACK:
+        return _encode_msgpack(payload)
+    if media_type == ARROW:
+        return _encode_arrow(payload)
+    parts = []
+    _json_parts(payload, parts)
+    return "".join(parts).encode("utf-8")
+
+
+def encode_stream_item(item, media_type=NDJSON, event=None):
+    """
+    Encode one item of a streamed response as an NDJSON line or a
+    server-sent event.
+
+    Parameters:
+    item (dict): Item payload, which may contain numpy arrays
+    media_type (str): NDJSON or EVENT_STREAM
+    event (str): Event name for server-sent events
+
+    Returns:
+    bytes: Encoded chunk
+    """
+    # JSON output never contains raw newlines, so each item fits on one line
+    body = encode(item)
+    if media_type == EVENT_STREAM:
+        header = f"event: {event}\n".encode("utf-8") if event else b""
+        return header + b"data: " + body + b"\n\n"
+    return body + b"\n"
+
+
+def _json_array(values):
+    if values.dtype.kind == "M":
+        return json.dumps(np.datetime_as_string(values).tolist())
+    if values.dtype.kind == "f":
+        # str() on a float array gives the shortest repr for its precision,
+        # so float32 values come out as e.g. 0.1 rather than 0.10000000149011612
+        text = values.astype(str)
+        text[~np.isfinite(values)] = "null"
+        return "[" + ",".join(text.tolist()) + "]"
+    return json.dumps(values.tolist())
+
+
+def _json_parts(obj, parts):
+    if isinstance(obj, dict):
+        parts.append("{")
+        for i, (key, value) in enumerate(obj.items()):
+            if i:
+                parts.append(",")
+            parts.append(json.dumps(str(key)))
+            parts.append(":")
+            _json_parts(value, parts)
+        parts.append("}")
+    elif isinstance(obj, (list, tuple)):
+        parts.append("[")
+        for i, value in enumerate(obj):
+            if i:
+                parts.append(",")
+            _json_parts(value, parts)
+        parts.append("]")
+    elif isinstance(obj, np.ndarray):
+        parts.append(_json_array(obj))
+    elif isinstance(obj, np.generic):
+        parts.append(json.dumps(obj.item()))
+    else:
+        parts.append(json.dumps(obj, default=str))
+
+
+def _encode_msgpack(payload):
+    import msgpack
+
+    def default(obj):
+        if isinstance(obj, np.ndarray):
+            if obj.dtype.kind == "M":
+                return np.datetime_as_string(obj).tolist()
+            return obj.tolist()
+        if isinstance(obj, np.generic):
+            return obj.item()
+        return str(obj)
+
+    # Pack floats as float32 when the client asked for reduced precision
+    return msgpack.packb(payload, default=default, use_single_float=payload.get("dtype") == "float32")
+
+
+def _encode_arrow(payload):
+    """
+    Encode a columnar payload as an Arrow IPC stream: a "date" column plus
+    one "<ticker>/<metric>" column per series, with everything else stored
+    as JSON in the schema metadata under "payload".
+    """
+    import pyarrow as pa
+
+    columns = {"date": pa.array(payload["dates"], type=pa.date32())}
+    rest = {key: value for key, value in payload.items() if key not in ("dates", "results")}
+    rest["results"] = {}
+    for ticker, result in payload["results"].items():
+        for metric, values in result.get("series", {}).items():
+            columns[f"{ticker}/{metric}"] = pa.array(values, from_pandas=True)
+        rest["results"][ticker] = {key: value for key, value in result.items() if key != "series"}
+
+    parts = []
+    _json_parts(rest, parts)
+    table = pa.table(columns).replace_schema_metadata({"payload": "".join(parts)})
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+# ---------------------------
+# COMPRESSION
+# ---------------------------
+
+def available_encodings():
+    """
+    List the content codings that can be produced, best first.
+
+    Returns:
+    list: "br" when the brotli package is installed, then "gzip"
+    """
+    try:
+        import brotli  # noqa: F401
+        return ["br", "gzip"]
+    except ImportError:
+        return ["gzip"]
+
+
+def compress(body, encoding):
+    """
+    Compress a response body.
+
+    Parameters:
+    body (bytes): Encoded body
+    encoding (str): "br" or "gzip"
+
+    Returns:
+    bytes: Compressed body
+    """
+    if encoding == "br":
+        import brotli
+
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
@@ -0,0 +1,184 @@
+import sys
+import zlib
+import types
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------
+# ARIMA FIXTURES
+# ---------------------------
+
+# (AR coefficients, MA coefficients, d) of simulated series with a known order
+ARIMA_FIXTURES = {
+    "random_walk": ((), (), 1),
+    "ar1_diff": ((0.5,), (), 1),
+    "arma11_diff": ((0.6,), (0.3,), 1),
+    "ar2_level": ((0.5, 0.2), (), 0),
+}
+
+
+def arima_series(ar, ma, d, length, seed=0):
+    """
+    Simulate an ARIMA series with the given AR/MA coefficients and d.
+
+    Parameters:
+    ar (tuple): AR coefficients
+    ma (tuple): MA coefficients
+    d (int): Order of integration
+    length (int): Number of observations
+    seed (int): Random seed
+
+    Returns:
+    np.array: Simulated series
+    """
+    from statsmodels.tsa.arima_process import arma_generate_sample
+
+    np.random.seed(seed)
+    x = arma_generate_sample(np.r_[1, -np.array(ar)], np.r_[1, np.array(ma)], length, scale=1.0)
+    for _ in range(d):
+        x = np.cumsum(x)
+    return x + 100
+
+# ---------------------------
+# PRICE FIXTURES
+# ---------------------------
+
+def _ticker_rng(ticker, seed=0):
+    # Seeded per ticker, so a ticker's path does not depend on its basket
+    return np.random.default_rng([zlib.crc32(ticker.encode("utf-8")), seed])
+
+
+def _factor_shocks(tickers, num_days, seed=0, market_weight=0.5):
+    """
+    Standard normal daily shocks that load on one common market factor,
+    so the fixtures have realistic cross-correlations.
+
+    Parameters:
+    tickers (list): Ticker names, each seeding its own idiosyncratic shocks
+    num_days (int): Number of trading days
+    seed (int): Random seed
+    market_weight (float): Largest share of variance explained by the market
+
+    Returns:
+    np.array: Shocks of shape (num_days, len(tickers))
+    """
+    market = np.random.default_rng(seed).standard_normal(num_days)
+    shocks = np.empty((num_days, len(tickers)))
+    for i, ticker in enumerate(tickers):
+        rng = _ticker_rng(ticker, seed)
+        beta = np.sqrt(market_weight * rng.uniform(0.2, 1.0))
+        shocks[:, i] = beta * market + np.sqrt(1 - beta ** 2) * rng.standard_normal(num_days)
+    return shocks
+
+
+def gbm_returns(tickers, num_days, seed=0, drift=0.0003, volatility=0.02):
+    """
+    Daily log returns of geometric Brownian motion.
+
+    Parameters:
+    tickers (list): Ticker names
+    num_days (int): Number of trading days
+    seed (int): Random seed
+    drift (float): Mean daily log return
+    volatility (float): Daily volatility
+
+    Returns:
+    np.array: Log returns of shape (num_days, len(tickers))
+    """
+    return drift + volatility * _factor_shocks(tickers, num_days, seed)
+
+
+def garch_returns(tickers, num_days, seed=0, drift=0.0003, volatility=0.02, alpha=0.08, beta=0.9):
+    """
+    Daily log returns of a GARCH(1, 1) process, whose calm and turbulent
+    spells exercise the volatility and risk code more than constant
+    volatility does.
+
+    Parameters:
+    tickers (list): Ticker names
+    num_days (int): Number of trading days
+    seed (int): Random seed
+    drift (float): Mean daily log return
+    volatility (float): Long-run daily volatility
+    alpha (float): Weight of the last squared shock
+    beta (float): Weight of the last variance
+
+    Returns:
+    np.array: Log returns of shape (num_days, len(tickers))
+    """
+    shocks = _factor_shocks(tickers, num_days, seed)
+    omega = volatility ** 2 * (1 - alpha - beta)
+    variance = np.full(len(tickers), volatility ** 2)
+    returns = np.empty_like(shocks)
+    for t in range(num_days):
+        returns[t] = np.sqrt(variance) * shocks[t]
+        variance = omega + alpha * returns[t] ** 2 + beta * variance
+    return drift + returns
+
+
+PRICE_MODELS = {"gbm": gbm_returns, "garch": garch_returns}
+
+
+def fixture_prices(tickers, index, model="garch", seed=0):
+    """
+    Simulate close prices starting at 100.
+
+    Parameters:
+    tickers (list): Ticker names
+    index (pd.DatetimeIndex): Trading days
+    model (str): "gbm" or "garch"
+    seed (int): Random seed
+
+    Returns:
+    pd.DataFrame: Prices with one column per ticker
+    """
+    log_returns = PRICE_MODELS[model](list(tickers), len(index), seed)
+    return pd.DataFrame(100 * np.exp(np.cumsum(log_returns, axis=0)), index=index, columns=list(tickers))
+
+
+def fixture_frame(num_tickers, num_days, model="garch", seed=0):
+    """
+    Simulate a tickers x days price frame on business days.
+
+    Parameters:
+    num_tickers (int): Number of tickers
+    num_days (int): Number of trading days
+    model (str): "gbm" or "garch"
+    seed (int): Random seed
+
+    Returns:
+    pd.DataFrame: Prices with one column per ticker
+    """
+    index = pd.bdate_range("2015-01-01", periods=num_days)
+    return fixture_prices([f"T{i}" for i in range(num_tickers)], index, model, seed)
+
+
+def fixture_fetcher(model="garch", seed=0):
+    """
+    Price store fetcher that serves fixture prices instead of downloading.
+
+    Parameters:
+    model (str): "gbm" or "garch"
+    seed (int): Random seed
+
+    Returns:
+    callable: `(tickers, start_date, end_date) -> pd.DataFrame`
+    """
+    def fetch(tickers, start_date, end_date):
+        index = pd.bdate_range(start_date, end_date, inclusive="left")
+        return fixture_prices(tickers, index, model, seed)
+    return fetch
+
+
+def disable_yfinance():
+    """
+    Replace the yfinance module with a stub that fails on any download, so
+    a code path that bypasses the fixtures cannot reach the network.
+    """
+    def download(*args, **kwargs):
+        raise RuntimeError("yfinance is disabled; prices come from fixtures")
+
+    stub = types.ModuleType("yfinance")
+    stub.download = download
+    sys.modules["yfinance"] = stub
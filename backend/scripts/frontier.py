@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+import scipy.optimize as sco
+
+from scripts.covariance import as_covariance_model
+
+# ---------------------------
+# RANDOM PORTFOLIO ENGINE
+# ---------------------------
+
+def simulate_random_portfolios(expected_returns, cov_matrix, num_portfolios=10000, rng=None,
+                               max_chunk_bytes=64 * 1024 * 1024):
+    """
+    Draw random long-only portfolios and compute their annualized return,
+    volatility and Sharpe ratio in batches.
+
+    Weights are drawn from a flat Dirichlet distribution (uniform over the
+    simplex). Portfolios are processed in chunks so that the weight matrix
+    and its product with the covariance matrix stay within `max_chunk_bytes`,
+    which keeps memory fixed for millions of portfolios and hundreds of assets.
+
+    Parameters:
+    expected_returns (pd.Series): Expected annual returns
+    cov_matrix (CovarianceModel or pd.DataFrame): Annual covariance matrix
+    num_portfolios (int): Number of portfolios to generate
+    rng (np.random.Generator): Random generator, or a seed, for reproducible draws
+    max_chunk_bytes (int): Memory budget for one chunk of weights
+
+    Returns:
+    dict: Arrays `volatility`, `return`, `sharpe_ratio` and the weights of
+    the maximum Sharpe ratio portfolio under `max_sharpe_weights`
+    """
+    rng = np.random.default_rng(rng)
+    mu = np.asarray(expected_returns, dtype=np.float64)
+    cov = as_covariance_model(cov_matrix)
+    num_assets = len(mu)
+
+    # Two (chunk x assets) float64 matrices live at once: weights and weights @ cov
+    # (weights @ loadings is only chunk x factors for a factor model)
+    chunk_size = max(1, int(max_chunk_bytes // (2 * 8 * num_assets)))
+    alpha = np.ones(num_assets)
+
+    returns = np.empty(num_portfolios)
+    volatilities = np.empty(num_portfolios)
+    best_sharpe = -np.inf
+    best_weights = None
+
+    for start in range(0, num_portfolios, chunk_size):
+        stop = min(start + chunk_size, num_portfolios)
+        weights = rng.dirichlet(alpha, size=stop - start)
+        returns[start:stop] = weights @ mu
+        volatilities[start:stop] = cov.volatility(weights)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            chunk_sharpe = np.where(volatilities[start:stop] != 0,
+                                    returns[start:stop] / volatilities[start:stop], 0.0)
+        idx = int(np.argmax(chunk_sharpe))
+        if chunk_sharpe[idx] > best_sharpe:
+            best_sharpe = chunk_sharpe[idx]
+            best_weights = weights[idx].copy()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(volatilities != 0, returns / volatilities, 0.0)
+
+    return {
+        "volatility": volatilities,
+        "return": returns,
+        "sharpe_ratio": sharpe,
+        "max_sharpe_weights": best_weights,
+    }
+
+
+def frontier_envelope(volatilities, returns):
+    """
+    Extract the upper-left envelope of a cloud of portfolios.
+
+    Points are sorted by volatility and a point is kept only if its return
+    exceeds every return at lower volatility, i.e. a single sort followed by
+    a running-maximum pass (O(n log n)).
+
+    Parameters:
+    volatilities (np.array): Portfolio volatilities
+    returns (np.array): Portfolio returns
+
+    Returns:
+    np.array: Indices of the frontier portfolios, ordered by volatility
+    """
+    order = np.lexsort((-returns, volatilities))
+    sorted_returns = returns[order]
+    running_max = np.maximum.accumulate(sorted_returns)
+    keep = np.empty(len(order), dtype=bool)
+    if len(order):
+        keep[0] = True
+        keep[1:] = sorted_returns[1:] > running_max[:-1]
+    return order[keep]
+
+# ---------------------------
+# EXACT FRONTIER
+# ---------------------------
+
+def _minimize_variance(cov, constraints, initial_guess, bounds):
+    """
+    Minimize portfolio variance with SLSQP using the analytic gradient 2·Σw.
+
+    Parameters:
+    cov (CovarianceModel): Annual covariance matrix
+    constraints (list): SLSQP constraint dictionaries
+    initial_guess (np.array): Starting weights
+    bounds (list): Per-asset weight bounds
+
+    Returns:
+    OptimizeResult: SciPy optimization result
+    """
+    return sco.minimize(cov.variance,
+                        initial_guess,
+                        jac=lambda w: 2.0 * cov.matvec(w),
+                        method='SLSQP',
+                        bounds=bounds,
+                        constraints=constraints)
+
+
+def exact_efficient_frontier(expected_returns, cov_matrix, num_points=50):
+    """
+    Trace the long-only mean-variance efficient frontier exactly by solving
+    the minimum-variance QP at `num_points` target returns.
+
+    Targets run from the minimum-volatility portfolio's return up to the
+    highest single-asset return. Each solve is warm-started from the
+    previous target's weights and uses analytic gradients for the
+    objective and constraints, so neighbouring solves converge in a few
+    iterations.
+
+    Parameters:
+    expected_returns (pd.Series): Expected annual returns
+    cov_matrix (CovarianceModel or pd.DataFrame): Annual covariance matrix
+    num_points (int): Number of target returns on the frontier
+
+    Returns:
+    pd.DataFrame: Efficient frontier data with a `weights` column; the
+    total number of objective evaluations is stored in `attrs["nfev"]`
+    """
+    mu = np.asarray(expected_returns, dtype=np.float64)
+    cov = as_covariance_model(cov_matrix)
+    num_assets = len(mu)
+    bounds = [(0, 1)] * num_assets
+    ones = np.ones(num_assets)
+    budget = {'type': 'eq', 'fun': lambda w: w.sum() - 1, 'jac': lambda w: ones}
+
+    result = _minimize_variance(cov, [budget], ones / num_assets, bounds)
+    weights = result.x
+    nfev = result.nfev
+
+    targets = np.linspace(weights @ mu, mu.max(), num_points)
+    rows = []
+    for target in targets:
+        target_return = {'type': 'eq', 'fun': lambda w, t=target: w @ mu - t, 'jac': lambda w: mu}
+        result = _minimize_variance(cov, [budget, target_return], weights, bounds)
+        nfev += result.nfev
+        if not result.success:
+            continue
+        weights = np.clip(result.x, 0, 1)
+        weights /= weights.sum()
+        ret = weights @ mu
+        vol = cov.volatility(weights)
+        rows.append((vol, ret, ret / vol if vol != 0 else 0.0, weights))
+
+    frontier = pd.DataFrame(rows, columns=['Volatility', 'Return', 'Sharpe Ratio', 'weights'])
+    frontier.attrs["nfev"] = nfev
+    return frontier
@@ -0,0 +1,339 @@
+import os
+import re
+import json
+import time
+import uuid
+import pickle
+import shutil
+import hashlib
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# ---------------------------
+# WORKER-SIDE PROGRESS
+# ---------------------------
+
+# Set inside a worker process while it runs a job; each worker runs one job at a time
+_JOB_DIR = None
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobNotFinished(Exception):
+    pass
+
+
+def report_progress(stage, done=None, total=None):
+    """
+    Record progress for the job running in this process, e.g. "fit 37/108",
+    and abort it if it has been cancelled. Does nothing outside a job.
+
+    Parameters:
+    stage (str): Name of the current stage
+    done (int): Completed steps in this stage
+    total (int): Total steps in this stage, if known
+    """
+    if _JOB_DIR is None:
+        return
+    if os.path.exists(os.path.join(_JOB_DIR, "cancel")):
+        raise JobCancelled()
+    if done is None:
+        message = stage
+    elif total is None:
+        message = f"{stage} {done}"
+    else:
+        message = f"{stage} {done}/{total}"
+    _write_atomic(os.path.join(_JOB_DIR, "progress"), message.encode("utf-8"))
+
+
+def _write_atomic(path, data):
+    # Readers in other processes never see a partial file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _read_job(job_dir):
+    try:
+        with open(os.path.join(job_dir, "job.json")) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _update_job(job_dir, **fields):
+    job = _read_job(job_dir)
+    if job is None:
+        return None
+    job.update(fields)
+    _write_atomic(os.path.join(job_dir, "job.json"), json.dumps(job).encode("utf-8"))
+    return job
+
+
+def _run_job(job_dir, func, params):
+    global _JOB_DIR
+    _JOB_DIR = job_dir
+    try:
+        _update_job(job_dir, status="running", pid=os.getpid())
+        report_progress("started")
+        result = func(params)
+        _write_atomic(os.path.join(job_dir, "result.pkl"), pickle.dumps(result))
+        _update_job(job_dir, status="done", finished_at=time.time())
+    except JobCancelled:
+        _update_job(job_dir, status="cancelled", finished_at=time.time())
+    except Exception as e:
+        job = _read_job(job_dir) or {}
+        logging.error(f"Job {job.get('job_id')} ({job.get('kind')}) failed: {e}")
+        _update_job(job_dir, status="failed", error=str(e), finished_at=time.time())
+    finally:
+        _JOB_DIR = None
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+# ---------------------------
+# JOB QUEUE
+# ---------------------------
+
+class JobQueue:
+    """
+    Local background job queue backed by a process pool. Job status,
+    progress, cancellation flags and results are files under `root`, one
+    directory per job, so any server process sharing that directory can
+    poll, cancel or fetch a job, whichever process accepted it. Identical
+    in-flight submissions share one job, and finished jobs are kept up to
+    `max_finished` entries.
+
+    Jobs run in the pool of the process that accepted them; one whose
+    process has exited is reported as failed. `root` must be on the host
+    running the servers.
+    """
+
+    def __init__(self, root, max_workers=2, max_finished=256):
+        self.root = root
+        self.max_workers = max_workers
+        self.max_finished = max_finished
+        self._executor = None
+        self._futures = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "inflight"), exist_ok=True)
+
+    def _start(self):
+        # Started lazily so importing the app does not spawn processes
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def _dir(self, job_id):
+        # Job ids come from URLs; anything else must not become a path
+        if not isinstance(job_id, str) or not re.fullmatch(r"[0-9a-f]{32}", job_id):
+            return None
+        return os.path.join(self.root, job_id)
+
+    def _marker(self, key):
+        return os.path.join(self.root, "inflight", hashlib.sha1(json.dumps(key).encode("utf-8")).hexdigest())
+
+    def _claim(self, key, job_id):
+        """
+        Mark `job_id` as the in-flight job for `key`, or return the id of a
+        live job that already holds the mark.
+        """
+        marker = self._marker(key)
+        for _ in range(3):
+            try:
+                fd = os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    with open(marker) as f:
+                        holder = f.read().strip()
+                except FileNotFoundError:
+                    continue
+                status = self.status(holder)
+                if status is not None and status["status"] in ("queued", "running"):
+                    return holder
+                # Left behind by a finished or lost job
+                try:
+                    os.remove(marker)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, "w") as f:
+                f.write(job_id)
+            return job_id
+        return job_id
+
+    def _release(self, key, job_id):
+        marker = self._marker(key)
+        try:
+            with open(marker) as f:
+                if f.read().strip() == job_id:
+                    os.remove(marker)
+        except FileNotFoundError:
+            pass
+
+    def submit(self, kind, func, params):
+        """
+        Submit a job, or return the id of an identical job still in flight.
+
+        Parameters:
+        kind (str): Job type, e.g. "forecast"
+        func (callable): Picklable function `params -> (result, status_code)`
+        params (dict): JSON-serializable request parameters
+
+        Returns:
+        str: Job id
+        """
+        key = [kind, json.dumps(params, sort_keys=True)]
+        job_id = uuid.uuid4().hex
+        job_dir = self._dir(job_id)
+        os.makedirs(job_dir)
+        # Written before claiming the key, so a process that finds the claim can read the job
+        job = {
+            "job_id": job_id,
+            "kind": kind,
+            "key": key,
+            "status": "queued",
+            "submitted_at": time.time(),
+            "finished_at": None,
+            "error": None,
+            "owner": os.getpid(),
+            "pid": None,
+        }
+        _write_atomic(os.path.join(job_dir, "job.json"), json.dumps(job).encode("utf-8"))
+        holder = self._claim(key, job_id)
+        if holder != job_id:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            return holder
+
+        with self._lock:
+            self._start()
+            future = self._executor.submit(_run_job, job_dir, func, params)
+            self._futures[job_id] = future
+        future.add_done_callback(lambda f: self._finish(job_id, key, f))
+        return job_id
+
+    def _finish(self, job_id, key, future):
+        with self._lock:
+            self._futures.pop(job_id, None)
+        job_dir = self._dir(job_id)
+        job = _read_job(job_dir)
+        # The worker records its own outcome; this covers jobs it never ran or could not finish
+        if job is not None and job["finished_at"] is None:
+            if future.cancelled():
+                _update_job(job_dir, status="cancelled", finished_at=time.time())
+            else:
+                error = future.exception()
+                logging.error(f"Job {job_id} ({job['kind']}) failed: {error}")
+                _update_job(job_dir, status="failed", error=str(error or "worker exited"), finished_at=time.time())
+        self._release(key, job_id)
+        self._prune()
+
+    def _prune(self):
+        finished = []
+        for name in os.listdir(self.root):
+            job = _read_job(os.path.join(self.root, name)) if self._dir(name) else None
+            if job is not None and job["finished_at"] is not None:
+                finished.append((job["finished_at"], name))
+        finished.sort()
+        for _, name in finished[:max(0, len(finished) - self.max_finished)]:
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+    def status(self, job_id):
+        """
+        Return the public status of a job.
+
+        Parameters:
+        job_id (str): Job id
+
+        Returns:
+        dict: Job id, kind, status, progress and timings, or None if unknown
+        """
+        job_dir = self._dir(job_id)
+        job = _read_job(job_dir) if job_dir else None
+        if job is None:
+            return None
+        status = job["status"]
+        if job["finished_at"] is None:
+            # The process running or holding the job exited without recording an outcome
+            pid = job["pid"] if status == "running" else job["owner"]
+            if not _alive(pid):
+                job = _update_job(job_dir, status="failed", error="server process exited", finished_at=time.time())
+                status = job["status"]
+            elif os.path.exists(os.path.join(job_dir, "cancel")):
+                status = "cancelling"
+        try:
+            with open(os.path.join(job_dir, "progress")) as f:
+                progress = f.read()
+        except FileNotFoundError:
+            progress = None
+        return {
+            "job_id": job_id,
+            "kind": job["kind"],
+            "status": status,
+            "progress": progress,
+            "submitted_at": job["submitted_at"],
+            "finished_at": job["finished_at"],
+            "error": job["error"],
+        }
+
+    def result(self, job_id):
+        """
+        Return the result of a finished job. Raises KeyError for an unknown
+        job id and JobNotFinished, with the job's status as the message, for
+        a job that is still in flight or did not complete.
+
+        Parameters:
+        job_id (str): Job id
+
+        Returns:
+        tuple: (response dict, HTTP status code)
+        """
+        status = self.status(job_id)
+        if status is None:
+            raise KeyError(job_id)
+        if status["status"] != "done":
+            raise JobNotFinished(status["status"])
+        try:
+            with open(os.path.join(self._dir(job_id), "result.pkl"), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            # Pruned since the status was read
+            raise KeyError(job_id)
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued job, or ask a running job to stop at its next
+        progress report. Works from any process sharing `root`.
+
+        Parameters:
+        job_id (str): Job id
+
+        Returns:
+        bool: True if the job was still in flight
+        """
+        status = self.status(job_id)
+        if status is None or status["finished_at"] is not None:
+            return False
+        job_dir = self._dir(job_id)
+        with open(os.path.join(job_dir, "cancel"), "w"):
+            pass
+        # Let identical submissions start a fresh job instead of joining this one
+        job = _read_job(job_dir)
+        if job is not None:
+            self._release(job["key"], job_id)
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            # Only possible in the accepting process, and only before the job starts
+            future.cancel()
+        return True
@@ -0,0 +1,90 @@
+import weakref
+
+import numpy as np
+import tensorflow as tf
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Compiled rollout per Keras model, dropped when the model is garbage collected
+_ROLLOUTS = weakref.WeakKeyDictionary()
+
+# ---------------------------
+# SEQUENCES
+# ---------------------------
+
+def create_sequences(data, window_size):
+    """
+    Build (window -> next value) training pairs from a scaled series.
+
+    The windows are a strided view over `data`, so no copy of the
+    (samples x window_size) matrix is made.
+
+    Parameters:
+    data (np.array): Scaled series of shape (n, 1)
+    window_size (int): Number of time steps per input window
+
+    Returns:
+    tuple: (X of shape (n - window_size, window_size, 1), y of shape (n - window_size,))
+    """
+    values = np.asarray(data).reshape(-1)
+    X = sliding_window_view(values[:-1], window_size)[:, :, np.newaxis]
+    y = values[window_size:]
+    return X, y
+
+# ---------------------------
+# ROLLOUT
+# ---------------------------
+
+def get_rollout(model):
+    """
+    Return a graph-compiled autoregressive rollout for a Keras model.
+
+    The rollout feeds each prediction back into the input window inside a
+    single `tf.function`, so all forecast steps for a whole batch of
+    windows run in one graph call instead of one `predict` per step.
+
+    Parameters:
+    model (keras.Model): Trained one-step-ahead model
+
+    Returns:
+    tf.function: Function `(windows, steps) -> predictions` with windows of
+    shape (batch, window_size, 1) and predictions of shape (batch, steps)
+    """
+    rollout = _ROLLOUTS.get(model)
+    if rollout is not None:
+        return rollout
+
+    @tf.function(reduce_retracing=True)
+    def rollout(windows, steps):
+        outputs = tf.TensorArray(tf.float32, size=steps)
+        for i in tf.range(steps):
+            prediction = model(windows, training=False)
+            outputs = outputs.write(i, prediction[:, 0])
+            windows = tf.concat([windows[:, 1:, :], prediction[:, tf.newaxis, :]], axis=1)
+        return tf.transpose(outputs.stack())
+
+    _ROLLOUTS[model] = rollout
+    return rollout
+
+
+def lstm_forecast(model, scaler, series, window_size, forecast_period):
+    """
+    Forecast a series with a single rollout call.
+
+    Each ticker has its own model and scaler, so the rollout runs on a
+    batch of one window: the last `window_size` scaled values.
+
+    Parameters:
+    model (keras.Model): Trained one-step-ahead model
+    scaler (MinMaxScaler): Scaler fitted on the series
+    series (pd.Series or np.array): Price series
+    window_size (int): Input window length the model was trained with
+    forecast_period (int): Number of steps to forecast
+
+    Returns:
+    np.array: `forecast_period` predictions
+    """
+    window = scaler.transform(np.asarray(series, dtype=np.float64)[-window_size:].reshape(-1, 1))
+    windows = window[np.newaxis].astype(np.float32)
+
+    scaled = get_rollout(model)(tf.constant(windows), tf.constant(forecast_period, dtype=tf.int32)).numpy()
+    return scaler.inverse_transform(scaled[0].astype(np.float64).reshape(-1, 1)).flatten()
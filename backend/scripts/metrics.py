@@ -0,0 +1,365 @@
+import os
+import time
+import uuid
+import logging
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# ---------------------------
+# METRIC TYPES
+# ---------------------------
+
+# Latency buckets in seconds, from JSON encoding up to full model searches
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} needs labels {self.labels}, got {sorted(labels)}.")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def render(self):
+        """
+        Render the metric in the Prometheus text exposition format.
+
+        Returns:
+        list: Lines of text
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines += self._render_sample(key, value)
+        return lines
+
+    def _render_sample(self, key, value):
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count, e.g. calls or errors.
+    """
+    kind = "counter"
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """
+    Value that goes up and down, e.g. requests in flight.
+    """
+    kind = "gauge"
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount=1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values in cumulative buckets, with their sum
+    and count, so percentiles can be estimated across scrapes.
+    """
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    def _render_sample(self, key, value):
+        counts, total = value
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            labels = _format_labels(self.labels, key, [("le", _format_value(bound))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labels, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Metrics of this process, plus collectors that report values kept
+    elsewhere (e.g. cache counters) at scrape time. Each server process
+    has its own registry; work done in pool or job worker processes is
+    not included.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, *args, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name, documentation, labels=()):
+        return self._register(Counter, name, documentation, labels)
+
+    def gauge(self, name, documentation, labels=()):
+        return self._register(Gauge, name, documentation, labels)
+
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labels, buckets)
+
+    def add_collector(self, collector):
+        """
+        Register a function called at every scrape.
+
+        Parameters:
+        collector (callable): Returns (name, kind, documentation, value)
+            tuples, where kind is "counter" or "gauge"
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+        str: Exposition text
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines += metric.render()
+        for collector in collectors:
+            try:
+                samples = list(collector())
+            except Exception:
+                logging.exception("Metrics collector failed")
+                continue
+            for name, kind, documentation, value in samples:
+                if value is None:
+                    continue
+                lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}", f"{name} {_format_value(value)}"]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram("stage_duration_seconds", "Time spent in each processing stage.", ("stage",))
+STAGE_ERRORS = REGISTRY.counter("stage_errors_total", "Processing stages that raised an exception.", ("stage",))
+REQUEST_SECONDS = REGISTRY.histogram("http_request_duration_seconds",
+                                     "Time to produce a response (first byte for streams).",
+                                     ("endpoint", "method", "status"))
+REQUESTS_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "Requests being handled.")
+
+# ---------------------------
+# STAGE TIMERS
+# ---------------------------
+
+# Stage timings of the request handled by the current context; worker
+# threads that run in a copy of it add to the same breakdown
+_REQUEST_STAGES = contextvars.ContextVar("request_stages", default=None)
+_REQUEST_STAGES_LOCK = threading.Lock()
+
+
+@contextmanager
+def stage(name):
+    """
+    Time a block as a named stage: recorded in the stage histogram and in
+    the current request's breakdown, and counted as an error if it raises.
+
+    Parameters:
+    name (str): Stage name, e.g. "fetch_prices"
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=name)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        stages = _REQUEST_STAGES.get()
+        if stages is not None:
+            with _REQUEST_STAGES_LOCK:
+                total, count = stages.get(name, (0.0, 0))
+                stages[name] = (total + elapsed, count + 1)
+
+
+def timed_stage(name):
+    """
+    Decorator that runs a function as a named `stage`.
+
+    Parameters:
+    name (str): Stage name
+
+    Returns:
+    callable: Decorator
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_request():
+    """
+    Start collecting the stage breakdown of a request in this context.
+
+    Returns:
+    tuple: Token to pass to `finish_request`
+    """
+    stages = {}
+    return _REQUEST_STAGES.set(stages), stages, time.perf_counter()
+
+
+def finish_request(token):
+    """
+    Stop collecting a request's stages.
+
+    Parameters:
+    token (tuple): Output of `start_request`
+
+    Returns:
+    tuple: (elapsed seconds, {stage: (seconds, calls)})
+    """
+    context_token, stages, start = token
+    _REQUEST_STAGES.reset(context_token)
+    with _REQUEST_STAGES_LOCK:
+        return time.perf_counter() - start, dict(stages)
+
+
+def server_timing(stages, total=None):
+    """
+    Format a stage breakdown as a Server-Timing header, which browser
+    developer tools show next to the request.
+
+    Parameters:
+    stages (dict): {stage: (seconds, calls)}
+    total (float): Whole request time in seconds
+
+    Returns:
+    str: Header value
+    """
+    parts = [f"{name};dur={seconds * 1000:.1f}" for name, (seconds, _) in stages.items()]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+# ---------------------------
+# REQUEST PROFILING
+# ---------------------------
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+def start_profile(profiler="cprofile"):
+    """
+    Start profiling the current thread.
+
+    Parameters:
+    profiler (str): "cprofile", or "pyinstrument" when it is installed
+
+    Returns:
+    tuple: (profiler name, running profiler)
+    """
+    if profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logging.warning("pyinstrument is not installed; profiling with cProfile instead.")
+        else:
+            running = Profiler()
+            running.start()
+            return profiler, running
+
+    import cProfile
+
+    running = cProfile.Profile()
+    running.enable()
+    return "cprofile", running
+
+
+def stop_profile(profile, directory, label):
+    """
+    Stop a profiler and write its output: a pstats file for cProfile (open
+    with snakeviz or `python -m pstats`), an HTML report for pyinstrument.
+
+    Parameters:
+    profile (tuple): Output of `start_profile`
+    directory (str): Directory for the dumps
+    label (str): Name of the profiled request, used in the file name
+
+    Returns:
+    str: File name of the dump within `directory`
+    """
+    profiler, running = profile
+    os.makedirs(directory, exist_ok=True)
+    label = "".join(c if c.isalnum() else "_" for c in label).strip("_") or "request"
+    stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-{uuid.uuid4().hex[:8]}"
+
+    if profiler == "pyinstrument":
+        running.stop()
+        name = f"{stem}.html"
+        with open(os.path.join(directory, name), "w") as f:
+            f.write(running.output_html())
+    else:
+        running.disable()
+        name = f"{stem}.prof"
+        running.dump_stats(os.path.join(directory, name))
+    return name
@@ -0,0 +1,192 @@
+import os
+import json
+import pickle
+import logging
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# ---------------------------
+# MODEL REGISTRY
+# ---------------------------
+
+class ModelRegistry:
+    """
+    Registry of fitted forecasting models keyed by (ticker, model_type,
+    data_version), with a bounded in-memory LRU in front of an on-disk copy.
+
+    An entry is a dict with:
+    - "model": fitted statsmodels results, or a Keras model for LSTM
+    - "scaler": fitted MinMaxScaler (LSTM only)
+    - "params": order / spec / window size used to build the model
+    - "nobs": number of observations the model has seen
+    - "last_date": timestamp of the last observation
+    - "version": price data version the model corresponds to
+
+    Only the latest entry per (ticker, model_type) is kept on disk, so an
+    older fit can be loaded and brought up to date when new bars arrive.
+    """
+
+    def __init__(self, root, max_entries=32):
+        self.root = root
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _dir(self, ticker, model_type):
+        return os.path.join(self.root, ticker.replace("/", "_"), model_type)
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, ticker, model_type, version):
+        """
+        Return the entry fitted on exactly this data version, if any.
+
+        Parameters:
+        ticker (str): Stock ticker
+        model_type (str): "arima", "sarima" or "lstm"
+        version (int): Price data version
+
+        Returns:
+        dict: Registry entry, or None
+        """
+        key = (ticker, model_type, version)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        entry = self.latest(ticker, model_type)
+        if entry is not None and entry["version"] == version:
+            return entry
+        return None
+
+    def latest(self, ticker, model_type):
+        """
+        Return the most recent entry for a ticker and model type, from
+        memory or disk, regardless of data version. The copy on disk wins
+        when it is newer than the one in memory, e.g. after a job or pool
+        worker stored a fit of its own.
+
+        Parameters:
+        ticker (str): Stock ticker
+        model_type (str): "arima", "sarima" or "lstm"
+
+        Returns:
+        dict: Registry entry, or None
+        """
+        with self._lock:
+            candidates = [entry for key, entry in self._entries.items() if key[:2] == (ticker, model_type)]
+        in_memory = max(candidates, key=_recency) if candidates else None
+
+        directory = self._dir(ticker, model_type)
+        meta = self._read_meta(directory)
+        if meta is None or (in_memory is not None and _recency(meta) <= _recency(in_memory)):
+            return in_memory
+        try:
+            entry = self._load(directory, meta, model_type)
+        except Exception:
+            logging.exception(f"Could not load stored {model_type} model for {ticker}")
+            return in_memory
+        self._remember((ticker, model_type, entry["version"]), entry)
+        return entry
+
+    def put(self, ticker, model_type, entry):
+        """
+        Store an entry in memory and persist it to disk.
+
+        Parameters:
+        ticker (str): Stock ticker
+        model_type (str): "arima", "sarima" or "lstm"
+        entry (dict): Registry entry
+        """
+        self._remember((ticker, model_type, entry["version"]), entry)
+        try:
+            self._save(self._dir(ticker, model_type), model_type, entry)
+        except Exception:
+            logging.exception(f"Could not persist {model_type} model for {ticker}")
+
+    def evict(self, ticker, model_type):
+        """
+        Drop the in-memory entries for a ticker and model type, so the next
+        lookup reads the copy on disk, e.g. after a worker process stored a
+        newer fit.
+
+        Parameters:
+        ticker (str): Stock ticker
+        model_type (str): "arima", "sarima" or "lstm"
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[:2] == (ticker, model_type)]:
+                del self._entries[key]
+
+    def _save(self, directory, model_type, entry):
+        os.makedirs(directory, exist_ok=True)
+        if model_type == "lstm":
+            entry["model"].save(os.path.join(directory, "model.keras"))
+            with open(os.path.join(directory, "scaler.pkl"), "wb") as f:
+                pickle.dump(entry["scaler"], f)
+        else:
+            entry["model"].save(os.path.join(directory, "results.pkl"))
+
+        meta = {
+            "params": entry["params"],
+            "nobs": entry["nobs"],
+            "last_date": str(entry["last_date"]),
+            "version": entry["version"],
+        }
+        tmp = os.path.join(directory, "meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(directory, "meta.json"))
+
+    def _read_meta(self, directory):
+        try:
+            with open(os.path.join(directory, "meta.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logging.exception(f"Could not read model metadata in {directory}")
+            return None
+
+    def _load(self, directory, meta, model_type):
+        entry = {
+            "params": _to_tuples(meta["params"]),
+            "nobs": meta["nobs"],
+            "last_date": pd.Timestamp(meta["last_date"]),
+            "version": meta["version"],
+            "scaler": None,
+        }
+        if model_type == "lstm":
+            from tensorflow.keras.models import load_model
+
+            entry["model"] = load_model(os.path.join(directory, "model.keras"))
+            with open(os.path.join(directory, "scaler.pkl"), "rb") as f:
+                entry["scaler"] = pickle.load(f)
+        else:
+            with open(os.path.join(directory, "results.pkl"), "rb") as f:
+                entry["model"] = pickle.load(f)
+        return entry
+
+
+def _recency(entry):
+    """
+    Sort key ordering entries, or their stored metadata, from oldest to newest.
+    """
+    return entry["version"], entry["nobs"]
+
+
+def _to_tuples(value):
+    """
+    Convert JSON lists back into the (nested) tuples used for model orders.
+    """
+    if isinstance(value, list):
+        return tuple(_to_tuples(v) for v in value)
+    return value
@@ -0,0 +1,246 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from scripts.covariance import as_covariance_model
+
+OBJECTIVES = ("max_sharpe", "min_volatility")
+
+# ---------------------------
+# CONIC PORTFOLIO PROBLEM
+# ---------------------------
+
+class PortfolioProblem:
+    """
+    Long-only maximum Sharpe ratio or minimum volatility problem, compiled
+    once with cvxpy for a universe size, covariance rank and constraint
+    structure. All data (returns, covariance root, bounds, previous weights)
+    enters as parameters, so re-solving skips canonicalization and the
+    solver can warm-start from the last solution.
+
+    Both objectives share one homogenized formulation in x and a scale s:
+
+        minimize    ||B'x||² + ||sqrt(d)∘x||²   (Σ = B B' + diag(d); B is the
+                                                 Cholesky factor and d = 0 for dense models)
+        subject to  x >= 0, sum(x) = s, x <= max_weight·s,
+                    lo·s <= S x <= hi·s      (sector membership S)
+                    ||x - w_prev·s||₁ <= turnover·s
+
+    Minimum volatility fixes s = 1. Maximum Sharpe lets s vary and adds
+    (μ - r_f)'x = 1, the Cornuejols-Tütüncü transform of the Sharpe ratio
+    into a convex QP; the weights are x / s. Constraints are homogeneous in
+    (x, s), so they hold for the rescaled weights too.
+    """
+
+    def __init__(self, objective, num_assets, rank, num_sectors=0, turnover=False):
+        import cvxpy as cp
+
+        self.objective = objective
+        self.x = cp.Variable(num_assets, nonneg=True)
+        self.scale = cp.Variable(nonneg=True) if objective == "max_sharpe" else 1.0
+        self.loadings = cp.Parameter((num_assets, rank))
+        self.specific_volatility = cp.Parameter(num_assets, nonneg=True)
+        self.max_weight = cp.Parameter(nonneg=True)
+        self.excess_returns = cp.Parameter(num_assets)
+        self.sectors = cp.Parameter((num_sectors, num_assets)) if num_sectors else None
+        self.sector_lower = cp.Parameter(num_sectors) if num_sectors else None
+        self.sector_upper = cp.Parameter(num_sectors) if num_sectors else None
+        self.previous = cp.Parameter(num_assets) if turnover else None
+        self.turnover = cp.Parameter(nonneg=True) if turnover else None
+
+        # Factor exposures as their own variable keep the QP sparse: the
+        # solver sees the N x k loadings in a constraint and a diagonal
+        # Hessian, rather than the dense N x N matrix B B'
+        x, s = self.x, self.scale
+        self.exposures = cp.Variable(rank)
+        constraints = [self.exposures == self.loadings.T @ x, cp.sum(x) == s, x <= self.max_weight * s]
+        if objective == "max_sharpe":
+            constraints.append(self.excess_returns @ x == 1)
+        if num_sectors:
+            constraints += [self.sectors @ x >= self.sector_lower * s, self.sectors @ x <= self.sector_upper * s]
+        if turnover:
+            constraints.append(cp.norm1(x - self.previous * s) <= self.turnover * s)
+
+        self.problem = cp.Problem(cp.Minimize(cp.sum_squares(self.exposures)
+                                               + cp.sum_squares(cp.multiply(self.specific_volatility, x))),
+                                   constraints)
+        self.lock = threading.Lock()
+
+    def solve(self, loadings, specific_volatility, excess_returns, max_weight=1.0, sectors=None, sector_lower=None, sector_upper=None,
+              previous=None, turnover=None, solver=None):
+        """
+        Solve for new data, warm-starting from the previous weights or the
+        last solution.
+
+        Returns:
+        np.array: Portfolio weights summing to one
+        """
+        with self.lock:
+            self.loadings.value = loadings
+            self.specific_volatility.value = specific_volatility
+            self.max_weight.value = max_weight
+            self.excess_returns.value = excess_returns
+            if self.sectors is not None:
+                self.sectors.value = sectors
+                self.sector_lower.value = sector_lower
+                self.sector_upper.value = sector_upper
+            if self.previous is not None:
+                self.previous.value = previous
+                self.turnover.value = turnover
+            if previous is not None:
+                # Start from the holdings, rescaled onto (μ - r_f)'x = 1 for max Sharpe
+                scale = excess_returns @ previous if self.objective == "max_sharpe" else 1.0
+                if scale > 0:
+                    self.x.value = previous / scale
+
+            self.problem.solve(solver=solver, warm_start=True)
+            if self.problem.status not in ("optimal", "optimal_inaccurate"):
+                raise ValueError(f"Portfolio optimization is {self.problem.status}; check the constraints.")
+
+            weights = np.clip(self.x.value, 0.0, None)
+            return weights / weights.sum()
+
+
+# Compiled problems by (objective, assets, rank, sectors, turnover)
+_PROBLEMS = OrderedDict()
+_PROBLEMS_LOCK = threading.Lock()
+MAX_PROBLEMS = 16
+
+
+def get_problem(objective, num_assets, rank, num_sectors=0, turnover=False):
+    """
+    Return the compiled problem for this structure, building it on first use.
+
+    Returns:
+    PortfolioProblem: Shared problem instance
+    """
+    key = (objective, num_assets, rank, num_sectors, turnover)
+    with _PROBLEMS_LOCK:
+        if key in _PROBLEMS:
+            _PROBLEMS.move_to_end(key)
+            return _PROBLEMS[key]
+    problem = PortfolioProblem(objective, num_assets, rank, num_sectors, turnover)
+    with _PROBLEMS_LOCK:
+        problem = _PROBLEMS.setdefault(key, problem)
+        while len(_PROBLEMS) > MAX_PROBLEMS:
+            _PROBLEMS.popitem(last=False)
+    return problem
+
+# ---------------------------
+# OPTIMIZATION
+# ---------------------------
+
+def covariance_root(cov_matrix):
+    """
+    Split Σ into B B' + diag(d) for the solver: the factor loadings and
+    specific volatilities of a factor model, whose O(N·k) entries are all
+    the QP needs, or the cached Cholesky factor with d = 0 otherwise.
+
+    Parameters:
+    cov_matrix (CovarianceModel or pd.DataFrame): Annual covariance matrix
+
+    Returns:
+    tuple: (B of shape (N, rank), sqrt(d) of shape (N,))
+    """
+    model = as_covariance_model(cov_matrix)
+    if model.is_factor:
+        return model.loadings, np.sqrt(model.specific)
+    return model.cholesky, np.zeros(model.num_assets)
+
+
+def slsqp_portfolio(expected_returns, cov_matrix, objective="max_sharpe", initial_guess=None):
+    """
+    Long-only maximum Sharpe ratio or minimum volatility weights with SLSQP
+    and analytic gradients. Faster than the QP for small unconstrained
+    universes, especially when warm-started from a nearby solution.
+
+    Parameters:
+    expected_returns (pd.Series or np.array): Expected annual returns
+    cov_matrix (CovarianceModel or pd.DataFrame): Annual covariance matrix
+    objective (str): "max_sharpe" or "min_volatility"
+    initial_guess (np.array): Starting weights, e.g. the previous solution
+
+    Returns:
+    np.array: Portfolio weights
+    """
+    import scipy.optimize as sco
+
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective '{objective}'. Choose from {', '.join(OBJECTIVES)}.")
+    mu = np.asarray(expected_returns, dtype=np.float64)
+    cov = as_covariance_model(cov_matrix)
+    num_assets = len(mu)
+
+    def objective_and_gradient(w):
+        cov_w = cov.matvec(w)
+        vol = np.sqrt(w @ cov_w)
+        if objective == "min_volatility":
+            return vol, cov_w / vol
+        ret = w @ mu
+        return -ret / vol, -(mu / vol - ret * cov_w / vol ** 3)
+
+    if initial_guess is None:
+        initial_guess = np.full(num_assets, 1.0 / num_assets)
+    result = sco.minimize(objective_and_gradient, initial_guess, jac=True, method="SLSQP",
+                          bounds=[(0, 1)] * num_assets,
+                          constraints={"type": "eq", "fun": lambda x: np.sum(x) - 1, "jac": lambda x: np.ones_like(x)})
+    return result.x
+
+
+def optimize_portfolio(expected_returns, cov_matrix, objective="max_sharpe", max_weight=None, sectors=None,
+                       sector_bounds=None, previous_weights=None, max_turnover=None, risk_free_rate=0.0,
+                       solver="CLARABEL"):
+    """
+    Long-only maximum Sharpe ratio or minimum volatility weights from a
+    convex QP, which scales to universes of hundreds or thousands of assets.
+
+    Parameters:
+    expected_returns (pd.Series or np.array): Expected annual returns
+    cov_matrix (CovarianceModel or pd.DataFrame): Annual covariance matrix
+    objective (str): "max_sharpe" or "min_volatility"
+    max_weight (float): Upper bound on every weight
+    sectors (list): Sector label of every asset
+    sector_bounds (dict): Sector label -> (min, max) total weight
+    previous_weights (np.array): Current holdings, used as the turnover
+        anchor and to warm-start the solver
+    max_turnover (float): Upper bound on sum |w - previous_weights|
+    risk_free_rate (float): Annual risk-free rate for the Sharpe ratio
+    solver (str): cvxpy solver name. Clarabel (interior point) is robust on
+        large max Sharpe problems; OSQP can warm-start from previous_weights
+        and is faster for repeated minimum volatility rebalances
+
+    Returns:
+    np.array: Portfolio weights
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective '{objective}'. Choose from {', '.join(OBJECTIVES)}.")
+    excess_returns = np.asarray(expected_returns, dtype=np.float64) - risk_free_rate
+    num_assets = len(excess_returns)
+    if objective == "max_sharpe" and excess_returns.max() <= 0:
+        raise ValueError("No asset has a positive expected excess return, so the Sharpe ratio cannot be maximized.")
+    max_weight = 1.0 if max_weight is None else float(max_weight)
+    if max_weight * num_assets < 1:
+        raise ValueError(f"max_weight {max_weight} is too small for {num_assets} assets to be fully invested.")
+
+    membership, lower, upper = None, None, None
+    if sector_bounds:
+        if sectors is None or len(sectors) != num_assets:
+            raise ValueError("Sector bounds need one sector label per asset.")
+        names = sorted(sector_bounds)
+        membership = np.array([[label == name for label in sectors] for name in names], dtype=np.float64)
+        lower = np.array([sector_bounds[name][0] for name in names], dtype=np.float64)
+        upper = np.array([sector_bounds[name][1] for name in names], dtype=np.float64)
+
+    if previous_weights is not None:
+        previous_weights = np.asarray(previous_weights, dtype=np.float64)
+        if len(previous_weights) != num_assets:
+            raise ValueError("previous_weights must have one weight per asset.")
+    if max_turnover is not None and previous_weights is None:
+        raise ValueError("A turnover limit needs previous_weights.")
+
+    loadings, specific_volatility = covariance_root(cov_matrix)
+    problem = get_problem(objective, num_assets, loadings.shape[1], 0 if membership is None else len(membership),
+                          max_turnover is not None)
+    return problem.solve(loadings, specific_volatility, excess_returns, max_weight, membership, lower, upper,
+                         previous_weights, max_turnover, solver)
@@ -0,0 +1,187 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import numpy as np
+from scipy.stats import norm
+
+from scripts.risk import rolling_risk_metrics
+from scripts.covariance import as_covariance_model
+
+# ---------------------------
+# HELPERS
+# ---------------------------
+
+def _as_weight_matrix(weights):
+    """
+    Return weights as an (N, P) matrix, one column per portfolio.
+
+    Parameters:
+    weights (np.array): Weights of shape (N,) or (N, P)
+
+    Returns:
+    np.array: Weights of shape (N, P)
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    return weights[:, np.newaxis] if weights.ndim == 1 else weights
+
+
+def _tail_metrics(portfolio_returns, confidence_levels):
+    """
+    Historical VaR and CVaR of simulated or observed portfolio returns.
+
+    Parameters:
+    portfolio_returns (np.array): Returns of shape (T, P)
+    confidence_levels (tuple): Confidence levels
+
+    Returns:
+    dict: "var" and "cvar" of shape (levels, P), as positive losses
+    """
+    metrics = rolling_risk_metrics(portfolio_returns, len(portfolio_returns), confidence_levels)
+    return {"var": metrics["var"][:, 0], "cvar": metrics["cvar"][:, 0]}
+
+# ---------------------------
+# PARAMETRIC AND HISTORICAL
+# ---------------------------
+
+def parametric_var_cvar(weights, mean, cov, confidence_levels=(0.95,), horizon=1):
+    """
+    Delta-normal VaR and CVaR: portfolio returns are normal with mean w'mu
+    and variance w'Σw, scaled to the horizon by h and sqrt(h).
+
+    Parameters:
+    weights (np.array): Weights of shape (N,) or (N, P)
+    mean (np.array): Expected daily returns
+    cov (CovarianceModel or np.array): Daily covariance matrix
+    confidence_levels (tuple): Confidence levels
+    horizon (int): Holding period in trading days
+
+    Returns:
+    dict: "var" and "cvar" of shape (levels, P), as positive losses
+    """
+    weights = _as_weight_matrix(weights)
+    mu = np.asarray(mean, dtype=np.float64) @ weights * horizon
+    sigma = np.sqrt(as_covariance_model(cov).variance(weights.T) * horizon)
+
+    alpha = 1 - np.asarray(confidence_levels, dtype=np.float64)[:, np.newaxis]
+    z = norm.ppf(alpha)
+    return {
+        "var": -(mu + z * sigma),
+        "cvar": -(mu - sigma * norm.pdf(z) / alpha),
+    }
+
+
+def historical_var_cvar(returns, weights, confidence_levels=(0.95,), horizon=1):
+    """
+    Historical-simulation VaR and CVaR of the portfolio return series, using
+    overlapping `horizon`-day sums for multi-day horizons.
+
+    Parameters:
+    returns (np.array): Daily asset returns of shape (T, N)
+    weights (np.array): Weights of shape (N,) or (N, P)
+    confidence_levels (tuple): Confidence levels
+    horizon (int): Holding period in trading days
+
+    Returns:
+    dict: "var" and "cvar" of shape (levels, P), as positive losses
+    """
+    portfolio_returns = np.asarray(returns, dtype=np.float64) @ _as_weight_matrix(weights)
+    if horizon > 1:
+        cumulative = np.cumsum(np.vstack([np.zeros(portfolio_returns.shape[1]), portfolio_returns]), axis=0)
+        portfolio_returns = cumulative[horizon:] - cumulative[:-horizon]
+    return _tail_metrics(portfolio_returns, confidence_levels)
+
+# ---------------------------
+# MONTE CARLO
+# ---------------------------
+
+def _simulate_chunk(seed, size, mean, cov, weights, horizon, distribution, df):
+    """
+    Simulate `size` scenarios of correlated asset returns over `horizon`
+    days and return the portfolio returns, shape (size, P).
+    """
+    rng = np.random.default_rng(seed)
+    num_assets = len(mean)
+    shocks = cov.transform(rng.standard_normal((size * horizon, cov.rank)))
+    if distribution == "t":
+        # Multivariate Student t, rescaled so its covariance is still `cov`
+        scale = np.sqrt((df - 2) / rng.chisquare(df, size * horizon))
+        shocks *= scale[:, np.newaxis]
+    shocks += mean
+    return shocks.reshape(size, horizon, num_assets).sum(axis=1) @ weights
+
+
+def simulate_portfolio_returns(weights, mean, cov, num_scenarios=100000, horizon=1, distribution="normal",
+                               df=5, seed=None, n_jobs=None, executor="threads",
+                               max_chunk_bytes=64 * 1024 * 1024):
+    """
+    Simulate portfolio returns with correlated shocks drawn through the
+    covariance model's cached Cholesky factor, or through its loadings for
+    a factor model.
+
+    Scenarios are generated in chunks whose (chunk x horizon x assets) shock
+    matrix stays within `max_chunk_bytes`, and only the portfolio returns
+    are kept, so millions of scenarios fit in memory. Chunks run on a
+    thread or process pool. Every chunk gets its own child of the seed's
+    SeedSequence, so results depend on the seed only, not on the number of
+    workers or the executor.
+
+    Parameters:
+    weights (np.array): Weights of shape (N,) or (N, P)
+    mean (np.array): Expected daily returns
+    cov (CovarianceModel or np.array): Daily covariance matrix
+    num_scenarios (int): Number of scenarios
+    horizon (int): Holding period in trading days
+    distribution (str): "normal" or "t" (multivariate Student t)
+    df (float): Degrees of freedom for the Student t, above 2
+    seed (int): Random seed
+    n_jobs (int): Number of workers (defaults to the CPU count)
+    executor (str): "threads" or "processes"
+    max_chunk_bytes (int): Memory budget for one chunk of shocks
+
+    Returns:
+    np.array: Portfolio returns of shape (num_scenarios, P)
+    """
+    if distribution not in ("normal", "t"):
+        raise ValueError(f"Unknown distribution '{distribution}'. Choose 'normal' or 't'.")
+    if distribution == "t" and df <= 2:
+        raise ValueError("Degrees of freedom must be above 2 for the covariance to exist.")
+    if executor not in ("threads", "processes"):
+        raise ValueError(f"Unknown executor '{executor}'. Choose 'threads' or 'processes'.")
+
+    weights = _as_weight_matrix(weights)
+    mean = np.asarray(mean, dtype=np.float64)
+    cov = as_covariance_model(cov)
+    if not cov.is_factor:
+        # Factorize once, before the model is shipped to the workers
+        cov.cholesky
+
+    chunk_size = max(1, int(max_chunk_bytes // (8 * horizon * max(cov.rank, len(mean)))))
+    sizes = [min(chunk_size, num_scenarios - start) for start in range(0, num_scenarios, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(child, size, mean, cov, weights, horizon, distribution, df) for child, size in zip(seeds, sizes)]
+
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(sizes))
+    if n_jobs == 1:
+        return np.vstack([_simulate_chunk(*chunk) for chunk in args])
+
+    pool_class = ThreadPoolExecutor if executor == "threads" else ProcessPoolExecutor
+    with pool_class(max_workers=n_jobs) as pool:
+        return np.vstack(list(pool.map(_simulate_chunk, *zip(*args))))
+
+
+def monte_carlo_var_cvar(weights, mean, cov, confidence_levels=(0.95,), **simulation):
+    """
+    Monte Carlo VaR and CVaR from `simulate_portfolio_returns`.
+
+    Parameters:
+    weights (np.array): Weights of shape (N,) or (N, P)
+    mean (np.array): Expected daily returns
+    cov (CovarianceModel or np.array): Daily covariance matrix
+    confidence_levels (tuple): Confidence levels
+    **simulation: Keyword arguments for `simulate_portfolio_returns`
+
+    Returns:
+    dict: "var" and "cvar" of shape (levels, P), as positive losses
+    """
+    portfolio_returns = simulate_portfolio_returns(weights, mean, cov, **simulation)
+    return _tail_metrics(portfolio_returns, confidence_levels)
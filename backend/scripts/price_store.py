@@ -0,0 +1,243 @@
+import os
+import json
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from scripts.metrics import stage
+
+# ---------------------------
+# FETCHERS
+# ---------------------------
+
+def yfinance_fetcher(tickers, start_date, end_date):
+    """
+    Download closing prices from Yahoo Finance.
+
+    Parameters:
+    tickers (list): List of stock tickers to fetch
+    start_date (str): Start date (inclusive)
+    end_date (str): End date (exclusive)
+
+    Returns:
+    pd.DataFrame: Close prices, one column per ticker
+    """
+    import yfinance as yf
+
+    data = yf.download(tickers, start=start_date, end=end_date, progress=False)
+    if data.empty:
+        return pd.DataFrame()
+
+    close_prices = data["Close"]
+    if isinstance(close_prices, pd.Series):
+        close_prices = close_prices.to_frame(name=tickers[0])
+    return close_prices
+
+# ---------------------------
+# PRICE STORE
+# ---------------------------
+
+class PriceStore:
+    """
+    On-disk store of daily close prices, one memory-mapped NumPy file pair
+    per ticker (`dates.npy` as int64 nanoseconds, `close.npy` as float64)
+    plus a small `meta.json` recording the date range already requested
+    from the fetcher. Only missing ranges are fetched on later calls.
+    A failed fetch leaves its range uncovered, to be fetched again on the
+    next call, and its error is kept per ticker (see `errors`).
+    """
+
+    def __init__(self, root, fetcher=yfinance_fetcher):
+        self.root = root
+        self.fetcher = fetcher
+        self.listeners = []
+        self._errors = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _lock(self, ticker):
+        with self._locks_guard:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def _path(self, ticker, name):
+        return os.path.join(self.root, ticker.replace("/", "_"), name)
+
+    def _read_meta(self, ticker):
+        path = self._path(ticker, "meta.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _read_series(self, ticker):
+        dates = np.load(self._path(ticker, "dates.npy"), mmap_mode="r")
+        close = np.load(self._path(ticker, "close.npy"), mmap_mode="r")
+        return pd.Series(close, index=pd.to_datetime(np.asarray(dates)), name=ticker)
+
+    def _write(self, ticker, series, meta):
+        os.makedirs(os.path.dirname(self._path(ticker, "meta.json")), exist_ok=True)
+        series = series[~series.index.duplicated(keep="last")].sort_index()
+        # Write to temporary files first so readers never see a partial update
+        for name, values in (("dates.npy", series.index.values.astype("datetime64[ns]").astype(np.int64)),
+                             ("close.npy", series.values.astype(np.float64))):
+            tmp = self._path(ticker, name + ".tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, values)
+            os.replace(tmp, self._path(ticker, name))
+        tmp = self._path(ticker, "meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._path(ticker, "meta.json"))
+
+    def _missing_ranges(self, meta, start, end):
+        if meta is None:
+            return [(start, end)]
+        ranges = []
+        covered_start = pd.Timestamp(meta["covered_start"])
+        covered_end = pd.Timestamp(meta["covered_end"])
+        if start < covered_start:
+            ranges.append((start, covered_start))
+        if end > covered_end:
+            ranges.append((covered_end, end))
+        return ranges
+
+    def refresh(self, tickers, start_date, end_date):
+        """
+        Fetch any dates not yet covered by the store for the given tickers.
+
+        Parameters:
+        tickers (list): List of stock tickers
+        start_date (str): Start date (inclusive)
+        end_date (str): End date (exclusive)
+
+        Returns:
+        list: Tickers whose stored data changed
+        """
+        start = pd.Timestamp(start_date)
+        # Never mark dates after today as covered, so they are fetched once they exist
+        end = min(pd.Timestamp(end_date), pd.Timestamp.today().normalize())
+        changed = []
+
+        # Group tickers by the missing range so each range is a single bulk fetch
+        pending = {}
+        for ticker in tickers:
+            for missing in self._missing_ranges(self._read_meta(ticker), start, end):
+                if missing[0] < missing[1]:
+                    pending.setdefault(missing, []).append(ticker)
+
+        for (range_start, range_end), batch in pending.items():
+            try:
+                with stage("price_download"):
+                    fetched = self.fetcher(batch, range_start.strftime("%Y-%m-%d"), range_end.strftime("%Y-%m-%d"))
+            except Exception as e:
+                # Serve what is stored; the range is fetched again on the next call
+                logging.exception(f"Fetching {batch} failed")
+                fetched = pd.DataFrame()
+                fetched.attrs["errors"] = {ticker: str(e) for ticker in batch}
+            # Fetchers may explain missing tickers: errors worth retrying, or no data at all
+            errors = fetched.attrs.get("errors", {})
+            no_data = fetched.attrs.get("no_data", {})
+            for ticker in batch:
+                with self._lock(ticker):
+                    meta = self._read_meta(ticker)
+                    if ticker in fetched.columns:
+                        new = fetched[ticker].dropna()
+                        new.index = pd.to_datetime(new.index).tz_localize(None)
+                    else:
+                        new = pd.Series(dtype=np.float64)
+                    if ticker in errors:
+                        # Leave the range uncovered so it is fetched again
+                        self._errors[ticker] = errors[ticker]
+                        continue
+                    self._errors.pop(ticker, None)
+                    if meta is None:
+                        if new.empty:
+                            logging.warning(f"No data fetched for {ticker}.")
+                            self._errors[ticker] = no_data.get(ticker, "no data returned")
+                            continue
+                        series = new
+                        meta = {"covered_start": str(range_start.date()), "covered_end": str(range_end.date()), "version": 0}
+                    else:
+                        series = pd.concat([self._read_series(ticker), new]) if not new.empty else self._read_series(ticker)
+                        meta["covered_start"] = str(min(pd.Timestamp(meta["covered_start"]), range_start).date())
+                        meta["covered_end"] = str(max(pd.Timestamp(meta["covered_end"]), range_end).date())
+                    if not new.empty:
+                        meta["version"] += 1
+                        changed.append(ticker)
+                    self._write(ticker, series, meta)
+        if changed:
+            for listener in self.listeners:
+                listener(changed)
+        return changed
+
+    def errors(self, tickers):
+        """
+        Return why the last fetch failed for any of the given tickers.
+
+        Parameters:
+        tickers (list): List of stock tickers
+
+        Returns:
+        dict: Ticker -> error message, for tickers whose last fetch failed
+        """
+        errors = {}
+        for ticker in tickers:
+            error = self._errors.get(ticker)
+            if error is not None:
+                errors[ticker] = error
+        return errors
+
+    def add_listener(self, listener):
+        """
+        Register a callback invoked with the list of changed tickers after a refresh.
+
+        Parameters:
+        listener (callable): Function taking a list of tickers
+        """
+        self.listeners.append(listener)
+
+    def get(self, tickers, start_date, end_date):
+        """
+        Return close prices for the given tickers, fetching only missing dates.
+
+        Parameters:
+        tickers (list): List of stock tickers
+        start_date (str): Start date (inclusive)
+        end_date (str): End date (exclusive)
+
+        Returns:
+        pd.DataFrame: Close prices, one column per ticker with stored data
+        """
+        self.refresh(tickers, start_date, end_date)
+
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(end_date)
+        columns = {}
+        for ticker in tickers:
+            if self._read_meta(ticker) is None:
+                continue
+            series = self._read_series(ticker)
+            columns[ticker] = series[(series.index >= start) & (series.index < end)]
+        if not columns:
+            return pd.DataFrame()
+        return pd.DataFrame(columns)
+
+    def version(self, tickers):
+        """
+        Return a data version token for a set of tickers that changes
+        whenever any of their stored prices change.
+
+        Parameters:
+        tickers (list): List of stock tickers
+
+        Returns:
+        tuple: (ticker, version) pairs sorted by ticker
+        """
+        versions = []
+        for ticker in sorted(set(tickers)):
+            meta = self._read_meta(ticker)
+            versions.append((ticker, meta["version"] if meta else -1))
+        return tuple(versions)
@@ -0,0 +1,149 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# ---------------------------
+# CONTENT KEYS
+# ---------------------------
+
+def content_key(func, *args):
+    """
+    Hash a render function and its inputs into a cache key, so identical
+    plots share one image.
+
+    Parameters:
+    func (callable): Module-level render function
+    *args: Arrays and scalars passed to `func`
+
+    Returns:
+    str: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256(f"{func.__module__}.{func.__qualname__}".encode("utf-8"))
+    for arg in args:
+        if isinstance(arg, np.ndarray):
+            digest.update(f"{arg.dtype}{arg.shape}".encode("utf-8"))
+            digest.update(np.ascontiguousarray(arg).tobytes())
+        else:
+            digest.update(repr(arg).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _render(func, args, path):
+    """
+    Run a render function in a worker and, if a path is given, store the
+    image there atomically so other server processes can serve it.
+    """
+    image = func(*args)
+    if path is not None:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(image)
+        os.replace(tmp, path)
+    return image
+
+# ---------------------------
+# RENDER SERVICE
+# ---------------------------
+
+class RenderService:
+    """
+    Renders images in a process pool off the request path. Requests get a
+    content-hash key straight away and fetch the image by key later;
+    identical inputs are rendered once. Finished images are kept in an
+    in-memory LRU bounded by bytes and, when `root` is set, on disk so that
+    every server process can serve images rendered by the others.
+    """
+
+    def __init__(self, root=None, max_workers=1, max_bytes=64 * 1024 * 1024):
+        self.root = root
+        self.max_workers = max_workers
+        self.max_bytes = max_bytes
+        self._executor = None
+        self._images = OrderedDict()
+        self._bytes = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+        if root is not None:
+            os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, f"{key}.png") if self.root is not None else None
+
+    def submit(self, func, *args):
+        """
+        Start rendering `func(*args)` unless the same image is cached or
+        already being rendered.
+
+        Parameters:
+        func (callable): Picklable module-level function returning image bytes
+        *args: Arguments for `func`
+
+        Returns:
+        str: Image key
+        """
+        key = content_key(func, *args)
+        path = self._path(key)
+        with self._lock:
+            if key in self._images or key in self._inflight or (path is not None and os.path.exists(path)):
+                return key
+            if self._executor is None:
+                # Started lazily so importing the app does not spawn processes
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            future = self._executor.submit(_render, func, args, path)
+            self._inflight[key] = future
+        future.add_done_callback(lambda f: self._finish(key, f))
+        return key
+
+    def _finish(self, key, future):
+        with self._lock:
+            self._inflight.pop(key, None)
+            try:
+                image = future.result()
+            except Exception:
+                logging.exception(f"Rendering image {key} failed")
+                return
+            self._images[key] = image
+            self._bytes += len(image)
+            while self._bytes > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def get(self, key, timeout=30):
+        """
+        Return a rendered image, waiting up to `timeout` seconds if it is
+        still being rendered here or, with a shared `root`, by another
+        server process.
+
+        Parameters:
+        key (str): Image key returned by `submit`
+        timeout (float): Seconds to wait for an unfinished image
+
+        Returns:
+        bytes: Image, or None if it is unknown or did not finish in time
+        """
+        deadline = time.monotonic() + timeout
+        path = self._path(key)
+        while True:
+            with self._lock:
+                if key in self._images:
+                    self._images.move_to_end(key)
+                    return self._images[key]
+                future = self._inflight.get(key)
+            if future is not None:
+                try:
+                    return future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except Exception:
+                    return None
+            if path is not None and os.path.exists(path):
+                with open(path, "rb") as f:
+                    return f.read()
+            if path is None or time.monotonic() >= deadline:
+                return None
+            time.sleep(0.05)
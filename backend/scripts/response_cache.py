@@ -0,0 +1,254 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# ---------------------------
+# REQUEST KEYS
+# ---------------------------
+
+# Body fields that name the tickers a request reads
+TICKER_FIELDS = ("stocks", "tickers", "ticker")
+
+# Body fields that change how a request runs, not what it returns
+IGNORED_FIELDS = ("async",)
+
+
+def request_tickers(params):
+    """
+    Return the sorted, de-duplicated tickers named in a request body.
+
+    Parameters:
+    params (dict): Request body
+
+    Returns:
+    tuple: Tickers
+    """
+    tickers = set()
+    for field in TICKER_FIELDS:
+        value = params.get(field)
+        if isinstance(value, str):
+            value = [value]
+        if isinstance(value, list):
+            tickers.update(ticker.strip() for ticker in value if isinstance(ticker, str) and ticker.strip())
+    return tuple(sorted(tickers))
+
+
+def request_key(kind, params, version):
+    """
+    Canonical cache key of a request: the endpoint, its sorted tickers, the
+    price data version of those tickers and every other body field in
+    sorted JSON, so reordered tickers or keys map to the same entry and new
+    bars map to a new one.
+
+    Parameters:
+    kind (str): Endpoint name, e.g. "optimize"
+    params (dict): Request body
+    version (callable): `tickers -> version token`, e.g. PriceStore.version
+
+    Returns:
+    tuple: (kind, tickers, data version, parameters)
+    """
+    tickers = request_tickers(params)
+    rest = {name: value for name, value in params.items() if name not in TICKER_FIELDS + IGNORED_FIELDS}
+    return kind, tickers, version(tickers), json.dumps(rest, sort_keys=True, default=str)
+
+
+def _payload_size(value):
+    """
+    Approximate the memory used by a response payload.
+
+    Parameters:
+    value: Nested dicts, lists, strings, numbers and NumPy arrays
+
+    Returns:
+    int: Size in bytes
+    """
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(_payload_size(k) + _payload_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_payload_size(item) for item in value) + 8 * len(value)
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return 8
+
+# ---------------------------
+# RESPONSE CACHE
+# ---------------------------
+
+class _Flight:
+    """
+    A computation in progress that identical requests wait on.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.entry = None
+        self.error = None
+
+
+class ResponseCache:
+    """
+    Thread-safe cache of request handler results, bounded by number of
+    entries, total bytes and age. Concurrent identical requests are
+    coalesced: the first one computes and the others wait for its result
+    instead of repeating the work. Each entry carries an ETag token, so a
+    client that already holds the response can be answered with 304.
+
+    Results are stored before encoding, so one entry serves every media
+    type and compression a client may ask for. Only successful (200)
+    results are kept; errors are shared with the requests waiting on them
+    and then dropped.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024, ttl=300.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def _lookup(self, key):
+        # Caller holds the lock
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry["expires"] <= time.monotonic():
+            self._bytes -= self._entries.pop(key)["size"]
+            self.expired += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key, entry):
+        # Caller holds the lock
+        if entry["size"] > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous["size"]
+        self._entries[key] = entry
+        self._bytes += entry["size"]
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted["size"]
+            self.evictions += 1
+
+    def get_or_compute(self, key, compute, refresh=False, cacheable=None, rekey=None):
+        """
+        Return the cached result for `key`, wait for an identical request
+        already computing it, or compute it.
+
+        Parameters:
+        key (tuple): Output of `request_key`
+        compute (callable): Zero-argument function returning (result, status)
+        refresh (bool): Ignore a cached entry and compute again, e.g. for a
+            request sent with Cache-Control: no-cache
+        cacheable (callable): Optional `result -> bool` deciding whether a
+            successful result may be stored, e.g. not a partial one
+        rekey (callable): Optional zero-argument function returning the key
+            to store the result under, for computations that change what
+            the key was derived from, e.g. by fetching new prices
+
+        Returns:
+        tuple: (result, status, etag, source) where source is "hit",
+        "coalesced" or "miss"
+        """
+        with self._lock:
+            entry = None if refresh else self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                return entry["result"], entry["status"], entry["etag"], "hit"
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            entry = flight.entry
+            return entry["result"], entry["status"], entry["etag"], "coalesced"
+
+        try:
+            result, status = compute()
+            token = hashlib.blake2b(repr((key, time.time_ns(), os.getpid())).encode("utf-8"), digest_size=12)
+            entry = {
+                "result": result,
+                "status": status,
+                "etag": token.hexdigest(),
+                "expires": time.monotonic() + self.ttl,
+                "size": _payload_size(result)
+            }
+            flight.entry = entry
+            if status == 200 and (cacheable is None or cacheable(result)):
+                store_key = key if rekey is None else rekey()
+                with self._lock:
+                    self._store(store_key, entry)
+            return result, status, entry["etag"], "miss"
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def invalidate(self, tickers=None):
+        """
+        Drop cached results that include any of the given tickers.
+
+        Parameters:
+        tickers (list): Tickers whose data changed, or None to clear everything
+        """
+        with self._lock:
+            if tickers is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            changed = set(tickers)
+            for key in [k for k in self._entries if changed.intersection(k[1])]:
+                self._bytes -= self._entries.pop(key)["size"]
+
+    def stats(self):
+        """
+        Return hit-rate and size metrics.
+
+        Returns:
+        dict: Counters, hit rate (cached and coalesced answers over all
+        lookups), entry count and bytes held
+        """
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else None,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "inflight": len(self._inflight),
+                "ttl": self.ttl
+            }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,94 @@
+import threading
+from collections import OrderedDict
+
+# ---------------------------
+# RETURN STATISTICS CACHE
+# ---------------------------
+
+def _nbytes(value):
+    """
+    Approximate the memory used by a cached value.
+
+    Parameters:
+    value (tuple): Tuple of pandas/NumPy objects
+
+    Returns:
+    int: Size in bytes
+    """
+    total = 0
+    for item in value:
+        if hasattr(item, "memory_usage"):
+            usage = item.memory_usage(index=True, deep=False)
+            total += int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+        elif hasattr(item, "nbytes"):
+            total += int(item.nbytes)
+    return total
+
+
+class ReturnCache:
+    """
+    Thread-safe LRU cache of derived return statistics, bounded both by
+    number of entries and by total bytes. Keys are
+    (tickers, start_date, end_date, data_version) tuples.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for `key`, computing and storing it on a miss.
+
+        Parameters:
+        key (tuple): Hashable cache key
+        compute (callable): Zero-argument function producing the value
+
+        Returns:
+        tuple: Cached value
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        value = compute()
+        size = _nbytes(value)
+
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key][0]
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+        return value
+
+    def invalidate(self, tickers=None):
+        """
+        Drop cached entries that include any of the given tickers.
+
+        Parameters:
+        tickers (list): Tickers whose data changed, or None to clear everything
+        """
+        with self._lock:
+            if tickers is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            changed = set(tickers)
+            for key in [k for k in self._entries if changed.intersection(k[0])]:
+                self._bytes -= self._entries.pop(key)[1]
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,280 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# ---------------------------
+# VECTORIZED ROLLING METRICS
+# ---------------------------
+
+def _quantile_positions(window, confidence_levels):
+    """
+    Return the order statistics needed for historical VaR at each confidence
+    level, using the same linear interpolation as `np.percentile`.
+
+    Parameters:
+    window (int): Number of observations per window
+    confidence_levels (tuple): Confidence levels, e.g. (0.95, 0.99)
+
+    Returns:
+    tuple: (lower positions, upper positions, interpolation fractions)
+    """
+    # np.percentile's own arithmetic (percent, then back to a fraction), so the
+    # threshold rounds the same way and the CVaR tail holds the same observations
+    quantiles = 100 * (1 - np.asarray(confidence_levels, dtype=np.float64)) / 100
+    positions = (window - 1) * quantiles
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.minimum(lower + 1, window - 1)
+    return lower, upper, positions - lower
+
+
+def _var_cvar(windows, lower, upper, fraction):
+    """
+    VaR and CVaR from windows whose last axis has been partitioned (or
+    sorted) at the positions in `lower` and `upper`.
+
+    Parameters:
+    windows (np.array): Array of shape (..., window)
+    lower (np.array): Lower order statistic per confidence level
+    upper (np.array): Upper order statistic per confidence level
+    fraction (np.array): Interpolation fraction per confidence level
+
+    Returns:
+    tuple: (var, cvar), each of shape (levels, ...), as positive losses
+    """
+    var = np.empty((len(lower),) + windows.shape[:-1])
+    cvar = np.empty_like(var)
+    for i, (lo, hi, frac) in enumerate(zip(lower, upper, fraction)):
+        diff = windows[..., hi] - windows[..., lo]
+        threshold = windows[..., hi] - diff * (1 - frac) if frac >= 0.5 else windows[..., lo] + diff * frac
+        var[i] = -threshold
+
+        # Everything up to position lo is in the tail; later values only when
+        # they tie the threshold, which can only happen if position hi does
+        total = windows[..., :lo + 1].sum(axis=-1)
+        count = np.full(threshold.shape, lo + 1.0)
+        ties = windows[..., hi] <= threshold if hi > lo else np.zeros(threshold.shape, dtype=bool)
+        if ties.any():
+            rest = windows[ties][:, lo + 1:]
+            tail = rest <= threshold[ties][:, np.newaxis]
+            total[ties] += np.where(tail, rest, 0.0).sum(axis=-1)
+            count[ties] += tail.sum(axis=-1)
+        cvar[i] = -total / count
+    return var, cvar
+
+
+def rolling_risk_metrics(returns, window, confidence_levels=(0.95,), max_chunk_bytes=64 * 1024 * 1024):
+    """
+    Compute rolling historical VaR, CVaR and volatility for every column of
+    a return matrix at once.
+
+    Windows are a strided view over the returns, partitioned along the
+    window axis with `np.partition` at just the order statistics each
+    confidence level needs (O(window) per window instead of a sort). Rows
+    are processed in chunks so the partitioned copy stays within
+    `max_chunk_bytes`. VaR matches `calculate_var` (np.percentile with
+    linear interpolation) and CVaR matches `calculate_cvar`.
+
+    Parameters:
+    returns (np.array): Daily returns of shape (T, N) without missing values
+    window (int): Number of observations per window
+    confidence_levels (tuple): Confidence levels, e.g. (0.95, 0.99)
+    max_chunk_bytes (int): Memory budget for one chunk of windows
+
+    Returns:
+    dict: "var" and "cvar" of shape (levels, T - window + 1, N) and
+    "volatility" (daily standard deviation) of shape (T - window + 1, N),
+    row i covering returns i .. i + window - 1
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    if returns.ndim == 1:
+        returns = returns[:, np.newaxis]
+    num_obs, num_assets = returns.shape
+    if window < 2 or window > num_obs:
+        raise ValueError(f"Window must be between 2 and the number of observations ({num_obs}), got {window}.")
+
+    lower, upper, fraction = _quantile_positions(window, confidence_levels)
+    kth = np.unique(np.concatenate([lower, upper]))
+    num_windows = num_obs - window + 1
+
+    var = np.empty((len(lower), num_windows, num_assets))
+    cvar = np.empty_like(var)
+    volatility = np.empty((num_windows, num_assets))
+
+    # (num_windows, N, window) view without copying the returns
+    view = sliding_window_view(returns, window, axis=0)
+    chunk_size = max(1, int(max_chunk_bytes // (8 * num_assets * window)))
+    for start in range(0, num_windows, chunk_size):
+        stop = min(start + chunk_size, num_windows)
+        windows = np.partition(view[start:stop], kth, axis=-1)
+        var[:, start:stop], cvar[:, start:stop] = _var_cvar(windows, lower, upper, fraction)
+        volatility[start:stop] = windows.std(axis=-1, ddof=1)
+
+    return {"var": var, "cvar": cvar, "volatility": volatility}
+
+# ---------------------------
+# INCREMENTAL ENGINE
+# ---------------------------
+
+class RollingRisk:
+    """
+    Rolling VaR, CVaR and volatility for a set of tickers over one window,
+    computed in bulk once and then updated bar by bar.
+
+    Each ticker's current window is kept sorted, so a new bar removes the
+    oldest return and inserts the new one with one vectorized shift across
+    all tickers (O(window) per ticker) instead of recomputing the history.
+    """
+
+    def __init__(self, returns, window, confidence_levels=(0.95,), periods_per_year=252):
+        """
+        Parameters:
+        returns (pd.DataFrame): Daily returns, one column per ticker
+        window (int): Number of observations per window
+        confidence_levels (tuple): Confidence levels, e.g. (0.95, 0.99)
+        periods_per_year (int): Used to annualize volatility
+        """
+        self.tickers = list(returns.columns)
+        self.window = window
+        self.confidence_levels = tuple(confidence_levels)
+        self.periods_per_year = periods_per_year
+        self._lower, self._upper, self._fraction = _quantile_positions(window, self.confidence_levels)
+
+        values = returns.to_numpy(dtype=np.float64)
+        metrics = rolling_risk_metrics(values, window, self.confidence_levels)
+        self._dates = list(returns.index[window - 1:])
+        self._var = list(metrics["var"].transpose(1, 0, 2))
+        self._cvar = list(metrics["cvar"].transpose(1, 0, 2))
+        self._volatility = list(metrics["volatility"])
+
+        # Current window per ticker, in arrival order (ring buffer) and sorted
+        self._ring = values[-window:].T.copy()
+        self._head = 0
+        self._sorted = np.sort(self._ring, axis=1)
+        self.nobs = len(values)
+        self.last_date = returns.index[-1]
+
+    def update(self, date, new_returns):
+        """
+        Slide every window forward by one bar.
+
+        Parameters:
+        date (pd.Timestamp): Date of the new bar
+        new_returns (np.array): One return per ticker, in ticker order
+        """
+        new = np.asarray(new_returns, dtype=np.float64)
+        old = self._ring[:, self._head].copy()
+        self._ring[:, self._head] = new
+        self._head = (self._head + 1) % self.window
+
+        rows = np.arange(len(self.tickers))
+        columns = np.arange(self.window)
+
+        # Drop one copy of the oldest return from each sorted row
+        drop = (self._sorted < old[:, np.newaxis]).sum(axis=1)
+        kept = self._sorted[columns != drop[:, np.newaxis]].reshape(len(rows), self.window - 1)
+
+        # Insert the new return at its sorted position
+        insert = (kept < new[:, np.newaxis]).sum(axis=1)
+        source = columns - (columns > insert[:, np.newaxis])
+        self._sorted = np.take_along_axis(kept, np.minimum(source, self.window - 2), axis=1)
+        self._sorted[rows, insert] = new
+
+        var, cvar = _var_cvar(self._sorted, self._lower, self._upper, self._fraction)
+        self._dates.append(date)
+        self._var.append(var)
+        self._cvar.append(cvar)
+        self._volatility.append(self._sorted.std(axis=1, ddof=1))
+        self.nobs += 1
+        self.last_date = date
+
+    def extend(self, returns):
+        """
+        Bring the engine up to date with a return frame that extends the one
+        it was built from.
+
+        Parameters:
+        returns (pd.DataFrame): Daily returns including the new bars
+
+        Returns:
+        bool: False if `returns` does not extend the engine's data, in which
+        case nothing is changed and the engine should be rebuilt
+        """
+        if (list(returns.columns) != self.tickers or len(returns) < self.nobs
+                or returns.index[self.nobs - 1] != self.last_date):
+            return False
+        new_rows = returns.iloc[self.nobs:]
+        for date, row in zip(new_rows.index, new_rows.to_numpy(dtype=np.float64)):
+            self.update(date, row)
+        return True
+
+    def series(self):
+        """
+        Return the full rolling history as DataFrames.
+
+        Returns:
+        dict: "var" and "cvar" keyed by confidence level, plus annualized
+        "volatility", each a DataFrame indexed by window end date with one
+        column per ticker
+        """
+        index = pd.DatetimeIndex(self._dates)
+        var = np.stack(self._var, axis=1)
+        cvar = np.stack(self._cvar, axis=1)
+        volatility = np.stack(self._volatility) * np.sqrt(self.periods_per_year)
+        return {
+            "var": {level: pd.DataFrame(var[i], index=index, columns=self.tickers)
+                    for i, level in enumerate(self.confidence_levels)},
+            "cvar": {level: pd.DataFrame(cvar[i], index=index, columns=self.tickers)
+                     for i, level in enumerate(self.confidence_levels)},
+            "volatility": pd.DataFrame(volatility, index=index, columns=self.tickers),
+        }
+
+
+class RiskEngines:
+    """
+    Thread-safe LRU of `RollingRisk` engines keyed by (tickers, window,
+    confidence levels). An engine is extended in place when new bars
+    arrive and rebuilt when the history it was built from changed.
+
+    The registry lock only guards the lookup; each engine has its own lock,
+    so a cold build blocks requests for that engine alone.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {"lock": threading.Lock(), "engine": None}
+            self._entries.move_to_end(key)
+            # An evicted engine still being built finishes for its caller, then is dropped
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return entry
+
+    def series(self, returns, window, confidence_levels=(0.95,)):
+        """
+        Return the rolling history of `returns`, bringing the cached engine
+        up to date first.
+
+        Parameters:
+        returns (pd.DataFrame): Daily returns, one column per ticker
+        window (int): Number of observations per window
+        confidence_levels (tuple): Confidence levels
+
+        Returns:
+        dict: Snapshot of `RollingRisk.series` covering all of `returns`
+        """
+        entry = self._entry((tuple(returns.columns), window, tuple(confidence_levels)))
+        with entry["lock"]:
+            engine = entry["engine"]
+            if engine is None or not engine.extend(returns):
+                engine = entry["engine"] = RollingRisk(returns, window, confidence_levels)
+            # Copied out under the lock, so a later extend cannot change it
+            return engine.series()
@@ -0,0 +1,191 @@
+import logging
+import warnings
+import itertools
+
+import numpy as np
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+from statsmodels.tsa.stattools import acf
+
+from scripts.arima_search import estimate_d, grid_search, run_with_timeout, FitTimeout
+
+# Seasonal periods longer than this are modelled with Fourier regressors
+# instead of a seasonal state, whose size grows with the period
+MAX_STATE_PERIOD = 24
+
+# Candidate periods in trading days: week, month, twelve/twenty-four bars, quarter, year
+CANDIDATE_PERIODS = (5, 12, 21, 24, 63, 252)
+
+# ---------------------------
+# SEASONALITY
+# ---------------------------
+
+def detect_seasonal_periods(values, d=1, candidates=CANDIDATE_PERIODS, z=1.96, max_periods=None):
+    """
+    Keep the candidate periods that show up in the autocorrelation of the
+    differenced series: the ACF at the period must exceed the approximate
+    significance bound z/sqrt(n) and be a local peak.
+
+    Parameters:
+    values (np.array): Time series values
+    d (int): Number of differences applied before the ACF
+    candidates (tuple): Candidate seasonal periods
+    z (float): Critical value for the significance bound
+    max_periods (int): Keep at most this many periods, those with the
+        highest autocorrelation
+
+    Returns:
+    list: Detected periods in ascending order
+    """
+    x = np.diff(np.asarray(values, dtype=np.float64), n=d) if d else np.asarray(values, dtype=np.float64)
+    usable = [m for m in candidates if 2 * m + 1 < len(x)]
+    if not usable:
+        return []
+    correlations = acf(x, nlags=max(usable) + 1, fft=True)
+    bound = z / np.sqrt(len(x))
+    detected = [m for m in usable
+                if correlations[m] > bound
+                and correlations[m] >= correlations[m - 1]
+                and correlations[m] >= correlations[m + 1]]
+    if max_periods is not None:
+        detected = sorted(sorted(detected, key=lambda m: correlations[m], reverse=True)[:max_periods])
+    return detected
+
+
+def fourier_terms(start, steps, period, num_terms):
+    """
+    Build sine/cosine regressors for a seasonal period.
+
+    Parameters:
+    start (int): Index of the first observation
+    steps (int): Number of rows to generate
+    period (int): Seasonal period
+    num_terms (int): Number of harmonics K
+
+    Returns:
+    np.array: Array of shape (steps, 2 * num_terms)
+    """
+    t = np.arange(start, start + steps)[:, None]
+    k = np.arange(1, num_terms + 1)[None, :]
+    angle = 2 * np.pi * k * t / period
+    return np.hstack([np.sin(angle), np.cos(angle)])
+
+# ---------------------------
+# FITTING
+# ---------------------------
+
+def build_sarima(series, spec):
+    """
+    Build a SARIMAX model for a search result.
+
+    Parameters:
+    series (pd.Series or np.array): Time series data
+    spec (tuple): (order, seasonal_order, fourier) where `fourier` is
+        (period, num_terms) or None
+
+    Returns:
+    SARIMAX: Unfitted model
+    """
+    order, seasonal_order, fourier = spec
+    exog = fourier_terms(0, len(series), *fourier) if fourier else None
+    return SARIMAX(series, order=order, seasonal_order=seasonal_order, exog=exog)
+
+
+def forecast_exog(spec, nobs, steps):
+    """
+    Return the exogenous regressors needed to forecast `steps` ahead.
+
+    Parameters:
+    spec (tuple): Search result, see `build_sarima`
+    nobs (int): Number of observations the model was fitted on
+    steps (int): Forecast horizon
+
+    Returns:
+    np.array: Future Fourier terms, or None
+    """
+    fourier = spec[2]
+    return fourier_terms(nobs, steps, *fourier) if fourier else None
+
+
+def _fit_sarima(values, spec):
+    warnings.filterwarnings("ignore")
+    return build_sarima(values, spec).fit(disp=False).aic
+
+
+def fit_sarima_aic(values, spec, timeout=None):
+    """
+    Fit one SARIMA candidate and return its AIC, or inf if the fit fails,
+    times out or exceeds the worker's memory limit.
+
+    Parameters:
+    values (np.array): Time series values
+    spec (tuple): Candidate, see `build_sarima`
+    timeout (float): Time limit in seconds for this fit
+
+    Returns:
+    tuple: (spec, aic)
+    """
+    try:
+        return spec, run_with_timeout(_fit_sarima, timeout, values, spec)
+    except FitTimeout:
+        logging.warning(f"SARIMA{spec} fit timed out after {timeout}s")
+        return spec, float("inf")
+    except MemoryError:
+        logging.warning(f"SARIMA{spec} fit exceeded the worker memory limit")
+        return spec, float("inf")
+    except Exception:
+        return spec, float("inf")
+
+# ---------------------------
+# ORDER SEARCH
+# ---------------------------
+
+def search_sarima_order(series, max_p=2, max_d=1, max_q=2, max_P=1, max_D=1, max_Q=1,
+                        candidate_periods=CANDIDATE_PERIODS, max_periods=1, max_fourier_terms=3,
+                        n_jobs=None, fit_timeout=120, memory_limit=2 * 1024 ** 3):
+    """
+    Find the SARIMA specification with the lowest AIC.
+
+    d is chosen with ADF tests and seasonal periods are taken from the ACF,
+    so only periods present in the data are tried, and only the
+    `max_periods` with the strongest autocorrelation, since each period
+    adds up to (max_P+1)(max_D+1)(max_Q+1) - 1 fits per non-seasonal
+    order. Periods up to MAX_STATE_PERIOD get a seasonal (P, D, Q, m)
+    state; longer periods (e.g. 252) are modelled with 1..max_fourier_terms
+    Fourier harmonics as exogenous regressors. Candidates are fitted in a
+    process pool whose workers each have a memory limit.
+
+    Parameters:
+    series (pd.Series): Time series data
+    max_p (int): Maximum non-seasonal p value
+    max_d (int): Maximum non-seasonal d value
+    max_q (int): Maximum non-seasonal q value
+    max_P (int): Maximum seasonal P value
+    max_D (int): Maximum seasonal D value
+    max_Q (int): Maximum seasonal Q value
+    candidate_periods (tuple): Seasonal periods to test for
+    max_periods (int): Most detected periods to search over
+    max_fourier_terms (int): Maximum Fourier harmonics for long periods
+    n_jobs (int): Number of worker processes (1 runs in the calling process)
+    fit_timeout (float): Per-fit time limit in seconds
+    memory_limit (int): Per-worker memory limit in bytes
+
+    Returns:
+    tuple: (best_spec, best_aic, number_of_fits)
+    """
+    values = np.asarray(series, dtype=np.float64)
+    d = estimate_d(values, max_d)
+    periods = detect_seasonal_periods(values, d, candidate_periods, max_periods=max_periods)
+    logging.info(f"SARIMA search: d={d}, detected seasonal periods {periods}")
+
+    orders = [(p, d, q) for p in range(max_p + 1) for q in range(max_q + 1)]
+    seasonal = [((0, 0, 0, 0), None)]
+    for m in periods:
+        if m <= MAX_STATE_PERIOD:
+            seasonal += [((P, D, Q, m), None) for P, D, Q in
+                         itertools.product(range(max_P + 1), range(max_D + 1), range(max_Q + 1))
+                         if (P, D, Q) != (0, 0, 0)]
+        else:
+            seasonal += [((0, 0, 0, 0), (m, k)) for k in range(1, min(max_fourier_terms, m // 2) + 1)]
+
+    candidates = [(order, seasonal_order, fourier) for order in orders for seasonal_order, fourier in seasonal]
+    return grid_search(fit_sarima_aic, values, candidates, n_jobs, fit_timeout, memory_limit)
@@ -0,0 +1,207 @@
+"""
+Serve the app with gunicorn instead of `app.run(debug=True)`, as one
+server or split into a threaded "data" role and a "models" role.
+
+Usage: gunicorn -c gunicorn.conf.py app:app   (role from SERVING_ROLE)
+       python -m scripts.serving [--role data] [--bind 0.0.0.0:5000] [--routes]
+"""
+import gc
+import os
+import sys
+import logging
+import argparse
+
+# ---------------------------
+# ROLES
+# ---------------------------
+
+# "data" endpoints mostly wait on disk, the network or BLAS and share threaded
+# workers; "models" endpoints spend seconds of CPU per request, one per worker
+SERVING_ROLES = {
+    "data": {
+        "bind": "0.0.0.0:5000",
+        "worker_class": "gthread",
+        "threads": 8,
+        "timeout": 120,
+        "paths": ("/api/analyze", "/api/market-trend", "/api/efficient-frontier", "/api/optimize", "/api/risk",
+                  "/api/portfolio-risk", "/api/images", "/api/jobs", "/api/cache", "/metrics", "/healthz", "/readyz")
+    },
+    "models": {
+        "bind": "0.0.0.0:5001",
+        "worker_class": "sync",
+        "threads": 1,
+        "timeout": 900,
+        "paths": ("/api/forecast", "/api/backtest")
+    },
+    "all": {
+        "bind": "0.0.0.0:5000",
+        "worker_class": "gthread",
+        "threads": 4,
+        "timeout": 900,
+        "paths": ("/",)
+    }
+}
+
+# Backends that start threads on import (TensorFlow's runtime), which do not
+# survive a fork; these are loaded in each worker after it starts instead
+FORK_UNSAFE_BACKENDS = ("lstm",)
+
+
+def role_for_path(path):
+    """
+    Return the role serving a request path in a split deployment.
+
+    Parameters:
+    path (str): Request path, e.g. "/api/forecast/batch"
+
+    Returns:
+    str: "data" or "models"
+    """
+    for role in ("models", "data"):
+        if any(path == prefix or path.startswith(prefix + "/") for prefix in SERVING_ROLES[role]["paths"]):
+            return role
+    return "data"
+
+
+def nginx_routes(upstreams=None):
+    """
+    Render nginx location blocks sending each role's paths to its server.
+
+    Parameters:
+    upstreams (dict): Role -> "host:port", defaults to each role's bind
+
+    Returns:
+    str: Configuration snippet
+    """
+    upstreams = upstreams or {}
+    blocks = []
+    for role in ("models", "data"):
+        target = upstreams.get(role, SERVING_ROLES[role]["bind"].replace("0.0.0.0", "127.0.0.1"))
+        for path in SERVING_ROLES[role]["paths"]:
+            blocks.append(f"location {path} {{\n    proxy_pass http://{target};\n    proxy_buffering off;\n}}")
+    return "\n".join(blocks) + "\n"
+
+# ---------------------------
+# WORKER LIFECYCLE HOOKS
+# ---------------------------
+
+def _app_module():
+    # Already imported by the time the hooks run: in the master with preload_app, else in the worker
+    import app
+    return app
+
+
+def when_ready(server):
+    # Master process, after the preloaded app is imported and before the first fork
+    if not server.cfg.preload_app:
+        return
+    app = _app_module()
+    report = app.warmup(backends=[name for name in app.WARMUP_BACKENDS if name not in FORK_UNSAFE_BACKENDS])
+    # Move everything loaded so far out of the collector's reach: collections
+    # in the workers would otherwise write to, and so un-share, these pages
+    gc.freeze()
+    server.log.info(f"Warmed up in {report['seconds']:.1f}s; {gc.get_freeze_count()} objects shared with workers")
+
+
+def post_worker_init(worker):
+    app = _app_module()
+    if not worker.cfg.preload_app:
+        app.warmup()
+        return
+    fork_unsafe = [name for name in app.WARMUP_BACKENDS if name in FORK_UNSAFE_BACKENDS]
+    if fork_unsafe:
+        from scripts.backends import preload_backends
+
+        preload_backends(fork_unsafe)
+
+
+def worker_exit(server, worker):
+    # Stop this worker's fit pools so their processes do not outlive it
+    from scripts.arima_search import shutdown_pools
+
+    shutdown_pools()
+
+# ---------------------------
+# CONFIGURATION
+# ---------------------------
+
+def gunicorn_config(role="all", **overrides):
+    """
+    Build gunicorn settings for a serving role. Environment variables
+    override the defaults: SERVING_BIND, WEB_CONCURRENCY (workers),
+    SERVING_THREADS, SERVING_TIMEOUT and SERVING_MAX_REQUESTS.
+
+    Parameters:
+    role (str): "data", "models" or "all"
+    **overrides: Settings that take precedence over both, e.g. workers=2
+
+    Returns:
+    dict: Setting name -> value, as in a gunicorn config file
+    """
+    if role not in SERVING_ROLES:
+        raise ValueError(f"Unknown serving role '{role}'. Choose from {sorted(SERVING_ROLES)}.")
+    defaults = SERVING_ROLES[role]
+    config = {
+        "bind": os.environ.get("SERVING_BIND", defaults["bind"]),
+        "workers": int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        "worker_class": defaults["worker_class"],
+        "threads": int(os.environ.get("SERVING_THREADS", defaults["threads"])),
+        "timeout": int(os.environ.get("SERVING_TIMEOUT", defaults["timeout"])),
+        # Finish in-flight requests on SIGTERM before the worker exits
+        "graceful_timeout": 30,
+        "keepalive": 5,
+        "preload_app": True,
+        # Recycle sync workers now and then to return memory fragmented by model
+        # fits; a threaded worker restarting would drop its kept-alive connections
+        "max_requests": int(os.environ.get("SERVING_MAX_REQUESTS", 200 if defaults["worker_class"] == "sync" else 0)),
+        "max_requests_jitter": 20,
+        "when_ready": when_ready,
+        "post_worker_init": post_worker_init,
+        "worker_exit": worker_exit,
+        "accesslog": "-",
+        "proc_name": f"portfolio-{role}"
+    }
+    config.update(overrides)
+    return config
+
+
+def serve(role="all", **overrides):
+    """
+    Run the app under gunicorn in this process, without a config file.
+
+    Parameters:
+    role (str): "data", "models" or "all"
+    **overrides: Settings that take precedence over the role defaults
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        sys.exit("gunicorn is not installed; pip install -r requirements.txt")
+
+    config = gunicorn_config(role, **overrides)
+
+    class Application(BaseApplication):
+        def load_config(self):
+            for name, value in config.items():
+                if name in self.cfg.settings and value is not None:
+                    self.cfg.set(name, value)
+
+        def load(self):
+            return _app_module().app
+
+    Application().run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--role", choices=sorted(SERVING_ROLES), default=os.environ.get("SERVING_ROLE", "all"))
+    parser.add_argument("--bind", default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--routes", action="store_true", help="Print nginx locations for a data/models split and exit")
+    args = parser.parse_args()
+
+    if args.routes:
+        print(nginx_routes(), end="")
+        sys.exit(0)
+    logging.basicConfig(level=logging.INFO)
+    serve(args.role, **{name: value for name, value in (("bind", args.bind), ("workers", args.workers)) if value})
@@ -0,0 +1,30 @@
+import os
+
+import pytest
+
+from scripts.arima_search import shutdown_pools
+from scripts.fixtures import disable_yfinance, fixture_fetcher
+
+
+@pytest.fixture(scope="session")
+def app_module(tmp_path_factory):
+    """
+    The app with its on-disk state in temporary directories and prices
+    from seeded fixtures instead of Yahoo Finance.
+    """
+    for name in ("PRICE_STORE_DIR", "MODEL_REGISTRY_DIR", "IMAGE_CACHE_DIR", "JOB_STORE_DIR"):
+        os.environ[name] = str(tmp_path_factory.mktemp(name.lower()))
+    disable_yfinance()
+    # Workers forked by earlier tests would import the app with the default directories
+    shutdown_pools()
+
+    import app
+
+    app.PRICE_STORE.fetcher = fixture_fetcher(model="gbm")
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    app_module.RESPONSE_CACHE.invalidate()
+    return app_module.app.test_client()
@@ -0,0 +1,70 @@
+import warnings
+
+import pytest
+
+from scripts.arima_search import estimate_d, grid_search, search_arima_order, stepwise_search
+from scripts.fixtures import ARIMA_FIXTURES, arima_series
+
+
+def bowl(centre):
+    """
+    Fit function with a convex AIC surface over (p, q), lowest at `centre`.
+    """
+    def fit(values, order, timeout=None):
+        p, _, q = order
+        return order, float((p - centre[0]) ** 2 + (q - centre[1]) ** 2)
+
+    return fit
+
+
+def neighbours(order, max_p=5, max_q=5):
+    p, d, q = order
+    steps = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, 1), (-1, 1), (1, -1)]
+    return [(p + dp, d, q + dq) for dp, dq in steps if 0 <= p + dp <= max_p and 0 <= q + dq <= max_q]
+
+
+@pytest.mark.parametrize("centre", [(0, 0), (4, 1), (5, 5), (2, 4)])
+def test_stepwise_finds_the_grid_minimum_on_a_convex_surface(centre):
+    fit = bowl(centre)
+    initial = [(2, 1, 2), (0, 1, 0), (1, 1, 0), (0, 1, 1)]
+    candidates = [(p, 1, q) for p in range(6) for q in range(6)]
+
+    grid = grid_search(fit, None, candidates, n_jobs=1)
+    stepwise = stepwise_search(fit, None, initial, neighbours, n_jobs=1)
+
+    assert stepwise[0] == grid[0] == (centre[0], 1, centre[1])
+    assert stepwise[2] < grid[2]
+
+
+def test_stepwise_respects_max_fits():
+    initial = [(2, 1, 2), (0, 1, 0), (1, 1, 0), (0, 1, 1)]
+
+    # The far corner needs several rounds; a budget of the initial fits allows none
+    best, _, fits = stepwise_search(bowl((5, 5)), None, initial, neighbours, n_jobs=1, max_fits=4)
+
+    assert fits == 4
+    assert best == (2, 1, 2)
+
+
+@pytest.mark.parametrize("name", sorted(ARIMA_FIXTURES))
+def test_stepwise_order_matches_grid_order(name):
+    ar, ma, d = ARIMA_FIXTURES[name]
+    series = arima_series(ar, ma, d, 1000, seed=0)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        grid = search_arima_order(series, max_p=3, max_q=3, method="grid", n_jobs=1)
+        stepwise = search_arima_order(series, max_p=3, max_q=3, method="stepwise", n_jobs=1)
+
+    # Both search at the same ADF-selected d
+    assert grid[0][1] == stepwise[0][1] == estimate_d(series)
+    assert stepwise[0] == grid[0]
+    assert stepwise[1] == pytest.approx(grid[1])
+    assert stepwise[2] <= grid[2]
+
+
+@pytest.mark.parametrize("name", sorted(ARIMA_FIXTURES))
+def test_estimate_d_recovers_the_order_of_integration(name):
+    ar, ma, d = ARIMA_FIXTURES[name]
+
+    assert estimate_d(arima_series(ar, ma, d, 1000, seed=0)) == d
@@ -0,0 +1,243 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import scripts.backtest as backtest
+from scripts.backtest import (forecast_errors, holding_period_returns, performance_summary, rebalance_points,
+                              rolling_moments, walk_forward_forecast, walk_forward_portfolio)
+from scripts.covariance import CovarianceModel
+from scripts.fixtures import fixture_frame
+from scripts.optimizer import slsqp_portfolio
+
+
+@pytest.fixture(scope="module")
+def returns():
+    return fixture_frame(4, 600, model="gbm", seed=8).pct_change().dropna()
+
+# ---------------------------
+# REBALANCE SCHEDULE
+# ---------------------------
+
+def test_rebalance_points_leave_out_of_sample_data():
+    assert rebalance_points(100, 60, 15) == [60, 75, 90]
+    with pytest.raises(ValueError, match="out-of-sample"):
+        rebalance_points(100, 100, 5)
+    with pytest.raises(ValueError):
+        rebalance_points(100, 1, 5)
+    with pytest.raises(ValueError):
+        rebalance_points(100, 60, 0)
+
+
+@pytest.mark.parametrize("step", [1, 7, 60, 200])
+def test_rolling_moments_match_each_window(returns, step):
+    values = returns.to_numpy()
+    points = rebalance_points(len(values), 60, step)
+
+    means, covs = rolling_moments(values, points, 60)
+
+    for i, t in enumerate(points):
+        window = values[t - 60:t]
+        np.testing.assert_allclose(means[i], window.mean(axis=0), rtol=1e-9, atol=1e-15)
+        np.testing.assert_allclose(covs[i], np.cov(window, rowvar=False), rtol=1e-7, atol=1e-13)
+
+# ---------------------------
+# HOLDINGS AND PERFORMANCE
+# ---------------------------
+
+def test_holdings_drift_between_rebalances(returns):
+    values = returns.to_numpy()[:50]
+    points = [10, 25, 40]
+    weights = np.array([[0.25] * 4, [0.7, 0.1, 0.1, 0.1], [0.0, 0.0, 0.5, 0.5]])
+
+    daily, turnover = holding_period_returns(values, points, weights)
+
+    # Buy units at each rebalance and mark them to market every day
+    wealth, expected, expected_turnover = 1.0, [], []
+    prices = np.vstack([np.ones(4), np.cumprod(1 + values, axis=0)])
+    holdings = None
+    for i, (start, stop) in enumerate(zip(points, points[1:] + [len(values)])):
+        if holdings is not None:
+            drifted = holdings * prices[start] / wealth
+            expected_turnover.append(np.abs(weights[i] - drifted).sum())
+        else:
+            expected_turnover.append(1.0)
+        holdings = wealth * weights[i] / prices[start]
+        for day in range(start, stop):
+            new_wealth = holdings @ prices[day + 1]
+            expected.append(new_wealth / wealth - 1)
+            wealth = new_wealth
+    np.testing.assert_allclose(daily, expected, rtol=1e-10, atol=1e-14)
+    np.testing.assert_allclose(turnover, expected_turnover, rtol=1e-10)
+
+
+def test_performance_summary():
+    daily = np.array([0.1, -0.2, 0.05, 0.1, -0.1])
+
+    summary = performance_summary(daily, periods_per_year=5)
+
+    wealth = np.cumprod(1 + daily)
+    assert summary["total_return"] == pytest.approx(wealth[-1] - 1)
+    assert summary["annualized_return"] == pytest.approx(wealth[-1] - 1)
+    assert summary["annualized_volatility"] == pytest.approx(np.std(daily, ddof=1) * np.sqrt(5))
+    # Peak 1.1 after the first day, trough 0.88 after the second
+    assert summary["max_drawdown"] == pytest.approx(0.2)
+    assert performance_summary(np.zeros(3))["sharpe_ratio"] is None
+
+# ---------------------------
+# PORTFOLIO WALK-FORWARD
+# ---------------------------
+
+def test_walk_forward_portfolio_optimizes_every_window(returns):
+    result = walk_forward_portfolio(returns, lookback=120, step=40, n_jobs=1, chunk_size=3)
+
+    points = rebalance_points(len(returns), 120, 40)
+    assert set(result) == {"max_sharpe", "min_volatility", "equal_weight"}
+    assert list(result["min_volatility"]["weights"].index) == list(returns.index[points])
+    np.testing.assert_allclose(result["equal_weight"]["weights"], 0.25)
+    assert result["max_sharpe"]["returns"].index[0] == returns.index[120]
+    values = returns.to_numpy()
+    for i, t in enumerate(points):
+        model = CovarianceModel(matrix=np.cov(values[t - 120:t], rowvar=False) * 252)
+        expected = slsqp_portfolio(values[t - 120:t].mean(axis=0) * 252, model, "min_volatility")
+        weights = result["min_volatility"]["weights"].iloc[i].to_numpy()
+        assert model.volatility(weights) == pytest.approx(model.volatility(expected), rel=1e-4)
+        assert result["min_volatility"]["predicted_volatility"].iloc[i] == pytest.approx(model.volatility(weights))
+
+
+def test_pool_and_serial_runs_agree(returns):
+    options = dict(lookback=120, step=20, strategies=("min_volatility",), chunk_size=4)
+
+    serial = walk_forward_portfolio(returns, n_jobs=1, **options)
+    pooled = walk_forward_portfolio(returns, n_jobs=2, **options)
+
+    pd.testing.assert_frame_equal(pooled["min_volatility"]["weights"], serial["min_volatility"]["weights"])
+    pd.testing.assert_series_equal(pooled["min_volatility"]["returns"], serial["min_volatility"]["returns"])
+
+
+def test_constraints_and_other_estimators_use_the_qp(returns):
+    result = walk_forward_portfolio(returns, lookback=120, step=60, strategies=("max_sharpe",),
+                                    covariance={"method": "ledoit_wolf"}, constraints={"max_weight": 0.3}, n_jobs=1)
+
+    weights = result["max_sharpe"]["weights"].to_numpy()
+    assert weights.max() <= 0.3 + 1e-6
+    np.testing.assert_allclose(weights.sum(axis=1), 1.0, atol=1e-6)
+    with pytest.raises(ValueError, match="'qp' optimizer"):
+        walk_forward_portfolio(returns, constraints={"max_weight": 0.3}, optimizer="slsqp")
+    with pytest.raises(ValueError, match="Unknown strategies"):
+        walk_forward_portfolio(returns, strategies=("momentum",))
+
+# ---------------------------
+# FORECAST WALK-FORWARD
+# ---------------------------
+
+@pytest.fixture
+def naive_backend(monkeypatch):
+    # Forecasts the last price it has seen; update appends the new bars
+    calls = {"fit": 0, "update": 0}
+
+    def fit(series):
+        calls["fit"] += 1
+        return {"model": np.asarray(series, dtype=float)}
+
+    def update(entry, new_values):
+        calls["update"] += 1
+        assert new_values.index[0] == entry["nobs"]
+        return np.concatenate([entry["model"], new_values.to_numpy()])
+
+    def forecast(entry, series, horizon):
+        assert len(entry["model"]) == len(series)
+        return np.full(horizon, entry["model"][-1]), None
+
+    monkeypatch.setattr(backtest, "get_backend", lambda name: SimpleNamespace(fit=fit, update=update,
+                                                                                forecast=forecast))
+    return calls
+
+
+@pytest.mark.parametrize("refit", ["update", "full"])
+def test_forecasts_only_see_data_before_their_origin(naive_backend, refit):
+    series = fixture_frame(1, 300, seed=4)["T0"]
+
+    forecasts = walk_forward_forecast(series, "naive", lookback=200, step=30, horizon=5, refit=refit, n_jobs=1)
+
+    # Origins are the last bar before each rebalance position 200, 230, 260 and 290
+    assert list(forecasts.index.unique()) == list(series.index[[199, 229, 259, 289]])
+    assert len(forecasts) == 4 * 5
+    np.testing.assert_array_equal(forecasts["forecast"], forecasts["last"])
+    np.testing.assert_array_equal(forecasts["actual"].to_numpy()[:5], series.to_numpy()[200:205])
+    assert (naive_backend["fit"], naive_backend["update"]) == ((1, 3) if refit == "update" else (4, 0))
+
+
+def test_forecast_errors_match_sklearn():
+    from sklearn.metrics import mean_absolute_error, mean_squared_error
+
+    forecasts = pd.DataFrame({
+        "step": [1, 2, 1, 2],
+        "last": [100.0, 100.0, 110.0, 110.0],
+        "forecast": [101.0, 102.0, 110.0, 108.0],
+        "actual": [102.0, 99.0, 111.0, 105.0]
+    })
+
+    errors = forecast_errors(forecasts)
+
+    overall = errors["overall"]
+    assert overall["mae"] == pytest.approx(mean_absolute_error(forecasts["actual"], forecasts["forecast"]))
+    assert overall["rmse"] == pytest.approx(np.sqrt(mean_squared_error(forecasts["actual"], forecasts["forecast"])))
+    assert overall["naive_mae"] == pytest.approx(9 / 4)
+    # Up/up right, up/down wrong, no predicted move skipped, down/down right
+    assert overall["directional_accuracy"] == pytest.approx(2 / 3)
+    assert errors["by_step"][1]["mape"] == pytest.approx((1 / 102 + 1 / 111) / 2)
+
+
+def test_invalid_forecast_backtests_are_rejected(naive_backend):
+    series = fixture_frame(1, 100, seed=4)["T0"]
+
+    with pytest.raises(ValueError, match="refit"):
+        walk_forward_forecast(series, "naive", lookback=50, refit="sometimes")
+    with pytest.raises(ValueError, match="Not enough data"):
+        walk_forward_forecast(series, "naive", lookback=98, horizon=5)
+
+# ---------------------------
+# ENDPOINT
+# ---------------------------
+
+def test_portfolio_backtest_endpoint(client):
+    response = client.post("/api/backtest", json={"stocks": ["AAA", "BBB", "CCC"], "lookback": 252,
+                                                  "rebalance_every": 63, "max_points": 100})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["format"] == "columnar" and len(body["dates"]) <= 100
+    for name in ("max_sharpe", "min_volatility", "equal_weight"):
+        result = body["results"][name]
+        assert len(result["series"]["wealth"]) == len(body["dates"])
+        assert sum(result["latest_weights"].values()) == pytest.approx(1.0, abs=1e-3)
+        assert result["performance"]["max_drawdown"] >= 0
+
+
+def test_forecast_backtest_endpoint(client):
+    response = client.post("/api/backtest", json={"type": "forecast", "ticker": "AAA", "lookback": 2400,
+                                                  "rebalance_every": 60, "horizon": 3})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["num_forecasts"] == len(body["dates"]) > 0
+    assert set(body["results"]["AAA"]["series"]) == {f"{kind}_{h}" for kind in ("forecast", "actual")
+                                                    for h in (1, 2, 3)}
+    assert set(body["results"]["AAA"]["errors"]["by_step"]) == {"1", "2", "3"}
+
+
+@pytest.mark.parametrize("params", [
+    {"type": "options"},
+    {"optimizer": "slsqp", "max_weight": 0.5},
+    {"previous_weights": [0.5, 0.5], "max_turnover": 0.1},
+    {"lookback": 100000},
+    {"strategies": ["momentum"]},
+    {"type": "forecast", "ticker": "AAA", "model_type": "prophet"},
+])
+def test_backtest_endpoint_rejects_bad_requests(client, params):
+    response = client.post("/api/backtest", json=dict({"stocks": ["AAA", "BBB"]}, **params))
+
+    assert response.status_code == 400
+    assert "error" in response.get_json()
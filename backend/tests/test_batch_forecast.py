@@ -0,0 +1,129 @@
+import json
+
+import pytest
+
+from scripts.encoding import NDJSON
+
+
+@pytest.fixture(autouse=True)
+def quick_arima(monkeypatch):
+    # Skip the order search for fits made in this process
+    from scripts.backends import get_backend
+
+    monkeypatch.setattr(get_backend("arima"), "optimize_arima_params", lambda series: (1, 1, 1))
+
+
+@pytest.fixture
+def without(app_module, monkeypatch):
+    # Serve every ticker except the given ones
+    def exclude(*missing):
+        fetch = app_module.PRICE_STORE.fetcher
+        monkeypatch.setattr(app_module.PRICE_STORE, "fetcher", lambda tickers, start, end: fetch(
+            [ticker for ticker in tickers if ticker not in missing], start, end))
+    return exclude
+
+
+@pytest.fixture
+def fits(app_module, monkeypatch):
+    # Count the fits made in this process
+    calls = []
+    fit = app_module.fit_forecast_model
+
+    def counting(series, model_type):
+        calls.append((series.name, model_type))
+        return fit(series, model_type)
+
+    monkeypatch.setattr(app_module, "fit_forecast_model", counting)
+    return calls
+
+
+def options(*tickers, model_types=("arima",), forecast_period=5):
+    return {"tickers": list(tickers), "model_types": list(model_types), "forecast_period": forecast_period}
+
+# ---------------------------
+# batch_forecast
+# ---------------------------
+
+def test_batch_matches_single_forecasts_and_reuses_the_fits(client, app_module, fits):
+    results = {ticker: result for ticker, _, result in
+               app_module.batch_forecast(options("BF1", "BF2"), n_jobs=1)}
+
+    assert sorted(fits) == [("BF1", "arima"), ("BF2", "arima")]
+    single = client.post("/api/forecast", json={"ticker": "BF2", "forecast_period": 5}).get_json()
+    assert json.loads(json.dumps(results["BF2"])) == single
+    # Both fits are registered, so a second batch fits nothing
+    again = {ticker: result for ticker, _, result in app_module.batch_forecast(options("BF1", "BF2"), n_jobs=1)}
+    assert again == results
+    assert len(fits) == 2
+
+
+def test_missing_data_and_failed_fits_only_affect_their_pair(app_module, monkeypatch, fits, without):
+    without("BF4")
+    fit = app_module.fit_forecast_model
+
+    def failing(series, model_type):
+        if model_type == "sarima":
+            raise ValueError("did not converge")
+        return fit(series, model_type)
+
+    monkeypatch.setattr(app_module, "fit_forecast_model", failing)
+
+    results = {(ticker, model): result for ticker, model, result in
+               app_module.batch_forecast(options("BF3", "BF4", model_types=("arima", "sarima")), n_jobs=1)}
+
+    assert len(results) == 4
+    assert len(results["BF3", "arima"]["predictions"]) == 5
+    assert results["BF3", "sarima"] == {"error": "did not converge"}
+    assert results["BF4", "arima"]["error"].startswith("No data fetched for ticker BF4")
+    assert results["BF4", "sarima"]["error"].startswith("No data fetched for ticker BF4")
+
+
+def test_pool_fits_are_stored_in_the_registry(app_module, fits):
+    results = list(app_module.batch_forecast(options("BF5", "BF6", forecast_period=3), n_jobs=2))
+
+    assert sorted((ticker, model) for ticker, model, _ in results) == [("BF5", "arima"), ("BF6", "arima")]
+    assert all(len(result["predictions"]) == 3 for _, _, result in results)
+    # The fits ran in the workers, and this process reads them back from disk
+    assert fits == []
+    for ticker in ("BF5", "BF6"):
+        version = app_module.PRICE_STORE.version([ticker])[0][1]
+        assert app_module.MODEL_REGISTRY.get(ticker, "arima", version) is not None
+
+# ---------------------------
+# ENDPOINT
+# ---------------------------
+
+def test_batch_endpoint_groups_results_by_ticker(client, without):
+    without("BF8")
+
+    response = client.post("/api/forecast/batch", json={"tickers": ["BF7", "BF8", "BF7"], "forecast_period": 4})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["tickers"] == ["BF7", "BF8"]
+    assert list(body["results"]) == ["BF7"]
+    assert len(body["results"]["BF7"]["arima"]["predictions"]) == 4
+    assert [(item["ticker"], item["model"]) for item in body["failed"]] == [("BF8", "arima")]
+
+
+def test_batch_endpoint_streams_each_forecast(client):
+    response = client.post("/api/forecast/batch", json={"tickers": ["BF7"], "forecast_period": 4},
+                           headers={"Accept": NDJSON})
+
+    lines = [json.loads(line) for line in response.data.splitlines()]
+    assert response.mimetype == NDJSON
+    assert [(line["ticker"], line["model"]) for line in lines[:-1]] == [("BF7", "arima")]
+    assert lines[-1]["failed"] == []
+
+
+@pytest.mark.parametrize("body", [
+    {"tickers": []},
+    {"tickers": ["AAA"], "model_types": ["arima", "prophet"]},
+    {"tickers": ["AAA"], "forecast_period": 0},
+])
+def test_batch_endpoint_rejects_bad_requests(client, body):
+    for headers in ({}, {"Accept": NDJSON}):
+        response = client.post("/api/forecast/batch", json=body, headers=headers)
+
+        assert response.status_code == 400
+        assert "error" in response.get_json()
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.covariance import ledoit_wolf
+
+from scripts.covariance import CovarianceModel, as_covariance_model, estimate_covariance
+from scripts.fixtures import fixture_frame
+
+
+@pytest.fixture
+def returns():
+    # Correlated through a common market factor, with volatility clustering
+    prices = fixture_frame(12, 400)
+    return prices.pct_change().dropna()
+
+
+def test_sample_matches_pandas(returns):
+    model = estimate_covariance(returns, "sample")
+
+    pd.testing.assert_frame_equal(model.to_frame(), returns.cov() * 252, rtol=1e-12)
+
+
+def test_ledoit_wolf_matches_sklearn(returns):
+    model = estimate_covariance(returns, "ledoit_wolf")
+
+    expected, shrinkage = ledoit_wolf(returns.to_numpy())
+    np.testing.assert_allclose(model.matrix, expected * 252, rtol=1e-10)
+    assert model.details["shrinkage"] == pytest.approx(shrinkage, rel=1e-10)
+    assert 0 < shrinkage < 1
+
+
+@pytest.mark.parametrize("halflife", [10, 63])
+def test_ewma_matches_pandas(returns, halflife):
+    model = estimate_covariance(returns, "ewma", halflife=halflife)
+
+    expected = returns.ewm(halflife=halflife).cov().loc[returns.index[-1]]
+    pd.testing.assert_frame_equal(model.to_frame(), expected * 252, rtol=1e-10)
+
+
+@pytest.mark.parametrize("num_factors", [1, 3, 5])
+def test_factor_model_keeps_the_sample_variances(returns, num_factors):
+    model = estimate_covariance(returns, "factor", num_factors=num_factors)
+
+    sample = (returns.cov() * 252).to_numpy()
+    assert model.is_factor
+    assert model.loadings.shape == (12, num_factors)
+    np.testing.assert_allclose(np.diag(model.matrix), np.diag(sample), rtol=1e-10)
+    assert 0 < model.details["explained_variance"] < 1
+
+
+def test_factor_model_arithmetic_matches_the_dense_matrix(returns):
+    model = estimate_covariance(returns, "factor", num_factors=3)
+    dense = as_covariance_model(model.to_frame())
+    weights = np.random.default_rng(0).dirichlet(np.ones(12), size=20)
+
+    np.testing.assert_allclose(model.variance(weights), dense.variance(weights), rtol=1e-10)
+    np.testing.assert_allclose(model.matvec(weights), dense.matvec(weights), rtol=1e-10)
+    np.testing.assert_allclose(model.volatility(weights[0]), np.sqrt(weights[0] @ dense.matrix @ weights[0]))
+    # Unit draws, one per independent normal, reproduce Σ exactly
+    for cov in (model, dense):
+        draws = cov.transform(np.eye(cov.rank))
+        np.testing.assert_allclose(draws.T @ draws, dense.matrix, rtol=1e-10, atol=1e-14)
+
+
+def test_scaled_models_keep_their_factorizations(returns):
+    for method in ("sample", "factor"):
+        model = estimate_covariance(returns, method)
+        model.cholesky
+
+        daily = model.scaled(1 / 252)
+
+        np.testing.assert_allclose(daily.matrix, model.matrix / 252, rtol=1e-12)
+        np.testing.assert_allclose(daily.cholesky @ daily.cholesky.T, daily.matrix, rtol=1e-9, atol=1e-15)
+
+
+def test_cholesky_falls_back_for_singular_matrices():
+    vector = np.array([1.0, 2.0, 3.0])
+    model = CovarianceModel(matrix=np.outer(vector, vector))
+
+    np.testing.assert_allclose(model.cholesky @ model.cholesky.T, model.matrix, atol=1e-12)
+
+
+def test_invalid_options_are_rejected(returns):
+    with pytest.raises(ValueError):
+        estimate_covariance(returns, "shrunk")
+    with pytest.raises(ValueError):
+        estimate_covariance(returns, "ewma", halflife=0)
+    with pytest.raises(ValueError):
+        estimate_covariance(returns, "factor", num_factors=13)
+    with pytest.raises(ValueError):
+        CovarianceModel()
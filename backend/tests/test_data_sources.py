@@ -0,0 +1,209 @@
+import random
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.data_sources import (ConcurrentFetcher, FetchError, FileSource, NoDataError, call_with_retries,
+                                  parse_sources)
+
+
+class StubSource:
+    """
+    Source serving a fixed series, raising `failures[ticker]` for some
+    tickers and blocking on `gate` for those in `slow`.
+    """
+    limiter = None
+
+    def __init__(self, name, prices=None, failures=None, slow=(), gate=None):
+        self.name = name
+        self.prices = prices or {}
+        self.failures = failures or {}
+        self.slow = slow
+        self.gate = gate
+        self.calls = []
+
+    def fetch(self, ticker, start_date, end_date):
+        self.calls.append(ticker)
+        if ticker in self.slow:
+            self.gate.wait(5)
+        if ticker in self.failures:
+            raise self.failures[ticker]
+        if ticker not in self.prices:
+            raise NoDataError(f"{ticker}: unknown")
+        return self.prices[ticker]
+
+
+def prices(value):
+    return pd.Series([value, value + 1.0], index=pd.to_datetime(["2020-01-02", "2020-01-03"]))
+
+
+def flaky(failures, result="ok"):
+    calls = []
+
+    def func():
+        calls.append(None)
+        if len(calls) <= failures:
+            raise ConnectionError("reset by peer")
+        return result
+
+    return func, calls
+
+# ---------------------------
+# RETRIES
+# ---------------------------
+
+@pytest.mark.parametrize("seed", range(5))
+def test_backoff_delays_stay_within_jitter_bound(seed):
+    func, calls = flaky(5)
+    delays = []
+
+    result = call_with_retries(func, attempts=6, base_delay=0.5, max_delay=3.0, sleep=delays.append,
+                               rng=random.Random(seed))
+
+    assert result == "ok"
+    assert len(calls) == 6
+    bounds = [0.5, 1.0, 2.0, 3.0, 3.0]
+    assert len(delays) == len(bounds)
+    for delay, bound in zip(delays, bounds):
+        assert 0 <= delay <= bound
+
+
+def test_backoff_bound_doubles_up_to_cap():
+    class UpperBound:
+        def uniform(self, low, high):
+            return high
+
+    func, _ = flaky(4)
+    delays = []
+
+    call_with_retries(func, attempts=5, base_delay=0.25, max_delay=1.5, sleep=delays.append, rng=UpperBound())
+
+    assert delays == [0.25, 0.5, 1.0, 1.5]
+
+
+def test_last_error_is_raised_after_all_attempts():
+    func, calls = flaky(10)
+    delays = []
+
+    with pytest.raises(ConnectionError):
+        call_with_retries(func, attempts=3, sleep=delays.append)
+
+    assert len(calls) == 3
+    assert len(delays) == 2
+
+
+def test_no_data_is_not_retried():
+    calls, delays = [], []
+
+    def func():
+        calls.append(None)
+        raise NoDataError("delisted")
+
+    with pytest.raises(NoDataError):
+        call_with_retries(func, attempts=5, sleep=delays.append)
+
+    assert len(calls) == 1
+    assert delays == []
+
+# ---------------------------
+# CONCURRENT FETCHER
+# ---------------------------
+
+def test_falls_back_to_next_source():
+    failing = StubSource("down", failures={"AAA": ConnectionError("refused")})
+    empty = StubSource("empty")
+    backup = StubSource("backup", prices={"AAA": prices(1.0), "BBB": prices(2.0)})
+    fetcher = ConcurrentFetcher([failing, empty, backup], attempts=2, base_delay=0)
+
+    frame = fetcher(["AAA", "BBB"], "2020-01-01", "2020-02-01")
+
+    assert sorted(frame.columns) == ["AAA", "BBB"]
+    np.testing.assert_array_equal(frame["AAA"].to_numpy(), [1.0, 2.0])
+    assert frame.attrs == {"errors": {}, "no_data": {}}
+    # The failing source was retried, the empty one was not
+    assert failing.calls.count("AAA") == 2
+    assert empty.calls.count("AAA") == 1
+
+
+def test_errors_and_no_data_are_reported_separately():
+    source = StubSource("stub", prices={"AAA": prices(1.0)}, failures={"BBB": TimeoutError("read timed out")})
+    fetcher = ConcurrentFetcher([source], attempts=2, base_delay=0)
+
+    frame = fetcher(["AAA", "BBB", "ZZZ"], "2020-01-01", "2020-02-01")
+
+    assert list(frame.columns) == ["AAA"]
+    assert frame.attrs["errors"] == {"BBB": "stub: read timed out"}
+    assert frame.attrs["no_data"] == {"ZZZ": "stub: ZZZ: unknown"}
+
+
+def test_transient_failure_in_any_source_makes_a_ticker_retryable():
+    down = StubSource("down", failures={"AAA": ConnectionError("refused")})
+    empty = StubSource("empty")
+    fetcher = ConcurrentFetcher([down, empty], attempts=1)
+
+    with pytest.raises(FetchError):
+        fetcher.fetch_ticker("AAA", "2020-01-01", "2020-02-01")
+    with pytest.raises(NoDataError):
+        ConcurrentFetcher([empty]).fetch_ticker("AAA", "2020-01-01", "2020-02-01")
+
+
+def test_timed_out_ticker_does_not_fail_the_others():
+    gate = threading.Event()
+    source = StubSource("stub", prices={"AAA": prices(1.0), "SLOW": prices(2.0)}, slow=("SLOW",), gate=gate)
+    fetcher = ConcurrentFetcher([source], max_workers=2, timeout=0.2)
+    try:
+        frame = fetcher(["AAA", "SLOW"], "2020-01-01", "2020-02-01")
+    finally:
+        gate.set()
+
+    assert list(frame.columns) == ["AAA"]
+    assert frame.attrs["errors"] == {"SLOW": "timed out after 0.2s"}
+
+# ---------------------------
+# FILE SOURCE
+# ---------------------------
+
+@pytest.fixture
+def csv_dir(tmp_path):
+    index = pd.bdate_range("2020-01-01", "2020-03-31", name="Date")
+    pd.Series(np.arange(len(index), dtype=float), index=index, name="Close").to_csv(tmp_path / "AAA.csv")
+    return tmp_path
+
+
+def test_file_source_reads_the_date_window(csv_dir):
+    close = FileSource(csv_dir).fetch("AAA", "2020-02-03", "2020-03-02")
+
+    assert close.index[0] == pd.Timestamp("2020-02-03")
+    assert close.index[-1] == pd.Timestamp("2020-02-28")
+
+
+def test_file_source_reports_missing_data(csv_dir):
+    source = FileSource(csv_dir)
+
+    with pytest.raises(NoDataError):
+        source.fetch("ZZZ", "2020-01-01", "2020-02-01")
+    with pytest.raises(NoDataError):
+        source.fetch("AAA", "2021-01-01", "2021-02-01")
+
+
+def test_flaky_file_source_is_recovered_by_retries(csv_dir):
+    source = FileSource(csv_dir, failure_rate=0.5, seed=0)
+    fetcher = ConcurrentFetcher([source], attempts=20, base_delay=0)
+
+    frame = fetcher(["AAA"], "2020-01-01", "2020-02-01")
+
+    assert list(frame.columns) == ["AAA"]
+    assert frame.attrs["errors"] == {}
+
+
+def test_parse_sources(csv_dir):
+    sources = parse_sources(f"yahoo, file:{csv_dir}")
+
+    assert [source.name for source in sources] == ["yahoo", "file"]
+    assert sources[1].directory == str(csv_dir)
+    with pytest.raises(ValueError):
+        parse_sources("bloomberg")
+    with pytest.raises(ValueError):
+        parse_sources("")
@@ -0,0 +1,106 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.seasonal import seasonal_decompose
+from statsmodels.tsa.stattools import adfuller
+
+from scripts.eda import adf_test, analyze_frame, moving_average, seasonal_decompose_frame, summary_statistics
+
+
+@pytest.fixture
+def prices():
+    # Random walks with different drifts plus one mean-reverting series, so both ADF outcomes occur
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range("2015-01-01", periods=800)
+    columns = {f"W{i}": 100 * np.exp(np.cumsum(rng.normal(0.0003 * i, 0.015, len(index)))) for i in range(4)}
+    level = np.empty(len(index))
+    level[0] = 0.0
+    for t in range(1, len(index)):
+        level[t] = 0.7 * level[t - 1] + rng.normal(0, 1)
+    columns["MR"] = 100 + level
+    return pd.DataFrame(columns, index=index)
+
+
+def test_adf_matches_statsmodels(prices):
+    results = adf_test(prices.to_numpy())
+
+    assert [result["is_stationary"] for result in results].count(True) >= 1
+    for ticker, result in zip(prices.columns, results):
+        statistic, p_value, _, _, critical_values, _ = adfuller(prices[ticker].to_numpy(), autolag="AIC")
+        assert result["adf_statistic"] == pytest.approx(statistic, rel=1e-9)
+        assert result["p_value"] == pytest.approx(p_value, rel=1e-9)
+        assert result["critical_values"] == pytest.approx(critical_values, rel=1e-12)
+        assert result["is_stationary"] == (p_value < 0.05)
+
+
+def test_adf_rejects_too_short_series():
+    with pytest.raises(ValueError):
+        adf_test(np.ones((3, 2)))
+
+
+@pytest.mark.parametrize("period", [5, 12, 21])
+@pytest.mark.parametrize("model", ["multiplicative", "additive"])
+def test_decomposition_matches_statsmodels(prices, period, model):
+    trend, seasonal, residual = seasonal_decompose_frame(prices.to_numpy(), period, model)
+
+    for i, ticker in enumerate(prices.columns):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            reference = seasonal_decompose(prices[ticker], model=model, period=period)
+        np.testing.assert_allclose(trend[:, i], reference.trend.to_numpy(), rtol=1e-12, equal_nan=True)
+        # Running sums round at the scale of the prices, which additive components near zero inherit
+        np.testing.assert_allclose(seasonal[:, i], reference.seasonal.to_numpy(), rtol=1e-10, atol=1e-10)
+        np.testing.assert_allclose(residual[:, i], reference.resid.to_numpy(), rtol=1e-10, atol=1e-10,
+                                   equal_nan=True)
+
+
+@pytest.mark.parametrize("period", [4, 7])
+def test_moving_average_matches_the_two_sided_filter(prices, period):
+    values = prices.to_numpy()[:60]
+    if period % 2 == 0:
+        weights = np.r_[0.5, np.ones(period - 1), 0.5] / period
+    else:
+        weights = np.ones(period) / period
+    expected = pd.DataFrame(values).rolling(len(weights), center=True).apply(lambda w: w @ weights, raw=True)
+
+    np.testing.assert_allclose(moving_average(values, period), expected.to_numpy(), rtol=1e-12, equal_nan=True)
+
+
+def test_summary_statistics_match_describe(prices):
+    stats = summary_statistics(prices.to_numpy())
+
+    for ticker, result in zip(prices.columns, stats):
+        assert result == pytest.approx(prices[ticker].describe().to_dict(), rel=1e-12)
+
+
+def test_analyze_frame_series_match_pandas(prices):
+    results = analyze_frame(prices, window=30, period=21)
+
+    for ticker in prices.columns:
+        series = results[ticker]["series"]
+        returns = prices[ticker].pct_change()
+        pd.testing.assert_series_equal(series["rolling_mean"], prices[ticker].rolling(30).mean(), check_names=False)
+        pd.testing.assert_series_equal(series["rolling_std"], prices[ticker].rolling(30).std(), check_names=False)
+        pd.testing.assert_series_equal(series["returns"], returns.dropna(), check_names=False)
+        pd.testing.assert_series_equal(series["volatility_clustering"],
+                                       (returns.rolling(30).std() * np.sqrt(252)).dropna(), check_names=False)
+
+
+def test_analyze_frame_reports_unusable_columns_without_failing_the_rest(prices):
+    frame = prices.iloc[:100].copy()
+    frame["FLAT"] = 50.0
+    frame["GAP"] = frame["W0"].where(frame.index != frame.index[10])
+    frame["NEG"] = frame["W1"] - 200
+
+    results = analyze_frame(frame, period=21)
+
+    assert list(results) == list(frame.columns)
+    assert results["FLAT"] == {"error": "Invalid input, x is constant"}
+    assert results["GAP"] == {"error": "This function does not handle missing values"}
+    assert "Multiplicative seasonality" in results["NEG"]["error"]
+    assert "basic_stats" in results["W0"]
+
+    short = analyze_frame(frame, period=252)
+    assert "2 complete cycles" in short["W0"]["error"]
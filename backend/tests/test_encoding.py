@@ -0,0 +1,169 @@
+import gzip
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.encoding import (ARROW, EVENT_STREAM, JSON, MSGPACK, NDJSON, available_media_types, compress, encode,
+                              encode_stream_item, to_columnar, to_records)
+
+
+@pytest.fixture
+def series():
+    index = pd.bdate_range("2024-01-01", periods=10)
+    return {
+        "AAA": {"close": pd.Series(np.linspace(100, 109, 10), index=index),
+                "returns": pd.Series(np.linspace(0.1, 0.9, 9), index=index[1:])},
+        "BBB": {"close": pd.Series([50.5, 51.25, 52.0], index=index[3:6])}
+    }
+
+# ---------------------------
+# COLUMNAR LAYOUT
+# ---------------------------
+
+def test_columnar_aligns_every_series_on_the_union_of_dates(series):
+    dates, columns = to_columnar(series, None)
+
+    assert len(dates) == 10
+    assert dates.dtype == np.dtype("datetime64[D]")
+    np.testing.assert_array_equal(columns["AAA"]["close"], np.linspace(100, 109, 10))
+    assert np.isnan(columns["AAA"]["returns"][0])
+    np.testing.assert_array_equal(np.flatnonzero(~np.isnan(columns["BBB"]["close"])), [3, 4, 5])
+
+
+def test_records_round_trip_the_columnar_arrays(series):
+    dates, columns = to_columnar(series, None)
+
+    for ticker, metrics in series.items():
+        for metric, values in metrics.items():
+            records = to_records(dates, columns[ticker][metric])
+            assert records == {day.strftime("%Y-%m-%d"): value for day, value in values.items()}
+
+
+def test_max_points_keeps_every_nth_date_and_the_latest(series):
+    dates, columns = to_columnar(series, None, max_points=4)
+
+    assert len(dates) == 4
+    assert dates[-1] == np.datetime64("2024-01-12")
+    np.testing.assert_array_equal(columns["AAA"]["close"], [100, 103, 106, 109])
+    assert len(to_columnar(series, None, max_points=50)[0]) == 10
+
+
+def test_float32_precision_and_invalid_dtypes(series):
+    _, columns = to_columnar(series, None, dtype="float32")
+
+    assert columns["AAA"]["close"].dtype == np.float32
+    with pytest.raises(ValueError):
+        to_columnar(series, None, dtype="float16")
+
+# ---------------------------
+# ENCODERS
+# ---------------------------
+
+def columnar_payload(series, dtype="float64"):
+    dates, columns = to_columnar(series, None, dtype=dtype)
+    return {
+        "format": "columnar",
+        "dtype": dtype,
+        "dates": dates,
+        "results": {ticker: {"mean": np.float64(1.5), "series": metrics} for ticker, metrics in columns.items()},
+        "tickers": list(series)
+    }
+
+
+def test_json_writes_nan_as_null_and_dates_as_iso(series):
+    payload = columnar_payload(series)
+
+    decoded = json.loads(encode(payload, JSON))
+
+    assert decoded["dates"][0] == "2024-01-01"
+    assert decoded["results"]["AAA"]["mean"] == 1.5
+    assert decoded["results"]["AAA"]["series"]["returns"][:2] == [None, 0.1]
+    assert decoded["results"]["AAA"]["series"]["close"] == payload["results"]["AAA"]["series"]["close"].tolist()
+
+
+def test_json_float32_uses_the_shortest_repr(series):
+    body = encode(columnar_payload(series, "float32"), JSON)
+
+    assert b"0.1," in body
+    assert b"0.10000000149011612" not in body
+
+
+def test_msgpack_matches_json(series):
+    msgpack = pytest.importorskip("msgpack")
+    payload = columnar_payload(series)
+
+    decoded = msgpack.unpackb(encode(payload, MSGPACK))
+
+    # msgpack keeps NaN where JSON writes null
+    close = decoded["results"]["BBB"]["series"]["close"]
+    assert np.isnan(close[:3]).all()
+    decoded["results"]["BBB"]["series"]["close"] = [None if np.isnan(value) else value for value in close]
+    decoded["results"]["AAA"]["series"]["returns"][0] = None
+    assert decoded == json.loads(encode(payload, JSON))
+    single = msgpack.unpackb(encode(columnar_payload(series, "float32"), MSGPACK))
+    assert single["results"]["AAA"]["series"]["returns"][1] == pytest.approx(0.1, rel=1e-7)
+
+
+def test_arrow_stores_one_column_per_series(series):
+    pa = pytest.importorskip("pyarrow")
+    payload = columnar_payload(series)
+
+    table = pa.ipc.open_stream(encode(payload, ARROW)).read_all()
+
+    assert table.column_names == ["date", "AAA/close", "AAA/returns", "BBB/close"]
+    assert table.column("date")[0].as_py().isoformat() == "2024-01-01"
+    assert table.column("AAA/returns").null_count == 1
+    np.testing.assert_array_equal(table.column("AAA/close").to_numpy(), payload["results"]["AAA"]["series"]["close"])
+    rest = json.loads(table.schema.metadata[b"payload"])
+    assert rest["results"]["AAA"] == {"mean": 1.5}
+    assert rest["tickers"] == ["AAA", "BBB"]
+
+
+def test_arrow_is_offered_only_for_columnar_payloads(series):
+    pytest.importorskip("pyarrow")
+
+    assert ARROW in available_media_types(columnar_payload(series))
+    assert ARROW not in available_media_types({"format": "records"})
+    assert available_media_types({})[0] == JSON
+
+
+def test_stream_items_are_single_lines_or_events():
+    item = {"ticker": "AAA", "values": np.array([1.0, np.nan])}
+
+    line = encode_stream_item(item, NDJSON)
+    event = encode_stream_item(item, EVENT_STREAM, event="ticker")
+
+    assert line.count(b"\n") == 1 and json.loads(line) == {"ticker": "AAA", "values": [1.0, None]}
+    assert event == b"event: ticker\ndata: " + line[:-1] + b"\n\n"
+
+
+def test_compression_round_trips():
+    body = encode({"values": np.arange(500, dtype=float)})
+
+    assert gzip.decompress(compress(body, "gzip")) == body
+    brotli = pytest.importorskip("brotli")
+    assert brotli.decompress(compress(body, "br")) == body
+
+# ---------------------------
+# ENDPOINT
+# ---------------------------
+
+def test_analyze_defaults_to_columnar_and_still_serves_records(client):
+    columnar = client.post("/api/analyze", json={"stocks": ["AAA"], "max_points": 50}).get_json()
+    records = client.post("/api/analyze", json={"stocks": ["AAA"], "format": "records"}).get_json()
+
+    assert columnar["format"] == "columnar"
+    assert len(columnar["dates"]) == 50
+    for metric, values in columnar["results"]["AAA"]["series"].items():
+        assert len(values) == 50
+        assert set(records["results"]["AAA"][metric]) >= {day for day, value in zip(columnar["dates"], values)
+                                                           if value is not None}
+    assert "format" not in records and "series" not in records["results"]["AAA"]
+
+
+def test_analyze_rejects_unknown_formats(client):
+    response = client.post("/api/analyze", json={"stocks": ["AAA"], "format": "csv"})
+
+    assert response.status_code == 400
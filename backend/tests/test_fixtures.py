@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.fixtures import PRICE_MODELS, fixture_fetcher, fixture_frame, fixture_prices
+
+
+@pytest.mark.parametrize("model", sorted(PRICE_MODELS))
+def test_fixtures_are_reproducible(model):
+    first = fixture_frame(3, 300, model, seed=1)
+
+    pd.testing.assert_frame_equal(first, fixture_frame(3, 300, model, seed=1))
+    assert not first.equals(fixture_frame(3, 300, model, seed=2))
+    assert (first > 0).all().all()
+    # Paths start at 100
+    np.testing.assert_allclose(first.iloc[0], 100, rtol=0.1)
+
+
+def test_ticker_path_does_not_depend_on_its_basket():
+    index = pd.bdate_range("2020-01-01", periods=250)
+
+    alone = fixture_prices(["AAA"], index, "gbm")
+    basket = fixture_prices(["ZZZ", "AAA", "MMM"], index, "gbm")
+
+    pd.testing.assert_series_equal(alone["AAA"], basket["AAA"])
+
+
+def test_tickers_share_a_market_factor():
+    returns = np.log(fixture_frame(10, 2000, "gbm")).diff().dropna()
+    correlations = returns.corr().to_numpy()[np.triu_indices(10, 1)]
+
+    assert correlations.min() > 0.05
+
+
+def test_garch_returns_cluster_in_volatility():
+    def squared_autocorrelation(model):
+        returns = np.log(fixture_frame(5, 4000, model)).diff().dropna() ** 2
+        return np.mean([returns[column].autocorr() for column in returns.columns])
+
+    assert squared_autocorrelation("garch") > 0.05
+    assert abs(squared_autocorrelation("gbm")) < 0.05
+
+
+def test_fetcher_serves_business_days_in_the_requested_range():
+    fetch = fixture_fetcher("gbm")
+
+    prices = fetch(["AAA", "BBB"], "2020-01-01", "2020-02-03")
+
+    assert list(prices.columns) == ["AAA", "BBB"]
+    assert prices.index[0] == pd.Timestamp("2020-01-01")
+    assert prices.index[-1] == pd.Timestamp("2020-01-31")
+    assert (prices.index.dayofweek < 5).all()
+
+
+def test_app_serves_fixture_prices(client, app_module):
+    response = client.post("/api/market-trend", json={"stocks": ["AAA", "BBB"]})
+
+    assert response.status_code == 200
+    assert app_module.PRICE_STORE.version(["AAA", "BBB"]) == (("AAA", 1), ("BBB", 1))
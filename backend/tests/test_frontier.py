@@ -0,0 +1,174 @@
+import numpy as np
+import pytest
+
+from scripts.covariance import estimate_covariance
+from scripts.fixtures import fixture_frame
+from scripts.frontier import exact_efficient_frontier, frontier_envelope, simulate_random_portfolios
+from scripts.optimizer import optimize_portfolio
+
+
+@pytest.fixture(scope="module")
+def universe():
+    returns = fixture_frame(6, 756, model="gbm", seed=5).pct_change().dropna()
+    expected_returns = returns.mean() * 252 + np.linspace(-0.04, 0.12, 6)
+    return expected_returns, estimate_covariance(returns, "sample")
+
+# ---------------------------
+# RANDOM PORTFOLIOS
+# ---------------------------
+
+def loop_portfolios(weights, expected_returns, cov_matrix):
+    """
+    Return, volatility and Sharpe ratio one portfolio at a time, as the
+    per-portfolio loop computed them.
+    """
+    results = []
+    for w in weights:
+        ret = np.dot(w, expected_returns)
+        vol = np.sqrt(np.dot(w.T, np.dot(cov_matrix, w)))
+        results.append((vol, ret, ret / vol if vol != 0 else 0))
+    return np.array(results)
+
+
+def loop_envelope(volatilities, returns):
+    """
+    Brute-force upper envelope: a portfolio is kept if no portfolio with
+    lower or equal volatility has at least its return, ties going to the
+    first of equal points.
+    """
+    keep = []
+    for i in range(len(volatilities)):
+        dominated = (volatilities < volatilities[i]) & (returns >= returns[i])
+        tied = (volatilities == volatilities[i]) & ((returns > returns[i]) | ((returns == returns[i])
+                                                                            & (np.arange(len(returns)) < i)))
+        if not (dominated | tied).any():
+            keep.append(i)
+    return sorted(keep, key=lambda i: volatilities[i])
+
+
+@pytest.mark.parametrize("method", ["sample", "factor"])
+def test_random_portfolios_match_the_loop(universe, method):
+    expected_returns, sample = universe
+    returns = fixture_frame(6, 756, model="gbm", seed=5).pct_change().dropna()
+    cov = sample if method == "sample" else estimate_covariance(returns, "factor", num_factors=2)
+
+    # A small chunk budget draws the weights in several batches
+    portfolios = simulate_random_portfolios(expected_returns, cov, 2000, rng=7, max_chunk_bytes=8 * 6 * 2 * 150)
+
+    weights = np.random.default_rng(7).dirichlet(np.ones(6), size=2000)
+    expected = loop_portfolios(weights, expected_returns.to_numpy(), cov.to_frame().to_numpy())
+    np.testing.assert_allclose(portfolios["volatility"], expected[:, 0], rtol=1e-12)
+    np.testing.assert_allclose(portfolios["return"], expected[:, 1], rtol=1e-12)
+    np.testing.assert_allclose(portfolios["sharpe_ratio"], expected[:, 2], rtol=1e-12)
+    np.testing.assert_array_equal(portfolios["max_sharpe_weights"], weights[np.argmax(expected[:, 2])])
+
+
+def test_random_portfolios_are_reproducible(universe):
+    expected_returns, cov = universe
+
+    first = simulate_random_portfolios(expected_returns, cov, 500, rng=1)["return"]
+
+    np.testing.assert_array_equal(first, simulate_random_portfolios(expected_returns, cov, 500, rng=1)["return"])
+    assert not np.array_equal(first, simulate_random_portfolios(expected_returns, cov, 500, rng=2)["return"])
+
+
+def test_envelope_matches_brute_force(universe):
+    expected_returns, cov = universe
+    portfolios = simulate_random_portfolios(expected_returns, cov, 1500, rng=3)
+    # Rounding creates volatility ties, which keep only their highest return
+    volatilities = np.round(portfolios["volatility"], 3)
+    returns = np.round(portfolios["return"], 3)
+
+    for vol, ret in ((portfolios["volatility"], portfolios["return"]), (volatilities, returns)):
+        envelope = frontier_envelope(vol, ret)
+        np.testing.assert_array_equal(vol[envelope], vol[loop_envelope(vol, ret)])
+        np.testing.assert_array_equal(ret[envelope], ret[loop_envelope(vol, ret)])
+        assert np.all(np.diff(ret[envelope]) > 0)
+    assert len(frontier_envelope(np.array([]), np.array([]))) == 0
+
+
+def test_envelope_keeps_the_best_sharpe_portfolio_of_each_volatility_on_the_frontier(universe):
+    # The per-volatility loop picked the best Sharpe ratio at each volatility;
+    # the envelope keeps those of them no lower-volatility portfolio beats
+    expected_returns, cov = universe
+    portfolios = simulate_random_portfolios(expected_returns, cov, 1500, rng=4)
+    vol = np.round(portfolios["volatility"], 3)
+    ret = portfolios["return"]
+    sharpe = ret / vol
+
+    loop_points = {}
+    for v in np.unique(vol):
+        members = np.flatnonzero(vol == v)
+        loop_points[v] = members[np.argmax(sharpe[members])]
+
+    envelope = frontier_envelope(vol, ret)
+    assert all(loop_points[vol[i]] == i or ret[loop_points[vol[i]]] == ret[i] for i in envelope)
+    best = max(loop_points.values(), key=lambda i: sharpe[i])
+    assert best in set(envelope)
+
+# ---------------------------
+# EXACT FRONTIER
+# ---------------------------
+
+def test_exact_frontier_runs_from_min_volatility_to_the_best_asset(universe):
+    expected_returns, cov = universe
+
+    frontier = exact_efficient_frontier(expected_returns, cov, num_points=25)
+
+    assert len(frontier) == 25
+    min_vol = optimize_portfolio(expected_returns, cov, "min_volatility")
+    assert frontier["Volatility"].iloc[0] == pytest.approx(cov.volatility(min_vol), rel=1e-4)
+    assert frontier["Return"].iloc[-1] == pytest.approx(expected_returns.max(), rel=1e-6)
+    # Higher target returns cost volatility along the efficient branch
+    assert np.all(np.diff(frontier["Return"]) > 0)
+    assert np.all(np.diff(frontier["Volatility"]) > -1e-9)
+    for weights in frontier["weights"]:
+        assert weights.sum() == pytest.approx(1.0)
+        assert weights.min() >= 0
+
+
+def test_exact_frontier_dominates_random_portfolios(universe):
+    expected_returns, cov = universe
+    frontier = exact_efficient_frontier(expected_returns, cov, num_points=40)
+    weights = np.random.default_rng(0).dirichlet(np.ones(6), size=5000)
+
+    returns = weights @ expected_returns.to_numpy()
+    in_range = (returns >= frontier["Return"].min()) & (returns <= frontier["Return"].max())
+    bound = np.interp(returns[in_range], frontier["Return"], frontier["Volatility"])
+
+    # No random portfolio is less volatile than the frontier at its return, beyond interpolation error
+    assert np.all(cov.volatility(weights[in_range]) >= bound - 2e-3)
+    assert frontier["Sharpe Ratio"].max() >= (returns / cov.volatility(weights)).max() - 1e-6
+
+
+def test_exact_frontier_on_a_factor_covariance(universe):
+    expected_returns, _ = universe
+    returns = fixture_frame(6, 756, model="gbm", seed=5).pct_change().dropna()
+    factor = estimate_covariance(returns, "factor", num_factors=2)
+
+    frontier = exact_efficient_frontier(expected_returns, factor, num_points=10)
+
+    for weights, volatility in zip(frontier["weights"], frontier["Volatility"]):
+        assert volatility == pytest.approx(np.sqrt(weights @ factor.matrix @ weights), rel=1e-10)
+
+# ---------------------------
+# ENDPOINT
+# ---------------------------
+
+def test_optimize_returns_the_exact_frontier(client):
+    response = client.post("/api/optimize", json={"stocks": ["AAA", "BBB", "CCC"], "frontier_method": "exact",
+                                                  "frontier_points": 12})
+
+    assert response.status_code == 200
+    frontier = response.get_json()["efficient_frontier"]
+    assert 0 < len(frontier) <= 12
+    assert set(frontier[0]) == {"Volatility", "Return", "Sharpe Ratio"}
+
+
+@pytest.mark.parametrize("points", [0, -3, 10_000, 2.5, "50", True, None])
+def test_optimize_rejects_bad_frontier_points(client, points):
+    response = client.post("/api/optimize", json={"stocks": ["AAA", "BBB"], "frontier_method": "exact",
+                                                  "frontier_points": points})
+
+    assert response.status_code == 400
+    assert "frontier_points" in response.get_json()["error"]
@@ -0,0 +1,258 @@
+import json
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from scripts.jobs import JobNotFinished, JobQueue, report_progress
+
+
+def echo(params):
+    return {"echo": params}, 200
+
+
+def fail(params):
+    raise ValueError("boom")
+
+
+def wait_for(params):
+    """
+    Report progress until the file `params["release"]` exists.
+    """
+    deadline = time.time() + 10
+    step = 0
+    while not os.path.exists(params["release"]) and time.time() < deadline:
+        report_progress("wait", step)
+        step += 1
+        time.sleep(0.01)
+    return {"waited": step}, 200
+
+
+def wait_until(condition, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        value = condition()
+        if value:
+            return value
+        time.sleep(0.01)
+    raise AssertionError("condition not met in time")
+
+
+def wait_for_status(queue, job_id, *statuses):
+    return wait_until(lambda: queue.status(job_id)["status"] in statuses and queue.status(job_id))
+
+
+@pytest.fixture
+def release(tmp_path):
+    return str(tmp_path / "release")
+
+
+@pytest.fixture
+def make_queue(tmp_path, release):
+    queues = []
+
+    def make(**kwargs):
+        queue = JobQueue(str(tmp_path / "jobs"), **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield make
+    open(release, "w").close()
+    for queue in queues:
+        if queue._executor is not None:
+            queue._executor.shutdown(cancel_futures=True)
+
+# ---------------------------
+# SUBMIT AND RESULT
+# ---------------------------
+
+def test_submit_runs_the_job_and_returns_its_result(make_queue):
+    queue = make_queue()
+
+    job_id = queue.submit("echo", echo, {"x": 1})
+
+    status = wait_for_status(queue, job_id, "done")
+    assert status["kind"] == "echo"
+    assert status["finished_at"] >= status["submitted_at"]
+    assert queue.result(job_id) == ({"echo": {"x": 1}}, 200)
+
+
+def test_identical_submissions_share_an_in_flight_job(make_queue, release):
+    queue = make_queue()
+
+    first = queue.submit("wait", wait_for, {"release": release})
+    second = make_queue().submit("wait", wait_for, {"release": release})
+    other = queue.submit("echo", echo, {"x": 1})
+
+    assert first == second
+    assert other != first
+    open(release, "w").close()
+    wait_for_status(queue, first, "done")
+    # A finished job is not joined again
+    assert queue.submit("wait", wait_for, {"release": release}) != first
+
+
+def test_status_reports_worker_progress(make_queue, release):
+    queue = make_queue()
+
+    job_id = queue.submit("wait", wait_for, {"release": release})
+
+    status = wait_until(lambda: (queue.status(job_id)["progress"] or "").startswith("wait") and queue.status(job_id))
+    assert status["status"] == "running"
+    with pytest.raises(JobNotFinished, match="running"):
+        queue.result(job_id)
+
+
+def test_unknown_and_malformed_job_ids(make_queue):
+    queue = make_queue()
+
+    for job_id in ("0" * 32, "../jobs", "inflight", None):
+        assert queue.status(job_id) is None
+        assert queue.cancel(job_id) is False
+        with pytest.raises(KeyError):
+            queue.result(job_id)
+
+
+def test_failed_job_reports_its_error(make_queue):
+    queue = make_queue()
+
+    job_id = queue.submit("fail", fail, {})
+
+    status = wait_for_status(queue, job_id, "failed", "done")
+    assert status["status"] == "failed"
+    assert status["error"] == "boom"
+    with pytest.raises(JobNotFinished, match="failed"):
+        queue.result(job_id)
+
+# ---------------------------
+# CANCELLATION
+# ---------------------------
+
+def test_running_job_is_cancelled_from_another_queue(make_queue, release):
+    queue = make_queue()
+    job_id = queue.submit("wait", wait_for, {"release": release})
+    wait_for_status(queue, job_id, "running")
+
+    assert make_queue().cancel(job_id) is True
+
+    assert queue.status(job_id)["status"] in ("cancelling", "cancelled")
+    assert wait_for_status(queue, job_id, "cancelled")["finished_at"] is not None
+    assert queue.cancel(job_id) is False
+    # Cancelling freed the key for a fresh job
+    assert queue.submit("wait", wait_for, {"release": release}) != job_id
+
+
+@pytest.mark.parametrize("same_queue", [True, False])
+def test_queued_job_is_cancelled_before_it_runs(make_queue, release, same_queue):
+    queue = make_queue(max_workers=1)
+    blocker = queue.submit("wait", wait_for, {"release": release})
+    wait_for_status(queue, blocker, "running")
+    job_id = queue.submit("echo", echo, {"x": 1})
+
+    assert (queue if same_queue else make_queue()).cancel(job_id) is True
+    open(release, "w").close()
+
+    assert wait_for_status(queue, job_id, "cancelled", "done")["status"] == "cancelled"
+    assert wait_for_status(queue, blocker, "done")["status"] == "done"
+    with pytest.raises(JobNotFinished, match="cancelled"):
+        queue.result(job_id)
+
+# ---------------------------
+# SHARED STATE
+# ---------------------------
+
+def test_job_of_an_exited_process_is_reported_as_failed(make_queue):
+    queue = make_queue()
+    exited = multiprocessing.Process(target=time.sleep, args=(0,))
+    exited.start()
+    exited.join()
+    job_id = "f" * 32
+    os.makedirs(os.path.join(queue.root, job_id))
+    with open(os.path.join(queue.root, job_id, "job.json"), "w") as f:
+        json.dump({"job_id": job_id, "kind": "echo", "key": ["echo", "{}"], "status": "queued",
+                   "submitted_at": time.time(), "finished_at": None, "error": None, "owner": exited.pid,
+                   "pid": None}, f)
+
+    status = queue.status(job_id)
+
+    assert status["status"] == "failed"
+    assert status["error"] == "server process exited"
+    assert status["finished_at"] is not None
+
+
+def test_finished_jobs_are_pruned(make_queue):
+    queue = make_queue(max_finished=2)
+
+    job_ids = [queue.submit("echo", echo, {"x": i}) for i in range(4)]
+    for job_id in job_ids:
+        wait_until(lambda: queue.status(job_id) is None or queue.status(job_id)["finished_at"])
+
+    wait_until(lambda: sum(queue.status(job_id) is not None for job_id in job_ids) == 2)
+    assert queue.status(job_ids[-1])["status"] == "done"
+
+
+def poll_result(root, job_id, results):
+    queue = JobQueue(root)
+    wait_until(lambda: queue.status(job_id)["status"] == "done")
+    results.put(queue.result(job_id))
+
+
+def test_job_submitted_in_one_process_is_polled_from_another(make_queue, release):
+    queue = make_queue()
+    job_id = queue.submit("wait", wait_for, {"release": release})
+    results = multiprocessing.Queue()
+    poller = multiprocessing.Process(target=poll_result, args=(queue.root, job_id, results))
+    poller.start()
+
+    open(release, "w").close()
+
+    assert results.get(timeout=20)[1] == 200
+    poller.join(timeout=20)
+    assert poller.exitcode == 0
+
+# ---------------------------
+# ENDPOINTS
+# ---------------------------
+
+@pytest.fixture
+def jobs_client(client, app_module, make_queue, monkeypatch):
+    monkeypatch.setattr(app_module, "JOB_QUEUE", make_queue())
+    monkeypatch.setattr(app_module, "JOB_HANDLERS", {"echo": echo, "wait": wait_for, "fail": fail})
+    return client
+
+
+def test_job_endpoints(jobs_client, release):
+    response = jobs_client.post("/api/jobs/echo", json={"x": 1})
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+
+    wait_until(lambda: jobs_client.get(f"/api/jobs/{job_id}").get_json()["status"] == "done")
+    response = jobs_client.get(f"/api/jobs/{job_id}/result")
+    assert response.status_code == 200
+    assert response.get_json() == {"echo": {"x": 1}}
+
+    assert jobs_client.post("/api/jobs/unknown", json={}).status_code == 404
+    assert jobs_client.get(f"/api/jobs/{'0' * 32}").status_code == 404
+    assert jobs_client.get(f"/api/jobs/{'0' * 32}/result").status_code == 404
+    assert jobs_client.delete(f"/api/jobs/{job_id}").status_code == 404
+
+
+def test_job_result_is_202_until_finished_and_410_once_cancelled(jobs_client, release):
+    job_id = jobs_client.post("/api/jobs/wait", json={"release": release}).get_json()["job_id"]
+
+    response = jobs_client.get(f"/api/jobs/{job_id}/result")
+    assert response.status_code == 202
+    assert response.get_json()["status"] in ("queued", "running")
+
+    assert jobs_client.delete(f"/api/jobs/{job_id}").get_json()["status"] in ("cancelling", "cancelled")
+    wait_until(lambda: jobs_client.get(f"/api/jobs/{job_id}/result").status_code == 410)
+
+
+def test_failed_job_result_is_500(jobs_client):
+    job_id = jobs_client.post("/api/jobs/fail", json={}).get_json()["job_id"]
+
+    wait_until(lambda: jobs_client.get(f"/api/jobs/{job_id}").get_json()["status"] == "failed")
+    response = jobs_client.get(f"/api/jobs/{job_id}/result")
+    assert response.status_code == 500
+    assert response.get_json() == {"error": "boom"}
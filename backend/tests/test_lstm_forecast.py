@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+
+from sklearn.preprocessing import MinMaxScaler
+
+from scripts.backends.lstm import create_lstm_model
+from scripts.fixtures import fixture_frame
+from scripts.lstm_forecast import create_sequences, get_rollout, lstm_forecast
+
+WINDOW = 20
+
+
+@pytest.fixture(scope="module")
+def model():
+    # Untrained weights are enough to compare the rollout with a step loop
+    tf.random.set_seed(0)
+    return create_lstm_model(WINDOW, 1)
+
+
+def test_sequences_match_the_window_loop():
+    data = np.arange(50, dtype=float).reshape(-1, 1)
+
+    X, y = create_sequences(data, WINDOW)
+
+    expected = np.array([data[i:i + WINDOW, 0] for i in range(len(data) - WINDOW)])
+    np.testing.assert_array_equal(X[:, :, 0], expected)
+    np.testing.assert_array_equal(y, data[WINDOW:, 0])
+    assert X.shape == (30, WINDOW, 1)
+
+
+def test_forecast_matches_the_predict_loop(model):
+    series = fixture_frame(1, 300, seed=1)["T0"]
+    scaler = MinMaxScaler().fit(np.asarray(series).reshape(-1, 1))
+
+    predictions = lstm_forecast(model, scaler, series, WINDOW, 10)
+
+    # One predict() per step, feeding each prediction back into the window
+    window = scaler.transform(np.asarray(series)[-WINDOW:].reshape(-1, 1)).astype(np.float32)
+    expected = []
+    for _ in range(10):
+        step = model.predict(window[np.newaxis], verbose=0)[0, 0]
+        expected.append(step)
+        window = np.append(window[1:], [[step]], axis=0)
+    expected = scaler.inverse_transform(np.array(expected).reshape(-1, 1)).flatten()
+    assert predictions.shape == (10,)
+    np.testing.assert_allclose(predictions, expected, rtol=1e-4)
+
+
+def test_rollout_is_compiled_once_per_model(model):
+    rollout = get_rollout(model)
+    windows = tf.zeros((1, WINDOW, 1))
+
+    first = rollout(windows, tf.constant(5, dtype=tf.int32))
+    rollout(windows, tf.constant(8, dtype=tf.int32))
+
+    assert get_rollout(model) is rollout
+    assert first.shape == (1, 5)
+    # The step count is a tensor, so other horizons reuse the same graph
+    assert rollout.experimental_get_tracing_count() == 1
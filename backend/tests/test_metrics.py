@@ -0,0 +1,184 @@
+import contextvars
+import os
+import pstats
+import re
+import threading
+
+import pytest
+
+from scripts.metrics import (STAGE_ERRORS, STAGE_SECONDS, MetricsRegistry, finish_request, server_timing, stage,
+                             start_profile, start_request, stop_profile, timed_stage)
+
+# ---------------------------
+# METRIC TYPES
+# ---------------------------
+
+def test_counters_and_gauges_render_in_the_text_format():
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls.", ("route",))
+    in_flight = registry.gauge("in_flight", "Requests being handled.")
+
+    calls.inc(route="/a")
+    calls.inc(2, route='/b "quoted"')
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+
+    assert registry.counter("calls_total", "Calls.", ("route",)) is calls
+    assert registry.render().splitlines() == [
+        "# HELP calls_total Calls.",
+        "# TYPE calls_total counter",
+        'calls_total{route="/a"} 1.0',
+        'calls_total{route="/b \\"quoted\\""} 2.0',
+        "# HELP in_flight Requests being handled.",
+        "# TYPE in_flight gauge",
+        "in_flight 1.0",
+    ]
+
+
+def test_histograms_count_cumulatively():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", ("stage",), buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.observe(value, stage="fit")
+
+    lines = registry.render().splitlines()
+    assert lines[2:] == [
+        'latency_seconds_bucket{stage="fit",le="0.1"} 1',
+        'latency_seconds_bucket{stage="fit",le="1.0"} 3',
+        'latency_seconds_bucket{stage="fit",le="+Inf"} 4',
+        'latency_seconds_sum{stage="fit"} 4.25',
+        'latency_seconds_count{stage="fit"} 4',
+    ]
+
+
+def test_labels_must_match_the_declaration():
+    counter = MetricsRegistry().counter("errors_total", "Errors.", ("stage",))
+
+    with pytest.raises(ValueError, match="needs labels"):
+        counter.inc()
+    with pytest.raises(ValueError):
+        counter.inc(stage="fit", model="arima")
+
+
+def test_collectors_are_read_at_scrape_time():
+    registry = MetricsRegistry()
+    hits = [0]
+    registry.add_collector(lambda: [("hits_total", "counter", "Hits.", hits[0]), ("ratio", "gauge", "Ratio.", None)])
+    registry.add_collector(lambda: 1 / 0)
+
+    hits[0] = 3
+
+    text = registry.render()
+    assert "hits_total 3.0" in text
+    assert "ratio" not in text
+
+# ---------------------------
+# STAGE TIMERS
+# ---------------------------
+
+def stage_count(name):
+    counts, _ = STAGE_SECONDS._values.get((name,), ([0], 0.0))
+    return sum(counts)
+
+
+def test_stages_are_recorded_in_the_histogram_and_the_request():
+    before = stage_count("test_load")
+    token = start_request()
+
+    with stage("test_load"):
+        pass
+    with pytest.raises(KeyError):
+        with stage("test_load"):
+            raise KeyError("missing")
+
+    elapsed, stages = finish_request(token)
+    assert stage_count("test_load") == before + 2
+    assert STAGE_ERRORS._values[("test_load",)] >= 1
+    assert stages["test_load"][1] == 2
+    assert 0 <= stages["test_load"][0] <= elapsed
+
+
+def test_threads_running_in_a_copy_of_the_context_add_to_the_request():
+    @timed_stage("test_worker")
+    def work():
+        return threading.current_thread().name
+
+    token = start_request()
+    threads = [threading.Thread(target=contextvars.copy_context().run, args=(work,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Stages outside any request are only recorded in the histogram
+    _, stages = finish_request(token)
+    work()
+
+    assert stages["test_worker"][1] == 4
+    assert work.__name__ == "work"
+
+
+def test_server_timing_header():
+    header = server_timing({"fetch_prices": (0.0123, 1), "arima_fit": (1.5, 2)}, total=2.0)
+
+    assert header == "fetch_prices;dur=12.3, arima_fit;dur=1500.0, total;dur=2000.0"
+
+# ---------------------------
+# REQUEST PROFILING
+# ---------------------------
+
+def test_cprofile_dumps_are_readable(tmp_path):
+    profile = start_profile("cprofile")
+    sum(range(1000))
+
+    name = stop_profile(profile, str(tmp_path), "/api/forecast")
+
+    assert re.fullmatch(r"\d{8}-\d{6}-api_forecast-[0-9a-f]{8}\.prof", name)
+    assert pstats.Stats(str(tmp_path / name)).total_calls > 0
+
+
+def test_unknown_profilers_fall_back_to_cprofile(tmp_path):
+    try:
+        import pyinstrument  # noqa: F401
+        expected = ".html"
+    except ImportError:
+        expected = ".prof"
+
+    assert stop_profile(start_profile("pyinstrument"), str(tmp_path), "x").endswith(expected)
+    assert stop_profile(start_profile("yappi"), str(tmp_path), "x").endswith(".prof")
+
+# ---------------------------
+# ENDPOINTS
+# ---------------------------
+
+def test_responses_carry_their_stage_breakdown(client):
+    # Tickers no other test asks for, so their return statistics are not cached yet
+    response = client.post("/api/market-trend", json={"stocks": ["MT1", "MT2"]})
+
+    names = [part.split(";")[0] for part in response.headers["Server-Timing"].split(", ")]
+    assert "return_statistics" in names and "serialize" in names
+    assert names[-1] == "total"
+
+
+def test_metrics_endpoint_reports_requests_and_caches(client):
+    client.post("/api/market-trend", json={"stocks": ["AAA", "BBB"]})
+    client.post("/api/market-trend", json={"stocks": ["AAA", "BBB"]})
+
+    text = client.get("/metrics").get_data(as_text=True)
+
+    assert re.search(r'http_request_duration_seconds_count\{endpoint="/api/market-trend",method="POST",'
+                     r'status="200"\} [1-9]', text)
+    assert re.search(r"response_cache_hits_total [1-9]", text)
+    assert "stage_duration_seconds_bucket{stage=\"serialize\"" in text
+    # The scrape itself is the only request in flight
+    assert "http_requests_in_flight 1.0" in text
+
+
+def test_profiling_needs_a_profile_directory(client, app_module, monkeypatch, tmp_path):
+    assert "X-Profile-File" not in client.get("/healthz?profile=cprofile").headers
+
+    monkeypatch.setattr(app_module, "PROFILE_DIR", str(tmp_path))
+    response = client.get("/healthz", headers={"X-Profile": "cprofile"})
+
+    assert os.path.exists(tmp_path / response.headers["X-Profile-File"])
@@ -0,0 +1,75 @@
+import pickle
+
+import pandas as pd
+
+from scripts.model_registry import ModelRegistry
+
+
+class StubResults:
+    """
+    Picklable stand-in for statsmodels results, saved the same way.
+    """
+
+    def __init__(self, label):
+        self.label = label
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self, f)
+
+
+def make_entry(label, version, nobs):
+    return {
+        "model": StubResults(label),
+        "scaler": None,
+        "params": (1, 1, 0),
+        "nobs": nobs,
+        "last_date": pd.Timestamp("2020-01-01") + pd.offsets.BDay(nobs),
+        "version": version
+    }
+
+
+def test_latest_prefers_a_newer_fit_stored_by_another_process(tmp_path):
+    web = ModelRegistry(tmp_path)
+    worker = ModelRegistry(tmp_path)
+    web.put("AAA", "arima", make_entry("web", 1, 500))
+
+    worker.put("AAA", "arima", make_entry("worker", 2, 501))
+
+    latest = web.latest("AAA", "arima")
+    assert latest["model"].label == "worker"
+    assert (latest["version"], latest["nobs"], latest["params"]) == (2, 501, (1, 1, 0))
+    assert web.get("AAA", "arima", 2)["model"].label == "worker"
+
+
+def test_latest_keeps_the_entry_in_memory_when_disk_is_not_newer(tmp_path):
+    registry = ModelRegistry(tmp_path)
+    entry = make_entry("web", 3, 600)
+    registry.put("AAA", "arima", entry)
+
+    assert registry.latest("AAA", "arima") is entry
+
+    # An older fit written by a slower worker does not replace it
+    ModelRegistry(tmp_path).put("AAA", "arima", make_entry("slow worker", 2, 599))
+    assert registry.latest("AAA", "arima") is entry
+
+
+def test_latest_picks_the_newest_entry_in_memory(tmp_path):
+    registry = ModelRegistry(tmp_path)
+    newer = make_entry("newer", 2, 501)
+    registry.put("AAA", "arima", newer)
+    registry.put("AAA", "arima", make_entry("older", 1, 500))
+    # Put the newer fit back on disk, as a worker finishing last would
+    ModelRegistry(tmp_path).put("AAA", "arima", make_entry("newer on disk", 2, 501))
+
+    assert registry.latest("AAA", "arima") is newer
+
+
+def test_latest_loads_from_disk_in_a_new_process(tmp_path):
+    ModelRegistry(tmp_path).put("AAA", "arima", make_entry("stored", 1, 500))
+
+    registry = ModelRegistry(tmp_path)
+
+    assert registry.latest("AAA", "arima")["model"].label == "stored"
+    assert registry.latest("BBB", "arima") is None
+    assert registry.get("AAA", "arima", 2) is None
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+from scripts.covariance import estimate_covariance
+from scripts.fixtures import fixture_frame
+from scripts.optimizer import get_problem, optimize_portfolio, slsqp_portfolio
+
+# Solver tolerances leave the weights a little short of exact
+TOLERANCE = 1e-6
+
+
+@pytest.fixture(scope="module")
+def universe():
+    returns = fixture_frame(15, 756, model="gbm", seed=3).pct_change().dropna()
+    # Spread expected returns so the unconstrained optimum concentrates in a few assets
+    expected_returns = returns.mean().to_numpy() * 252 + np.linspace(-0.05, 0.15, 15)
+    return expected_returns, returns
+
+
+def sharpe(weights, expected_returns, cov):
+    return weights @ expected_returns / cov.volatility(weights)
+
+
+def assert_long_only(weights):
+    assert weights.sum() == pytest.approx(1.0, abs=1e-9)
+    assert weights.min() >= 0
+
+
+@pytest.mark.parametrize("method", ["sample", "factor"])
+def test_max_sharpe_qp_matches_slsqp(universe, method):
+    expected_returns, returns = universe
+    cov = estimate_covariance(returns, method)
+
+    qp = optimize_portfolio(expected_returns, cov, "max_sharpe")
+    slsqp = slsqp_portfolio(expected_returns, cov, "max_sharpe")
+
+    assert_long_only(qp)
+    assert sharpe(qp, expected_returns, cov) == pytest.approx(sharpe(slsqp, expected_returns, cov), rel=1e-5)
+    np.testing.assert_allclose(qp, slsqp, atol=5e-3)
+
+
+def test_min_volatility_qp_matches_slsqp(universe):
+    expected_returns, returns = universe
+    cov = estimate_covariance(returns, "sample")
+
+    qp = optimize_portfolio(expected_returns, cov, "min_volatility")
+    slsqp = slsqp_portfolio(expected_returns, cov, "min_volatility")
+
+    assert cov.volatility(qp) == pytest.approx(cov.volatility(slsqp), rel=1e-5)
+    assert cov.volatility(qp) <= cov.volatility(np.full(15, 1 / 15))
+
+
+@pytest.mark.parametrize("objective", ["max_sharpe", "min_volatility"])
+def test_max_weight_holds(universe, objective):
+    expected_returns, returns = universe
+    cov = estimate_covariance(returns, "sample")
+
+    weights = optimize_portfolio(expected_returns, cov, objective, max_weight=0.1)
+
+    assert_long_only(weights)
+    assert weights.max() <= 0.1 + TOLERANCE
+    # The bound binds: without it the optimum is more concentrated
+    assert optimize_portfolio(expected_returns, cov, objective).max() > 0.1
+
+
+def test_sector_bounds_hold(universe):
+    expected_returns, returns = universe
+    cov = estimate_covariance(returns, "sample")
+    sectors = ["tech"] * 5 + ["energy"] * 5 + ["bonds"] * 5
+    bounds = {"tech": (0.1, 0.3), "energy": (0.2, 0.5), "bonds": (0.3, 1.0)}
+
+    weights = optimize_portfolio(expected_returns, cov, "max_sharpe", sectors=sectors, sector_bounds=bounds)
+
+    assert_long_only(weights)
+    for name, (lower, upper) in bounds.items():
+        total = weights[[label == name for label in sectors]].sum()
+        assert lower - TOLERANCE <= total <= upper + TOLERANCE
+
+
+@pytest.mark.parametrize("objective", ["max_sharpe", "min_volatility"])
+def test_turnover_limit_holds(universe, objective):
+    expected_returns, returns = universe
+    cov = estimate_covariance(returns, "sample")
+    previous = np.full(15, 1 / 15)
+
+    weights = optimize_portfolio(expected_returns, cov, objective, previous_weights=previous, max_turnover=0.2)
+
+    assert_long_only(weights)
+    assert np.abs(weights - previous).sum() <= 0.2 + TOLERANCE
+    assert np.abs(optimize_portfolio(expected_returns, cov, objective) - previous).sum() > 0.2
+
+
+def test_compiled_problems_are_reused(universe):
+    expected_returns, returns = universe
+    cov = estimate_covariance(returns, "factor", num_factors=3)
+    optimize_portfolio(expected_returns, cov, "max_sharpe")
+
+    problem = get_problem("max_sharpe", 15, 3)
+
+    assert get_problem("max_sharpe", 15, 3) is problem
+    assert get_problem("max_sharpe", 15, 3, turnover=True) is not problem
+
+
+def test_infeasible_requests_are_rejected(universe):
+    expected_returns, returns = universe
+    cov = estimate_covariance(returns, "sample")
+
+    with pytest.raises(ValueError, match="positive expected excess return"):
+        optimize_portfolio(expected_returns, cov, "max_sharpe", risk_free_rate=1.0)
+    with pytest.raises(ValueError, match="too small"):
+        optimize_portfolio(expected_returns, cov, max_weight=0.05)
+    with pytest.raises(ValueError, match="one sector label"):
+        optimize_portfolio(expected_returns, cov, sector_bounds={"tech": (0, 1)})
+    with pytest.raises(ValueError, match="previous_weights"):
+        optimize_portfolio(expected_returns, cov, max_turnover=0.1)
+    with pytest.raises(ValueError, match="check the constraints"):
+        optimize_portfolio(expected_returns, cov, sectors=["tech"] * 15, sector_bounds={"tech": (0, 0.5)})
+    with pytest.raises(ValueError):
+        optimize_portfolio(expected_returns, cov, objective="max_return")
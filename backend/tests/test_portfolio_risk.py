@@ -0,0 +1,158 @@
+import numpy as np
+import pytest
+from scipy.stats import norm
+
+from scripts.covariance import CovarianceModel, estimate_covariance
+from scripts.fixtures import fixture_frame
+from scripts.portfolio_risk import (historical_var_cvar, monte_carlo_var_cvar, parametric_var_cvar,
+                                    simulate_portfolio_returns)
+
+LEVELS = (0.95, 0.99)
+
+
+@pytest.fixture(scope="module")
+def universe():
+    returns = fixture_frame(5, 750, model="gbm", seed=2).pct_change().dropna()
+    weights = np.column_stack([np.full(5, 0.2), [0.5, 0.3, 0.1, 0.1, 0.0]])
+    cov = estimate_covariance(returns, "sample").scaled(1 / 252)
+    return returns.to_numpy(), weights, returns.mean().to_numpy(), cov
+
+# ---------------------------
+# PARAMETRIC AND HISTORICAL
+# ---------------------------
+
+def test_parametric_matches_the_normal_tail(universe):
+    _, weights, mean, cov = universe
+
+    estimate = parametric_var_cvar(weights, mean, cov, LEVELS, horizon=10)
+
+    for k, level in enumerate(LEVELS):
+        for i, w in enumerate(weights.T):
+            mu, sigma = 10 * mean @ w, np.sqrt(10 * w @ cov.matrix @ w)
+            threshold = norm.ppf(1 - level, mu, sigma)
+            tail_mean = norm.expect(lambda x: x, loc=mu, scale=sigma, ub=threshold, conditional=True)
+            assert estimate["var"][k, i] == pytest.approx(-threshold, rel=1e-10)
+            assert estimate["cvar"][k, i] == pytest.approx(-tail_mean, rel=1e-6)
+
+
+@pytest.mark.parametrize("horizon", [1, 5])
+def test_historical_matches_percentile_of_overlapping_sums(universe, horizon):
+    returns, weights, _, _ = universe
+
+    estimate = historical_var_cvar(returns, weights, LEVELS, horizon)
+
+    for i, w in enumerate(weights.T):
+        daily = returns @ w
+        sums = np.array([daily[t:t + horizon].sum() for t in range(len(daily) - horizon + 1)])
+        for k, level in enumerate(LEVELS):
+            threshold = np.percentile(sums, 100 * (1 - level))
+            assert estimate["var"][k, i] == pytest.approx(-threshold, rel=1e-10)
+            assert estimate["cvar"][k, i] == pytest.approx(-sums[sums <= threshold].mean(), rel=1e-10)
+
+
+def test_single_portfolios_give_one_column(universe):
+    returns, weights, mean, cov = universe
+
+    single = parametric_var_cvar(weights[:, 1], mean, cov, LEVELS)
+
+    assert single["var"].shape == (2, 1)
+    np.testing.assert_allclose(single["var"][:, 0], parametric_var_cvar(weights, mean, cov, LEVELS)["var"][:, 1])
+    assert historical_var_cvar(returns, weights[:, 0], LEVELS)["cvar"].shape == (2, 1)
+
+# ---------------------------
+# MONTE CARLO
+# ---------------------------
+
+def test_simulation_depends_only_on_the_seed(universe):
+    _, weights, mean, cov = universe
+    options = dict(num_scenarios=5000, horizon=3, seed=11)
+
+    serial = simulate_portfolio_returns(weights, mean, cov, n_jobs=1, max_chunk_bytes=8 * 3 * 5 * 700, **options)
+
+    for n_jobs, executor in ((4, "threads"), (2, "processes")):
+        parallel = simulate_portfolio_returns(weights, mean, cov, n_jobs=n_jobs, executor=executor,
+                                              max_chunk_bytes=8 * 3 * 5 * 700, **options)
+        np.testing.assert_array_equal(parallel, serial)
+    assert serial.shape == (5000, 2)
+    assert not np.array_equal(simulate_portfolio_returns(weights, mean, cov, n_jobs=1, **dict(options, seed=12)),
+                              serial)
+
+
+@pytest.mark.parametrize("factor", [False, True])
+def test_normal_monte_carlo_converges_to_parametric(universe, factor):
+    returns, weights, mean, cov = universe
+    if factor:
+        cov = estimate_covariance(fixture_frame(5, 750, model="gbm", seed=2).pct_change().dropna(), "factor",
+                                  num_factors=2).scaled(1 / 252)
+
+    simulated = monte_carlo_var_cvar(weights, mean, cov, LEVELS, num_scenarios=400000, horizon=5, seed=0)
+
+    expected = parametric_var_cvar(weights, mean, cov, LEVELS, horizon=5)
+    np.testing.assert_allclose(simulated["var"], expected["var"], rtol=0.02)
+    np.testing.assert_allclose(simulated["cvar"], expected["cvar"], rtol=0.02)
+
+
+def test_student_t_keeps_the_variance_and_fattens_the_tail(universe):
+    _, weights, mean, cov = universe
+
+    t = simulate_portfolio_returns(weights, mean, cov, num_scenarios=400000, distribution="t", df=4, seed=0)
+
+    np.testing.assert_allclose(t.var(axis=0), cov.variance(weights.T), rtol=0.05)
+    normal = monte_carlo_var_cvar(weights, mean, cov, (0.999,), num_scenarios=400000, seed=0)
+    heavy = monte_carlo_var_cvar(weights, mean, cov, (0.999,), num_scenarios=400000, distribution="t", df=4, seed=0)
+    assert np.all(heavy["cvar"] > normal["cvar"])
+
+
+def test_semi_definite_covariances_can_be_simulated():
+    vector = np.array([0.01, 0.02, 0.03])
+    cov = CovarianceModel(matrix=np.outer(vector, vector))
+    weights = np.array([0.2, 0.3, 0.5])
+
+    simulated = simulate_portfolio_returns(weights, np.zeros(3), cov, num_scenarios=100000, seed=0)
+
+    assert simulated.std() == pytest.approx(vector @ weights, rel=0.02)
+
+
+def test_invalid_simulation_options_are_rejected(universe):
+    _, weights, mean, cov = universe
+
+    with pytest.raises(ValueError, match="distribution"):
+        simulate_portfolio_returns(weights, mean, cov, distribution="cauchy")
+    with pytest.raises(ValueError, match="Degrees of freedom"):
+        simulate_portfolio_returns(weights, mean, cov, distribution="t", df=2)
+    with pytest.raises(ValueError, match="executor"):
+        simulate_portfolio_returns(weights, mean, cov, executor="gpu")
+
+# ---------------------------
+# ENDPOINT
+# ---------------------------
+
+def test_portfolio_risk_reports_every_method(client):
+    response = client.post("/api/portfolio-risk", json={"stocks": ["AAA", "BBB", "CCC"], "num_scenarios": 20000,
+                                                        "seed": 1, "horizon": 5})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["horizon_days"] == 5
+    for portfolio in ("max_sharpe_portfolio", "min_volatility_portfolio"):
+        result = body["results"][portfolio]
+        assert sum(result["weights"].values()) == pytest.approx(1.0, abs=1e-3)
+        for method in ("parametric", "historical", "monte_carlo"):
+            for level in ("0.95", "0.99"):
+                assert 0 < result[method]["var"][level] <= result[method]["cvar"][level]
+            assert result[method]["var"]["0.95"] < result[method]["var"]["0.99"]
+
+
+@pytest.mark.parametrize("params", [
+    {"methods": ["parametric", "garch"]},
+    {"confidence_levels": [0.95, 1.5]},
+    {"horizon": 0},
+    {"num_scenarios": 10},
+    {"distribution": "t", "df": 1},
+    {"stocks": []},
+])
+def test_portfolio_risk_rejects_bad_requests(client, params):
+    response = client.post("/api/portfolio-risk", json=dict({"stocks": ["AAA", "BBB"]}, **params))
+
+    assert response.status_code == 400
+    assert "error" in response.get_json()
@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.data_sources import ConcurrentFetcher, FileSource
+from scripts.price_store import PriceStore
+
+TICKERS = ["AAA", "BBB"]
+
+
+class RecordingFetcher:
+    """
+    File-backed fetcher that records every (tickers, start, end) call.
+    """
+
+    def __init__(self, directory, failure_rate=0.0):
+        self.fetcher = ConcurrentFetcher([FileSource(directory, failure_rate=failure_rate)], attempts=1)
+        self.calls = []
+
+    def __call__(self, tickers, start_date, end_date):
+        self.calls.append((sorted(tickers), start_date, end_date))
+        return self.fetcher(tickers, start_date, end_date)
+
+
+@pytest.fixture
+def csv_dir(tmp_path):
+    directory = tmp_path / "csv"
+    directory.mkdir()
+    index = pd.bdate_range("2020-01-01", "2020-12-31", name="Date")
+    for i, ticker in enumerate(TICKERS):
+        close = pd.Series(100.0 + i + np.arange(len(index)), index=index, name="Close")
+        close.to_csv(directory / f"{ticker}.csv")
+    return directory
+
+
+@pytest.fixture
+def fetcher(csv_dir):
+    return RecordingFetcher(csv_dir)
+
+
+@pytest.fixture
+def store(tmp_path, fetcher):
+    return PriceStore(tmp_path / "store", fetcher=fetcher)
+
+
+def test_get_returns_csv_prices(store, csv_dir):
+    prices = store.get(TICKERS, "2020-02-03", "2020-03-02")
+
+    expected = pd.read_csv(csv_dir / "AAA.csv", parse_dates=["Date"], index_col="Date")["Close"]
+    expected = expected["2020-02-03":"2020-02-28"]
+    assert list(prices.columns) == TICKERS
+    np.testing.assert_array_equal(prices["AAA"].to_numpy(), expected.to_numpy())
+    assert (prices.index == expected.index).all()
+
+
+def test_covered_range_is_not_fetched_again(store, fetcher):
+    store.get(TICKERS, "2020-03-02", "2020-06-01")
+    store.get(TICKERS, "2020-03-02", "2020-06-01")
+    store.get(TICKERS, "2020-04-01", "2020-05-01")
+
+    assert fetcher.calls == [(TICKERS, "2020-03-02", "2020-06-01")]
+
+
+def test_refresh_fetches_only_missing_ranges(store, fetcher):
+    store.get(TICKERS, "2020-03-02", "2020-06-01")
+    fetcher.calls.clear()
+
+    prices = store.get(TICKERS, "2020-01-01", "2020-09-01")
+
+    assert sorted(fetcher.calls, key=lambda call: call[1]) == [
+        (TICKERS, "2020-01-01", "2020-03-02"),
+        (TICKERS, "2020-06-01", "2020-09-01")
+    ]
+    assert prices.index[0] == pd.Timestamp("2020-01-01")
+    assert prices.index[-1] == pd.Timestamp("2020-08-31")
+    assert not prices.index.duplicated().any()
+
+
+def test_only_tickers_missing_a_range_are_fetched(store, fetcher):
+    store.get(["AAA"], "2020-01-01", "2020-06-01")
+    fetcher.calls.clear()
+
+    store.get(TICKERS, "2020-01-01", "2020-06-01")
+
+    assert fetcher.calls == [(["BBB"], "2020-01-01", "2020-06-01")]
+
+
+def test_failed_fetch_leaves_range_uncovered(tmp_path, csv_dir):
+    failing = RecordingFetcher(csv_dir, failure_rate=1.0)
+    store = PriceStore(tmp_path / "store", fetcher=failing)
+
+    assert store.refresh(TICKERS, "2020-01-01", "2020-06-01") == []
+    assert store.get(TICKERS, "2020-01-01", "2020-06-01").empty
+    assert set(store.errors(TICKERS)) == set(TICKERS)
+    assert store.version(TICKERS) == (("AAA", -1), ("BBB", -1))
+
+    working = RecordingFetcher(csv_dir)
+    store.fetcher = working
+    prices = store.get(TICKERS, "2020-01-01", "2020-06-01")
+
+    assert working.calls == [(TICKERS, "2020-01-01", "2020-06-01")]
+    assert list(prices.columns) == TICKERS
+    assert store.errors(TICKERS) == {}
+
+
+def test_failed_extension_is_fetched_again(store, csv_dir):
+    store.get(TICKERS, "2020-01-01", "2020-06-01")
+    versions = store.version(TICKERS)
+
+    store.fetcher = RecordingFetcher(csv_dir, failure_rate=1.0)
+    prices = store.get(TICKERS, "2020-01-01", "2020-09-01")
+
+    # Stored prices are still served, and nothing is marked as changed
+    assert prices.index[-1] == pd.Timestamp("2020-05-29")
+    assert store.version(TICKERS) == versions
+
+    store.fetcher = working = RecordingFetcher(csv_dir)
+    prices = store.get(TICKERS, "2020-01-01", "2020-09-01")
+
+    assert working.calls == [(TICKERS, "2020-06-01", "2020-09-01")]
+    assert prices.index[-1] == pd.Timestamp("2020-08-31")
+
+
+def test_fetcher_exception_is_recorded_per_ticker(tmp_path):
+    def broken(tickers, start_date, end_date):
+        raise ConnectionError("provider down")
+
+    store = PriceStore(tmp_path / "store", fetcher=broken)
+
+    assert store.refresh(TICKERS, "2020-01-01", "2020-06-01") == []
+    assert store.errors(TICKERS) == {"AAA": "provider down", "BBB": "provider down"}
+
+
+def test_unknown_ticker_is_reported(store):
+    prices = store.get(["AAA", "ZZZ"], "2020-01-01", "2020-06-01")
+
+    assert list(prices.columns) == ["AAA"]
+    assert list(store.errors(["AAA", "ZZZ"])) == ["ZZZ"]
+
+
+def test_version_changes_only_when_prices_change(store, fetcher):
+    changes = []
+    store.add_listener(changes.append)
+
+    assert store.refresh(TICKERS, "2020-06-01", "2021-01-01") == TICKERS
+    first = store.version(TICKERS)
+    assert first == (("AAA", 1), ("BBB", 1))
+
+    # Already covered: nothing fetched, nothing changed
+    assert store.refresh(TICKERS, "2020-06-01", "2021-01-01") == []
+    assert store.version(TICKERS) == first
+
+    # Fetched, but no trading days in the CSV files: coverage grows, versions do not
+    assert store.refresh(TICKERS, "2020-06-01", "2021-03-01") == []
+    assert store.version(TICKERS) == first
+    fetcher.calls.clear()
+    store.refresh(TICKERS, "2020-06-01", "2021-03-01")
+    assert fetcher.calls == []
+
+    # New prices: versions bump and listeners hear about it
+    assert store.refresh(TICKERS, "2020-01-01", "2021-03-01") == TICKERS
+    assert store.version(TICKERS) == (("AAA", 2), ("BBB", 2))
+    assert changes == [TICKERS, TICKERS]
@@ -0,0 +1,172 @@
+import base64
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from scripts.render_service import RenderService, content_key
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def render_bytes(size, log_dir):
+    # Leaves one file per call so the test can count renders across processes
+    open(os.path.join(log_dir, f"{os.getpid()}-{time.monotonic_ns()}"), "w").close()
+    return bytes(size)
+
+
+def render_slowly(delay, value):
+    time.sleep(delay)
+    return value
+
+
+def render_failure():
+    raise RuntimeError("bad figure")
+
+
+@pytest.fixture
+def make_service():
+    services = []
+
+    def make(*args, **kwargs):
+        service = RenderService(*args, **kwargs)
+        services.append(service)
+        return service
+
+    yield make
+    for service in services:
+        if service._executor is not None:
+            service._executor.shutdown()
+
+# ---------------------------
+# CONTENT KEYS
+# ---------------------------
+
+def test_keys_depend_on_the_function_and_every_input():
+    values = np.arange(6, dtype=np.float64)
+    key = content_key(render_bytes, values, 1.5)
+
+    assert content_key(render_bytes, values.copy(), 1.5) == key
+    assert len(key) == 64
+    assert content_key(render_slowly, values, 1.5) != key
+    assert content_key(render_bytes, values, 2.5) != key
+    assert content_key(render_bytes, values.astype(np.float32), 1.5) != key
+    assert content_key(render_bytes, values.reshape(2, 3), 1.5) != key
+    assert content_key(render_bytes, values[::-1], 1.5) != key
+
+# ---------------------------
+# RENDER SERVICE
+# ---------------------------
+
+def test_identical_images_are_rendered_once(make_service, tmp_path):
+    service = make_service()
+
+    keys = {service.submit(render_bytes, 100, str(tmp_path)) for _ in range(5)}
+
+    key = keys.pop()
+    assert not keys
+    assert service.get(key) == bytes(100)
+    assert service.submit(render_bytes, 100, str(tmp_path)) == key
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_images_on_disk_are_shared_between_services(make_service, tmp_path):
+    log_dir = tmp_path / "log"
+    log_dir.mkdir()
+    first = make_service(str(tmp_path / "images"))
+    key = first.submit(render_bytes, 100, str(log_dir))
+    first.get(key)
+
+    second = make_service(str(tmp_path / "images"))
+
+    assert second.get(key) == bytes(100)
+    assert second.submit(render_bytes, 100, str(log_dir)) == key
+    assert second._executor is None
+    assert len(os.listdir(log_dir)) == 1
+    assert os.listdir(tmp_path / "images") == [f"{key}.png"]
+
+
+def test_get_waits_for_an_image_another_process_is_rendering(make_service, tmp_path):
+    renderer = make_service(str(tmp_path))
+    key = renderer.submit(render_slowly, 0.5, b"done")
+    reader = make_service(str(tmp_path))
+
+    assert reader.get(key, timeout=10) == b"done"
+    assert reader.get("0" * 64, timeout=0.1) is None
+
+
+def test_memory_is_bounded_by_bytes(make_service):
+    service = make_service(max_bytes=250)
+    keys = [service.submit(render_slowly, 0, bytes([i]) * 100) for i in range(3)]
+
+    for key in keys:
+        service.get(key)
+    # Results reach waiters just before the done callbacks store them
+    while service._inflight:
+        time.sleep(0.01)
+
+    # The oldest image is evicted and, with no disk copy, is gone
+    assert service._bytes == 200
+    assert list(service._images) == keys[1:]
+    assert service.get(keys[0], timeout=0.1) is None
+
+
+def test_failed_renders_are_reported_as_missing(make_service, tmp_path):
+    service = make_service(str(tmp_path))
+
+    key = service.submit(render_failure)
+
+    assert service.get(key, timeout=10) is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_concurrent_requests_share_one_render(make_service):
+    service = make_service()
+    results = []
+
+    def request():
+        key = service.submit(render_slowly, 0.3, b"shared")
+        results.append(service.get(key))
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    while service._inflight:
+        time.sleep(0.01)
+
+    assert results == [b"shared"] * 8
+    assert len(service._images) == 1
+
+# ---------------------------
+# ENDPOINTS
+# ---------------------------
+
+def test_frontier_image_is_served_by_url(client):
+    body = client.post("/api/efficient-frontier", json={"stocks": ["AAA", "BBB"], "seed": 3}).get_json()
+
+    response = client.get(body["efficient_frontier_image_url"])
+
+    assert "efficient_frontier_image" not in body
+    assert response.status_code == 200
+    assert response.mimetype == "image/png"
+    assert response.data.startswith(PNG_SIGNATURE)
+    assert "immutable" in response.headers["Cache-Control"]
+    etag = response.headers["ETag"]
+    assert client.get(body["efficient_frontier_image_url"], headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_frontier_image_can_still_be_inlined(client):
+    body = client.post("/api/efficient-frontier", json={"stocks": ["AAA", "BBB"], "seed": 3,
+                                                        "inline_image": True}).get_json()
+
+    assert base64.b64decode(body["efficient_frontier_image"]).startswith(PNG_SIGNATURE)
+    assert "efficient_frontier_image_url" not in body
+
+
+@pytest.mark.parametrize("key", ["abc", "G" * 64, "../" + "0" * 61])
+def test_malformed_image_keys_are_not_found(client, key):
+    assert client.get(f"/api/images/{key}.png").status_code == 404
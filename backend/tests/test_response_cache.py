@@ -0,0 +1,221 @@
+import threading
+
+import pytest
+
+from scripts.response_cache import ResponseCache, request_key, request_tickers
+
+
+def versions(tickers):
+    return tuple((ticker, 1) for ticker in tickers)
+
+
+def counting(result=({"value": 1}, 200)):
+    calls = []
+
+    def compute():
+        calls.append(None)
+        return result
+
+    return compute, calls
+
+# ---------------------------
+# REQUEST KEYS
+# ---------------------------
+
+def test_request_key_is_canonical():
+    key = request_key("optimize", {"stocks": ["MSFT", "AAPL", "MSFT "], "risk_free_rate": 0.02, "method": "qp"},
+                      versions)
+
+    assert key == request_key("optimize", {"method": "qp", "async": True, "risk_free_rate": 0.02,
+                                           "stocks": ["AAPL", "MSFT"]}, versions)
+    assert key[:3] == ("optimize", ("AAPL", "MSFT"), (("AAPL", 1), ("MSFT", 1)))
+    assert key != request_key("optimize", {"stocks": ["AAPL", "MSFT"], "risk_free_rate": 0.03, "method": "qp"},
+                              versions)
+    assert key != request_key("risk", {"stocks": ["AAPL", "MSFT"], "risk_free_rate": 0.02, "method": "qp"},
+                              versions)
+
+
+def test_request_tickers_reads_every_ticker_field():
+    assert request_tickers({"ticker": "TSLA", "tickers": ["AAPL", 3, " "], "stocks": "SPY"}) == ("AAPL", "SPY", "TSLA")
+
+# ---------------------------
+# RESPONSE CACHE
+# ---------------------------
+
+def test_concurrent_identical_requests_compute_once():
+    cache = ResponseCache()
+    gate = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(None)
+        gate.wait(5)
+        return {"value": 1}, 200
+
+    sources = []
+    threads = [threading.Thread(target=lambda: sources.append(cache.get_or_compute("key", compute)[3]))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    while cache.misses + cache.coalesced < 8:
+        threading.Event().wait(0.01)
+    gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(sources) == ["coalesced"] * 7 + ["miss"]
+    assert cache.get_or_compute("key", compute)[3] == "hit"
+
+
+def test_errors_reach_waiting_requests_and_are_not_cached():
+    cache = ResponseCache()
+    gate = threading.Event()
+    errors = []
+
+    def compute():
+        gate.wait(5)
+        raise ValueError("boom")
+
+    def request():
+        try:
+            cache.get_or_compute("key", compute)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=request) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while cache.misses + cache.coalesced < 3:
+        threading.Event().wait(0.01)
+    gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 3
+    assert cache.get_or_compute("key", counting()[0])[3] == "miss"
+
+
+def test_hits_share_an_etag_and_refresh_replaces_it():
+    cache = ResponseCache()
+    compute, calls = counting()
+
+    _, _, etag, source = cache.get_or_compute("key", compute)
+    hit = cache.get_or_compute("key", compute)
+    refreshed = cache.get_or_compute("key", compute, refresh=True)
+
+    assert (source, hit[3], refreshed[3]) == ("miss", "hit", "miss")
+    assert hit[2] == etag
+    assert refreshed[2] != etag
+    assert len(calls) == 2
+    assert cache.get_or_compute("key", compute)[2] == refreshed[2]
+
+
+def test_only_cacheable_successes_are_stored():
+    cache = ResponseCache()
+    failed, _ = counting(({"error": "bad"}, 400))
+    partial, _ = counting(({"data_errors": {"ZZZ": "no data"}}, 200))
+
+    cache.get_or_compute("failed", failed)
+    cache.get_or_compute("partial", partial, cacheable=lambda result: "data_errors" not in result)
+
+    assert cache.get_or_compute("failed", failed)[3] == "miss"
+    assert cache.get_or_compute("partial", partial, cacheable=lambda result: "data_errors" not in result)[3] == "miss"
+    assert cache.stats()["entries"] == 0
+
+
+def test_rekey_stores_under_the_key_after_computing():
+    cache = ResponseCache()
+    compute, calls = counting()
+
+    cache.get_or_compute(("AAA", 0), compute, rekey=lambda: ("AAA", 1))
+
+    assert cache.get_or_compute(("AAA", 1), compute)[3] == "hit"
+    assert cache.get_or_compute(("AAA", 0), compute)[3] == "miss"
+
+
+def test_entries_expire_and_are_evicted(monkeypatch):
+    cache = ResponseCache(max_entries=2, ttl=10)
+    compute, _ = counting()
+    now = [0.0]
+    monkeypatch.setattr("scripts.response_cache.time.monotonic", lambda: now[0])
+
+    for key in ("a", "b", "c"):
+        cache.get_or_compute(key, compute)
+    assert cache.get_or_compute("a", compute)[3] == "miss"
+    assert cache.evictions == 2
+    now[0] = 11.0
+    assert cache.get_or_compute("c", compute)[3] == "miss"
+    assert cache.expired == 1
+
+
+def test_invalidate_drops_entries_of_changed_tickers():
+    cache = ResponseCache()
+    compute, _ = counting()
+    keys = [request_key("risk", {"stocks": stocks}, versions) for stocks in (["AAA"], ["AAA", "BBB"], ["CCC"])]
+    for key in keys:
+        cache.get_or_compute(key, compute)
+
+    cache.invalidate(["AAA"])
+
+    assert [cache.get_or_compute(key, compute)[3] for key in keys] == ["miss", "miss", "hit"]
+
+# ---------------------------
+# ENDPOINTS
+# ---------------------------
+
+def test_first_response_on_a_cold_store_is_reused(client):
+    # The handler fetches these tickers, which changes the price version the request was keyed with
+    body = {"stocks": ["COLD1", "COLD2"]}
+
+    assert client.post("/api/market-trend", json=body).headers["X-Cache"] == "MISS"
+    assert client.post("/api/market-trend", json=body).headers["X-Cache"] == "HIT"
+
+
+def test_etag_revalidation_and_no_cache(client):
+    body = {"stocks": ["AAA", "BBB"]}
+    first = client.post("/api/market-trend", json=body)
+    etag = first.headers["ETag"]
+
+    revalidated = client.post("/api/market-trend", json=body, headers={"If-None-Match": etag})
+    refreshed = client.post("/api/market-trend", json=body, headers={"Cache-Control": "no-cache"})
+
+    assert first.status_code == 200
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == etag
+    assert revalidated.data == b""
+    assert refreshed.headers["X-Cache"] == "MISS"
+    assert refreshed.headers["ETag"] != etag
+    assert refreshed.get_json() == first.get_json()
+
+
+def test_partial_results_are_not_cached(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module.PRICE_STORE, "errors", lambda tickers: {"ZZZ": "no data"})
+    body = {"stocks": ["AAA", "ZZZ"]}
+
+    first = client.post("/api/market-trend", json=body)
+
+    assert first.get_json()["data_errors"] == {"ZZZ": "no data"}
+    assert client.post("/api/market-trend", json=body).headers["X-Cache"] == "MISS"
+
+
+def test_cached_image_url_follows_the_request_host(client):
+    body = {"stocks": ["AAA", "BBB"], "seed": 0}
+
+    first = client.post("/api/efficient-frontier", json=body, base_url="http://one.example")
+    second = client.post("/api/efficient-frontier", json=body, base_url="https://two.example")
+
+    assert second.headers["X-Cache"] == "HIT"
+    first_url = first.get_json()["efficient_frontier_image_url"]
+    second_url = second.get_json()["efficient_frontier_image_url"]
+    assert first_url.startswith("http://one.example/api/images/")
+    assert second_url == first_url.replace("http://one.example", "https://two.example")
+
+
+@pytest.mark.parametrize("body", [{"stocks": []}, {}])
+def test_errors_are_not_cached(client, body):
+    first = client.post("/api/market-trend", json=body)
+
+    assert first.status_code == 400
+    assert "ETag" not in first.headers
+    assert client.post("/api/market-trend", json=body).headers["X-Cache"] == "MISS"
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+from scripts.fixtures import fixture_fetcher
+from scripts.price_store import PriceStore
+from scripts.return_cache import ReturnCache
+
+
+def value(rows=10):
+    return pd.DataFrame(np.zeros((rows, 2))), pd.Series(np.zeros(2))
+
+
+def counting(rows=10):
+    calls = []
+
+    def compute():
+        calls.append(None)
+        return value(rows)
+
+    return compute, calls
+
+
+def key(*tickers, version=1):
+    return tuple(tickers), "2020-01-01", "2020-06-01", tuple((ticker, version) for ticker in tickers)
+
+
+def test_hits_reuse_the_computed_value():
+    cache = ReturnCache()
+    compute, calls = counting()
+
+    first = cache.get_or_compute(key("AAA"), compute)
+
+    assert cache.get_or_compute(key("AAA"), compute) is first
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ReturnCache(max_entries=2)
+    compute, calls = counting()
+    cache.get_or_compute(key("AAA"), compute)
+    cache.get_or_compute(key("BBB"), compute)
+    cache.get_or_compute(key("AAA"), compute)
+
+    cache.get_or_compute(key("CCC"), compute)
+
+    assert len(cache) == 2
+    cache.get_or_compute(key("AAA"), compute)
+    assert len(calls) == 3
+    cache.get_or_compute(key("BBB"), compute)
+    assert len(calls) == 4
+
+
+def test_byte_budget_bounds_the_cache():
+    # 8000 bytes per value
+    cache = ReturnCache(max_bytes=20000)
+    compute = lambda: (np.zeros(1000),)
+
+    for ticker in ("AAA", "BBB", "CCC"):
+        cache.get_or_compute(key(ticker), compute)
+
+    assert len(cache) == 2
+    assert cache._bytes == 16000
+    # A value larger than the whole budget is returned without being stored
+    small = ReturnCache(max_bytes=4000)
+    assert small.get_or_compute(key("AAA"), compute)[0].shape == (1000,)
+    assert len(small) == 0
+
+
+def test_invalidate_drops_only_entries_of_changed_tickers():
+    cache = ReturnCache()
+    compute, calls = counting()
+    for tickers in (("AAA",), ("AAA", "BBB"), ("BBB",), ("CCC",)):
+        cache.get_or_compute(key(*tickers), compute)
+
+    cache.invalidate(["AAA"])
+
+    assert len(cache) == 2
+    cache.get_or_compute(key("BBB"), compute)
+    cache.get_or_compute(key("CCC"), compute)
+    assert len(calls) == 4
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_new_bars_reported_by_the_price_store_invalidate_their_tickers(tmp_path):
+    store = PriceStore(tmp_path, fetcher=fixture_fetcher(model="gbm"))
+    cache = ReturnCache()
+    store.add_listener(cache.invalidate)
+    store.refresh(["AAA", "BBB"], "2020-01-01", "2020-06-01")
+    compute, calls = counting()
+    for tickers in (["AAA"], ["BBB"], ["AAA", "BBB"]):
+        cache.get_or_compute((tuple(tickers), "2020-01-01", "2020-06-01", store.version(tickers)), compute)
+
+    changed = store.refresh(["AAA"], "2020-01-01", "2020-07-01")
+
+    assert changed == ["AAA"]
+    assert len(cache) == 1
+    cache.get_or_compute((("BBB",), "2020-01-01", "2020-06-01", store.version(["BBB"])), compute)
+    assert len(calls) == 3
+    # A refresh that fetches nothing new leaves the cache alone
+    assert store.refresh(["BBB"], "2020-01-01", "2020-06-01") == []
+    assert len(cache) == 1
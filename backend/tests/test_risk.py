@@ -0,0 +1,127 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.risk import RiskEngines, RollingRisk, rolling_risk_metrics
+
+LEVELS = (0.9, 0.95, 0.99)
+
+
+@pytest.fixture
+def returns():
+    # Rounded to basis points so windows contain ties at the VaR threshold
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range("2020-01-01", periods=300)
+    values = np.round(rng.standard_t(4, size=(len(index), 3)) * 0.01, 4)
+    return pd.DataFrame(values, index=index, columns=["AAA", "BBB", "CCC"])
+
+
+def reference(values, window, level):
+    """
+    Rolling VaR and CVaR one window at a time with np.percentile and a
+    boolean mask, as `calculate_var` and `calculate_cvar` compute them.
+    """
+    var, cvar = [], []
+    for end in range(window, len(values) + 1):
+        sample = values[end - window:end]
+        threshold = np.percentile(sample, 100 * (1 - level))
+        var.append(-threshold)
+        cvar.append(-sample[sample <= threshold].mean())
+    return np.array(var), np.array(cvar)
+
+
+@pytest.mark.parametrize("window", [2, 20, 61])
+def test_rolling_metrics_match_percentile_and_tail_mean(returns, window):
+    values = returns.to_numpy()
+
+    # A small chunk budget splits the windows into several partitions
+    metrics = rolling_risk_metrics(values, window, LEVELS, max_chunk_bytes=8 * 3 * window * 17)
+
+    for i, level in enumerate(LEVELS):
+        for j in range(values.shape[1]):
+            var, cvar = reference(values[:, j], window, level)
+            np.testing.assert_allclose(metrics["var"][i, :, j], var, rtol=1e-12, atol=1e-15)
+            np.testing.assert_allclose(metrics["cvar"][i, :, j], cvar, rtol=1e-12, atol=1e-15)
+    np.testing.assert_allclose(metrics["volatility"], returns.rolling(window).std().to_numpy()[window - 1:],
+                               rtol=1e-9)
+
+
+def test_rolling_metrics_match_the_app_helpers(app_module, returns):
+    window = 60
+
+    metrics = rolling_risk_metrics(returns.to_numpy(), window, (0.95,))
+
+    for end in (window, 150, len(returns)):
+        sample = returns["BBB"].iloc[end - window:end]
+        assert metrics["var"][0, end - window, 1] == pytest.approx(app_module.calculate_var(sample, 0.95), rel=1e-12)
+        assert metrics["cvar"][0, end - window, 1] == pytest.approx(app_module.calculate_cvar(sample, 0.95), rel=1e-12)
+
+
+def test_rolling_metrics_reject_invalid_windows(returns):
+    for window in (1, len(returns) + 1):
+        with pytest.raises(ValueError):
+            rolling_risk_metrics(returns.to_numpy(), window)
+
+
+def assert_series_equal(actual, expected):
+    for name in ("var", "cvar"):
+        assert list(actual[name]) == list(expected[name])
+        for level in expected[name]:
+            pd.testing.assert_frame_equal(actual[name][level], expected[name][level], rtol=1e-12, atol=1e-15)
+    pd.testing.assert_frame_equal(actual["volatility"], expected["volatility"], rtol=1e-9)
+
+
+@pytest.mark.parametrize("window", [2, 21, 100])
+def test_incremental_updates_equal_a_full_rebuild(returns, window):
+    engine = RollingRisk(returns.iloc[:150], window, LEVELS)
+
+    assert engine.extend(returns)
+
+    assert engine.nobs == len(returns)
+    assert engine.last_date == returns.index[-1]
+    assert_series_equal(engine.series(), RollingRisk(returns, window, LEVELS).series())
+
+
+def test_extend_refuses_a_different_history(returns):
+    engine = RollingRisk(returns.iloc[:150], 20)
+    changed = returns.copy()
+    changed.index = changed.index + pd.Timedelta(days=1)
+
+    assert not engine.extend(changed)
+    assert not engine.extend(returns.iloc[:100])
+    assert not engine.extend(returns[["AAA", "BBB"]])
+    assert engine.nobs == 150
+
+
+def test_engines_rebuild_when_history_changes(returns):
+    engines = RiskEngines()
+    engines.series(returns.iloc[:200], 20)
+
+    restated = returns.iloc[50:]
+    series = engines.series(restated, 20)
+
+    assert_series_equal(series, RollingRisk(restated, 20).series())
+
+
+def test_concurrent_reads_see_consistent_snapshots(returns):
+    engines = RiskEngines()
+    lengths = [120, 180, 240, 300, 150, 300, 200, 260]
+    expected = {length: RollingRisk(returns.iloc[:length], 30, (0.95, 0.99)).series() for length in set(lengths)}
+    failures = []
+
+    def read(length):
+        try:
+            for _ in range(5):
+                assert_series_equal(engines.series(returns.iloc[:length], 30, (0.95, 0.99)), expected[length])
+        except Exception as e:
+            failures.append(e)
+
+    threads = [threading.Thread(target=read, args=(length,)) for length in lengths]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert failures == []
@@ -0,0 +1,120 @@
+import warnings
+
+import numpy as np
+import pytest
+
+import scripts.sarima_search as sarima_search
+from scripts.sarima_search import (build_sarima, detect_seasonal_periods, forecast_exog, fourier_terms,
+                                   search_sarima_order)
+
+
+def seasonal_walk(amplitudes, length=1500, seed=0):
+    """
+    Random walk whose daily change jumps by `amplitude` every `period` days,
+    for each {period: amplitude}. A pulse train's autocorrelation is flat
+    except at multiples of its period, so several can be detected together.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(length)
+    changes = rng.normal(0, 1, length)
+    for period, amplitude in amplitudes.items():
+        changes += amplitude * (t % period == 0)
+    return 100 + np.cumsum(changes)
+
+# ---------------------------
+# SEASONALITY
+# ---------------------------
+
+@pytest.mark.parametrize("period", [5, 12, 21, 63])
+def test_detects_the_seasonal_period_of_the_changes(period):
+    detected = detect_seasonal_periods(seasonal_walk({period: 3.0 * np.sqrt(period)}))
+
+    # Multiples of the period (24 for 12, 252 for 12, 21 and 63) correlate as strongly
+    assert period in detected
+    assert all(m % period == 0 for m in detected)
+
+
+def test_white_noise_has_no_seasonal_period():
+    assert detect_seasonal_periods(seasonal_walk({})) == []
+
+
+def test_max_periods_keeps_the_strongest():
+    # Autocorrelation at a period grows with amplitude² / period
+    values = seasonal_walk({5: 2.0, 12: 4.0, 63: 8.0})
+
+    assert detect_seasonal_periods(values, candidates=(5, 12, 63)) == [5, 12, 63]
+    assert detect_seasonal_periods(values, candidates=(5, 12, 63), max_periods=1) == [12]
+    assert detect_seasonal_periods(values, candidates=(5, 12, 63), max_periods=2) == [12, 63]
+
+
+def test_periods_without_two_cycles_are_skipped():
+    assert detect_seasonal_periods(seasonal_walk({63: 20.0}, length=120), candidates=(63,)) == []
+
+
+def test_fourier_terms_are_periodic_and_continue_past_the_sample():
+    terms = fourier_terms(0, 300, 63, 3)
+
+    assert terms.shape == (300, 6)
+    np.testing.assert_allclose(terms[:63], terms[63:126], atol=1e-12)
+    np.testing.assert_allclose(fourier_terms(250, 50, 63, 3), terms[250:], atol=1e-12)
+
+# ---------------------------
+# ORDER SEARCH
+# ---------------------------
+
+@pytest.fixture
+def candidates(monkeypatch):
+    # Record the candidates instead of fitting them
+    searched = []
+
+    def grid_search(fit, values, candidates, *args):
+        searched.extend(candidates)
+        return candidates[0], 0.0, len(candidates)
+
+    monkeypatch.setattr(sarima_search, "grid_search", grid_search)
+    return searched
+
+
+def test_search_is_bounded_by_the_strongest_period(candidates):
+    values = seasonal_walk({5: 2.0, 12: 4.0, 21: 3.0})
+    assert len(detect_seasonal_periods(values)) > 1
+
+    search_sarima_order(values, candidate_periods=(5, 12, 21), n_jobs=1)
+
+    periods = {seasonal_order[3] for _, seasonal_order, _ in candidates} - {0}
+    assert periods == {12}
+    # 9 non-seasonal orders, each alone or with one of 7 seasonal states
+    assert len(candidates) == 9 * 8
+
+
+def test_more_periods_can_be_searched(candidates):
+    search_sarima_order(seasonal_walk({5: 2.0, 12: 4.0, 63: 8.0}), candidate_periods=(5, 12, 63), max_periods=2,
+                        n_jobs=1)
+
+    assert {seasonal_order[3] for _, seasonal_order, _ in candidates} - {0} == {12}
+    assert {spec[2] for spec in candidates} - {None} == {(63, 1), (63, 2), (63, 3)}
+    assert len(candidates) == 9 * (1 + 7 + 3)
+
+
+def test_long_periods_use_fourier_terms(candidates):
+    search_sarima_order(seasonal_walk({63: 20.0}), candidate_periods=(63,), n_jobs=1)
+
+    fourier = {spec[2] for spec in candidates} - {None}
+    assert fourier == {(63, 1), (63, 2), (63, 3)}
+    assert all(spec[1] == (0, 0, 0, 0) for spec in candidates)
+
+
+def test_fourier_model_is_selected_and_forecasts():
+    values = seasonal_walk({63: 20.0}, length=500)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        spec, aic, fits = search_sarima_order(values, max_p=1, max_q=1, candidate_periods=(63,), n_jobs=1)
+        model = build_sarima(values, spec).fit(disp=False)
+        forecast = model.get_forecast(steps=20, exog=forecast_exog(spec, len(values), 20))
+
+    assert fits == 4 * 4
+    assert spec[2] is not None and spec[2][0] == 63
+    assert model.aic == pytest.approx(aic)
+    assert forecast.predicted_mean.shape == (20,)
+    assert forecast_exog(spec, len(values), 20).shape == (20, 2 * spec[2][1])
@@ -0,0 +1,61 @@
+import pytest
+
+from scripts.jobs import JobQueue
+from scripts.serving import SERVING_ROLES, gunicorn_config, nginx_routes, role_for_path
+
+
+def test_role_for_path():
+    assert role_for_path("/api/forecast") == "models"
+    assert role_for_path("/api/forecast/batch") == "models"
+    assert role_for_path("/api/backtest") == "models"
+    assert role_for_path("/api/jobs/forecast") == "data"
+    assert role_for_path("/api/analyze") == "data"
+    # Prefixes match whole path segments only
+    assert role_for_path("/api/forecasts") == "data"
+
+
+def test_every_endpoint_is_routed(app_module):
+    prefixes = SERVING_ROLES["models"]["paths"] + SERVING_ROLES["data"]["paths"]
+
+    for rule in app_module.app.url_map.iter_rules():
+        if rule.endpoint == "static":
+            continue
+        path = rule.rule.split("<")[0].rstrip("/") or "/"
+        assert any(path == prefix or path.startswith(prefix + "/") for prefix in prefixes), rule.rule
+
+
+def test_jobs_submitted_by_one_role_are_polled_by_the_other(app_module):
+    # Each role's workers build their own queue over the shared JOB_STORE_DIR
+    models = app_module.JOB_QUEUE
+    data = JobQueue(models.root)
+    job_id = models.submit("forecast", app_module.JOB_HANDLERS["forecast"], {"ticker": ""})
+    try:
+        status = data.status(job_id)
+    finally:
+        # Later tests start a fresh pool on demand
+        models._executor.shutdown()
+        models._executor = None
+
+    assert (status["job_id"], status["kind"]) == (job_id, "forecast")
+    assert data.status(job_id)["finished_at"] is not None
+
+
+def test_gunicorn_config(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    monkeypatch.setenv("SERVING_TIMEOUT", "60")
+
+    config = gunicorn_config("models", bind="127.0.0.1:9000")
+
+    assert config["bind"] == "127.0.0.1:9000"
+    assert (config["workers"], config["timeout"], config["worker_class"]) == (3, 60, "sync")
+    assert config["max_requests"] == 200
+    assert gunicorn_config("data")["max_requests"] == 0
+    with pytest.raises(ValueError):
+        gunicorn_config("gpu")
+
+
+def test_nginx_routes():
+    routes = nginx_routes({"models": "models:5001"})
+
+    assert "location /api/forecast {\n    proxy_pass http://models:5001;" in routes
+    assert "location /api/jobs {\n    proxy_pass http://127.0.0.1:5000;" in routes
@@ -0,0 +1,116 @@
+import json
+import threading
+import time
+
+import pytest
+
+from scripts.encoding import EVENT_STREAM, NDJSON
+
+TICKERS = ["AAA", "BBB", "CCC"]
+
+
+def parse_events(body):
+    events = []
+    for block in body.decode("utf-8").split("\n\n")[:-1]:
+        name, data = block.split("\n")
+        assert name.startswith("event: ") and data.startswith("data: ")
+        events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+# ---------------------------
+# /api/analyze
+# ---------------------------
+
+def test_ndjson_sends_one_line_per_ticker_then_a_summary(client):
+    response = client.post("/api/analyze", json={"stocks": TICKERS}, headers={"Accept": NDJSON})
+
+    assert response.status_code == 200
+    assert response.mimetype == NDJSON
+    assert response.headers["Cache-Control"] == "no-cache"
+    lines = [json.loads(line) for line in response.data.splitlines()]
+    assert sorted(line["ticker"] for line in lines[:-1]) == TICKERS
+    assert lines[-1] == {"message": "EDA completed successfully", "tickers": TICKERS, "failed": []}
+    for line in lines[:-1]:
+        assert line["format"] == "columnar"
+        assert all(len(values) == len(line["dates"]) for values in line["series"].values())
+
+
+def test_streamed_results_match_the_buffered_response(client):
+    buffered = client.post("/api/analyze", json={"stocks": ["AAA"]}).get_json()
+
+    response = client.post("/api/analyze", json={"stocks": ["AAA"]}, headers={"Accept": NDJSON})
+
+    streamed = json.loads(response.data.splitlines()[0])
+    assert streamed["dates"] == buffered["dates"]
+    assert streamed["series"] == buffered["results"]["AAA"]["series"]
+    assert streamed["basic_stats"] == buffered["results"]["AAA"]["basic_stats"]
+
+
+def test_server_sent_events_name_each_message(client):
+    response = client.post("/api/analyze", json={"stocks": TICKERS, "format": "records"},
+                           headers={"Accept": EVENT_STREAM})
+
+    assert response.mimetype == EVENT_STREAM
+    events = parse_events(response.data)
+    assert [name for name, _ in events] == ["ticker"] * 3 + ["done"]
+    assert "dates" not in events[0][1] and "format" not in events[0][1]
+
+
+def test_a_failing_ticker_is_reported_without_stopping_the_others(client, app_module, monkeypatch):
+    analyze_ticker = app_module.analyze_ticker
+
+    def failing(prices):
+        if prices.name == "BBB":
+            raise ValueError("not enough data")
+        return analyze_ticker(prices)
+
+    monkeypatch.setattr(app_module, "analyze_ticker", failing)
+
+    response = client.post("/api/analyze", json={"stocks": TICKERS}, headers={"Accept": EVENT_STREAM})
+
+    events = parse_events(response.data)
+    assert ("error", {"error": "not enough data", "ticker": "BBB"}) in events
+    assert sorted(data["ticker"] for name, data in events if name == "ticker") == ["AAA", "CCC"]
+    assert events[-1][1]["failed"] == ["BBB"]
+
+
+def test_invalid_streaming_requests_are_rejected_before_streaming(client):
+    response = client.post("/api/analyze", json={"stocks": [" "]}, headers={"Accept": NDJSON})
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "No valid stocks provided."}
+
+# ---------------------------
+# perform_eda
+# ---------------------------
+
+def test_tickers_are_loaded_lazily_and_abandoned_when_the_client_leaves(app_module):
+    loaded = []
+    lock = threading.Lock()
+
+    def load(ticker):
+        with lock:
+            loaded.append(ticker)
+        return app_module.fetch_and_preprocess_data([ticker])[ticker]
+
+    results = app_module.perform_eda(load, [f"T{i}" for i in range(40)], max_workers=2)
+
+    ticker, result = next(results)
+    assert "basic_stats" in result
+    # At most twice the workers are queued, and one more per finished ticker
+    assert len(loaded) <= 2 * 2 + 1
+    results.close()
+    time.sleep(0.2)
+    assert len(loaded) <= 2 * 2 + 1
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 32])
+def test_loaded_frames_are_analysed_in_chunks(app_module, monkeypatch, chunk_size):
+    monkeypatch.setattr(app_module, "EDA_CHUNK_SIZE", chunk_size)
+    data = app_module.fetch_and_preprocess_data(TICKERS)
+
+    results = dict(app_module.perform_eda(data, TICKERS + ["AAA", "ZZZ"], max_workers=2))
+
+    assert sorted(results) == TICKERS
+    single = app_module.analyze_ticker(data["BBB"])
+    assert results["BBB"]["basic_stats"] == single["basic_stats"]